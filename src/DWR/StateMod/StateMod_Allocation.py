@@ -0,0 +1,180 @@
+# StateMod_Allocation - prior appropriation allocation of river flow to water rights
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import numpy as np
+
+
+class StateMod_Allocation:
+    """
+    Prior appropriation allocation of river flow to direct flow rights for one time step.
+    This is a simplified form of the StateMod direct flow right allocation:  rights are processed in priority
+    order and each right diverts the minimum of its decree, the remaining demand and capacity of its station,
+    and the flow available at the station and all downstream nodes, so that a junior right cannot take water
+    that is needed to satisfy a senior right downstream.  Return flows, reservoirs, operating rules and
+    instream flows are not included.
+    All values must be in the same flow units (e.g., CFS) for the time step.
+
+    The path from a station to the outlet is checked and reduced with array operations on contiguous slices,
+    so the per-right cost does not involve Python loops over nodes.  The network is divided into chains once,
+    using the upstream sub-tree sizes from the network Euler tour (each node continues the chain of its
+    downstream node if it has the largest upstream sub-tree of the nodes draining to it).  The flow available
+    at each node is stored in chain order, so a path to the outlet is a few slices (one per chain, at most
+    log2 of the number of nodes), and the memory used is proportional to the number of nodes regardless of
+    the depth of the network.
+    """
+
+    def __init__(self, network, rights_table):
+        """
+        Construct the allocation for a river network and rights.
+        :param network: StateMod_RiverNetwork.
+        :param rights_table: StateMod_RightsTable built with station_ids=network.node_ids so that
+        the right station index is the network node index.
+        """
+        self.network = network
+        self.rights_table = rights_table
+
+        # Chain decomposition of the network, built when needed:  the first (most downstream) node of the
+        # chain containing each node, and the position of each node in chain order
+        self.chain_heads = None
+        self.chain_positions = None
+
+        # Node index -> list of (start, stop) slices of chain order from the node to the outlet, built as needed
+        self.path_slices = {}
+
+    def allocate(self, demand, capacity, gains):
+        """
+        Allocate river flow to rights for one time step.
+        :param demand: demand for each network node (e.g., monthly diversion demand converted to flow).
+        :param capacity: diversion capacity for each network node (e.g., StateMod_Diversion.divcap),
+        numpy.inf for no limit.  Use get_capacity_array() to build from diversion stations.
+        :param gains: incremental natural flow gain at each network node.
+        :return: (right_diversions, node_flows, station_diversions), where right_diversions is the amount
+        diverted by each right in rights_table.table order, node_flows is the river flow at each node after
+        diversions, and station_diversions is the total diverted at each node.
+        """
+        network = self.network
+        table = self.rights_table.table
+        demand_remaining = np.array(network.check_node_array(demand), dtype=np.float64)
+        capacity_remaining = np.array(network.check_node_array(capacity), dtype=np.float64)
+        # Flow at each node before diversions, which is also the flow available to divert
+        available = network.accumulate_upstream(gains)
+        np.maximum(available, 0.0, out=available)
+
+        # Flow available in chain order so that each path to the outlet is a few slices
+        positions = self.get_chain_positions()
+        available_chain = np.empty_like(available)
+        available_chain[positions] = available
+
+        right_diversions = np.zeros(len(table), dtype=np.float64)
+        stations = table["station"]
+        # Only rights that are on and at a network node can divert
+        active = np.nonzero((table["switch"] > 0) & (stations >= 0) & (table["decree"] > 0.0))[0]
+        decrees = table["decree"]
+        for k in active:
+            station = int(stations[k])
+            amount = min(decrees[k], demand_remaining[station], capacity_remaining[station])
+            if amount <= 0.0:
+                continue
+            slices = self.get_path_slices(station)
+            for start, stop in slices:
+                amount = min(amount, available_chain[start:stop].min())
+            if amount <= 0.0:
+                continue
+            for start, stop in slices:
+                available_chain[start:stop] -= amount
+            demand_remaining[station] -= amount
+            capacity_remaining[station] -= amount
+            right_diversions[k] = amount
+        available = available_chain[positions]
+
+        station_diversions = np.bincount(stations[active], weights=right_diversions[active],
+                                         minlength=network.get_node_count())
+        return right_diversions, available, station_diversions
+
+    @staticmethod
+    def get_capacity_array(network, diversions):
+        """
+        Return the diversion capacity for each network node.
+        :param network: StateMod_RiverNetwork.
+        :param diversions: list of StateMod_Diversion.
+        :return: array of capacity for each node, numpy.inf for nodes that are not diversions or that
+        have missing capacity.
+        """
+        capacity = np.full(network.get_node_count(), np.inf)
+        for div in diversions:
+            i = network.index_of(div.get_id())
+            divcap = div.get_divcap()
+            if (i >= 0) and (divcap is not None) and (divcap >= 0.0):
+                capacity[i] = divcap
+        return capacity
+
+    def get_chain_positions(self):
+        """
+        Return the position of each node in chain order, building the chain decomposition if necessary.
+        Each chain is contiguous in chain order, starting with its most downstream node.
+        :return: array of positions, one per node.
+        """
+        if self.chain_positions is None:
+            network = self.network
+            node_count = network.get_node_count()
+            downstream = network.downstream
+            # Number of nodes in each node's upstream sub-tree, including the node
+            sizes = network.tout - network.tin
+            # The node with the largest sub-tree draining to each node continues that node's chain
+            children = np.nonzero(downstream >= 0)[0]
+            order = children[np.lexsort((-sizes[children], downstream[children]))]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = downstream[order[1:]] != downstream[order[:-1]]
+            continues_chain = np.zeros(node_count, dtype=bool)
+            continues_chain[order[first]] = True
+            # Chain head and depth in the chain, in preorder so that downstream nodes are processed first
+            heads = np.arange(node_count, dtype=np.int64)
+            depths = np.zeros(node_count, dtype=np.int64)
+            for i in network.preorder[continues_chain[network.preorder]]:
+                heads[i] = heads[downstream[i]]
+                depths[i] = depths[downstream[i]] + 1
+            positions = np.empty(node_count, dtype=np.int64)
+            positions[np.lexsort((depths, heads))] = np.arange(node_count)
+            self.chain_heads = heads
+            self.chain_positions = positions
+        return self.chain_positions
+
+    def get_path_slices(self, node):
+        """
+        Return the slices of chain order that contain the path from a node to the outlet.
+        :param node: node index.
+        :return: list of (start, stop) positions in chain order (see get_chain_positions()).
+        """
+        slices = self.path_slices.get(node)
+        if slices is None:
+            positions = self.get_chain_positions()
+            heads = self.chain_heads
+            downstream = self.network.downstream
+            slices = []
+            i = node
+            while i >= 0:
+                head = heads[i]
+                slices.append((int(positions[head]), int(positions[i]) + 1))
+                i = downstream[head]
+            self.path_slices[node] = slices
+        return slices
@@ -0,0 +1,384 @@
+# StateMod_BTS - read StateMod binary output time series files
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+import os
+import struct
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_BTS:
+    """
+    Read a StateMod binary output time series file (*.B43, *.B44, *.B65 and the daily *.B49, *.B50, *.B66)
+    by memory-mapping the file.  The data records are exposed as a read-only array dimensioned
+    (time step x station x parameter) that is a view of the file, so selecting one parameter for all stations,
+    or all parameters for one station, does not copy or parse the data.  Values are only read from disk
+    when they are accessed.
+
+    The file is a direct-access file of fixed-length records, with little-endian 4-byte integers and floats,
+    following StateMod_BTS in the Java library.  The header records are:
+
+    * record 1 - units (char*4), iystr0 and iyend0 (first and last year, in the year type), the station counts
+      numsta (river nodes), numdiv (diversions), numifr (instream flows), numres (reservoirs), numown (reservoir
+      accounts), nrsact (active reservoir accounts), numrun (base flow stations), numdxw (D&W structures) and
+      numwel (wells), the parameter counts ndivO, nresO and nwelO (river node, reservoir and well parameters),
+      and the record length lrecl
+    * record 2 - month abbreviations (14 x char*4), starting with the first month of the year type,
+      followed by the total and average labels
+    * record 3 - days in each month (12 integers), in the same order as the month abbreviations
+    * station records - identifier (char*12) and name (char*24), one record per station, in blocks for the
+      river nodes, diversions, instream flows, reservoirs, reservoir accounts, base flow stations and wells
+    * parameter records - parameter name (char*24), one record per parameter, in blocks for the river node,
+      reservoir and well parameters
+
+    The data records follow, one record per station for each time step (month, or day for daily files), with the
+    parameter values as 4-byte floats at the start of the record.  River node files (*.B43, *.B49) have a record
+    for each river node, reservoir files (*.B44, *.B50) have a record for each reservoir followed by each reservoir
+    account, and well files (*.B65, *.B66) have a record for each well.
+    """
+
+    # Header record 1:  units, then iystr0, iyend0, numsta, numdiv, numifr, numres, numown, nrsact, numrun, numdxw,
+    # numwel, ndivO, nresO, nwelO and lrecl
+    header_format = "<4s15i"
+
+    # Header record 2:  month abbreviations
+    month_format = "<" + "4s" * 14
+
+    # Header record 3:  days in each month
+    month_day_format = "<12i"
+
+    # Station record:  identifier and name
+    station_format = "<12s24s"
+
+    # Parameter record:  name
+    parameter_format = "<24s"
+
+    # Data value type
+    value_dtype = np.dtype("<f4")
+
+    # Station blocks in the station records, in file order
+    STATION_BLOCK_RIVER = "River"
+    STATION_BLOCK_DIVERSION = "Diversion"
+    STATION_BLOCK_INSTREAM_FLOW = "InstreamFlow"
+    STATION_BLOCK_RESERVOIR = "Reservoir"
+    STATION_BLOCK_RESERVOIR_ACCOUNT = "ReservoirAccount"
+    STATION_BLOCK_BASE_FLOW = "BaseFlow"
+    STATION_BLOCK_WELL = "Well"
+    station_blocks = [
+        STATION_BLOCK_RIVER,
+        STATION_BLOCK_DIVERSION,
+        STATION_BLOCK_INSTREAM_FLOW,
+        STATION_BLOCK_RESERVOIR,
+        STATION_BLOCK_RESERVOIR_ACCOUNT,
+        STATION_BLOCK_BASE_FLOW,
+        STATION_BLOCK_WELL
+    ]
+
+    # Parameter blocks in the parameter records, in file order
+    parameter_blocks = [
+        StateMod_Util.STATION_TYPE_DIVERSION,
+        StateMod_Util.STATION_TYPE_RESERVOIR,
+        StateMod_Util.STATION_TYPE_WELL
+    ]
+
+    # File extension (upper case) -> station type of the parameters, station blocks of the data records,
+    # and whether the file is daily
+    file_types = {
+        "B43": (StateMod_Util.STATION_TYPE_DIVERSION, [STATION_BLOCK_RIVER], False),
+        "B44": (StateMod_Util.STATION_TYPE_RESERVOIR, [STATION_BLOCK_RESERVOIR, STATION_BLOCK_RESERVOIR_ACCOUNT],
+                False),
+        "B65": (StateMod_Util.STATION_TYPE_WELL, [STATION_BLOCK_WELL], False),
+        "B49": (StateMod_Util.STATION_TYPE_DIVERSION, [STATION_BLOCK_RIVER], True),
+        "B50": (StateMod_Util.STATION_TYPE_RESERVOIR, [STATION_BLOCK_RESERVOIR, STATION_BLOCK_RESERVOIR_ACCOUNT],
+                True),
+        "B66": (StateMod_Util.STATION_TYPE_WELL, [STATION_BLOCK_WELL], True)
+    }
+
+    # First month abbreviation -> first month of the year type
+    first_months = {
+        "JAN": 1,
+        "OCT": 10,
+        "NOV": 11
+    }
+
+    def __init__(self, filename):
+        """
+        Open a binary output file, read the header and memory-map the data records.
+        :param filename: name of the binary file to read.
+        """
+        logger = logging.getLogger(__name__)
+        self.filename = filename
+
+        extension = os.path.splitext(filename)[1][1:].upper()
+        if extension not in StateMod_BTS.file_types:
+            raise ValueError("File extension \"{}\" is not a known binary file type.".format(extension))
+        self.station_type, data_blocks, self.is_daily = StateMod_BTS.file_types[extension]
+
+        header_size = struct.calcsize(StateMod_BTS.header_format)
+        with open(filename, "rb") as f:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                raise ValueError("File \"{}\" is too short to be a StateMod binary file.".format(filename))
+            values = struct.unpack(StateMod_BTS.header_format, header)
+            self.units = values[0].decode("ascii").strip()
+            self.iystr0, self.iyend0, self.numsta, self.numdiv, self.numifr, self.numres, self.numown, \
+                self.nrsact, self.numrun, self.numdxw, self.numwel, self.ndivO, self.nresO, self.nwelO, \
+                self.record_length = values[1:]
+            self.station_counts = [self.numsta, self.numdiv, self.numifr, self.numres, self.numown, self.numrun,
+                                   self.numwel]
+            self.parameter_counts = [self.ndivO, self.nresO, self.nwelO]
+            if (min(self.station_counts) < 0) or (min(self.parameter_counts) < 0) or \
+                    (self.iyend0 < self.iystr0) or (self.record_length < StateMod_BTS.get_header_record_length()) or \
+                    (self.record_length < max(self.parameter_counts) * StateMod_BTS.value_dtype.itemsize):
+                raise ValueError("File \"{}\" header is not valid.".format(filename))
+
+            # Month abbreviations and days in each month
+            f.seek(self.record_length)
+            month_names = struct.unpack(StateMod_BTS.month_format, self.read_record(f, StateMod_BTS.month_format))
+            self.month_names = [name.decode("ascii").strip() for name in month_names]
+            f.seek(2 * self.record_length)
+            self.month_days = list(struct.unpack(StateMod_BTS.month_day_format,
+                                                 self.read_record(f, StateMod_BTS.month_day_format)))
+            self.start_month = StateMod_BTS.first_months.get(self.month_names[0].upper())
+            if self.start_month is None:
+                raise ValueError("File \"{}\" first month \"{}\" is not JAN, OCT or NOV.".format(
+                    filename, self.month_names[0]))
+
+            # Station records, in blocks
+            record = 3
+            self.station_block_ids = {}
+            self.station_block_names = {}
+            for block, count in zip(StateMod_BTS.station_blocks, self.station_counts):
+                ids = []
+                names = []
+                for i in range(count):
+                    f.seek(record * self.record_length)
+                    station_id, station_name = struct.unpack(StateMod_BTS.station_format,
+                                                             self.read_record(f, StateMod_BTS.station_format))
+                    ids.append(station_id.decode("ascii").strip())
+                    names.append(station_name.decode("ascii").strip())
+                    record += 1
+                self.station_block_ids[block] = ids
+                self.station_block_names[block] = names
+
+            # Parameter records, in blocks
+            self.parameter_block_names = {}
+            for block, count in zip(StateMod_BTS.parameter_blocks, self.parameter_counts):
+                names = []
+                for i in range(count):
+                    f.seek(record * self.record_length)
+                    names.append(struct.unpack(StateMod_BTS.parameter_format,
+                                               self.read_record(f, StateMod_BTS.parameter_format))[0]
+                                 .decode("ascii").strip())
+                    record += 1
+                self.parameter_block_names[block] = names
+
+        # Stations and parameters of the data records for the file type
+        self.station_ids = []
+        self.station_names = []
+        for block in data_blocks:
+            self.station_ids.extend(self.station_block_ids[block])
+            self.station_names.extend(self.station_block_names[block])
+        self.parameters = self.parameter_block_names[self.station_type]
+
+        # Station identifier -> index
+        self.station_index = {}
+        for i, station_id in enumerate(self.station_ids):
+            self.station_index.setdefault(station_id, i)
+
+        self.data_offset = record * self.record_length
+        step_count = len(self.get_dates())
+        station_count = len(self.station_ids)
+        parameter_count = len(self.parameters)
+        data_size = step_count * station_count * self.record_length
+        if os.path.getsize(filename) < self.data_offset + data_size:
+            raise ValueError("File \"{}\" is too short for {} time steps.".format(filename, step_count))
+        if (data_size == 0) or (parameter_count == 0):
+            self.data = np.zeros((step_count, station_count, parameter_count), dtype=StateMod_BTS.value_dtype)
+        else:
+            # Map the records and view the parameter values, skipping the unused end of each record
+            records = np.memmap(filename, dtype=np.uint8, mode="r", offset=self.data_offset,
+                                shape=(step_count, station_count, self.record_length))
+            self.data = records[:, :, :parameter_count * StateMod_BTS.value_dtype.itemsize].view(
+                StateMod_BTS.value_dtype)
+        logger.info("Mapped {} time steps x {} stations x {} parameters from \"{}\".".format(
+            step_count, station_count, parameter_count, filename))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the data array.  The file is unmapped when no views of the data remain.
+        """
+        self.data = None
+
+    def get_data(self):
+        """
+        :return: read-only array of values dimensioned (time step x station x parameter), a view of the file.
+        """
+        return self.data
+
+    def get_dates(self):
+        """
+        :return: numpy datetime64 array of the date for each time step, months for monthly files and days for
+        daily files, from the first month of iystr0 to the last month of iyend0 in the year type.
+        """
+        start = np.datetime64("{:04d}-{:02d}".format(self.get_start_year(), self.start_month), "M")
+        end = start + 12 * (self.iyend0 - self.iystr0 + 1)
+        if self.is_daily:
+            return np.arange(start.astype("datetime64[D]"), end.astype("datetime64[D]"))
+        return np.arange(start, end)
+
+    @staticmethod
+    def get_header_record_length():
+        """
+        :return: the smallest record length that holds each header record.
+        """
+        return max(struct.calcsize(StateMod_BTS.header_format), struct.calcsize(StateMod_BTS.month_format),
+                   struct.calcsize(StateMod_BTS.month_day_format), struct.calcsize(StateMod_BTS.station_format),
+                   struct.calcsize(StateMod_BTS.parameter_format))
+
+    def get_month_days(self):
+        """
+        :return: list of the days in each month from the header, starting with the first month of the year type.
+        """
+        return self.month_days
+
+    def get_month_names(self):
+        """
+        :return: list of the month abbreviations from the header, starting with the first month of the year type.
+        """
+        return self.month_names
+
+    def get_parameter(self, parameter):
+        """
+        Return the values of one parameter for all stations, without copying.
+        :param parameter: parameter name or index.
+        :return: array view dimensioned (time step x station).
+        """
+        return self.data[:, :, self.index_of_parameter(parameter)]
+
+    def get_parameters(self):
+        """
+        :return: list of the parameter names of the data records, in file order.
+        """
+        return self.parameters
+
+    def get_start_year(self):
+        """
+        :return: the first calendar year of the data, which is the year before iystr0 for water and
+        irrigation years.
+        """
+        if self.start_month > 1:
+            return self.iystr0 - 1
+        return self.iystr0
+
+    def get_station(self, station):
+        """
+        Return all parameter values for one station, without copying.
+        :param station: station identifier or index.
+        :return: array view dimensioned (time step x parameter).
+        """
+        return self.data[:, self.index_of_station(station), :]
+
+    def get_station_ids(self, block=None):
+        """
+        Return station identifiers.
+        :param block: station block (e.g., STATION_BLOCK_DIVERSION), or None for the stations of the data records.
+        :return: list of station identifiers, in file order.
+        """
+        if block is None:
+            return self.station_ids
+        return self.station_block_ids[block]
+
+    def get_station_names(self, block=None):
+        """
+        Return station names.
+        :param block: station block (e.g., STATION_BLOCK_DIVERSION), or None for the stations of the data records.
+        :return: list of station names, in file order.
+        """
+        if block is None:
+            return self.station_names
+        return self.station_block_names[block]
+
+    def get_units(self):
+        """
+        :return: the units of the data values from the header (e.g., "ACFT" or "CFS").
+        """
+        return self.units
+
+    def get_values(self, station, parameter):
+        """
+        Return the values of one parameter for one station, without copying.
+        :param station: station identifier or index.
+        :param parameter: parameter name or index.
+        :return: array view dimensioned (time step).
+        """
+        return self.data[:, self.index_of_station(station), self.index_of_parameter(parameter)]
+
+    def index_of_parameter(self, parameter):
+        """
+        Return the index of a parameter.
+        :param parameter: parameter index, name (e.g., "Total_Demand") or name with the group from the
+        StateMod_Util output_ts_data_types lists (e.g., "Demand - Total_Demand").
+        :return: index of the parameter.
+        """
+        if isinstance(parameter, (int, np.integer)):
+            return int(parameter)
+        for i, name in enumerate(self.parameters):
+            if (name == parameter) or (name == parameter.split(" - ", 1)[-1]):
+                return i
+        raise KeyError("Parameter \"{}\" is not in \"{}\".".format(parameter, self.filename))
+
+    def index_of_station(self, station):
+        """
+        Return the index of a station.
+        :param station: station index or identifier.
+        :return: index of the station.
+        """
+        if isinstance(station, (int, np.integer)):
+            return int(station)
+        i = self.station_index.get(station)
+        if i is None:
+            raise KeyError("Station \"{}\" is not in \"{}\".".format(station, self.filename))
+        return i
+
+    def read_record(self, f, record_format):
+        """
+        Read the start of a header record.
+        :param f: file positioned at the start of the record.
+        :param record_format: struct format of the record.
+        :return: bytes for the format.
+        """
+        size = struct.calcsize(record_format)
+        data = f.read(size)
+        if len(data) < size:
+            raise ValueError("File \"{}\" is too short for the header records.".format(self.filename))
+        return data
@@ -0,0 +1,563 @@
+# StateMod_Benchmark - performance benchmarks for StateMod data processing
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from RTi.Util.Time.YearType import YearType
+from DWR.StateMod.StateMod_Allocation import StateMod_Allocation
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
+from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
+from DWR.StateMod.StateMod_RightsTable import StateMod_RightsTable
+from DWR.StateMod.StateMod_RiverNetwork import StateMod_RiverNetwork
+from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
+from DWR.StateMod.StateMod_TS import StateMod_TS
+
+
+class StateMod_Benchmark:
+    """
+    Benchmarks that time StateMod processing on synthetic data of a requested size.
+    The benchmark suite writes a synthetic data set for each scale with StateMod_DataSetGenerator, then times
+    each reader and writer and a full data set load, recording wall time, peak memory and values per second.
+    Run from the command line with:
+
+        python -m DWR.StateMod.StateMod_Benchmark --scale small basin --output results.json
+        python -m DWR.StateMod.StateMod_Benchmark --output new.json --compare results.json
+        python -m DWR.StateMod.StateMod_Benchmark --scale allocation10k --output allocation.json
+
+    The allocation scales (e.g., "allocation10k", 10,000 nodes and 100,000 rights) time the single time step
+    allocation on a synthetic river network and rights rather than a generated data set, to show how allocation
+    scales with the number of nodes and rights.  The "allocation10kchain" scale uses a single main stem, the
+    deepest network for the number of nodes.  Their results are recorded and compared in the same way as the
+    data set scales.
+
+    The compare mode lists benchmarks that are slower or use more memory than the baseline results and
+    exits with status 1 if there are regressions.
+
+    The suite also times importing the main modules in a new Python process, which is the startup cost of
+    short-lived tools that use the package.
+    """
+
+    # Modules that are timed by the import benchmarks
+    import_modules = [
+        "DWR.StateMod.StateMod_DataSet",
+        "DWR.StateMod.StateMod_TS",
+        "DWR.StateMod.StateMod_Diversion"
+    ]
+
+    # Data set generator parameters for each scale.  The "basin" scale is about the size of a large
+    # Colorado River basin data set and "basin10" is ten times larger.
+    scales = {
+        "small": {
+            "node_count": 200, "diversion_count": 80, "rights_per_diversion": 2,
+            "return_flows_per_diversion": 2, "stream_gage_count": 20, "delay_table_count": 5,
+            "start_year": 2000, "end_year": 2004, "daily": True
+        },
+        "basin": {
+            "node_count": 1500, "diversion_count": 600, "rights_per_diversion": 3,
+            "return_flows_per_diversion": 2, "stream_gage_count": 100, "delay_table_count": 20,
+            "start_year": 1950, "end_year": 2019, "daily": False
+        },
+        "basin10": {
+            "node_count": 15000, "diversion_count": 6000, "rights_per_diversion": 3,
+            "return_flows_per_diversion": 2, "stream_gage_count": 1000, "delay_table_count": 20,
+            "start_year": 1950, "end_year": 2019, "daily": False
+        }
+    }
+
+    # River network and rights sizes for each allocation scale, see benchmark_allocation()
+    allocation_scales = {
+        "allocation1k": {"node_count": 1000, "right_count": 10000},
+        "allocation10k": {"node_count": 10000, "right_count": 100000},
+        # Single main stem, the deepest possible network
+        "allocation10kchain": {"node_count": 10000, "right_count": 100000, "max_reach": 1}
+    }
+
+    # Results file format version
+    results_version = 1
+
+    @staticmethod
+    def benchmark(function, repeat=3):
+        """
+        Time a function.  The function is run the requested number of times and the fastest time is used.
+        The function is then run once more with tracemalloc to measure the peak memory, which is not
+        included in the time because tracing slows down allocation.
+        :param function: function to time, which returns the number of values that were processed.
+        :param repeat: number of times to run the function for timing.
+        :return: dictionary of results:  seconds, peak_bytes, values and values_per_second.
+        """
+        seconds = None
+        values = 0
+        for i in range(max(repeat, 1)):
+            start = time.perf_counter()
+            values = function()
+            elapsed = time.perf_counter() - start
+            if (seconds is None) or (elapsed < seconds):
+                seconds = elapsed
+        tracemalloc.start()
+        try:
+            function()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        values_per_second = values / seconds if seconds > 0.0 else 0.0
+        return {"seconds": seconds, "peak_bytes": peak_bytes, "values": values,
+                "values_per_second": values_per_second}
+
+    @staticmethod
+    def benchmark_allocation(node_count=10000, right_count=100000, max_reach=50, repeat=3, seed=0):
+        """
+        Time a single time step allocation on a synthetic river network and rights.  The benchmarks are
+        creating the river network, creating the rights table, the first allocation (which divides the network
+        into chains and computes the downstream paths) and a repeated allocation (which uses the cached paths,
+        the time for each later time step).  Values are nodes for the network and rights otherwise.
+        :param node_count: number of river network nodes.
+        :param right_count: number of diversion rights.
+        :param max_reach: maximum number of nodes between a node and its downstream node in the node list
+        (see create_network_nodes()), 1 for a single main stem.
+        :param repeat: number of times to run each benchmark for timing.
+        :param seed: random number generator seed.
+        :return: dictionary of results in the same form as benchmark_scale().
+        """
+        logger = logging.getLogger(__name__)
+        rng = np.random.default_rng(seed)
+        parameters = {"node_count": node_count, "right_count": right_count, "max_reach": max_reach}
+        nodes = StateMod_Benchmark.create_network_nodes(node_count, rng, max_reach)
+        network = StateMod_RiverNetwork(nodes)
+        rights = StateMod_Benchmark.create_diversion_rights(network.node_ids, right_count, rng)
+        rights_table = StateMod_RightsTable([(StateMod_DataSetComponentType.DIVERSION_RIGHTS, rights)],
+                                            network.node_ids)
+        gains = rng.gamma(0.5, 20.0, node_count)
+        demand = np.where(rng.random(node_count) < 0.6, rng.gamma(1.0, 30.0, node_count), 0.0)
+        capacity = np.full(node_count, np.inf)
+        allocation = StateMod_Allocation(network, rights_table)
+
+        benchmarks = {}
+
+        def run(name, function):
+            logger.info("Running benchmark \"{}\" for {} nodes and {} rights".format(name, node_count, right_count))
+            try:
+                benchmarks[name] = StateMod_Benchmark.benchmark(function, repeat)
+            except Exception as e:
+                logger.warning("Error running benchmark \"{}\".".format(name), exc_info=True)
+                benchmarks[name] = {"error": str(e)}
+
+        def create_rights_table():
+            StateMod_RightsTable([(StateMod_DataSetComponentType.DIVERSION_RIGHTS, rights)], network.node_ids)
+            return right_count
+
+        def allocate_first():
+            StateMod_Allocation(network, rights_table).allocate(demand, capacity, gains)
+            return right_count
+
+        def allocate_repeat():
+            allocation.allocate(demand, capacity, gains)
+            return right_count
+
+        run("create_river_network", lambda: StateMod_RiverNetwork(nodes).get_node_count())
+        run("create_rights_table", create_rights_table)
+        run("allocation_first", allocate_first)
+        # Paths are cached after the first time step
+        allocation.allocate(demand, capacity, gains)
+        run("allocation_repeat", allocate_repeat)
+        return {"parameters": parameters, "benchmarks": benchmarks}
+
+    @staticmethod
+    def benchmark_import(module, repeat=10):
+        """
+        Time importing a module in a new Python process, as with 'python -c "import module"'.
+        The process is run the requested number of times and the fastest time is used.
+        The time to start Python without importing the module is subtracted to give the import time.
+        The current sys.path is passed to the process in PYTHONPATH so that the same modules are found.
+        :param module: name of the module to import, for example "DWR.StateMod.StateMod_DataSet".
+        :param repeat: number of times to run the process for timing.
+        :return: dictionary of results:  seconds (import time), process_seconds and startup_seconds.
+        """
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([path for path in sys.path if path != ""])
+
+        def run(code):
+            seconds = None
+            for i in range(max(repeat, 1)):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", code], env=env, check=True)
+                elapsed = time.perf_counter() - start
+                if (seconds is None) or (elapsed < seconds):
+                    seconds = elapsed
+            return seconds
+
+        startup_seconds = run("pass")
+        process_seconds = run("import " + module)
+        return {"seconds": max(process_seconds - startup_seconds, 0.0), "process_seconds": process_seconds,
+                "startup_seconds": startup_seconds}
+
+    @staticmethod
+    def benchmark_imports(modules=None, repeat=10):
+        """
+        Time importing modules in a new Python process.  See benchmark_import().
+        :param modules: list of module names, or None for StateMod_Benchmark.import_modules.
+        :param repeat: number of times to run each process for timing.
+        :return: dictionary of module name -> results.  A module that cannot be imported has an "error" result.
+        """
+        logger = logging.getLogger(__name__)
+        if modules is None:
+            modules = StateMod_Benchmark.import_modules
+        results = {}
+        for module in modules:
+            logger.info("Timing import of " + module)
+            try:
+                results[module] = StateMod_Benchmark.benchmark_import(module, repeat)
+            except subprocess.CalledProcessError as e:
+                logger.warning("Import of \"{}\" failed: {}".format(module, e))
+                results[module] = {"error": str(e)}
+        return results
+
+    @staticmethod
+    def benchmark_scale(scale, directory, repeat=3, seed=0):
+        """
+        Run the benchmarks for one scale.  Benchmarks that fail are logged and recorded with an error
+        message so that the remaining benchmarks still run.
+        Values are data objects (nodes, stations, rights) for station and right files and data values for
+        time series files and the data set load.
+        :param scale: scale name, a key in StateMod_Benchmark.scales.
+        :param directory: directory for the generated data set and output files.
+        :param repeat: number of times to run each benchmark for timing.
+        :param seed: random number generator seed for the data set.
+        :return: dictionary of results for the scale.
+        """
+        logger = logging.getLogger(__name__)
+        parameters = StateMod_Benchmark.scales[scale]
+        generator = StateMod_DataSetGenerator(seed=seed, **parameters)
+        start = time.perf_counter()
+        response_file = generator.generate(directory, scale)
+        generate_seconds = time.perf_counter() - start
+        base = os.path.join(directory, scale)
+
+        year_count = parameters["end_year"] - parameters["start_year"] + 1
+        month_count = year_count * 12
+        day_count = int((np.datetime64("{:04d}-01-01".format(parameters["end_year"] + 1)) -
+                         np.datetime64("{:04d}-01-01".format(parameters["start_year"]))).astype(np.int64))
+        ts_count = parameters["diversion_count"] + parameters["stream_gage_count"]
+        dataset_value_count = ts_count * month_count
+        if parameters["daily"]:
+            dataset_value_count += ts_count * day_count
+
+        benchmarks = {}
+
+        def run(name, function):
+            logger.info("Running benchmark \"{}\" for scale \"{}\"".format(name, scale))
+            try:
+                benchmarks[name] = StateMod_Benchmark.benchmark(function, repeat)
+            except Exception as e:
+                logger.warning("Error running benchmark \"{}\" for scale \"{}\".".format(name, scale), exc_info=True)
+                benchmarks[name] = {"error": str(e)}
+
+        def read_time_series(filename, step_count):
+            tslist = StateMod_TS.read_time_series_list(filename, None, None, None, True)
+            return len(tslist) * step_count
+
+        def write_time_series(tslist, filename, step_count):
+            with open(filename, "w") as out:
+                StateMod_TS.write_time_series_list(out, tslist, None, None, YearType.CALENDAR, -999.0, 2, False)
+            return len(tslist) * step_count
+
+        def write_diversions(diversions):
+            StateMod_Diversion.write_statemod_file(base + ".dds", base + "-out.dds", diversions, None, False)
+            return len(diversions)
+
+        def load_dataset():
+            dataset = StateMod_DataSet()
+            dataset.read_statemod_file(response_file, True, True, False, None)
+            return dataset_value_count
+
+        run("read_river_network", lambda: len(StateMod_RiverNetworkNode.read_statemod_file(base + ".rin")))
+        run("read_diversions", lambda: len(StateMod_Diversion.read_statemod_file(base + ".dds")))
+        run("read_diversion_rights", lambda: len(StateMod_DiversionRight.read_statemod_file(base + ".ddr")))
+        run("read_time_series_monthly", lambda: read_time_series(base + ".ddm", month_count))
+        if parameters["daily"]:
+            run("read_time_series_daily", lambda: read_time_series(base + ".ddd", day_count))
+
+        # Writers use the data that were read, outside of the timing
+        diversions = StateMod_Diversion.read_statemod_file(base + ".dds")
+        run("write_diversions", lambda: write_diversions(diversions))
+        tslist = StateMod_TS.read_time_series_list(base + ".ddm", None, None, None, True)
+        run("write_time_series_monthly", lambda: write_time_series(tslist, base + "-out.ddm", month_count))
+        if parameters["daily"]:
+            tslist = StateMod_TS.read_time_series_list(base + ".ddd", None, None, None, True)
+            run("write_time_series_daily", lambda: write_time_series(tslist, base + "-out.ddd", day_count))
+        tslist = None
+
+        run("load_dataset", load_dataset)
+
+        # One time step allocation using the network and rights that were read
+        network = StateMod_RiverNetwork(StateMod_RiverNetworkNode.read_statemod_file(base + ".rin"))
+        rights = StateMod_DiversionRight.read_statemod_file(base + ".ddr")
+        rights_table = StateMod_RightsTable([(StateMod_DataSetComponentType.DIVERSION_RIGHTS, rights)],
+                                            network.node_ids)
+        rng = np.random.default_rng(seed)
+        gains = rng.gamma(0.5, 20.0, network.get_node_count())
+        demand = np.full(network.get_node_count(), 20.0)
+        capacity = StateMod_Allocation.get_capacity_array(network, diversions)
+        allocation = StateMod_Allocation(network, rights_table)
+
+        def allocate():
+            allocation.allocate(demand, capacity, gains)
+            return rights_table.get_size()
+
+        run("allocation", allocate)
+
+        return {"parameters": parameters, "generate_seconds": generate_seconds, "benchmarks": benchmarks}
+
+    @staticmethod
+    def compare_results(results, baseline, threshold=0.2, min_seconds=0.01):
+        """
+        Compare benchmark results with baseline results.
+        :param results: results from run_suite().
+        :param baseline: baseline results, for example from read_results().
+        :param threshold: fraction by which the time or peak memory must increase to be a regression.
+        :param min_seconds: minimum increase in time to be a regression, to ignore timing noise in
+        very fast benchmarks.
+        :return: list of regression messages, empty if there are no regressions.
+        """
+        logger = logging.getLogger(__name__)
+        regressions = []
+        for scale, scale_results in results["scales"].items():
+            baseline_scale = baseline.get("scales", {}).get(scale)
+            if baseline_scale is None:
+                logger.info("Scale \"{}\" is not in the baseline - not comparing.".format(scale))
+                continue
+            if baseline_scale.get("parameters") != scale_results["parameters"]:
+                logger.warning("Scale \"{}\" parameters are different in the baseline - not comparing.".format(scale))
+                continue
+            for name, result in scale_results["benchmarks"].items():
+                baseline_result = baseline_scale["benchmarks"].get(name)
+                if (baseline_result is None) or ("error" in baseline_result):
+                    continue
+                if "error" in result:
+                    regressions.append("{} {}: error \"{}\"".format(scale, name, result["error"]))
+                    continue
+                seconds = result["seconds"]
+                baseline_seconds = baseline_result["seconds"]
+                if (seconds > baseline_seconds * (1.0 + threshold)) and (seconds - baseline_seconds > min_seconds):
+                    regressions.append("{} {}: time {:.4f} s, baseline {:.4f} s ({:+.0f}%)".format(
+                        scale, name, seconds, baseline_seconds, (seconds / baseline_seconds - 1.0) * 100.0))
+                peak_bytes = result["peak_bytes"]
+                baseline_peak_bytes = baseline_result["peak_bytes"]
+                if peak_bytes > baseline_peak_bytes * (1.0 + threshold):
+                    regressions.append("{} {}: peak memory {} bytes, baseline {} bytes ({:+.0f}%)".format(
+                        scale, name, peak_bytes, baseline_peak_bytes,
+                        (peak_bytes / max(baseline_peak_bytes, 1) - 1.0) * 100.0))
+        for module, result in results.get("imports", {}).items():
+            baseline_result = baseline.get("imports", {}).get(module)
+            if (baseline_result is None) or ("error" in baseline_result):
+                continue
+            if "error" in result:
+                regressions.append("import {}: error \"{}\"".format(module, result["error"]))
+                continue
+            seconds = result["seconds"]
+            baseline_seconds = baseline_result["seconds"]
+            if (seconds > baseline_seconds * (1.0 + threshold)) and (seconds - baseline_seconds > min_seconds):
+                regressions.append("import {}: time {:.4f} s, baseline {:.4f} s ({:+.0f}%)".format(
+                    module, seconds, baseline_seconds, (seconds / max(baseline_seconds, 1.0e-6) - 1.0) * 100.0))
+        return regressions
+
+    @staticmethod
+    def create_diversion_rights(node_ids, right_count, rng):
+        """
+        Create synthetic diversion rights located at random nodes.
+        :param node_ids: list of river node identifiers.
+        :param right_count: number of rights to create.
+        :param rng: numpy random number generator.
+        :return: list of StateMod_DiversionRight.
+        """
+        stations = rng.integers(0, len(node_ids), right_count)
+        admins = rng.uniform(1000.0, 60000.0, right_count)
+        decrees = rng.gamma(1.0, 10.0, right_count)
+        rights = []
+        # Number of rights at each station, used to make unique right identifiers
+        station_right_count = np.zeros(len(node_ids), dtype=np.int64)
+        for i in range(right_count):
+            station_right_count[stations[i]] += 1
+            right = StateMod_DiversionRight()
+            right.set_id("{}.{:02d}".format(node_ids[stations[i]], station_right_count[stations[i]]))
+            right.set_cgoto(node_ids[stations[i]])
+            right.set_irtem("{:.5f}".format(admins[i]))
+            right.set_dcrdiv(float(decrees[i]))
+            right.set_switch(1)
+            rights.append(right)
+        return rights
+
+    @staticmethod
+    def create_network_nodes(node_count, rng, max_reach=50):
+        """
+        Create synthetic river network nodes in upstream to downstream order.  Each node drains to a node
+        a random number of positions further down the list, which produces a branching network with a
+        depth of about node_count / (max_reach / 2).
+        :param node_count: number of nodes.
+        :param rng: numpy random number generator.
+        :param max_reach: maximum number of list positions between a node and its downstream node.
+        :return: list of StateMod_RiverNetworkNode.
+        """
+        nodes = []
+        steps = rng.integers(1, max_reach + 1, node_count)
+        for i in range(node_count):
+            node = StateMod_RiverNetworkNode()
+            node.set_id("{:06d}".format(i))
+            node.set_name("Node {}".format(i))
+            if i < node_count - 1:
+                node.set_cstadn("{:06d}".format(min(i + steps[i], node_count - 1)))
+            nodes.append(node)
+        return nodes
+
+    @staticmethod
+    def main(argv=None):
+        """
+        Run the benchmark suite from the command line.
+        :param argv: command line arguments, or None to use sys.argv.
+        :return: exit status, 1 if regressions were found in compare mode, otherwise 0.
+        """
+        parser = argparse.ArgumentParser(description="Run StateMod benchmarks on synthetic data sets.")
+        parser.add_argument("--scale", nargs="+", default=["small"],
+                            choices=list(StateMod_Benchmark.scales.keys()) +
+                            list(StateMod_Benchmark.allocation_scales.keys()),
+                            help="data set and allocation scales to run (default: small)")
+        parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of each benchmark")
+        parser.add_argument("--seed", type=int, default=0, help="random number generator seed for data sets")
+        parser.add_argument("--directory", help="directory for generated files (default: temporary directory)")
+        parser.add_argument("--output", help="JSON file to write results to")
+        parser.add_argument("--compare", help="JSON baseline results file to compare with")
+        parser.add_argument("--threshold", type=float, default=0.2,
+                            help="fractional increase in time or memory that is a regression (default: 0.2)")
+        parser.add_argument("--import-repeat", type=int, default=10,
+                            help="number of timed processes for each import benchmark, 0 to skip (default: 10)")
+        args = parser.parse_args(argv)
+
+        results = StateMod_Benchmark.run_suite(args.scale, args.repeat, args.seed, args.directory,
+                                               args.import_repeat)
+        for module, result in results["imports"].items():
+            if "error" in result:
+                print("{:<8} {:<40} error: {}".format("import", module, result["error"]))
+            else:
+                print("{:<8} {:<40} {:10.4f} s (process {:.4f} s, Python startup {:.4f} s)".format(
+                    "import", module, result["seconds"], result["process_seconds"], result["startup_seconds"]))
+        for scale, scale_results in results["scales"].items():
+            for name, result in scale_results["benchmarks"].items():
+                if "error" in result:
+                    print("{:<18} {:<28} error: {}".format(scale, name, result["error"]))
+                else:
+                    print("{:<18} {:<28} {:10.4f} s {:10.1f} MB {:14.0f} values/s".format(
+                        scale, name, result["seconds"], result["peak_bytes"] / 1.0e6, result["values_per_second"]))
+        if args.output is not None:
+            StateMod_Benchmark.write_results(results, args.output)
+        if args.compare is not None:
+            regressions = StateMod_Benchmark.compare_results(results, StateMod_Benchmark.read_results(args.compare),
+                                                             args.threshold)
+            for regression in regressions:
+                print("REGRESSION: " + regression)
+            if len(regressions) > 0:
+                return 1
+            print("No regressions compared to \"{}\".".format(args.compare))
+        return 0
+
+    @staticmethod
+    def read_results(filename):
+        """
+        Read benchmark results from a JSON file.
+        :param filename: name of file to read.
+        :return: dictionary of results.
+        """
+        with open(filename) as f:
+            return json.load(f)
+
+    @staticmethod
+    def run_suite(scales=None, repeat=3, seed=0, directory=None, import_repeat=10):
+        """
+        Run the import benchmarks and the benchmarks for one or more scales.
+        :param scales: list of data set scale names (keys in scales) and allocation scale names
+        (keys in allocation_scales), or None for "small".
+        :param repeat: number of times to run each benchmark for timing.
+        :param seed: random number generator seed for the data sets.
+        :param directory: directory for generated files, or None to use a temporary directory that is removed.
+        :param import_repeat: number of times to run each import benchmark process, 0 to skip the import benchmarks.
+        :return: dictionary of results, which can be written with write_results().
+        """
+        if scales is None:
+            scales = ["small"]
+        results = {
+            "version": StateMod_Benchmark.results_version,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+            "imports": {},
+            "scales": {}
+        }
+        if import_repeat > 0:
+            results["imports"] = StateMod_Benchmark.benchmark_imports(repeat=import_repeat)
+        for scale in scales:
+            if scale in StateMod_Benchmark.allocation_scales:
+                results["scales"][scale] = StateMod_Benchmark.benchmark_allocation(
+                    repeat=repeat, seed=seed, **StateMod_Benchmark.allocation_scales[scale])
+        dataset_scales = [scale for scale in scales if scale not in StateMod_Benchmark.allocation_scales]
+        if len(dataset_scales) == 0:
+            return results
+        if directory is None:
+            with tempfile.TemporaryDirectory() as temp_directory:
+                for scale in dataset_scales:
+                    results["scales"][scale] = StateMod_Benchmark.benchmark_scale(
+                        scale, os.path.join(temp_directory, scale), repeat, seed)
+        else:
+            for scale in dataset_scales:
+                results["scales"][scale] = StateMod_Benchmark.benchmark_scale(
+                    scale, os.path.join(directory, scale), repeat, seed)
+        return results
+
+    @staticmethod
+    def write_results(results, filename):
+        """
+        Write benchmark results to a JSON file.
+        :param results: results from run_suite().
+        :param filename: name of file to write.
+        """
+        with open(filename, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    sys.exit(StateMod_Benchmark.main())
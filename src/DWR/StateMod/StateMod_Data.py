@@ -93,6 +93,10 @@ class StateMod_Data:
         # StateMod_Data is the base class for most other classes.
         self.shape_found = bool
 
+        # Dataset component whose identifier and river node indexes include this object.
+        # This is set by StateMod_DataSetComponent so that set_id() and set_cgoto() keep the indexes current.
+        self.component = None
+
         self.initialize()
 
     def get_cgoto(self):
@@ -146,7 +150,10 @@ class StateMod_Data:
         if cgoto != self.cgoto:
             if (not self.is_clone) and (self.dataset is not None):
                 self.dataset.set_dirty(self.smdata_type, True)
+            old_cgoto = self.cgoto
             self.cgoto = cgoto
+            if (not self.is_clone) and (self.component is not None):
+                self.component.update_cgoto_index(self, old_cgoto)
 
     def set_dirty(self, dirty):
         """
@@ -163,7 +170,10 @@ class StateMod_Data:
         if (s is not None) and (s != self.id):
             if (not self.is_clone) and (self.dataset is not None):
                 self.dataset.set_dirty(self.smdata_type, True)
+            old_id = self.id
             self.id = s
+            if (not self.is_clone) and (self.component is not None):
+                self.component.update_id_index(self, old_id)
 
     def set_name(self, s):
         """
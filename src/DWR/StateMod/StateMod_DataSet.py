@@ -23,22 +23,18 @@
 
 import logging
 import os
+import tracemalloc
 
 from RTi.Util.IO.DataSet import DataSet
 from RTi.Util.IO.DataSetComponent import DataSetComponent
-from RTi.Util.IO.IOUtil import IOUtil
-from RTi.Util.IO.PropList import PropList
-from RTi.Util.Time.StopWatch import StopWatch
-from RTi.Util.Time.TimeInterval import TimeInterval
 from DWR.StateMod.StateMod_Data import StateMod_Data
+from DWR.StateMod.StateMod_DataSetComponent import StateMod_DataSetComponent
 from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
-from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
-from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
-from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
-from DWR.StateMod.StateMod_StreamGage import StateMod_StreamGage
-from DWR.StateMod.StateMod_TS import StateMod_TS
 from DWR.StateMod.StateMod_Util import StateMod_Util
 
+# The component readers, numpy based arrays and the RTi IO and time utilities are imported in the methods that
+# use them so that importing this module is fast, for example for tools that only read one file.
+
 
 class StateMod_DataSet(DataSet):
     """
@@ -729,304 +725,217 @@ class StateMod_DataSet(DataSet):
         StateMod_DataSetComponentType.GEOVIEW_GROUP
     ]
 
-    # The following array assigns the time series data types for use with time series.
+    # The following dictionary assigns the time series data types for use with time series, by component type.
     # For example, StateMod data sets do not contain a data type and therefore after
     # reading the file, the time series data type must be assumed. If the data component
-    # is known (e.g., because reading from a response file), then the following array
+    # is known (e.g., because reading from a response file), then the following dictionary
     # can be used to look up the data type for the time series. Components that are not
     # time series have blank strings for data types.
-    component_ts_data_types = [
-        "",  # "Control Data",
-        "",  # "Response",
-        "",  # "Control",
-        "",  # "Output Request",
-        "",  # "Reach Data",
-
-        "",  # "Consumptive Use Data",
-        "",  # "StateCU Structure",
-        "",  # "Irrigation Practice TS (Yearly)" - units vary because multiple time series in one file,
-        "CWR",  # "Consumptive Water Requirement (Monthly)",
-        "CWR",  # "Consumptive Water Requirement (Daily)",
-
-        "",  # "Stream Gage Data",
-        "",  # "Stream Gage Stations",
-        "FlowHist",
-        "FlowHist",
-        "FlowNatural",
-        "FlowNatural",
-
-        "",  # "Delay Table (Monthly) Data",
-        "",  # "Delay Tables (Monthly)",
-
-        "",  # "Delay Table (Daily) Data",
-        "",  # "Delay Tables (Daily)",
-
-        "",  # "Diversion Data",
-        "",  # "Diversion Stations",
-        "TotalWaterRights",  # "Diversion Rights",
-        "DiversionHist",  # "Diversion Historical TS (Monthly)",
-        "DiversionHist",  # "Diversion Historical TS (Daily)",
-        "Demand",  # Demand TS (Monthly)",
-        "DemandOverride",
-        "DemandAverage",
-        "Demand",
-
-        "",  # "Precipitation Data",
-        "Precipitation",  # "Precipitation Time Series (Monthly)",
-        "Precipitation",  # "Precipitation Time Series (Yearly)",
-
-        "",  # "Evaporation Data",
-        "Evaporation",  # "Evaporation Time Series (Monthly)",
-        "Evaporation",  # "Evaporation Time Series (Yearly)",
-
-        "",  # "Reservoir Data",
-        "",  # "Reservoir Stations",
-        "TotalWaterRights",  # "Reservoir Rights",
-        "ContentEOMHist",  # "Content, End of Month (Monthly)",
-        "ContentEODHist",  # "Content, End of Day (Daily)",
-        "Target",  # "Reservoir Targets (Monthly)",
-        "Target",  # "Reservoir Targets (Daily)",
+    component_ts_data_types = {
+        StateMod_DataSetComponentType.CONTROL_GROUP: "",
+        StateMod_DataSetComponentType.RESPONSE: "",
+        StateMod_DataSetComponentType.CONTROL: "",
+        StateMod_DataSetComponentType.OUTPUT_REQUEST: "",
+        StateMod_DataSetComponentType.REACH_DATA: "",
+
+        StateMod_DataSetComponentType.CONSUMPTIVE_USE_GROUP: "",
+        StateMod_DataSetComponentType.STATECU_STRUCTURE: "",
+        StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY: "",  # varies, multiple time series in one file
+        StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY: "CWR",
+        StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY: "CWR",
+
+        StateMod_DataSetComponentType.STREAMGAGE_GROUP: "",
+        StateMod_DataSetComponentType.STREAMGAGE_STATIONS: "",
+        StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_MONTHLY: "FlowHist",
+        StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY: "FlowHist",
+        StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY: "FlowNatural",
+        StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY: "FlowNatural",
+
+        StateMod_DataSetComponentType.DELAY_TABLE_MONTHLY_GROUP: "",
+        StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY: "",
+
+        StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP: "",
+        StateMod_DataSetComponentType.DELAY_TABLES_DAILY: "",
+
+        StateMod_DataSetComponentType.DIVERSION_GROUP: "",
+        StateMod_DataSetComponentType.DIVERSION_STATIONS: "",
+        StateMod_DataSetComponentType.DIVERSION_RIGHTS: "TotalWaterRights",
+        StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY: "DiversionHist",
+        StateMod_DataSetComponentType.DIVERSION_TS_DAILY: "DiversionHist",
+        StateMod_DataSetComponentType.DEMAND_TS_MONTHLY: "Demand",
+        StateMod_DataSetComponentType.DEMAND_TS_OVERRIDE_MONTHLY: "DemandOverride",
+        StateMod_DataSetComponentType.DEMAND_TS_AVERAGE_MONTHLY: "DemandAverage",
+        StateMod_DataSetComponentType.DEMAND_TS_DAILY: "Demand",
+
+        StateMod_DataSetComponentType.PRECIPITATION_GROUP: "",
+        StateMod_DataSetComponentType.PRECIPITATION_TS_MONTHLY: "Precipitation",
+        StateMod_DataSetComponentType.PRECIPITATION_TS_YEARLY: "Precipitation",
+
+        StateMod_DataSetComponentType.EVAPORATION_GROUP: "",
+        StateMod_DataSetComponentType.EVAPORATION_TS_MONTHLY: "Evaporation",
+        StateMod_DataSetComponentType.EVAPORATION_TS_YEARLY: "Evaporation",
+
+        StateMod_DataSetComponentType.RESERVOIR_GROUP: "",
+        StateMod_DataSetComponentType.RESERVOIR_STATIONS: "",
+        StateMod_DataSetComponentType.RESERVOIR_RIGHTS: "TotalWaterRights",
+        StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_MONTHLY: "ContentEOMHist",
+        StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY: "ContentEODHist",
+        StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_MONTHLY: "Target",
+        StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY: "Target",
         # "Min" and "Max" must be appended since the target always go in pairs
-        "",  # Returns
-
-        "",  # "Instream Flow Data",
-        "",  # "Instream Flow Stations",
-        "TotalWaterRights",  # "Instream Flow Rights",
-        "Demand",  # "Demand (Monthly)",
-        "DemandAverage",  # "Demand (Average Monthly)",
-        "Demand",  # "Demand (Daily)",
-
-        "",  # "Well Data",
-        "",  # "Well Stations",
-        "TotalWaterRights",  # "Well Rights",
-        "PumpingHist",  # "Well Historical Pumping (Monthly)",
-        "PumpingHist",  # "Well Historical Pumping (Daily)",
-        "Demand",  # "Demand (Monthly)",
-        "Demand",  # "Demand (Daily)",
-
-        "",  # "Plan Data",
-        "",  # "Plans",
-        "",  # Well data
-        "",  # Return
-
-        "",  # "Stream Estimate Data",
-        "",  # "Stream Estimate Stations",
-        "",  # "Stream Estimate Coefficients",
-        "FlowNatural",  # "Stream Natural Flow TS (Monthly)",
-        "FlowNatural",  # "Stream Natural Flow TS (Daily)",
-
-        "",  # "River Network Data",
-        "",  # "River Network",
-        "",  # "Network (Graphical)", # For StateDMI and GUI
-
-        "",  # "Operational Data",
-        "",  # "Operational Rights",
-        "Call",  # "Call time series",
-        "SJRIP",  # San Juan
-        "RioGrandeSpill",  # Rio Grande spill
-
-        "",  # "Spatial Data",
-        ""  # "GeoView Project"
-    ]
-
-    # The following array assigns the time series data intervals for use with time
-    # series.  This information is important because the data types themselves may
-    # not be unique and the interval must be examined
-    component_ts_data_intervals = [
-        TimeInterval.UNKNOWN,  # "Control Data",
-        TimeInterval.UNKNOWN,  # "Response",
-        TimeInterval.UNKNOWN,  # "Control",
-        TimeInterval.UNKNOWN,  # "Output Request",
-        TimeInterval.UNKNOWN,  # "Reach Data",
-
-        TimeInterval.UNKNOWN,  # "Consumptive Use Data",
-        TimeInterval.UNKNOWN,  # "StatCU Structure",
-        TimeInterval.YEAR,  # "Irrigation Practice TS (Yearly)",
-        TimeInterval.MONTH,  # "Consumptive Water Req. (Monthly)",
-        TimeInterval.DAY,  # "Consumptive Water Req. (Daily)",
-
-        TimeInterval.UNKNOWN,  # "Stream Gage Data",
-        TimeInterval.UNKNOWN,  # "Stream Gage Stations",
-        TimeInterval.MONTH,
-        TimeInterval.DAY,
-        TimeInterval.MONTH,
-        TimeInterval.DAY,
-
-        TimeInterval.UNKNOWN,  # "Delay Table (Monthly) Data",
-        TimeInterval.UNKNOWN,  # "Delay Tables (Monthly)",
-
-        TimeInterval.UNKNOWN,  # "Delay Table (Daily) Data",
-        TimeInterval.UNKNOWN,  # "DelayTables (Daily)",
-
-        TimeInterval.UNKNOWN,  # "Diversion Data",
-        TimeInterval.UNKNOWN,  # "Diversion Stations",
-        TimeInterval.UNKNOWN,  # "Diversion Rights",
-        TimeInterval.MONTH,  # "Diversion Historical TS (Monthly)",
-        TimeInterval.DAY,  # "Diversion Historical TS (Daily)",
-        TimeInterval.MONTH,  # "Demand TS (Monthly)"
-        TimeInterval.MONTH,
-        TimeInterval.MONTH,
-        TimeInterval.DAY,
-
-        TimeInterval.UNKNOWN,  # "Precipitation Data",
-        TimeInterval.MONTH,  # "Precipitation Time Series (Monthly)",
-        TimeInterval.YEAR,  # "Precipitation Time Series (Yearly)",
-
-        TimeInterval.UNKNOWN,  # "Evaporation Data",
-        TimeInterval.MONTH,  # "Evaporation Time Series (Monthly)",
-        TimeInterval.YEAR,  # "Evaporation Time Series (Yearly)",
-
-        TimeInterval.UNKNOWN,  # "Reservoir Data",
-        TimeInterval.UNKNOWN,  # "Reservoir Stations",
-        TimeInterval.UNKNOWN,  # "Reservoir Rights",
-        TimeInterval.MONTH,  # "Content, End of Month (Monthly)",
-        TimeInterval.DAY,  # "Content, End of Day (Daily)",
-        TimeInterval.MONTH,  # "Reservoir Targets (Monthly)",
-        TimeInterval.DAY,  # "Reservoir Targets(Daily)",
-        TimeInterval.UNKNOWN,  # "Return Flow",
-
-        TimeInterval.UNKNOWN,  # "Instream Flow Data",
-        TimeInterval.UNKNOWN,  # "Instream Flow Stations",
-        TimeInterval.UNKNOWN,  # "Instream Flow Rights",
-        TimeInterval.MONTH,  # "Demand (Monthly)",
-        TimeInterval.MONTH,  # "Demand (Average Monthly)",
-        TimeInterval.DAY,  # "Demand (Daily)",
-
-        TimeInterval.UNKNOWN,  # "Well Data",
-        TimeInterval.UNKNOWN,  # "Well Stations",
-        TimeInterval.UNKNOWN,  # "Well Rights",
-        TimeInterval.MONTH,  # "Well Historical Pumping (Monthly)",
-        TimeInterval.DAY,  # "Well Historical Pumping (Daily)",
-        TimeInterval.MONTH,  # "Demand (Monthly)",
-        TimeInterval.DAY,  # "Demand (Daily)",
-
-        TimeInterval.UNKNOWN,  # "Plan Data",
-        TimeInterval.UNKNOWN,  # "Plans",
-        TimeInterval.UNKNOWN,  # "Well augmentation",
-        TimeInterval.UNKNOWN,  # "Return",
-
-        TimeInterval.UNKNOWN,  # "Stream Estimate Data",
-        TimeInterval.UNKNOWN,  # "Stream Estimate Stations",
-        TimeInterval.UNKNOWN,  # "Stream Estimate Coefficients",
-        TimeInterval.MONTH,  # "Stream Natural Flow TS (Monthly)",
-        TimeInterval.DAY,  # "Stream Natural Flow TS (Daily)",
-
-        TimeInterval.UNKNOWN,  # "River Network Data",
-        TimeInterval.UNKNOWN,  # "River Network",
-        TimeInterval.UNKNOWN,  # "Network (Graphical)",
-
-        TimeInterval.UNKNOWN,  # "Operational Data",
-        TimeInterval.UNKNOWN,  # "Operational Rights",
-        TimeInterval.DAY,  # "Call time series",
-        TimeInterval.YEAR,  # "San Juan Sediment Recovery Plan",
-        TimeInterval.MONTH,  # "Rio Grande Spill",
-
-        TimeInterval.UNKNOWN,  # "Spatial Data",
-        TimeInterval.UNKNOWN,  # "GeoView Project"
-    ]
-
-    # The following array assigns the time series data units for use with time series.
+        StateMod_DataSetComponentType.RESERVOIR_RETURN: "",
+
+        StateMod_DataSetComponentType.INSTREAM_GROUP: "",
+        StateMod_DataSetComponentType.INSTREAM_STATIONS: "",
+        StateMod_DataSetComponentType.INSTREAM_RIGHTS: "TotalWaterRights",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY: "Demand",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_AVERAGE_MONTHLY: "DemandAverage",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY: "Demand",
+
+        StateMod_DataSetComponentType.WELL_GROUP: "",
+        StateMod_DataSetComponentType.WELL_STATIONS: "",
+        StateMod_DataSetComponentType.WELL_RIGHTS: "TotalWaterRights",
+        StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY: "PumpingHist",
+        StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY: "PumpingHist",
+        StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY: "Demand",
+        StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY: "Demand",
+
+        StateMod_DataSetComponentType.PLAN_GROUP: "",
+        StateMod_DataSetComponentType.PLANS: "",
+        StateMod_DataSetComponentType.PLAN_WELL_AUGMENTATION: "",
+        StateMod_DataSetComponentType.PLAN_RETURN: "",
+
+        StateMod_DataSetComponentType.STREAMESTIMATE_GROUP: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_STATIONS: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_COEFFICIENTS: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY: "FlowNatural",
+        StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY: "FlowNatural",
+
+        StateMod_DataSetComponentType.RIVER_NETWORK_GROUP: "",
+        StateMod_DataSetComponentType.RIVER_NETWORK: "",
+        StateMod_DataSetComponentType.NETWORK: "",
+
+        StateMod_DataSetComponentType.OPERATION_GROUP: "",
+        StateMod_DataSetComponentType.OPERATION_RIGHTS: "",
+        StateMod_DataSetComponentType.DOWNSTREAM_CALL_TS_DAILY: "Call",
+        StateMod_DataSetComponentType.SANJUAN_RIP: "SJRIP",
+        StateMod_DataSetComponentType.RIO_GRANDE_SPILL: "RioGrandeSpill",
+
+        StateMod_DataSetComponentType.GEOVIEW_GROUP: "",
+        StateMod_DataSetComponentType.GEOVIEW: ""
+    }
+
+    # The following dictionary assigns the time series data intervals for use with time
+    # series, by component type.  This information is important because the data types themselves may
+    # not be unique and the interval must be examined.
+    # The dictionary is built by get_component_ts_data_intervals() when first used so that the TimeInterval class
+    # is not imported when this module is imported.
+    component_ts_data_intervals = None
+
+
+    # The following dictionary assigns the time series data units for use with time series, by component type.
     # These can be used when creating new time series. If the data component is known (e.g., because
-    # reading them from a response file), then the following array can be used to look up the data units
+    # reading them from a response file), then the following dictionary can be used to look up the data units
     # for the time series. Components that are not time series have blank strings for data units.
-    component_ts_data_units = [
-        "",  # "Control Data",
-        "",  # "Response",
-        "",  # "Control",
-        "",  # "Output Request",
-        "",  # "Reach Data",
-
-        "",  # "Consumptive Use Data",
-        "",  # "StateCU Structure",
-        "",  # "Irrigation Practice TS (Yearly)" - units vary
-        "ACFT",  # "Consumptive Water Requirement (Monthly)",
-        "CFS",  # "Consumptive Water Requirement (Daily)",
-
-        "",  # "Stream Gage Data",
-        "",  # "Stream Gage Stations",
-        "ACFT",
-        "CFS",
-        "ACFT",
-        "CFS",
-
-        "",  # "Delay Table (Monthly) Data",
-        "",  # "Delay Tables (Monthly)",
-
-        "",  # "Delay Table (Daily) Data",
-        "",  # "Delay Tables (Daily)",
-
-        "",  # "Diversion Data",
-        "",  # "Diversion Stations",
-        "CFS",  # "Diversion Rights",
-        "ACFT",  # "Diversion Historical TS (Monthly)",
-        "CFS",  # "Diversion Historical TS (Daily)",
-        "ACFT",  # "Demand TS (Monthly)",
-        "ACFT",
-        "ACFT",
-        "CFS",
-
-        "",  # "Precipitation Data",
-        "IN",  # "Precipitation Time Series (Monthly)",
-        "IN",  # "Precipitation Time Series (Yearly)",
-
-        "",  # "Evaporation Data",
-        "IN",  # "Evaporation Time Series (Monthly)",
-        "IN",  # "Evaporation TIme Series (Daily)",
-
-        "",  # "Reservoir Data",
-        "",  # "Reservoir Stations",
-        "ACFT",  # "Reservoir Rights",
-        "ACFT",  # "Content, End of Month (Monthly)",
-        "ACFT",  # "Content, End of Month (Daily)",
-        "ACFT",  # "Reservoir Targets (Monthly)",
-        "ACFT",  # "Reservoir Targets (Daily)",
-        "",  # Return,
-
-        "",  # "Instream Flow Data",
-        "",  # "Instream Flow Stations",
-        "CFS",  # "Instream Flow Rights",
-        "CFS",  # "Demand (Monthly)",
-        "CFS",  # "Demand (Average Monthly)",
-        "CFS",  # "Demand (Daily)",
-
-        "",  # "Well Data",
-        "",  # "Well Stations",
-        "CFS",  # "Well Rights",
-        "ACFT",  # "Well Historical Pumping (Monthly)",
-        "CFS",  # "Well Historical Pumping (Daily)",
-        "ACFT",  # "Demand (Monthly)",
-        "CFS",  # "Demand (Daily)",
-
-        "",  # "Plan Data",
-        "",  # "Plans",
-        "",  # "Well Augmentation",
-        "",  # "Return",
-
-        "",  # "Stream Estimate Data",
-        "",  # "Stream Estimate Stations",
-        "",  # "Stream Estimate coefficients",
-        "ACFT",  # "Stream Natural Flow TS (Monthly)",
-        "CFS",  # "Stream Natural Flow TS (Daily)",
-
-        "",  # "River Network Data",
-        "",  # "River Network",
-        "",  # "Network (Graphical)",
-
-        "",  # "River Network Data",
-        "",  # "Operational Rights",
-        "DAY",  # "Call time series",
-        "",  # "San Juan Sediment Recovery Plan",
-        "",  # "Rio Grande Spill",
-
-        "",  # "Spatial Data",
-        ""   # "GeoView Project"
-    ]
+    component_ts_data_units = {
+        StateMod_DataSetComponentType.CONTROL_GROUP: "",
+        StateMod_DataSetComponentType.RESPONSE: "",
+        StateMod_DataSetComponentType.CONTROL: "",
+        StateMod_DataSetComponentType.OUTPUT_REQUEST: "",
+        StateMod_DataSetComponentType.REACH_DATA: "",
+
+        StateMod_DataSetComponentType.CONSUMPTIVE_USE_GROUP: "",
+        StateMod_DataSetComponentType.STATECU_STRUCTURE: "",
+        StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY: "",  # units vary
+        StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.STREAMGAGE_GROUP: "",
+        StateMod_DataSetComponentType.STREAMGAGE_STATIONS: "",
+        StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY: "CFS",
+        StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.DELAY_TABLE_MONTHLY_GROUP: "",
+        StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY: "",
+
+        StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP: "",
+        StateMod_DataSetComponentType.DELAY_TABLES_DAILY: "",
+
+        StateMod_DataSetComponentType.DIVERSION_GROUP: "",
+        StateMod_DataSetComponentType.DIVERSION_STATIONS: "",
+        StateMod_DataSetComponentType.DIVERSION_RIGHTS: "CFS",
+        StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.DIVERSION_TS_DAILY: "CFS",
+        StateMod_DataSetComponentType.DEMAND_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.DEMAND_TS_OVERRIDE_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.DEMAND_TS_AVERAGE_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.DEMAND_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.PRECIPITATION_GROUP: "",
+        StateMod_DataSetComponentType.PRECIPITATION_TS_MONTHLY: "IN",
+        StateMod_DataSetComponentType.PRECIPITATION_TS_YEARLY: "IN",
+
+        StateMod_DataSetComponentType.EVAPORATION_GROUP: "",
+        StateMod_DataSetComponentType.EVAPORATION_TS_MONTHLY: "IN",
+        StateMod_DataSetComponentType.EVAPORATION_TS_YEARLY: "IN",
+
+        StateMod_DataSetComponentType.RESERVOIR_GROUP: "",
+        StateMod_DataSetComponentType.RESERVOIR_STATIONS: "",
+        StateMod_DataSetComponentType.RESERVOIR_RIGHTS: "ACFT",
+        StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY: "ACFT",
+        StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY: "ACFT",
+        StateMod_DataSetComponentType.RESERVOIR_RETURN: "",
+
+        StateMod_DataSetComponentType.INSTREAM_GROUP: "",
+        StateMod_DataSetComponentType.INSTREAM_STATIONS: "",
+        StateMod_DataSetComponentType.INSTREAM_RIGHTS: "CFS",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY: "CFS",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_AVERAGE_MONTHLY: "CFS",
+        StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.WELL_GROUP: "",
+        StateMod_DataSetComponentType.WELL_STATIONS: "",
+        StateMod_DataSetComponentType.WELL_RIGHTS: "CFS",
+        StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY: "CFS",
+        StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.PLAN_GROUP: "",
+        StateMod_DataSetComponentType.PLANS: "",
+        StateMod_DataSetComponentType.PLAN_WELL_AUGMENTATION: "",
+        StateMod_DataSetComponentType.PLAN_RETURN: "",
+
+        StateMod_DataSetComponentType.STREAMESTIMATE_GROUP: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_STATIONS: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_COEFFICIENTS: "",
+        StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY: "ACFT",
+        StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY: "CFS",
+
+        StateMod_DataSetComponentType.RIVER_NETWORK_GROUP: "",
+        StateMod_DataSetComponentType.RIVER_NETWORK: "",
+        StateMod_DataSetComponentType.NETWORK: "",
+
+        StateMod_DataSetComponentType.OPERATION_GROUP: "",
+        StateMod_DataSetComponentType.OPERATION_RIGHTS: "",
+        StateMod_DataSetComponentType.DOWNSTREAM_CALL_TS_DAILY: "DAY",
+        StateMod_DataSetComponentType.SANJUAN_RIP: "",
+        StateMod_DataSetComponentType.RIO_GRANDE_SPILL: "",
+
+        StateMod_DataSetComponentType.GEOVIEW_GROUP: "",
+        StateMod_DataSetComponentType.GEOVIEW: ""
+    }
 
     def __init__(self, dataset_type=None):
         """
         Construct a dataset.
         :param dataset_type:  Dataset type, currently unused.
         """
+        from RTi.Util.IO.PropList import PropList
         # Initialize the base class data in DataSet so that its methods can be used to process components
         super().__init__(component_types=StateMod_DataSet.component_types,
                          component_names=StateMod_DataSet.component_names,
@@ -1034,6 +943,10 @@ class StateMod_DataSet(DataSet):
                          component_group_assignments=StateMod_DataSet.component_group_assignments,
                          component_group_primaries=StateMod_DataSet.component_group_primaries)
 
+        # Components by StateMod_DataSetComponentType, for constant time lookup of components, including
+        # the sub-components of groups.  This is maintained by add_component() and register_component().
+        self.component_registry = {}
+
         self.WAIT = 0
         self.READY = 1
 
@@ -1044,6 +957,24 @@ class StateMod_DataSet(DataSet):
         # performance is not an issue.
         self.read_time_series = True
 
+        # Cache of parsed component data that is shared with other data sets, such as StateMod_DataSetEnsemble,
+        # or None to always read component data files.  See read_component_data().
+        self.component_data_cache = None
+
+        # Time series component data as arrays, for query_ts(), by StateMod_DataSetComponentType
+        self.ts_arrays = {}
+
+        # Indicates whether summary statistics are computed for each time series component as it is read,
+        # see read_statemod_file() and get_ts_statistics().
+        self.compute_statistics = False
+
+        # Memory traced while reading each component, if read_statemod_file() was called with trace_memory=True,
+        # as a dictionary of component name -> dictionary with peak_bytes and retained_bytes.
+        self.memory_trace = None
+
+        # Component being read and traced memory at the start of the read, used with memory_trace.
+        self.memory_trace_start = None
+
         # String indicating blank file name - allowed to be a duplicate.
         self.BLANK_FILE_NAME = ""
 
@@ -1176,148 +1107,268 @@ class StateMod_DataSet(DataSet):
             pass  # not important
         self.initialize()
 
+    def add_component(self, comp):
+        """
+        Add a component to the data set and register it, and its sub-components, for lookup by component type.
+        :param comp: DataSetComponent to add.
+        """
+        super().add_component(comp)
+        self.register_component(comp)
+
+    def aggregate_ts(self, comp_type, interval, year_type=None, statistic=None, allowed_missing=0, ids=None,
+                     units=None):
+        """
+        Aggregate time series component data to months or years for all stations at once,
+        without creating time series objects.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :param interval: StateMod_TSAggregator.INTERVAL_MONTH (daily components) or INTERVAL_YEAR.
+        :param year_type: year type for annual values ("CYR", "WYR" or "IYR"), or None to use the file year type.
+        :param statistic: StateMod_TSAggregator statistic, or None to total or average based on the units.
+        :param allowed_missing: number of missing time steps allowed in a period before the period is missing.
+        :param ids: station identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :param units: units to convert the values to before aggregating (e.g., "ACFT"), or None for the file units.
+        :return: (values, periods, ids) where values is an array dimensioned (station x period), periods is a
+        numpy datetime64[M] array of months or an integer array of years and ids is the list of identifiers.
+        """
+        return self.get_ts_array(comp_type, units).aggregate(interval, year_type, statistic, allowed_missing, ids)
+
     def check_component_visibility(self):
-        visibility = True
+        """
+        Set the visibility of components based on the control file flags,
+        for example to hide daily components if the data set is not daily.
+        """
+        daily_types = [
+            StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY,
+            StateMod_DataSetComponentType.DEMAND_TS_DAILY,
+            StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY,
+            StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY,
+            StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY,
+            StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP,
+            StateMod_DataSetComponentType.DELAY_TABLES_DAILY,
+            StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY,
+            StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY,
+            StateMod_DataSetComponentType.DIVERSION_TS_DAILY,
+            StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY,
+            StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY
+        ]
+        well_types = [
+            StateMod_DataSetComponentType.WELL_GROUP,
+            StateMod_DataSetComponentType.WELL_STATIONS,
+            StateMod_DataSetComponentType.WELL_RIGHTS,
+            StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY,
+            StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY
+        ]
 
         # Check for daily data set (some may be reset in other checks below)...
 
-        if self.iday != 0:
-            visibility = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DEMAND_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DELAY_TABLES_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DIVERSION_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(visibility)
+        self.set_components_visible(daily_types, self.iday != 0)
 
         # The stream estimate natural flow time series are always invisible because
         # they are shared with the stream gage natural time series files...
 
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY)
-        if comp is not None:
-            comp.set_visible(False)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY)
-        if comp is not None:
-            comp.set_visible(False)
+        self.set_components_visible([StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY,
+                                     StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY], False)
 
         # Check well data set...
 
-        if self.has_well_data(False):
-            visiblity = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_GROUP)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_STATIONS)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_RIGHTS)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY)
-        if comp is not None:
-            comp.set_visible(visibility)
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY)
-        if comp is not None:
-            comp.set_visible(visibility)
+        visibility = self.has_well_data(False)
+        self.set_components_visible(well_types, visibility)
         if self.iday != 0:  # Else checked above
-            comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY)
-            if comp is not None:
-                comp.set_visible(visibility)
-            comp = self.get_component_for_component_type(StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY)
-            if comp is not None:
-                comp.set_visible(visibility)
+            self.set_components_visible([StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY,
+                                         StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY], visibility)
 
         # Check instream demand flag (component is in the instream flow group)...
 
-        if (self.ireach == 2) or (self.ireach == 3):
-            visibility = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY)
-        if comp is not None:
-            comp.set_visible(visibility)
+        self.set_components_visible([StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY],
+                                    (self.ireach == 2) or (self.ireach == 3))
 
         # Check SJRIP flag...
 
-        if self.isjrip != 0:
-            visiblity = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.SANJUAN_RIP)
-        if comp is not None:
-            comp.set_visible(visibility)
+        self.set_components_visible([StateMod_DataSetComponentType.SANJUAN_RIP], self.isjrip != 0)
 
         # Check irrigation practice flag (component is in the diversion group)...
-        if self.itsfile != 0:
-            visibility = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY)
-        if comp is not None:
-            comp.set_visible(visibility)
+
+        self.set_components_visible([StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY], self.itsfile != 0)
 
         # Check variable efficiency flag (component is in the diversions group)...
 
-        if self.ieffmax != 0:
-            visibility = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY)
-        if comp is not None:
-            comp.set_visible(visibility)
+        visibility = self.ieffmax != 0
+        self.set_components_visible([StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY], visibility)
         if self.iday != 0:  # Else already check above
-            comp = self.get_component_for_component_type(StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY)
-            if comp is not None:
-                comp.set_visible(visibility)
+            self.set_components_visible([StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY],
+                                        visibility)
 
         # Check the soil moisture flag (component is in the diversion group)...
-        if self.soild != 0.0:
-            visibility = True
-        else:
-            visibility = False
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.STATECU_STRUCTURE)
-        if comp is not None:
-            comp.set_visible(visibility)
+
+        self.set_components_visible([StateMod_DataSetComponentType.STATECU_STRUCTURE], self.soild != 0.0)
 
         # Hide the network (Graphical) file until it is fully implemented...
 
-        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.NETWORK)
-        if comp is not None:
-            comp.set_visible(True)
+        self.set_components_visible([StateMod_DataSetComponentType.NETWORK], True)
+
+    def check_integrity(self, max_workers=None):
+        """
+        Check the referential integrity of the data set, for example that station river nodes and return flow
+        nodes are in the river network, that rights are for known stations, that stations have time series,
+        and that identifiers are unique.  See StateMod_IntegrityCheck.
+        :param max_workers: maximum number of threads to use for the checks, or None for the default.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        from DWR.StateMod.StateMod_IntegrityCheck import StateMod_IntegrityCheck
+        return StateMod_IntegrityCheck(self).check_integrity(max_workers)
+
+    def component_to_dataframe(self, comp_type, ids=None, start=None, end=None, units=None):
+        """
+        Return time series component data as a wide (time x station) pandas DataFrame with a monthly or daily
+        PeriodIndex, backed by the component's StateMod_TSArray values without copying when the selected stations
+        are contiguous (for example all stations).  The units and year type of the file are in DataFrame.attrs.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :param ids: station identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :param start: first date to include, or None to start with the first date.
+        :param end: last date to include, or None to end with the last date.
+        :param units: units to convert the values to (e.g., "CFS"), or None for the file units.
+        Converted values are a new array rather than a view of the component's array.
+        :return: pandas DataFrame
+        """
+        return self.get_ts_array(comp_type, units).to_dataframe(ids, start, end)
+
+    def fill_ts(self, comp_type, method, constant=None, pattern=None, max_gap=None, units=None):
+        """
+        Fill missing values in time series component data for all stations at once,
+        without creating time series objects.  The component data are not modified.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :param method: StateMod_TSFill.FILL_CONSTANT, FILL_INTERPOLATE, FILL_MONTHLY_AVERAGE or FILL_PATTERN.
+        :param constant: value for constant fill.
+        :param pattern: pattern for pattern fill, an array of the pattern (e.g., "WET", "AVG", "DRY") for each time
+        step, one dimensional or dimensioned (station x time step).
+        :param max_gap: largest number of consecutive missing values to fill with interpolation, or None for any.
+        :param units: units to convert the values to before filling (e.g., "CFS"), or None for the file units.
+        :return: StateMod_TSArray with the filled values.
+        """
+        return self.get_ts_array(comp_type, units).fill(method, constant, pattern, max_gap)
+
+    def get_component_for_component_type(self, comp_type):
+        """
+        Return the component for a component type, using the component registry rather than searching the
+        component groups.
+        :param comp_type: StateMod_DataSetComponentType, or its integer value.
+        :return: the component, or None if the data set does not include the component type.
+        """
+        comp_type = StateMod_DataSet.to_component_type(comp_type)
+        comp = self.component_registry.get(comp_type)
+        if (comp is None) and (comp_type is not None):
+            # Sub-component that was added to a group after the group was added to the data set
+            comp = super().get_component_for_component_type(comp_type)
+            if comp is not None:
+                self.component_registry[comp_type] = comp
+        return comp
+
+    @staticmethod
+    def get_component_ts_data_intervals():
+        """
+        Return the time series data intervals for the components, building the dictionary the first time it is
+        needed.
+        :return: dictionary of StateMod_DataSetComponentType -> TimeInterval base interval, with
+        TimeInterval.UNKNOWN for components that are not time series.
+        """
+        if StateMod_DataSet.component_ts_data_intervals is None:
+            from RTi.Util.Time.TimeInterval import TimeInterval
+            intervals = {
+                StateMod_DataSetComponentType.CONTROL_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.RESPONSE: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.CONTROL: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.OUTPUT_REQUEST: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.REACH_DATA: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.CONSUMPTIVE_USE_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STATECU_STRUCTURE: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY: TimeInterval.YEAR,
+                StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.STREAMGAGE_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STREAMGAGE_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.DELAY_TABLE_MONTHLY_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DELAY_TABLES_DAILY: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.DIVERSION_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DIVERSION_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DIVERSION_RIGHTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.DIVERSION_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.DEMAND_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.DEMAND_TS_OVERRIDE_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.DEMAND_TS_AVERAGE_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.DEMAND_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.PRECIPITATION_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.PRECIPITATION_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.PRECIPITATION_TS_YEARLY: TimeInterval.YEAR,
+
+                StateMod_DataSetComponentType.EVAPORATION_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.EVAPORATION_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.EVAPORATION_TS_YEARLY: TimeInterval.YEAR,
+
+                StateMod_DataSetComponentType.RESERVOIR_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.RESERVOIR_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.RESERVOIR_RIGHTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.RESERVOIR_RETURN: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.INSTREAM_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.INSTREAM_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.INSTREAM_RIGHTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_AVERAGE_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.WELL_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.WELL_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.WELL_RIGHTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.PLAN_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.PLANS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.PLAN_WELL_AUGMENTATION: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.PLAN_RETURN: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.STREAMESTIMATE_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STREAMESTIMATE_STATIONS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STREAMESTIMATE_COEFFICIENTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY: TimeInterval.MONTH,
+                StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY: TimeInterval.DAY,
+
+                StateMod_DataSetComponentType.RIVER_NETWORK_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.RIVER_NETWORK: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.NETWORK: TimeInterval.UNKNOWN,
+
+                StateMod_DataSetComponentType.OPERATION_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.OPERATION_RIGHTS: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.DOWNSTREAM_CALL_TS_DAILY: TimeInterval.DAY,
+                StateMod_DataSetComponentType.SANJUAN_RIP: TimeInterval.YEAR,
+                StateMod_DataSetComponentType.RIO_GRANDE_SPILL: TimeInterval.MONTH,
+
+                StateMod_DataSetComponentType.GEOVIEW_GROUP: TimeInterval.UNKNOWN,
+                StateMod_DataSetComponentType.GEOVIEW: TimeInterval.UNKNOWN
+            }
+            StateMod_DataSet.component_ts_data_intervals = intervals
+        return StateMod_DataSet.component_ts_data_intervals
 
     def get_data_file_path_absolute(self, file_object):
         """
@@ -1325,9 +1376,11 @@ class StateMod_DataSet(DataSet):
         working directory.  If the file is already an absolute path, the same value is
         returned.  Otherwise, the data set directory is prepended to the component data
         file name (which may be relative to the data set directory) and then calls IOUtil.get_path_using_working_dir().
+        If the file does not exist but a compressed file does (e.g., "file.ddm.gz"), the compressed file is returned.
         :param file_object: Data file object, either a string path or DataSetComponent.
         :return: Full path to the data file (absolute), using the working directory.
         """
+        from RTi.Util.IO.IOUtil import IOUtil
         # First get the filename
         logger = logging.getLogger(__name__)
         if isinstance(file_object, DataSetComponent):
@@ -1342,9 +1395,107 @@ class StateMod_DataSet(DataSet):
         else:
             logger.info("StateMod component data file name is '" + file + "'.")
         if os.path.isabs(file):
-            return file
+            return StateMod_Util.find_file(file)
+        else:
+            return StateMod_Util.find_file(
+                IOUtil.get_path_using_working_dir(str(self.get_dataset_directory() + os.path.sep + file)))
+
+    def get_delay_table_array(self, is_monthly):
+        """
+        Return the delay tables as a padded array, for use in lagging return flows.
+        :param is_monthly: True for monthly delay tables, False for daily delay tables.
+        :return: StateMod_DelayTableArray, or None if delay table data are not available.
+        """
+        from DWR.StateMod.StateMod_DelayTableArray import StateMod_DelayTableArray
+        if is_monthly:
+            comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY)
         else:
-            return IOUtil.get_path_using_working_dir(str(self.get_dataset_directory() + os.path.sep + file))
+            comp = self.get_component_for_component_type(StateMod_DataSetComponentType.DELAY_TABLES_DAILY)
+        if (comp is None) or (not isinstance(comp.get_data(), list)):
+            return None
+        return StateMod_DelayTableArray(comp.get_data())
+
+    def get_river_network(self):
+        """
+        Build the river network from the river network (.rin) component data.  The network is built
+        each time the method is called, so keep a reference to it for repeated queries.
+        :return: StateMod_RiverNetwork, or None if river network data are not available.
+        """
+        from DWR.StateMod.StateMod_RiverNetwork import StateMod_RiverNetwork
+        comp = self.get_component_for_component_type(StateMod_DataSetComponentType.RIVER_NETWORK)
+        if (comp is None) or (not isinstance(comp.get_data(), list)):
+            return None
+        return StateMod_RiverNetwork(comp.get_data())
+
+    def get_rights_table(self, station_ids=None):
+        """
+        Build a priority-sorted rights table from the rights components that have data.
+        Currently diversion rights are read by the data set.
+        :param station_ids: list of station identifiers for the table station index, for example
+        the river network node identifiers, or None to build the station list from the rights.
+        :return: StateMod_RightsTable
+        """
+        from DWR.StateMod.StateMod_RightsTable import StateMod_RightsTable
+        right_lists = []
+        for right_type in [StateMod_DataSetComponentType.DIVERSION_RIGHTS]:
+            comp = self.get_component_for_component_type(right_type)
+            if (comp is not None) and isinstance(comp.get_data(), list):
+                right_lists.append((right_type, comp.get_data()))
+        return StateMod_RightsTable(right_lists, station_ids)
+
+    def get_ts_array(self, comp_type, units=None):
+        """
+        Return time series component data as a StateMod_TSArray, without creating time series objects.
+        The component's data file is parsed the first time the component is requested.
+        If the component has been modified in memory, the array is created from the component's time series.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :param units: units to convert the values to (e.g., "CFS"), using the data set factor to convert CFS to
+        AF/day, or None for the file units.
+        :return: StateMod_TSArray
+        """
+        from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+        comp_type = StateMod_DataSet.to_component_type(comp_type)
+        comp = self.get_component_for_component_type(comp_type)
+        if comp is None:
+            raise ValueError("Data set does not have component {}.".format(comp_type))
+        is_daily = comp_type.name.endswith("_DAILY")
+        if comp.is_dirty() and isinstance(comp.get_data(), list):
+            # Data have been modified so do not use the file
+            self.ts_arrays.pop(comp_type, None)
+            ts_array = StateMod_TSArray.from_ts_list(comp.get_data(), is_daily)
+            if units is not None:
+                ts_array = ts_array.convert_units(units, self.factor)
+            return ts_array
+        ts_array = self.ts_arrays.get(comp_type)
+        if ts_array is None:
+            fn = comp.get_data_file_name()
+            if (fn is None) or (fn == ""):
+                ts_array = StateMod_TSArray.from_ts_list(comp.get_data() or [], is_daily)
+            else:
+                ts_array = self.read_component_data(
+                    comp, self.get_data_file_path_absolute(fn),
+                    lambda f: StateMod_TSArray.read_statemod_file(f, is_daily, compute_missing_mask=True),
+                    parameters=("StateMod_TSArray",))
+            self.ts_arrays[comp_type] = ts_array
+        if units is not None:
+            ts_array = ts_array.convert_units(units, self.factor)
+        return ts_array
+
+    def get_ts_statistics(self, comp_type):
+        """
+        Return the summary statistics for each time series in a component.  The statistics computed when the data
+        set was read with compute_statistics=True are used, otherwise they are computed from the component
+        data as an array (see get_ts_array()) and saved with the component.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :return: StateMod_TSStatistics
+        """
+        comp_type = StateMod_DataSet.to_component_type(comp_type)
+        comp = self.get_component_for_component_type(comp_type)
+        if comp is None:
+            raise ValueError("Data set does not have component {}.".format(comp_type))
+        if (comp.get_statistics() is None) or comp.is_dirty():
+            comp.set_statistics(self.get_ts_array(comp_type).get_statistics())
+        return comp.get_statistics()
 
     def get_unhandled_response_file_properties(self):
         """
@@ -1424,247 +1575,248 @@ class StateMod_DataSet(DataSet):
         #  TODO - should be allowed to have null data Vector but apparently
         #  StateMod GUI cannot handle yet - need to allow null later and use
         #  hasData() or similar to check.
+        from RTi.Util.IO.PropList import PropList
         logger = logging.getLogger(__name__)
         try:
             logger.info("Initializing dataset components")
             comp = DataSetComponent(self, StateMod_DataSetComponentType.CONTROL_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESPONSE)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESPONSE)
             subcomp.set_data(PropList())
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.CONTROL)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.CONTROL)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.OUTPUT_REQUEST)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.OUTPUT_REQUEST)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.REACH_DATA)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.REACH_DATA)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.CONSUMPTIVE_USE_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STATECU_STRUCTURE)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STATECU_STRUCTURE)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.IRRIGATION_PRACTICE_TS_YEARLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.CONSUMPTIVE_WATER_REQUIREMENT_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_HISTORICAL_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLE_MONTHLY_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY)
             subcomp.set_data([])
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLE_DAILY_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLES_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DELAY_TABLES_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_RIGHTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_RIGHTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DIVERSION_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_OVERRIDE_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_OVERRIDE_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_AVERAGE_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_AVERAGE_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DEMAND_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.PRECIPITATION_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.PRECIPITATION_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.PRECIPITATION_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.PRECIPITATION_TS_YEARLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.PRECIPITATION_TS_YEARLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.EVAPORATION_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.EVAPORATION_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.EVAPORATION_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.EVAPORATION_TS_YEARLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.EVAPORATION_TS_YEARLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_RIGHTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_RIGHTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_CONTENT_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_TARGET_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_RETURN)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RESERVOIR_RETURN)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_RIGHTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_RIGHTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_AVERAGE_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_AVERAGE_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.INSTREAM_DEMAND_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_RIGHTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_RIGHTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_PUMPING_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_PUMPING_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_DEMAND_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.WELL_DEMAND_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.PLAN_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.PLANS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.PLANS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.PLAN_WELL_AUGMENTATION)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.PLAN_WELL_AUGMENTATION)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.PLAN_RETURN)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.PLAN_RETURN)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_STATIONS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_STATIONS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_COEFFICIENTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_COEFFICIENTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.RIVER_NETWORK_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RIVER_NETWORK)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RIVER_NETWORK)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.NETWORK)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.NETWORK)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.OPERATION_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.OPERATION_RIGHTS)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.OPERATION_RIGHTS)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.DOWNSTREAM_CALL_TS_DAILY)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.DOWNSTREAM_CALL_TS_DAILY)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.SANJUAN_RIP)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.SANJUAN_RIP)
             subcomp.set_data([])
             comp.add_component(subcomp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.RIO_GRANDE_SPILL)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.RIO_GRANDE_SPILL)
             subcomp.set_data([])
             comp.add_component(subcomp)
 
             comp = DataSetComponent(self, StateMod_DataSetComponentType.GEOVIEW_GROUP)
             comp.set_list_source(DataSetComponent.LIST_SOURCE_PRIMARY_COMPONENT)
             self.add_component(comp)
-            subcomp = DataSetComponent(self, StateMod_DataSetComponentType.GEOVIEW)
+            subcomp = StateMod_DataSetComponent(self, StateMod_DataSetComponentType.GEOVIEW)
             subcomp.set_data([])
             comp.add_component(subcomp)
         except Exception as e:
@@ -1672,6 +1824,10 @@ class StateMod_DataSet(DataSet):
             # Message.printWarning(2, routine, e)
             pass
 
+        # Register the sub-components, which are added to their groups after the groups are added to the data set
+        for comp in self.get_components():
+            self.register_component(comp)
+
     def initialize_control_data(self):
         """
         Initialize the control data values to reasonable defaults.
@@ -1721,7 +1877,7 @@ class StateMod_DataSet(DataSet):
         :return: true if the file is a free format file.
         """
         is_free_format = False
-        with open(filepath.as_posix()) as fp:
+        with StateMod_Util.open_file(filepath.as_posix()) as fp:
             for line in fp:
                 string_trimmed = line.strip()
                 if string_trimmed.startswith("#") or string_trimmed == "":
@@ -1741,14 +1897,60 @@ class StateMod_DataSet(DataSet):
         StateMod_DataSetComponentType.COMP_RESERVOIR_TARGET_TS_DAILY, each of which contain both the maximum and
         minimum time series.  For these components, add "Max" and "Min" to the returned values.
         """
-        if isinstance(comp_type, int):
-            comp_type_value = comp_type
-        else:
-            # Assume Enum
-            comp_type_value = comp_type.value
-        return self.component_ts_data_types[comp_type_value]
+        return StateMod_DataSet.component_ts_data_types.get(StateMod_DataSet.to_component_type(comp_type), "")
+
+    def lookup_time_series_data_units(self, comp_type):
+        """
+        Determine the time series data units for a component type.
+        :param comp_type: Component type.
+        :return: the time series data units or an empty string if not found.
+        """
+        return StateMod_DataSet.component_ts_data_units.get(StateMod_DataSet.to_component_type(comp_type), "")
+
+    def memory_report(self):
+        """
+        Report the approximate memory used by each component and each type of data object.
+        If the data set was read with trace_memory=True, the report also includes the memory traced while
+        each component was read.
+        :return: StateMod_MemoryReport, use to_string() to format as text.
+        """
+        from DWR.StateMod.StateMod_MemoryReport import StateMod_MemoryReport
+        return StateMod_MemoryReport(self)
 
-    def read_statemod_file(self, filepath, read_data, read_time_series, use_gui, parent):
+    def query_ts(self, comp_type, ids=None, start=None, end=None, units=None):
+        """
+        Return time series component data as an array, without creating time series objects.
+        :param comp_type: StateMod_DataSetComponentType of a monthly or daily time series component.
+        :param ids: station identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :param start: first date to include (anything accepted by numpy.datetime64, e.g., "1990-01"),
+        or None to start with the first date.
+        :param end: last date to include, or None to end with the last date.
+        :param units: units to convert the values to (e.g., "CFS"), or None for the file units.
+        :return: (values, dates, ids) where values is a numpy array dimensioned (station x time step),
+        dates is the numpy datetime64 array for the time steps and ids is the list of station identifiers.
+        """
+        return self.get_ts_array(comp_type, units).query(ids, start, end)
+
+    def read_component_data(self, comp, filename, read_function, dependent_files=None, parameters=None):
+        """
+        Read the data for a component from a file, using the component data cache if one has been set,
+        so that data parsed for another data set from a file with the same contents are shared rather than read again.
+        Shared data must be treated as read-only.
+        :param comp: component being read.
+        :param filename: absolute path of the file to read.
+        :param read_function: function that is called with the file name to read the data.
+        :param dependent_files: list of other files whose contents the data depend on, or None.
+        :param parameters: tuple of other values that the data depend on, or None.
+        :return: the component data.
+        """
+        if self.component_data_cache is None:
+            return read_function(filename)
+        return self.component_data_cache.get_component_data(comp.get_component_type(), filename, read_function,
+                                                            dependent_files, parameters)
+
+    def read_statemod_file(self, filepath, read_data, read_time_series, use_gui, parent, trace_memory=False,
+                           compute_statistics=False):
         """
         Read the StateMod response file and fill the current StateMod_DataSet object.
         The file MUST be a newer free-format response file.
@@ -1764,9 +1966,35 @@ class StateMod_DataSet(DataSet):
         will not be read in any case.
         :param use_gui: If true, then interactive prompts will be used where necessary.
         :param parent: The parent JFrame used to position warning dialogs if use_gui is true.
+        :param trace_memory: if true, use tracemalloc to trace the peak and retained memory allocated while
+        reading each component, which is saved in memory_trace and included in memory_report().
+        Tracing slows down the read.
+        :param compute_statistics: if true, compute summary statistics for each time series (mean, minimum,
+        maximum, total, missing count and first and last dates with values) while the time series files are
+        parsed, which are saved with each component (see get_ts_statistics()).
         """
+        from RTi.Util.IO.IOUtil import IOUtil
+        from RTi.Util.IO.PropList import PropList
+        from RTi.Util.Time.StopWatch import StopWatch
+        from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+        from DWR.StateMod.StateMod_DelayTable import StateMod_DelayTable
+        from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
+        from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
+        from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
+        from DWR.StateMod.StateMod_StreamGage import StateMod_StreamGage
         logger = logging.getLogger(__name__)
 
+        self.ts_arrays = {}
+        self.compute_statistics = compute_statistics
+        self.memory_trace = None
+        self.memory_trace_start = None
+        stop_tracing = False
+        if trace_memory:
+            self.memory_trace = {}
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                stop_tracing = True
+
         if not read_data:
             read_time_series = False
 
@@ -1821,7 +2049,18 @@ class StateMod_DataSet(DataSet):
 
         response_props = PropList("Response")
         response_props.set_persistent_name(filepath.as_posix())
-        response_props.read_persistent()
+        if (StateMod_Util.get_compressed_file_extension(filepath.as_posix()) == "") and \
+                (StateMod_DataSetSource.find_source(filepath) is None):
+            response_props.read_persistent()
+        else:
+            # PropList can only read an uncompressed file on disk so read the property = value lines here
+            with StateMod_Util.open_file(filepath.as_posix()) as fp:
+                for line in fp:
+                    line = line.strip()
+                    if line.startswith("#") or (line.find("=") < 0):
+                        continue
+                    key, value = line.split("=", 1)
+                    response_props.set(key.strip(), value.strip())
 
         debug = True
         if debug:
@@ -1850,7 +2089,7 @@ class StateMod_DataSet(DataSet):
                 # Read the data...
                 # TODO @jurentie read data...
                 if (read_data and (fn is not None)) and \
-                          (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                          (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                      read_time.clear()
                      read_time.start()
                      fn = self.get_data_file_path_absolute(fn)
@@ -1878,12 +2117,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    comp.set_data(StateMod_RiverNetworkNode.read_statemod_file(fn))
+                    comp.set_data(self.read_component_data(comp, fn, StateMod_RiverNetworkNode.read_statemod_file))
             except Exception as e:
                 logger.warning("Unexpected error reading river network file:\n" + "\"" + fn + warning_end_string +
                                " See log file for more on error:" + str(e) + ")")
@@ -1923,12 +2162,21 @@ class StateMod_DataSet(DataSet):
                 if comp is not None and fn is not None:
                     comp.set_data_file_name(fn)
                 # Read the data...
-                if read_data and (fn is not None) and os.path.getsize(self.get_data_file_path_absolute(fn)):
+                if read_data and (fn is not None) and StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    comp.set_data(StateMod_Diversion.read_statemod_file(fn))
+                    # The rights are connected to the diversions when the rights are read, so diversion data
+                    # can only be shared with data sets that use the same rights
+                    rights_fn = response_props.get_value("Diversion_Right")
+                    if rights_fn is not None:
+                        rights_fn = self.get_data_file_path_absolute(rights_fn)
+                        if not StateMod_Util.file_exists(rights_fn):
+                            rights_fn = None
+                    comp.set_data(self.read_component_data(
+                        comp, fn, StateMod_Diversion.read_statemod_file,
+                        dependent_files=[rights_fn] if rights_fn is not None else None))
             except Exception as e:
                 logger.warning("Unexpected error reading diversion station file:\n" + "\"" + fn + warning_end_string +
                                " See log file for more on error:" + str(e) + ")")
@@ -1949,11 +2197,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
-                    comp.set_data(StateMod_StreamGage.read_statemod_file(fn))
+                    self.read_statemod_file_announce1(comp)
+                    comp.set_data(self.read_component_data(comp, fn, StateMod_StreamGage.read_statemod_file))
             except Exception as e:
                 logger.warning("Unexpected error reading stream gage station file:\n" + "\"" + fn + warning_end_string +
                                " See log file for more on error:" + str(e) + ")")
@@ -2007,8 +2256,6 @@ class StateMod_DataSet(DataSet):
                 comp.set_error_reading_input_file(True)
             finally:
                 comp.set_dirty(False)
-                # Control does not have its own data file now so use the data set
-                comp.set_data(self)
                 # read_time.stop()
                 self.read_statemod_file_announce2(comp, read_time.get_seconds())
 
@@ -2144,12 +2391,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    comp.set_data(StateMod_DiversionRight.read_statemod_file(fn))
+                    comp.set_data(self.read_component_data(comp, fn, StateMod_DiversionRight.read_statemod_file))
                     logger.info("Connecting diversion rights to diversion stations")
                     StateMod_Diversion.connect_all_rights(
                         self.get_component_for_component_type(
@@ -2213,12 +2460,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn) > 0)):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2248,12 +2495,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2282,12 +2529,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2316,12 +2563,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2346,17 +2593,17 @@ class StateMod_DataSet(DataSet):
                 fn = response_props.get_value("Stream_Base_Monthly")
                 # Always set the file name...
                 comp = self.get_component_for_component_type(
-                    StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY)
+                    StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY)
                 if comp is not None and fn is not None:
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2394,12 +2641,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn))):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn))):
                     read_time.clear()
                     read_time.start()
                     self.read_statemod_file_announce1(comp)
                     fn = self.get_data_file_path_absolute(fn)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2413,8 +2660,6 @@ class StateMod_DataSet(DataSet):
                 comp.set_error_reading_input_file(True)
             finally:
                 comp.set_dirty(False)
-                # Control does not have its own data file now so use the data set
-                comp.set_data(self)
                 read_time.stop()
                 self.read_statemod_file_announce2(comp, read_time.get_seconds())
 
@@ -2428,13 +2673,13 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     self.read_statemod_file_announce1(comp)
                     fn = self.get_data_file_path_absolute(fn)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
-                    if v is not None:
+                    v = self.read_time_series_component(comp, fn)
+                    if v is None:
                         v = []
                     size = len(v)
                     for i in range(size):
@@ -2461,13 +2706,13 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     self.read_statemod_file_announce1(comp)
                     fn = self.get_data_file_path_absolute(fn)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
-                    if v is not None:
+                    v = self.read_time_series_component(comp, fn)
+                    if v is None:
                         v = []
                     size = len(v)
                     for i in range(size):
@@ -2494,12 +2739,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn))> 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn))> 0):
                     read_time.clear()
                     read_time.start()
                     self.read_statemod_file_announce1(comp)
                     fn = self.get_data_file_path_absolute(fn)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2527,13 +2772,13 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
-                    if v is not None:
+                    v = self.read_time_series_component(comp, fn)
+                    if v is None:
                         v = []
                     size = len(v)
                     for i in range(size):
@@ -2560,13 +2805,13 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
-                    if v is not None:
+                    v = self.read_time_series_component(comp, fn)
+                    if v is None:
                         v = []
                     size = len(v)
                     for i in range(size):
@@ -2592,7 +2837,15 @@ class StateMod_DataSet(DataSet):
                 if comp is not None and fn is not None:
                     comp.set_data_file_name(fn)
                 # Read the data...
-                # TODO @jurentie read data
+                if read_data and (fn is not None) and \
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
+                    read_time.clear()
+                    read_time.start()
+                    fn = self.get_data_file_path_absolute(fn)
+                    self.read_statemod_file_announce1(comp)
+                    comp.set_data(self.read_component_data(
+                        comp, fn, lambda f: StateMod_DelayTable.read_statemod_file(f, True, self.interv),
+                        parameters=(self.interv,)))
             except Exception as e:
                 logger.warning("Unexpected error reading delay table (monthly) file:\n" + "\"" +
                                fn + warning_end_string + " See log file for more on error:" + str(e) + ")")
@@ -2613,7 +2866,7 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
@@ -2649,7 +2902,7 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and not self.has_sanjuan_data(False) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     logger.warning("Reading Rio Grande Spill file is not enabled.")
                     self.read_statemod_file_announce1(comp)
                     # comp.set_data( StateMod_ReturnFlow.read_statemod_file(fn,
@@ -2675,7 +2928,7 @@ class StateMod_DataSet(DataSet):
                 # Read the data...
                 # readInputAnnounce1(comp)
                 if read_data and (fn is not None) and self.has_sanjuan_data(False) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     logger.warning("Do not know how to read the San Juan Recovery file.")
             except Exception as e:
                 logger.warning("Unexpected error reading San Juan Recovery file:\n" + "\"" + fn + warning_end_string +
@@ -2698,7 +2951,7 @@ class StateMod_DataSet(DataSet):
                 # Read the data...
                 # readInputAnnounce1(comp)
                 if read_data and (fn is not None) and self.has_sanjuan_data(False) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     logger.warning("Reading Rio Grande Spill file is not enabled.")
             except Exception as e:
                 logger.warning("Unexpected error reading Rio Grande spill (monthly) file:\n" + "\"" +
@@ -2741,12 +2994,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2787,7 +3040,7 @@ class StateMod_DataSet(DataSet):
             # Soil moisture (*.par) file no longer supported (print a warning)...
 
             fn = response_props.get_value("SoilMoisture")
-            if fn is not None and (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+            if fn is not None and (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                 logger.warning("StateCU soil moisture file - not supported - not reading \"" + fn + "\"")
 
             # Reservoir content time series (monthly) file (.eom)...
@@ -2800,12 +3053,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2853,12 +3106,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2886,12 +3139,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     self.read_statemod_file_announce1(comp)
                     fn = self.get_data_file_path_absolute(fn)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     logger.info("Read " + str(len(v)) + " diversion historic (monthly) time series.")
                     if v is None:
                         v = []
@@ -2922,10 +3175,10 @@ class StateMod_DataSet(DataSet):
                 read_time.clear()
                 read_time.start()
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -2951,7 +3204,7 @@ class StateMod_DataSet(DataSet):
                 comp = self.get_component_for_component_type(StateMod_DataSetComponentType.GEOVIEW)
                 if comp is not None and fn is not None:
                     comp.set_data_file_name(fn)
-                if fn is not None and (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                if fn is not None and (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
@@ -2998,7 +3251,7 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 # readInputAnnounce1(comp, read_time.get_seconds())
-                if read_data and (fn is not None) and (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                if read_data and (fn is not None) and (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     logger.warning("Reach data file - not yet supported.")
             except Exception as e:
                 logger.warning("Unexpected error reading reach data file:\n" + "\"" + fn + warning_end_string +
@@ -3020,12 +3273,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3063,12 +3316,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3095,12 +3348,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3128,12 +3381,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3161,12 +3414,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3197,7 +3450,15 @@ class StateMod_DataSet(DataSet):
                 if comp is not None and fn is not None:
                     comp.set_data_file_name(fn)
                 # Read the data...
-                # TODO @jurentie 04/18/2019 - read the data
+                if read_data and (fn is not None) and \
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
+                    read_time.clear()
+                    read_time.start()
+                    fn = self.get_data_file_path_absolute(fn)
+                    self.read_statemod_file_announce1(comp)
+                    comp.set_data(self.read_component_data(
+                        comp, fn, lambda f: StateMod_DelayTable.read_statemod_file(f, False, self.interv),
+                        parameters=(self.interv,)))
             except Exception as e:
                 logger.warning("Unexpected error reading delay table (daily) file:\n" + "\"" + fn + warning_end_string +
                                " See log file for more on error:" + str(e) + ")")
@@ -3205,7 +3466,7 @@ class StateMod_DataSet(DataSet):
                 comp.set_error_reading_input_file(True)
             finally:
                 comp.set_dirty(False)
-                # read_time.stop()
+                read_time.stop()
                 self.read_statemod_file_announce2(comp, read_time.get_seconds())
 
             # Irrigation water requirement (.iwr) - daily...
@@ -3219,12 +3480,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3252,12 +3513,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3286,12 +3547,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     # Set the data type because it is not in the StateMod file...
@@ -3318,12 +3579,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3351,12 +3612,12 @@ class StateMod_DataSet(DataSet):
                     comp.set_data_file_name(fn)
                 # Read the data...
                 if read_data and self.read_time_series and (fn is not None) and \
-                        (os.path.getsize(self.get_data_file_path_absolute(fn)) > 0):
+                        (StateMod_Util.get_file_size(self.get_data_file_path_absolute(fn)) > 0):
                     read_time.clear()
                     read_time.start()
                     fn = self.get_data_file_path_absolute(fn)
                     self.read_statemod_file_announce1(comp)
-                    v = StateMod_TS.read_time_series_list(fn, None, None, None, True)
+                    v = self.read_time_series_component(comp, fn)
                     if v is None:
                         v = []
                     size = len(v)
@@ -3442,6 +3703,9 @@ class StateMod_DataSet(DataSet):
             logger.warning(message, exc_info=True)
             # TODO Just rethrow for now
             raise
+        finally:
+            if stop_tracing:
+                tracemalloc.stop()
 
         # Set component visibility based on the control information...
         self.check_component_visibility()
@@ -3452,6 +3716,47 @@ class StateMod_DataSet(DataSet):
         # self.sendProcessListenerMessage(22, msg)
         self.set_dirty(StateMod_DataSetComponentType.CONTROL, False)
 
+    @staticmethod
+    def read_time_series_file(filename):
+        """
+        Read all the time series in a StateMod time series file, for use with read_component_data().
+        :param filename: absolute path of the file to read.
+        :return: list of time series.
+        """
+        from DWR.StateMod.StateMod_TS import StateMod_TS
+        return StateMod_TS.read_time_series_list(filename, None, None, None, True)
+
+    def read_time_series_component(self, comp, filename):
+        """
+        Read the time series for a component, also computing the summary statistics for the component
+        if the data set is being read with compute_statistics=True.
+        :param comp: component being read.
+        :param filename: absolute path of the file to read.
+        :return: list of time series.
+        """
+        if not self.compute_statistics:
+            return self.read_component_data(comp, filename, StateMod_DataSet.read_time_series_file)
+        tslist, statistics = self.read_component_data(comp, filename,
+                                                      StateMod_DataSet.read_time_series_file_with_statistics,
+                                                      parameters=("StateMod_TSStatistics",))
+        comp.set_statistics(statistics)
+        return tslist
+
+    @staticmethod
+    def read_time_series_file_with_statistics(filename):
+        """
+        Read all the time series in a StateMod time series file and compute the summary statistics for each
+        time series in the same pass, for use with read_component_data().
+        :param filename: absolute path of the file to read.
+        :return: (tslist, statistics) where tslist is the list of time series and statistics is the
+        StateMod_TSStatistics.
+        """
+        from DWR.StateMod.StateMod_TS import StateMod_TS
+        from DWR.StateMod.StateMod_TSStatistics import StateMod_TSStatistics
+        statistics = StateMod_TSStatistics()
+        tslist = StateMod_TS.read_time_series_list(filename, None, None, None, True, statistics=statistics)
+        return tslist, statistics
+
     def read_statemod_file_announce1(self, comp):
         """
         This method is a helper routine to read_statemod_file().  It calls
@@ -3474,6 +3779,11 @@ class StateMod_DataSet(DataSet):
         msg = "Reading " + description + " data from \"" + fn + "\""
         # The status message is printed because process listeners may not be registered.
         logger.info(msg)
+
+        if (self.memory_trace is not None) and tracemalloc.is_tracing():
+            # Trace the memory allocated from here until read_statemod_file_announce2() for the component
+            tracemalloc.reset_peak()
+            self.memory_trace_start = (comp, tracemalloc.get_traced_memory()[0])
         # self.sendProcessListenerMessage( StateMod_GUIUtil.STATUS_READ_START, msg)
 
     def read_statemod_file_announce2(self, comp, seconds):
@@ -3492,6 +3802,40 @@ class StateMod_DataSet(DataSet):
         msg = description + " data read from \"" + fn + "\" in " + str("{:3f}".format(seconds)) + " seconds"
         logger.info(msg)
 
+        if (self.memory_trace_start is not None) and (self.memory_trace_start[0] is comp):
+            current, peak = tracemalloc.get_traced_memory()
+            start = self.memory_trace_start[1]
+            self.memory_trace[comp.get_component_name()] = {"peak_bytes": peak - start,
+                                                            "retained_bytes": current - start}
+            self.memory_trace_start = None
+
+    def register_component(self, comp):
+        """
+        Register a component, and the sub-components of a group, for lookup by get_component_for_component_type().
+        :param comp: DataSetComponent to register.
+        """
+        comps = [comp]
+        while len(comps) > 0:
+            comp = comps.pop()
+            comp_type = StateMod_DataSet.to_component_type(comp.get_component_type())
+            if comp_type is not None:
+                self.component_registry[comp_type] = comp
+            if comp.is_group():
+                subcomps = comp.get_components()
+                if subcomps is not None:
+                    comps.extend(subcomps)
+
+    def set_components_visible(self, comp_types, visibility):
+        """
+        Set the visibility of components.
+        :param comp_types: list of StateMod_DataSetComponentType.
+        :param visibility: True if the components are visible, False if not.
+        """
+        for comp_type in comp_types:
+            comp = self.get_component_for_component_type(comp_type)
+            if comp is not None:
+                comp.set_visible(visibility)
+
     def set_numeva(self, numeva):
         """
         Set number of evaporation stations.
@@ -3510,20 +3854,35 @@ class StateMod_DataSet(DataSet):
             self.numpre = numpre
             self.set_dirty(StateMod_DataSetComponentType.CONTROL, True)
 
+    @staticmethod
+    def to_component_type(comp_type):
+        """
+        Return the component type enumeration for a component type.
+        :param comp_type: StateMod_DataSetComponentType, or its integer value.
+        :return: the StateMod_DataSetComponentType, or None if the integer value is not a component type.
+        """
+        if isinstance(comp_type, StateMod_DataSetComponentType):
+            return comp_type
+        try:
+            return StateMod_DataSetComponentType(comp_type)
+        except ValueError:
+            return None
+
     def to_string_definitions(self):
         """
         Return a string representation of the data set definition information, useful for troubleshooting
         """
         nl = os.path.sep
         s = ""
-        for i in range(len(self.component_names)):
-            comp = self.get_component_for_component_type(i)
+        component_ts_data_intervals = self.get_component_ts_data_intervals()
+        for i, comp_type in enumerate(self.component_types):
+            comp = self.get_component_for_component_type(comp_type)
             s += "[{}]".format(i) + " Name=\"" + self.component_names[i]
             s += "\" Group={}".format(self.component_group_assignments[i])
             s += " RspProperty=\"" + self.statemod_file_properties[i]
             s += "\" Filename=\"" + comp.get_data_file_name()
             s += "\" Ext=\"" + self.component_file_extensions[i]
-            s += "\" TSType=\"" + self.component_ts_data_types[i]
-            s += "\" TSInt={}".format(self.component_ts_data_intervals[i])
-            s += " TSUnits=\"" + self.component_ts_data_units[i] + "\"\n"
+            s += "\" TSType=\"" + self.component_ts_data_types[comp_type]
+            s += "\" TSInt={}".format(component_ts_data_intervals[comp_type])
+            s += " TSUnits=\"" + self.component_ts_data_units[comp_type] + "\"\n"
         return s
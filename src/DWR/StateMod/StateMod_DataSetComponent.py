@@ -0,0 +1,372 @@
+# StateMod_DataSetComponent - data set component with identifier and river node indexes
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+from RTi.Util.IO.DataSetComponent import DataSetComponent
+from DWR.StateMod.StateMod_Data import StateMod_Data
+
+
+class StateMod_DataSetComponent(DataSetComponent):
+    """
+    DataSetComponent that maintains lookup indexes for list data.
+    When the component data is a list, an identifier index (ID -> object) and a river node index
+    (cgoto -> list of objects) are maintained so that lookups do not need to search the list.
+    StateMod_Data objects in the list are given a reference to this component so that
+    set_id() and set_cgoto() keep the indexes current.  Time series are indexed by location
+    identifier and have no river node.
+    Identifiers are compared ignoring case, consistent with the legacy StateMod lookup code.
+    If the list returned by get_data() is modified directly, call rebuild_indexes().  Direct edits that change
+    the length of the list are detected and the indexes are rebuilt, but replacing an element in place
+    (e.g., data[i] = new_object) is not detected and leaves the indexes out of date until they are rebuilt.
+
+    Components of different data sets can have the same data list, for example the data parsed once for a
+    StateMod_DataSetEnsemble.  Such components share one set of indexes, so that when an object in the list is
+    modified, the lookups of every component that has the list are current, regardless of which component the
+    object refers to.
+    """
+
+    def __init__(self, dataset, component_type):
+        """
+        Construct a component.
+        :param dataset: the data set that the component is part of.
+        :param component_type: component type (StateMod_DataSetComponentType).
+        """
+        # Identifier (upper case) -> first object in the list with the identifier.
+        self.id_index = {}
+
+        # Identifiers (upper case) that are used by more than one object in the list.
+        self.duplicate_ids = set()
+
+        # River node identifier (upper case) -> list of objects at the node, in list order.
+        self.cgoto_index = {}
+
+        # Number of objects in the list when the indexes were built, used to detect direct list edits.
+        self.indexed_count = 0
+
+        # Components that have the same data list and share the indexes, including this component.
+        # The list object is shared by all the components.
+        self.sharing_components = [self]
+
+        # Summary statistics for time series data (StateMod_TSStatistics), or None if not computed.
+        self.statistics = None
+
+        super().__init__(dataset, component_type)
+
+    def add_data_object(self, data_object):
+        """
+        Add an object to the end of the component's data list and add it to the indexes.
+        The data list is created if the component does not have list data.
+        :param data_object: object to add (StateMod_Data or time series).
+        """
+        data = self.get_data()
+        if not isinstance(data, list):
+            data = []
+            self.set_data(data)
+        data.append(data_object)
+        self.index_object(data_object)
+        self.indexed_count = len(data)
+
+    def at_node(self, node_id):
+        """
+        Return the objects that are located at a river node.  For rights, the river node is the
+        station identifier to which the right belongs.
+        :param node_id: river node identifier.
+        :return: list of objects at the node, in data list order, or an empty list if none.
+        The returned list is owned by the index and should not be modified.
+        """
+        if node_id is None:
+            return []
+        self.check_indexes()
+        return self.cgoto_index.get(node_id.upper(), [])
+
+    def check_indexes(self):
+        """
+        Rebuild the indexes if the size of the data list does not agree with the indexes,
+        which indicates that the list was modified without using the component methods.
+        Only the length is checked, so that the check is fast enough to do for every lookup.  An element that
+        is replaced in place is not detected, so call rebuild_indexes() after such edits.
+        """
+        data = self.get_data()
+        if isinstance(data, list) and (len(data) != self.indexed_count):
+            self.rebuild_indexes()
+
+    def get_duplicate_ids(self):
+        """
+        :return: the list of identifiers (upper case) that are used by more than one object.
+        """
+        self.check_indexes()
+        return sorted(self.duplicate_ids)
+
+    @staticmethod
+    def get_index_cgoto(data_object):
+        """
+        Return the river node identifier used to index an object.
+        :param data_object: object in the component data list.
+        :return: the river node identifier, or None if the object does not have a river node.
+        """
+        if isinstance(data_object, StateMod_Data):
+            return data_object.get_cgoto()
+        return None
+
+    @staticmethod
+    def get_index_id(data_object):
+        """
+        Return the identifier used to index an object.
+        :param data_object: object in the component data list.
+        :return: the StateMod_Data identifier, time series location, or None if not available.
+        """
+        if isinstance(data_object, StateMod_Data):
+            return data_object.get_id()
+        try:
+            # Time series
+            return data_object.get_identifier().get_location()
+        except AttributeError:
+            return None
+
+    def get_sharing_component(self, data):
+        """
+        Return another component that has indexed a data list, so that its indexes can be shared.
+        :param data: data list.
+        :return: the component that the objects in the list refer to, if it is not already sharing indexes with
+        this component and its data is the same list, otherwise None.
+        """
+        if (not isinstance(data, list)) or (len(data) == 0) or (not isinstance(data[0], StateMod_Data)):
+            return None
+        component = data[0].component
+        if (component is None) or any(c is component for c in self.sharing_components):
+            return None
+        if component.get_data() is not data:
+            return None
+        return component
+
+    def get_statistics(self):
+        """
+        :return: the summary statistics for time series data (StateMod_TSStatistics), or None if not computed.
+        """
+        return self.statistics
+
+    def index_object(self, data_object):
+        """
+        Add an object to the indexes.  The object is not added to the data list.
+        :param data_object: object to index.
+        """
+        if data_object is None:
+            return
+        if isinstance(data_object, StateMod_Data):
+            data_object.component = self
+        id = StateMod_DataSetComponent.get_index_id(data_object)
+        if id is not None:
+            key = id.upper()
+            if key in self.id_index:
+                self.duplicate_ids.add(key)
+            else:
+                self.id_index[key] = data_object
+        cgoto = StateMod_DataSetComponent.get_index_cgoto(data_object)
+        if cgoto is not None:
+            key = cgoto.upper()
+            objects = self.cgoto_index.get(key)
+            if objects is None:
+                self.cgoto_index[key] = [data_object]
+            else:
+                objects.append(data_object)
+
+    def lookup(self, id):
+        """
+        Look up an object by identifier.
+        :param id: identifier to find (case is ignored).
+        :return: the first object in the data list with the identifier, or None if not found.
+        """
+        if id is None:
+            return None
+        self.check_indexes()
+        return self.id_index.get(id.upper())
+
+    def rebuild_indexes(self):
+        """
+        Rebuild the indexes from the data list.  If the list has been indexed by a component of another data set,
+        that component's indexes are shared rather than building new indexes.
+        """
+        data = self.get_data()
+        component = self.get_sharing_component(data)
+        if component is not None:
+            component.check_indexes()
+            self.sharing_components = component.sharing_components
+            self.sharing_components.append(self)
+            self.id_index = component.id_index
+            self.duplicate_ids = component.duplicate_ids
+            self.cgoto_index = component.cgoto_index
+            self.indexed_count = component.indexed_count
+            return
+        # Update the indexes in place, which may be shared with other components
+        self.id_index.clear()
+        self.duplicate_ids.clear()
+        self.cgoto_index.clear()
+        self.indexed_count = 0
+        if not isinstance(data, list):
+            return
+        for data_object in data:
+            self.index_object(data_object)
+        self.indexed_count = len(data)
+
+    def remove_data_object(self, data_object):
+        """
+        Remove an object from the component's data list and from the indexes.
+        :param data_object: object to remove.
+        :return: True if the object was removed, False if it was not in the list.
+        """
+        data = self.get_data()
+        if not isinstance(data, list):
+            return False
+        for i, item in enumerate(data):
+            if item is data_object:
+                del data[i]
+                break
+        else:
+            return False
+        self.unindex_id(data_object, StateMod_DataSetComponent.get_index_id(data_object))
+        self.unindex_cgoto(data_object, StateMod_DataSetComponent.get_index_cgoto(data_object))
+        if isinstance(data_object, StateMod_Data) and (data_object.component is self):
+            data_object.component = None
+        self.indexed_count = len(data)
+        return True
+
+    def set_data(self, data):
+        """
+        Set the data for the component and rebuild the indexes.
+        :param data: component data, typically a list.
+        """
+        if (len(self.sharing_components) > 1) and (data is not self.get_data()):
+            self.unshare_indexes()
+        super().set_data(data)
+        self.rebuild_indexes()
+
+    def set_statistics(self, statistics):
+        """
+        Set the summary statistics for time series data.
+        :param statistics: StateMod_TSStatistics, or None.
+        """
+        self.statistics = statistics
+
+    def unindex_cgoto(self, data_object, cgoto):
+        """
+        Remove an object from the river node index.
+        :param data_object: object to remove.
+        :param cgoto: river node identifier under which the object is indexed.
+        """
+        if cgoto is None:
+            return
+        key = cgoto.upper()
+        objects = self.cgoto_index.get(key)
+        if objects is None:
+            return
+        for i, item in enumerate(objects):
+            if item is data_object:
+                del objects[i]
+                break
+        if len(objects) == 0:
+            del self.cgoto_index[key]
+
+    def unindex_id(self, data_object, id):
+        """
+        Remove an object from the identifier index.  If other objects share the identifier,
+        the first remaining object in the data list becomes the indexed object.
+        :param data_object: object to remove.
+        :param id: identifier under which the object is indexed.
+        """
+        if id is None:
+            return
+        key = id.upper()
+        if key not in self.duplicate_ids:
+            if self.id_index.get(key) is data_object:
+                del self.id_index[key]
+            return
+        # Duplicate identifiers are rare so search the list for the remaining objects.
+        matches = [item for item in self.get_data() if (item is not data_object) and
+                   (StateMod_DataSetComponent.get_index_id(item) or "").upper() == key]
+        if len(matches) == 0:
+            self.id_index.pop(key, None)
+        else:
+            self.id_index[key] = matches[0]
+        if len(matches) <= 1:
+            self.duplicate_ids.discard(key)
+
+    def unshare_indexes(self):
+        """
+        Stop sharing indexes with the other components that have the same data list, before the data are replaced.
+        Objects in the list that refer to this component are changed to refer to one of the other components.
+        """
+        others = [c for c in self.sharing_components if c is not self]
+        # Update the shared list in place for the other components
+        self.sharing_components[:] = others
+        data = self.get_data()
+        if isinstance(data, list) and (len(others) > 0):
+            for data_object in data:
+                if isinstance(data_object, StateMod_Data) and (data_object.component is self):
+                    data_object.component = others[0]
+        self.sharing_components = [self]
+        self.id_index = {}
+        self.duplicate_ids = set()
+        self.cgoto_index = {}
+        self.indexed_count = 0
+
+    def update_cgoto_index(self, data_object, old_cgoto):
+        """
+        Update the river node index after an object's river node has changed.
+        Called by StateMod_Data.set_cgoto().
+        :param data_object: object that was modified.
+        :param old_cgoto: river node identifier before the change.
+        """
+        self.unindex_cgoto(data_object, old_cgoto)
+        cgoto = StateMod_DataSetComponent.get_index_cgoto(data_object)
+        if cgoto is None:
+            return
+        objects = self.cgoto_index.setdefault(cgoto.upper(), [])
+        if len(objects) == 0:
+            objects.append(data_object)
+            return
+        # Keep the objects at the node in data list order, which requires finding the object in the list
+        members = {id(item) for item in objects}
+        members.add(id(data_object))
+        objects[:] = [item for item in self.get_data() if id(item) in members]
+
+    def update_id_index(self, data_object, old_id):
+        """
+        Update the identifier index after an object's identifier has changed.
+        Called by StateMod_Data.set_id().
+        :param data_object: object that was modified.
+        :param old_id: identifier before the change.
+        """
+        self.unindex_id(data_object, old_id)
+        id = StateMod_DataSetComponent.get_index_id(data_object)
+        if id is None:
+            return
+        key = id.upper()
+        indexed = self.id_index.get(key)
+        if indexed is None:
+            self.id_index[key] = data_object
+        elif indexed is not data_object:
+            self.duplicate_ids.add(key)
+            # Keep the first object in list order as the indexed object
+            for item in self.get_data():
+                if (item is indexed) or (item is data_object):
+                    self.id_index[key] = item
+                    break
@@ -0,0 +1,166 @@
+# StateMod_DataSetEnsemble - read many StateMod data sets, sharing data parsed from identical files
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+
+
+class StateMod_DataSetEnsemble:
+    """
+    Read the data sets for many scenarios (response files) that share most of their data files.
+    Each data file is identified by a hash of its contents, and the data for each unique file are parsed once
+    and shared by every data set that references a file with the same contents, for the same component.
+    Load time and memory therefore grow with the number of unique files rather than scenarios x files.
+
+    The shared component data are the same objects in each data set and must be treated as read-only.
+    Components with the same shared data list also share their identifier and river node indexes
+    (see StateMod_DataSetComponent), so lookups in every data set are current if an object is modified.
+    Use a separate StateMod_DataSet.read_statemod_file() call for a data set that will be edited.
+    """
+
+    # Number of bytes to read at a time when hashing files
+    hash_block_size = 1024 * 1024
+
+    def __init__(self, response_files):
+        """
+        Construct an ensemble.
+        :param response_files: list of response file paths (str or Path), one per scenario.
+        """
+        self.response_files = [Path(response_file) for response_file in response_files]
+
+        # Data sets that have been read, in response file order
+        self.datasets = []
+
+        # Absolute file path -> (size, modification time, content hash), so that each file is hashed once
+        self.file_hashes = {}
+
+        # (component type, content hash, dependent file hashes, parameters) -> parsed component data
+        self.component_data = {}
+
+        # Number of component reads that parsed a file and that used data parsed for another data set
+        self.parse_count = 0
+        self.shared_count = 0
+
+        # Lock for the caches, in case data sets are read in threads
+        self.lock = threading.Lock()
+
+    def get_component_data(self, comp_type, filename, read_function, dependent_files=None, parameters=None):
+        """
+        Return the data for a component, parsing the file only if a file with the same contents has not already
+        been parsed for the component.  This is called by StateMod_DataSet.read_component_data().
+        :param comp_type: StateMod_DataSetComponentType of the component being read.
+        :param filename: absolute path of the file to read.
+        :param read_function: function that is called with the file name to read the data.
+        :param dependent_files: list of other files whose contents the data depend on, or None.
+        :param parameters: tuple of other values that the data depend on, or None.
+        :return: the component data.
+        """
+        logger = logging.getLogger(__name__)
+        dependent_hashes = ()
+        if dependent_files is not None:
+            dependent_hashes = tuple(self.get_file_hash(dependent_file) for dependent_file in dependent_files)
+        key = (comp_type, self.get_file_hash(filename), dependent_hashes, parameters)
+        with self.lock:
+            data = self.component_data.get(key)
+            if data is not None:
+                self.shared_count += 1
+                logger.info("Using shared data for \"{}\".".format(filename))
+                return data
+        data = read_function(filename)
+        with self.lock:
+            # Another thread may have read the same file, in which case use its data
+            data = self.component_data.setdefault(key, data)
+            self.parse_count += 1
+        return data
+
+    def get_datasets(self):
+        """
+        :return: list of StateMod_DataSet that have been read, in response file order.
+        """
+        return self.datasets
+
+    def get_file_hash(self, filename):
+        """
+        Return the SHA-256 hash of a file's contents.  The hash is computed once for each file and is recomputed
+        if the file size or modification time changes.  Files in a StateMod_DataSetSource are read from the source.
+        :param filename: path of the file.
+        :return: hexadecimal hash string.
+        """
+        path = os.path.abspath(filename)
+        source = StateMod_DataSetSource.find_source(path)
+        if source is not None:
+            size = source.get_size(path)
+            mtime_ns = source.get_mtime_ns(path)
+        else:
+            stat = os.stat(path)
+            size = stat.st_size
+            mtime_ns = stat.st_mtime_ns
+        with self.lock:
+            file_hash = self.file_hashes.get(path)
+        if (file_hash is not None) and (file_hash[0] == size) and (file_hash[1] == mtime_ns):
+            return file_hash[2]
+        sha256 = hashlib.sha256()
+        with (source.open(path, "rb") if source is not None else open(path, "rb")) as f:
+            for block in iter(lambda: f.read(StateMod_DataSetEnsemble.hash_block_size), b""):
+                sha256.update(block)
+        with self.lock:
+            self.file_hashes[path] = (size, mtime_ns, sha256.hexdigest())
+        return sha256.hexdigest()
+
+    def get_statistics(self):
+        """
+        :return: dictionary with scenario_count, file_count (files hashed), unique_file_count (unique contents),
+        parse_count (component reads that parsed a file) and shared_count (component reads that used shared data).
+        """
+        return {
+            "scenario_count": len(self.datasets),
+            "file_count": len(self.file_hashes),
+            "unique_file_count": len(set(file_hash[2] for file_hash in self.file_hashes.values())),
+            "parse_count": self.parse_count,
+            "shared_count": self.shared_count
+        }
+
+    def read(self, read_data=True, read_time_series=True):
+        """
+        Read the data set for each response file, sharing component data parsed from identical files.
+        :param read_data: if True, read the data files, if False only read the response files.
+        :param read_time_series: if True, read the time series files.
+        :return: list of StateMod_DataSet, in response file order.
+        """
+        logger = logging.getLogger(__name__)
+        self.datasets = []
+        for response_file in self.response_files:
+            dataset = StateMod_DataSet()
+            dataset.component_data_cache = self
+            dataset.read_statemod_file(response_file.absolute(), read_data, read_time_series, False, None)
+            self.datasets.append(dataset)
+        statistics = self.get_statistics()
+        logger.info("Read {} data sets, parsed {} component files and shared {}.".format(
+            statistics["scenario_count"], statistics["parse_count"], statistics["shared_count"]))
+        return self.datasets
@@ -0,0 +1,400 @@
+# StateMod_DataSetGenerator - write a synthetic StateMod data set for scale testing
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import calendar
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+class StateMod_DataSetGenerator:
+    """
+    Write a self-consistent synthetic StateMod data set, for testing and benchmarking at production scale
+    without using real data sets.  The files are written in the formats that the StateMod readers parse:
+
+        .rsp - free format response file
+        .rin - river network
+        .ris - stream gage stations, one at the network outlet and the others at random nodes
+        .dds - diversion stations, with return flows to downstream nodes
+        .ddr - diversion rights
+        .dly - monthly delay tables (and .dld daily delay tables for a daily data set)
+        .xbm - stream baseflow time series (monthly) for the stream gages
+        .ddm - diversion demand time series (monthly)
+        .rid, .ddd - stream baseflow and diversion demand time series (daily), for a daily data set
+
+    Each river node drains to a node further down the node list, which produces a branching network with a
+    single outlet (the last node).  Station identifiers are the river node identifiers, as in StateMod.
+    The output depends only on the constructor parameters, so the same seed always produces the same files.
+    """
+
+    # Monthly pattern (Jan to Dec) for baseflow, peaking with snowmelt runoff
+    baseflow_pattern = [0.3, 0.3, 0.4, 0.7, 1.8, 2.6, 1.6, 0.9, 0.6, 0.5, 0.4, 0.3]
+
+    # Monthly pattern (Jan to Dec) for irrigation demand
+    demand_pattern = [0.0, 0.0, 0.1, 0.5, 1.2, 1.8, 2.0, 1.7, 1.0, 0.4, 0.0, 0.0]
+
+    def __init__(self, node_count=100, diversion_count=40, rights_per_diversion=2, return_flows_per_diversion=2,
+                 stream_gage_count=10, delay_table_count=5, start_year=1990, end_year=1999, daily=False, seed=0):
+        """
+        Construct the generator.
+        :param node_count: number of river network nodes.
+        :param diversion_count: number of diversion stations.
+        :param rights_per_diversion: number of rights for each diversion.
+        :param return_flows_per_diversion: number of return flows for each diversion.
+        :param stream_gage_count: number of stream gage stations, including the gage at the outlet.
+        :param delay_table_count: number of delay tables.
+        :param start_year: first calendar year of time series.
+        :param end_year: last calendar year of time series.
+        :param daily: if True, also write daily time series and delay tables.
+        :param seed: random number generator seed.
+        """
+        if node_count < 2:
+            raise ValueError("The number of river nodes must be at least 2.")
+        if diversion_count + stream_gage_count > node_count:
+            raise ValueError("The number of diversions ({}) and stream gages ({}) is more than the number of "
+                             "river nodes ({}).".format(diversion_count, stream_gage_count, node_count))
+        if (return_flows_per_diversion > 0) and (delay_table_count < 1):
+            raise ValueError("At least one delay table is needed for return flows.")
+        if end_year < start_year:
+            raise ValueError("The end year ({}) is before the start year ({}).".format(end_year, start_year))
+        self.node_count = node_count
+        self.diversion_count = diversion_count
+        self.rights_per_diversion = rights_per_diversion
+        self.return_flows_per_diversion = return_flows_per_diversion
+        self.stream_gage_count = stream_gage_count
+        self.delay_table_count = delay_table_count
+        self.start_year = start_year
+        self.end_year = end_year
+        self.daily = daily
+        self.seed = seed
+
+    def create_downstream(self, rng, max_reach=50):
+        """
+        Create the downstream node for each node.  Each node drains to a node a random number of positions
+        further down the node list and the last node is the outlet.
+        :param rng: numpy random number generator.
+        :param max_reach: maximum number of list positions between a node and its downstream node.
+        :return: array of downstream node index for each node, -1 for the outlet.
+        """
+        n = self.node_count
+        downstream = np.minimum(np.arange(n) + rng.integers(1, max_reach + 1, n), n - 1)
+        downstream[n - 1] = -1
+        return downstream
+
+    @staticmethod
+    def create_percents(rng, count, size):
+        """
+        Create sets of percents that each sum to 100, with two decimal places.
+        :param rng: numpy random number generator.
+        :param count: number of sets.
+        :param size: number of values in each set.
+        :return: array of shape (count, size).
+        """
+        percents = np.round(rng.dirichlet(np.ones(size), count) * 100.0, 2)
+        # Adjust the largest value so that the rounded values sum to 100
+        rows = np.arange(count)
+        largest = np.argmax(percents, axis=1)
+        percents[rows, largest] = np.round(percents[rows, largest] + 100.0 - percents.sum(axis=1), 2)
+        return percents
+
+    def generate(self, directory, name="synthetic"):
+        """
+        Write the data set files.
+        :param directory: directory for the files, created if it does not exist.
+        :param name: base name for the files.
+        :return: the full path to the response file, as Path, which can be passed to
+        StateMod_DataSet.read_statemod_file().
+        """
+        logger = logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+        rng = np.random.default_rng(self.seed)
+
+        n = self.node_count
+        node_ids = StateMod_DataSetGenerator.get_node_ids(n)
+        downstream = self.create_downstream(rng)
+
+        # Assign stations to nodes.  The outlet always has a stream gage.
+        nodes = rng.permutation(n - 1)
+        diversions = np.sort(nodes[:self.diversion_count])
+        gages = np.sort(nodes[self.diversion_count:self.diversion_count + self.stream_gage_count - 1])
+        if self.stream_gage_count > 0:
+            gages = np.append(gages, n - 1)
+        node_names = ["Node {}".format(i) for i in range(n)]
+        for i in diversions:
+            node_names[i] = "Diversion {}".format(i)
+        for i in gages:
+            node_names[i] = "Gage {}".format(i)
+
+        files = {
+            "River_Network": name + ".rin",
+            "StreamGage_Station": name + ".ris",
+            "Diversion_Station": name + ".dds",
+            "Diversion_Right": name + ".ddr",
+            "DelayTable_Monthly": name + ".dly",
+            "Stream_Base_Monthly": name + ".xbm",
+            "Diversion_Demand_Monthly": name + ".ddm"
+        }
+        if self.daily:
+            files["DelayTable_Daily"] = name + ".dld"
+            files["Stream_Base_Daily"] = name + ".rid"
+            files["Diversion_Demand_Daily"] = name + ".ddd"
+
+        def path(key):
+            return os.path.join(directory, files[key])
+
+        self.write_river_network(path("River_Network"), node_ids, node_names, downstream)
+        self.write_stream_gages(path("StreamGage_Station"), node_ids, node_names, gages)
+        self.write_diversions(path("Diversion_Station"), rng, node_ids, node_names, downstream, diversions)
+        self.write_diversion_rights(path("Diversion_Right"), rng, node_ids, node_names, diversions)
+        self.write_delay_tables(path("DelayTable_Monthly"), rng, 12, 36)
+        if self.daily:
+            self.write_delay_tables(path("DelayTable_Daily"), rng, 30, 120)
+
+        # Monthly time series, as ACFT
+        month_count = (self.end_year - self.start_year + 1) * 12
+        month_of_year = np.arange(month_count) % 12
+        baseflow = self.create_time_series(rng, len(gages), month_of_year, 5000.0,
+                                           StateMod_DataSetGenerator.baseflow_pattern)
+        demand = self.create_time_series(rng, len(diversions), month_of_year, 500.0,
+                                         StateMod_DataSetGenerator.demand_pattern)
+        gage_ids = [node_ids[i] for i in gages]
+        diversion_ids = [node_ids[i] for i in diversions]
+        self.write_time_series_monthly(path("Stream_Base_Monthly"), gage_ids, baseflow, "ACFT")
+        self.write_time_series_monthly(path("Diversion_Demand_Monthly"), diversion_ids, demand, "ACFT")
+
+        if self.daily:
+            # Daily time series, as CFS
+            days = np.arange(np.datetime64("{:04d}-01-01".format(self.start_year)),
+                             np.datetime64("{:04d}-01-01".format(self.end_year + 1)))
+            month_of_year = days.astype("datetime64[M]").astype(np.int64) % 12
+            baseflow = self.create_time_series(rng, len(gages), month_of_year, 80.0,
+                                               StateMod_DataSetGenerator.baseflow_pattern)
+            demand = self.create_time_series(rng, len(diversions), month_of_year, 8.0,
+                                             StateMod_DataSetGenerator.demand_pattern)
+            self.write_time_series_daily(path("Stream_Base_Daily"), gage_ids, baseflow, "CFS")
+            self.write_time_series_daily(path("Diversion_Demand_Daily"), diversion_ids, demand, "CFS")
+
+        response_file = os.path.join(directory, name + ".rsp")
+        with open(response_file, "w") as f:
+            f.write("# Synthetic StateMod data set\n")
+            f.write("# nodes={} diversions={} rights/diversion={} returns/diversion={} gages={} "
+                    "years={}-{} daily={} seed={}\n".format(
+                        self.node_count, self.diversion_count, self.rights_per_diversion,
+                        self.return_flows_per_diversion, self.stream_gage_count, self.start_year,
+                        self.end_year, self.daily, self.seed))
+            for key, filename in files.items():
+                f.write("{:<32} = {}\n".format(key, filename))
+        logger.info("Wrote synthetic data set \"{}\"".format(response_file))
+        return Path(response_file)
+
+    def create_time_series(self, rng, count, month_of_year, scale, pattern):
+        """
+        Create time series values with a seasonal pattern and random variation.
+        :param rng: numpy random number generator.
+        :param count: number of time series.
+        :param month_of_year: array of month of year (0 = January) for each time step.
+        :param scale: mean value of the time series scale.
+        :param pattern: list of 12 monthly multipliers.
+        :return: array of shape (count, number of time steps), rounded to two decimal places.
+        """
+        station_scale = rng.gamma(2.0, scale / 2.0, count)
+        noise = rng.lognormal(0.0, 0.3, (count, len(month_of_year)))
+        values = station_scale[:, np.newaxis] * np.asarray(pattern)[month_of_year] * noise
+        return np.round(values, 2)
+
+    @staticmethod
+    def get_node_ids(node_count):
+        """
+        Return the river node identifiers.
+        :param node_count: number of nodes.
+        :return: list of identifiers.
+        """
+        return ["{:06d}".format(i) for i in range(node_count)]
+
+    def write_delay_tables(self, filename, rng, min_count, max_count):
+        """
+        Write delay tables, as percents, with the number of values on the first line of each table.
+        :param filename: name of file to write.
+        :param rng: numpy random number generator.
+        :param min_count: minimum number of values in a table.
+        :param max_count: maximum number of values in a table.
+        """
+        values_per_line = 12
+        with open(filename, "w") as f:
+            f.write("# Synthetic delay tables, percent of return flow in each time step\n")
+            for table in range(1, self.delay_table_count + 1):
+                ndly = int(rng.integers(min_count, max_count + 1))
+                percents = StateMod_DataSetGenerator.create_percents(rng, 1, ndly)[0]
+                for start in range(0, ndly, values_per_line):
+                    if start == 0:
+                        f.write("{:8d}{:8d}".format(table, ndly))
+                    else:
+                        f.write(" " * 16)
+                    f.write("".join("{:8.2f}".format(p) for p in percents[start:start + values_per_line]) + "\n")
+
+    def write_diversion_rights(self, filename, rng, node_ids, node_names, diversions):
+        """
+        Write diversion rights.
+        :param filename: name of file to write.
+        :param rng: numpy random number generator.
+        :param node_ids: river node identifiers.
+        :param node_names: river node names.
+        :param diversions: node index of each diversion.
+        """
+        count = len(diversions) * self.rights_per_diversion
+        admins = rng.uniform(1000.0, 60000.0, count)
+        decrees = rng.gamma(1.0, 10.0, count)
+        with open(filename, "w") as f:
+            f.write("# Synthetic diversion rights\n")
+            k = 0
+            for i in diversions:
+                for j in range(self.rights_per_diversion):
+                    f.write("%-12.12s%-24.24s%-12.12s%16.5f%8.2f%8d\n" % (
+                        "{}.{:02d}".format(node_ids[i], j + 1), node_names[i], node_ids[i], admins[k], decrees[k], 1))
+                    k += 1
+
+    def write_diversions(self, filename, rng, node_ids, node_names, downstream, diversions):
+        """
+        Write diversion stations.  Return flows are to nodes one to three nodes downstream of the diversion.
+        About one in five diversions has monthly efficiencies.
+        :param filename: name of file to write.
+        :param rng: numpy random number generator.
+        :param node_ids: river node identifiers.
+        :param node_names: river node names.
+        :param downstream: downstream node index for each node.
+        :param diversions: node index of each diversion.
+        """
+        count = len(diversions)
+        nrtn = self.return_flows_per_diversion
+        divcaps = np.round(rng.gamma(2.0, 25.0, count), 2)
+        areas = np.round(rng.gamma(2.0, 500.0, count), 2)
+        efficiencies = np.round(rng.uniform(40.0, 80.0, count))
+        monthly = rng.random(count) < 0.2
+        monthly_efficiencies = np.round(rng.uniform(30.0, 90.0, (count, 12)))
+
+        # Return flow nodes, walking downstream a random number of nodes
+        returns = np.repeat(np.asarray(diversions, dtype=np.int64), nrtn)
+        steps = rng.integers(1, 4, len(returns))
+        for step in range(1, 4):
+            move = (steps >= step) & (downstream[returns] >= 0)
+            returns[move] = downstream[returns[move]]
+        returns = returns.reshape(count, nrtn)
+        percents = StateMod_DataSetGenerator.create_percents(rng, count, nrtn) if nrtn > 0 else None
+        delay_tables = rng.integers(1, self.delay_table_count + 1, (count, nrtn)) if nrtn > 0 else None
+
+        with open(filename, "w") as f:
+            f.write("# Synthetic diversion stations\n")
+            for k, i in enumerate(diversions):
+                f.write("%-12.12s%-24.24s%-12.12s%8d%#8.2f%8d%8d %-12.12s\n" % (
+                    node_ids[i], node_names[i], node_ids[i], 1, divcaps[k], 1, 1, node_ids[i]))
+                divefc = -1.0 if monthly[k] else efficiencies[k]
+                f.write("            %-24.24s            %8d%8d%#8.0f%#8.2f%8d%8d\n" % (
+                    "", 1, nrtn, divefc, areas[k], 4, 1))
+                if monthly[k]:
+                    f.write("".join(" %#5.0f" % e for e in monthly_efficiencies[k]) + "\n")
+                for j in range(nrtn):
+                    f.write("                                    %-12.12s%8.2f%8d\n" % (
+                        node_ids[returns[k, j]], percents[k, j], delay_tables[k, j]))
+
+    def write_river_network(self, filename, node_ids, node_names, downstream):
+        """
+        Write the river network.
+        :param filename: name of file to write.
+        :param node_ids: river node identifiers.
+        :param node_names: river node names.
+        :param downstream: downstream node index for each node.
+        """
+        with open(filename, "w") as f:
+            f.write("# Synthetic river network\n")
+            for i, node_id in enumerate(node_ids):
+                cstadn = node_ids[downstream[i]] if downstream[i] >= 0 else ""
+                f.write("%-12.12s%-24.24s%-12.12s %-12.12s %8.8s\n" % (node_id, node_names[i], cstadn, "", ""))
+
+    def write_stream_gages(self, filename, node_ids, node_names, gages):
+        """
+        Write stream gage stations.
+        :param filename: name of file to write.
+        :param node_ids: river node identifiers.
+        :param node_names: river node names.
+        :param gages: node index of each stream gage.
+        """
+        with open(filename, "w") as f:
+            f.write("# Synthetic stream gage stations\n")
+            for i in gages:
+                f.write("%-12.12s%-24.24s%-12.12s %-12.12s\n" % (node_ids[i], node_names[i], node_ids[i],
+                                                                node_ids[i]))
+
+    def write_time_series_daily(self, filename, ids, values, units):
+        """
+        Write daily time series in StateMod format, calendar year.  Each line has 31 values,
+        with zeros after the end of shorter months, followed by the monthly total.
+        :param filename: name of file to write.
+        :param ids: time series location identifiers.
+        :param values: array of shape (len(ids), number of days).
+        :param units: data units.
+        """
+        line_format = "%4d%4d %-12.12s" + "%8.2f" * 31 + "%10.2f\n"
+        padded = np.zeros((len(ids), 31))
+        with open(filename, "w") as f:
+            self.write_time_series_header(f, units)
+            day = 0
+            for year in range(self.start_year, self.end_year + 1):
+                for month in range(1, 13):
+                    ndays = calendar.monthrange(year, month)[1]
+                    padded[:, :ndays] = values[:, day:day + ndays]
+                    padded[:, ndays:] = 0.0
+                    totals = padded.sum(axis=1)
+                    for k, ts_id in enumerate(ids):
+                        f.write(line_format % ((year, month, ts_id) + tuple(padded[k]) + (totals[k],)))
+                    day += ndays
+
+    def write_time_series_header(self, f, units):
+        """
+        Write the comments and header line for a calendar year time series file.
+        :param f: open file.
+        :param units: data units.
+        """
+        f.write("#\n# StateMod time series\n# ********************\n#\n")
+        f.write("# Synthetic time series\n# Years Shown = Calendar Years\n#\n")
+        f.write("#>EndHeader\n")
+        f.write("   %2d/%4d  -     %2d/%4d%5.5s%5.5s\n" % (1, self.start_year, 12, self.end_year, units, "CYR"))
+
+    def write_time_series_monthly(self, filename, ids, values, units):
+        """
+        Write monthly time series in StateMod format, calendar year.  Each line has 12 values followed by
+        the annual total.
+        :param filename: name of file to write.
+        :param ids: time series location identifiers.
+        :param values: array of shape (len(ids), number of months).
+        :param units: data units.
+        """
+        line_format = "%4d %-12.12s" + "%8.2f" * 12 + "%10.2f\n"
+        with open(filename, "w") as f:
+            self.write_time_series_header(f, units)
+            for iyear, year in enumerate(range(self.start_year, self.end_year + 1)):
+                year_values = values[:, iyear * 12:(iyear + 1) * 12]
+                totals = year_values.sum(axis=1)
+                for k, ts_id in enumerate(ids):
+                    f.write(line_format % ((year, ts_id) + tuple(year_values[k]) + (totals[k],)))
@@ -0,0 +1,246 @@
+# StateMod_DataSetSource - data set files in a zip archive or in memory, read without extraction
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import io
+import itertools
+import logging
+import os
+import posixpath
+import threading
+import zipfile
+from pathlib import Path
+
+
+class StateMod_DataSetSource:
+    """
+    Data set files that are not in a directory, either the members of a zip archive or a mapping of
+    file names to bytes, so that a data set can be read without extracting files to disk.
+
+    A source has a root path, which is the absolute path of the zip file or a name for an in-memory source.
+    Files in the source have paths under the root (e.g., "/data/cm2015.zip/cm2015.rsp"), which are used as the
+    response file path and data set directory in the same way as for files on disk.  Open sources are registered
+    so that StateMod_Util.open_file(), find_file(), file_exists() and get_file_size() use the source for paths under
+    its root, and therefore all readers can read member files.  Each member is opened separately and can be
+    read with random access (seek), and zip members are decompressed as they are read.
+
+    Use as a context manager, or call close() to unregister the source and close the zip file, for example:
+
+        with StateMod_DataSetSource.from_zip("cm2015.zip") as source:
+            dataset = source.read_data_set()
+    """
+
+    # Root path -> open source
+    sources = {}
+
+    # Lock for the registered sources
+    lock = threading.Lock()
+
+    # Counter used to name in-memory sources
+    memory_counter = itertools.count(1)
+
+    def __init__(self, root, zip_file=None, files=None):
+        """
+        Construct and register a source.  Use from_zip() or from_bytes() rather than calling directly.
+        :param root: absolute root path for the files in the source.
+        :param zip_file: open zipfile.ZipFile, or None.
+        :param files: dictionary of file name (relative to the root, "/" separated) -> bytes, or None.
+        """
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.zip_file = zip_file
+
+        # Member name ("/" separated, relative to the root) -> zipfile.ZipInfo or bytes
+        self.members = {}
+        if zip_file is not None:
+            for info in zip_file.infolist():
+                if not info.is_dir():
+                    self.members[posixpath.normpath(info.filename)] = info
+        if files is not None:
+            for name, data in files.items():
+                self.members[posixpath.normpath(str(name).replace("\\", "/"))] = bytes(data)
+
+        with StateMod_DataSetSource.lock:
+            StateMod_DataSetSource.sources[self.root] = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unregister the source and close the zip file.
+        """
+        with StateMod_DataSetSource.lock:
+            if StateMod_DataSetSource.sources.get(self.root) is self:
+                del StateMod_DataSetSource.sources[self.root]
+        if self.zip_file is not None:
+            self.zip_file.close()
+            self.zip_file = None
+
+    def exists(self, path):
+        """
+        Determine whether a file is in the source.
+        :param path: path of the file, under the root.
+        :return: True if the file is in the source.
+        """
+        return self.get_member_name(path) in self.members
+
+    @staticmethod
+    def find_source(path):
+        """
+        Find the registered source that contains a path.
+        :param path: file path.
+        :return: StateMod_DataSetSource, or None if the path is not under the root of a registered source.
+        """
+        if (len(StateMod_DataSetSource.sources) == 0) or (path is None):
+            return None
+        path = os.path.normpath(os.path.abspath(str(path)))
+        with StateMod_DataSetSource.lock:
+            for root, source in StateMod_DataSetSource.sources.items():
+                if path.startswith(root + os.sep):
+                    return source
+        return None
+
+    @staticmethod
+    def from_bytes(files, root=None):
+        """
+        Create a source from files in memory.
+        :param files: dictionary of file name (relative path, "/" separated) -> bytes.
+        :param root: root path for the files, or None to use a unique name.
+        :return: StateMod_DataSetSource
+        """
+        if root is None:
+            root = os.path.join(os.path.abspath(os.sep), "statemod_memory",
+                                str(next(StateMod_DataSetSource.memory_counter)))
+        return StateMod_DataSetSource(root, files=files)
+
+    @staticmethod
+    def from_zip(zip_filename):
+        """
+        Open a zip archive as a source.  The member files are under the root path of the zip file,
+        for example "/data/cm2015.zip/cm2015.rsp".
+        :param zip_filename: path of the zip file.
+        :return: StateMod_DataSetSource
+        """
+        return StateMod_DataSetSource(str(zip_filename), zip_file=zipfile.ZipFile(str(zip_filename)))
+
+    def get_file_names(self):
+        """
+        :return: list of the member file names, relative to the root.
+        """
+        return list(self.members.keys())
+
+    def get_member_name(self, path):
+        """
+        Return the member name for a path.
+        :param path: path of the file, under the root.
+        :return: member name, relative to the root and "/" separated.
+        """
+        relative = os.path.relpath(os.path.normpath(os.path.abspath(str(path))), self.root)
+        return posixpath.normpath(relative.replace(os.sep, "/"))
+
+    def get_mtime_ns(self, path):
+        """
+        Return a modification stamp for a file, used in place of the file system modification time to detect
+        changes (for example by StateMod_DataSetEnsemble).
+        :param path: path of the file, under the root.
+        :return: the archive date and time of a zip member as a number (YYYYMMDDhhmmss), or 0 for in-memory files.
+        """
+        member = self.members[self.get_member_name(path)]
+        if isinstance(member, zipfile.ZipInfo):
+            # Date and time in the archive, combined as a number that changes when the member changes
+            year, month, day, hour, minute, second = member.date_time
+            return ((((year * 100 + month) * 100 + day) * 100 + hour) * 100 + minute) * 100 + second
+        return 0
+
+    def get_path(self, name):
+        """
+        Return the path of a file in the source.
+        :param name: file name relative to the root.
+        :return: Path of the file under the root.
+        """
+        return Path(self.root, *posixpath.normpath(str(name).replace("\\", "/")).split("/"))
+
+    def get_response_file_names(self):
+        """
+        :return: list of the response file (*.rsp, or compressed *.rsp.gz, etc.) names in the source,
+        relative to the root.
+        """
+        from DWR.StateMod.StateMod_Util import StateMod_Util
+        return sorted(name for name in self.members
+                      if StateMod_Util.remove_compressed_file_extension(name).lower().endswith(".rsp"))
+
+    def get_size(self, path):
+        """
+        Return the size of a file.
+        :param path: path of the file, under the root.
+        :return: uncompressed size of the file in bytes.
+        """
+        member = self.members[self.get_member_name(path)]
+        if isinstance(member, zipfile.ZipInfo):
+            return member.file_size
+        return len(member)
+
+    def open(self, path, mode="r"):
+        """
+        Open a file for reading.  The file object supports seek().
+        :param path: path of the file, under the root.
+        :param mode: "r" to read text or "rb" to read bytes.
+        :return: file object, which should be closed (use in a "with" statement).
+        """
+        name = self.get_member_name(path)
+        member = self.members.get(name)
+        if member is None:
+            raise FileNotFoundError("File \"{}\" is not in \"{}\".".format(name, self.root))
+        if isinstance(member, zipfile.ZipInfo):
+            if self.zip_file is None:
+                raise ValueError("Zip file \"{}\" is closed.".format(self.root))
+            f = self.zip_file.open(member)
+        else:
+            f = io.BytesIO(member)
+        if mode == "rb":
+            return f
+        return io.TextIOWrapper(f)
+
+    def read_data_set(self, response_file=None, read_data=True, read_time_series=True):
+        """
+        Read a data set from the source.
+        :param response_file: name of the response file relative to the root, or None to use the only
+        response file (*.rsp) in the source.
+        :param read_data: if True, read the data files, if False only read the response file.
+        :param read_time_series: if True, read the time series files.
+        :return: StateMod_DataSet
+        """
+        from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+        logger = logging.getLogger(__name__)
+        if response_file is None:
+            response_files = self.get_response_file_names()
+            if len(response_files) != 1:
+                raise ValueError("Source \"{}\" has {} response files - specify the response file.".format(
+                    self.root, len(response_files)))
+            response_file = response_files[0]
+        logger.info("Reading data set from \"{}\" in \"{}\".".format(response_file, self.root))
+        dataset = StateMod_DataSet()
+        dataset.read_statemod_file(self.get_path(response_file), read_data, read_time_series, False, None)
+        return dataset
@@ -0,0 +1,173 @@
+# StateMod_DelayTable - class to store delay (return flow) table data (.dly, .dld)
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+
+from DWR.StateMod.StateMod_Data import StateMod_Data
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_DelayTable(StateMod_Data):
+    """
+    This class stores a delay (return flow) table, which distributes return flow over time steps.
+    The StateMod_Data ID is the delay table identifier, which is referenced by StateMod_ReturnFlow.irtndl.
+    The first value is the return in the time step of the diversion, the second value is the return in
+    the next time step, etc.
+    """
+
+    def __init__(self, is_monthly=None):
+        # Return values, in the units indicated by units.
+        self.ret_val = []
+
+        # Units for the return values, "PERCENT" or "FRACTION".
+        self.units = None
+
+        # Whether the table is for monthly (True) or daily (False) data.
+        self.is_monthly = None
+
+        if is_monthly is None:
+            is_monthly = True
+
+        super().__init__()
+        self.initialize_statemod_delaytable(is_monthly)
+
+    def initialize_statemod_delaytable(self, is_monthly):
+        """
+        Initialize data.
+        :param is_monthly: whether the table is for monthly data.
+        """
+        self.is_monthly = is_monthly
+        if is_monthly:
+            self.smdata_type = StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY
+        else:
+            self.smdata_type = StateMod_DataSetComponentType.DELAY_TABLES_DAILY
+        self.ret_val = []
+        self.units = "PERCENT"
+
+    def add_ret_val(self, d):
+        """
+        Add a return value to the end of the table.
+        :param d: return value, in the table units.
+        """
+        self.ret_val.append(d)
+        self.set_dirty(True)
+        if (not self.is_clone) and (self.dataset is not None):
+            self.dataset.set_dirty(self.smdata_type, True)
+
+    def get_ndly(self):
+        """
+        :return: the number of return values in the table.
+        """
+        return len(self.ret_val)
+
+    def get_ret_val(self, i):
+        """
+        :param i: index of the return value, 0 for the first time step.
+        :return: the return value, in the table units.
+        """
+        return self.ret_val[i]
+
+    def get_ret_vals(self):
+        """
+        :return: the list of return values, in the table units.
+        """
+        return self.ret_val
+
+    def get_units(self):
+        """
+        :return: the units for the return values, "PERCENT" or "FRACTION".
+        """
+        return self.units
+
+    @staticmethod
+    def read_statemod_file(filename, is_monthly, interv):
+        """
+        Read delay table information and return a list of StateMod_DelayTable.
+        The file is free format.  Each table starts on a new line with the table identifier,
+        followed by the number of values if the number of values is variable (interv < 0),
+        followed by the values, which can continue on following lines.
+        :param filename: name of file to read.
+        :param is_monthly: True for monthly (.dly) tables, False for daily (.dld) tables.
+        :param interv: control file interv value - the number of values in each table if > 0, or
+        variable number of values as percent if -1, or variable number of values as fractions if -100.
+        :return: a list of StateMod_DelayTable.
+        :raises Exception: if the file cannot be read or is malformed.
+        """
+        logger = logging.getLogger(__name__)
+        the_delays = []
+        units = "PERCENT"
+        if interv == -100:
+            units = "FRACTION"
+        linecount = 0
+        a_delay = None
+        # Number of values remaining to read for the current table
+        ndly_remaining = 0
+
+        try:
+            with StateMod_Util.open_file(filename) as f:
+                for iline in f:
+                    linecount += 1
+                    # Check for comments
+                    if iline.startswith("#") or (len(iline.strip()) == 0):
+                        continue
+
+                    v = iline.split()
+                    j = 0
+                    if ndly_remaining <= 0:
+                        # Start of a new table
+                        a_delay = StateMod_DelayTable(is_monthly)
+                        a_delay.set_id(v[0])
+                        a_delay.units = units
+                        j = 1
+                        if interv < 0:
+                            ndly_remaining = int(v[1])
+                            j = 2
+                        else:
+                            ndly_remaining = interv
+                        the_delays.append(a_delay)
+                    # Values on this line, which may be a continuation of the table
+                    while (j < len(v)) and (ndly_remaining > 0):
+                        a_delay.ret_val.append(float(v[j]))
+                        ndly_remaining -= 1
+                        j += 1
+        except Exception:
+            logger.warning("Error reading \"{}\" at line {}".format(filename, linecount), exc_info=True)
+            # Rethrow so that the component is marked as having an error
+            raise
+
+        if ndly_remaining > 0:
+            logger.warning("Delay table \"{}\" in \"{}\" has fewer values than expected.".format(
+                a_delay.get_id(), filename))
+        return the_delays
+
+    def set_units(self, units):
+        """
+        Set the units for the return values.
+        :param units: "PERCENT" or "FRACTION".
+        """
+        if (units is not None) and (units != self.units):
+            self.units = units
+            self.set_dirty(True)
+            if (not self.is_clone) and (self.dataset is not None):
+                self.dataset.set_dirty(self.smdata_type, True)
@@ -0,0 +1,180 @@
+# StateMod_DelayTableArray - delay tables stored as a padded array, with return flow lag convolution
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import numpy as np
+
+from DWR.StateMod.StateMod_DelayTable import StateMod_DelayTable
+
+
+class StateMod_DelayTableArray:
+    """
+    Delay tables stored in one array dimensioned (tables x maximum table length), padded with zeros,
+    with values converted to fractions.  Tables are looked up by the identifier used by StateMod_ReturnFlow.irtndl.
+    The lag() method distributes return amounts over time through the delay tables for many rows at once,
+    using direct convolution for short tables and FFT convolution for long tables.
+    """
+
+    # Tables with more values than this multiple of log2(FFT length) are convolved using the FFT.
+    # Direct convolution costs about table length operations per value and the FFT about log2(FFT length),
+    # with a larger constant.
+    FFT_LENGTH_FACTOR = 4
+
+    def __init__(self, delay_tables):
+        """
+        Construct the array from a list of delay tables.
+        :param delay_tables: list of StateMod_DelayTable.
+        """
+        # Table identifiers, in list order
+        self.table_ids = [table.get_id() for table in delay_tables]
+
+        # Normalized table identifier -> row in values
+        self.table_index = {}
+        for i, table_id in enumerate(self.table_ids):
+            self.table_index.setdefault(StateMod_DelayTableArray.normalize_table_id(table_id), i)
+
+        # Number of values in each table
+        self.lengths = np.array([table.get_ndly() for table in delay_tables], dtype=np.int64)
+
+        # Table values as fractions, padded with zeros
+        max_length = int(self.lengths.max()) if len(delay_tables) > 0 else 0
+        self.values = np.zeros((len(delay_tables), max_length), dtype=np.float64)
+        for i, table in enumerate(delay_tables):
+            ret_vals = np.array(table.get_ret_vals(), dtype=np.float64)
+            if table.get_units() == "PERCENT":
+                ret_vals /= 100.0
+            self.values[i, :len(ret_vals)] = ret_vals
+
+    @staticmethod
+    def convolve_rows(values, kernel):
+        """
+        Convolve each row of an array with a kernel, truncating the result to the original number of columns,
+        so that result[:, t] = sum(kernel[k] * values[:, t - k]).
+        Missing values should be filled or set to zero before convolving.
+        :param values: array dimensioned (rows x time).
+        :param kernel: 1-D array of weights, the first weight applying to the current time step.
+        :return: array dimensioned (rows x time).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        kernel = np.trim_zeros(np.asarray(kernel, dtype=np.float64), "b")
+        nt = values.shape[1]
+        length = min(len(kernel), nt)
+        result = np.zeros_like(values)
+        if (length == 0) or (values.shape[0] == 0):
+            return result
+        kernel = kernel[:length]
+        nfft = 1 << int(np.ceil(np.log2(nt + length - 1)))
+        if length <= StateMod_DelayTableArray.FFT_LENGTH_FACTOR * np.log2(nfft):
+            # Direct convolution, vectorized over rows
+            for k in range(length):
+                if kernel[k] != 0.0:
+                    result[:, k:] += kernel[k] * values[:, :nt - k]
+        else:
+            spectrum = np.fft.rfft(values, nfft, axis=1) * np.fft.rfft(kernel, nfft)
+            result[:, :] = np.fft.irfft(spectrum, nfft, axis=1)[:, :nt]
+        return result
+
+    def get_table(self, table_id):
+        """
+        Return the values for a table as fractions.
+        :param table_id: table identifier (string or integer).
+        :return: 1-D array of fractions, or None if the table is not found.
+        """
+        i = self.index_of(table_id)
+        if i < 0:
+            return None
+        return self.values[i, :self.lengths[i]]
+
+    def index_of(self, table_id):
+        """
+        :param table_id: table identifier (string or integer).
+        :return: the row of the table in values, or -1 if not found.
+        """
+        return self.table_index.get(StateMod_DelayTableArray.normalize_table_id(table_id), -1)
+
+    def lag(self, values, table_ids):
+        """
+        Distribute return amounts over time through delay tables.  Each row is lagged through its own table and
+        rows that use the same table are convolved together.
+        :param values: array of return amounts dimensioned (rows x time), for example structures or river nodes.
+        :param table_ids: delay table identifier for each row (e.g., StateMod_ReturnFlow.irtndl).
+        :return: array of lagged return amounts dimensioned (rows x time), truncated to the input period.
+        :raise ValueError: if a delay table is not found.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.array([self.index_of(table_id) for table_id in table_ids], dtype=np.int64)
+        if len(rows) != values.shape[0]:
+            raise ValueError("Number of delay table identifiers ({}) does not match the number of rows ({}).".format(
+                len(rows), values.shape[0]))
+        if np.any(rows < 0):
+            raise ValueError("Delay table \"{}\" is not found.".format(list(table_ids)[int(np.argmin(rows))]))
+        result = np.zeros_like(values)
+        for i in np.unique(rows):
+            in_table = rows == i
+            result[in_table] = StateMod_DelayTableArray.convolve_rows(values[in_table],
+                                                                      self.values[i, :self.lengths[i]])
+        return result
+
+    def lag_by_table(self, values_by_table):
+        """
+        Lag arrays that have already been grouped by delay table, such as the output of
+        StateMod_ReturnFlowMatrix.apply(), and add the results.
+        :param values_by_table: dictionary of delay table identifier -> array dimensioned (rows x time),
+        all with the same shape.
+        :return: the total lagged array dimensioned (rows x time).
+        :raise ValueError: if a delay table is not found.
+        """
+        result = None
+        for table_id, values in values_by_table.items():
+            table = self.get_table(table_id)
+            if table is None:
+                raise ValueError("Delay table \"{}\" is not found.".format(table_id))
+            lagged = StateMod_DelayTableArray.convolve_rows(values, table)
+            if result is None:
+                result = lagged
+            else:
+                result += lagged
+        return result
+
+    @staticmethod
+    def normalize_table_id(table_id):
+        """
+        Normalize a table identifier so that numeric identifiers match regardless of type or padding.
+        :param table_id: table identifier (string or integer).
+        :return: the normalized identifier.
+        """
+        s = str(table_id).strip()
+        try:
+            return str(int(s))
+        except ValueError:
+            return s.upper()
+
+    @staticmethod
+    def read_statemod_file(filename, is_monthly, interv):
+        """
+        Read a delay table file into an array.
+        :param filename: name of file to read.
+        :param is_monthly: True for monthly (.dly) tables, False for daily (.dld) tables.
+        :param interv: control file interv value, see StateMod_DelayTable.read_statemod_file().
+        :return: StateMod_DelayTableArray
+        """
+        return StateMod_DelayTableArray(StateMod_DelayTable.read_statemod_file(filename, is_monthly, interv))
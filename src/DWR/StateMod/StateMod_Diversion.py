@@ -250,15 +250,61 @@ class StateMod_Diversion(StateMod_Data):
 
     @staticmethod
     def connect_all_rights(diversions, rights):
+        """
+        Connect all diversion rights to the corresponding diversion stations.  The rights are grouped by
+        station identifier (cgoto) in one pass and each group is attached to the diversion with the matching
+        identifier, so the time is proportional to the number of diversions plus the number of rights.
+        Previously connected rights are replaced.  Identifiers are compared ignoring case.
+        :param diversions: list of StateMod_Diversion.
+        :param rights: list of StateMod_DiversionRight.
+        :return: list of orphan rights, which do not have a matching diversion station.
+        """
+        logger = logging.getLogger(__name__)
         if (diversions is None) or (rights is None):
-            return
-        num_divs = len(diversions)
+            return []
 
-        for i in range(num_divs):
-            div = diversions[i]
-            if div is not None:
+        # Group the rights by station identifier...
+        rights_by_station = {}
+        for right in rights:
+            if right is None:
                 continue
-            div.connect_rights(rights)
+            cgoto = right.get_cgoto()
+            if cgoto is None:
+                cgoto = ""
+            key = cgoto.upper()
+            station_rights = rights_by_station.get(key)
+            if station_rights is None:
+                rights_by_station[key] = [right]
+            else:
+                station_rights.append(right)
+
+        # Attach each group to its diversion.  The first diversion with an identifier gets the rights,
+        # consistent with looking up the station by identifier...
+        for div in diversions:
+            if div is None:
+                continue
+            div.rights = rights_by_station.pop(div.get_id().upper(), [])
+
+        # Whatever is left over did not match a diversion...
+        orphan_rights = []
+        for station_rights in rights_by_station.values():
+            orphan_rights.extend(station_rights)
+        if len(orphan_rights) > 0:
+            logger.warning("{} diversion rights do not have a matching diversion station (e.g., right \"{}\" "
+                           "for station \"{}\").".format(len(orphan_rights), orphan_rights[0].get_id(),
+                                                          orphan_rights[0].get_cgoto()))
+        return orphan_rights
+
+    def connect_rights(self, rights):
+        """
+        Connect the rights for this diversion, replacing previously connected rights.  To connect the rights
+        for all diversions, use connect_all_rights(), which does not search the rights list for each diversion.
+        :param rights: list of StateMod_DiversionRight.
+        """
+        if rights is None:
+            return
+        id = self.id.upper()
+        self.rights = [right for right in rights if (right is not None) and (right.get_cgoto().upper() == id)]
 
     def get_area(self):
         """
@@ -339,6 +385,12 @@ class StateMod_Diversion(StateMod_Data):
         """
         return self.rivret
 
+    def get_rights(self):
+        """
+        :return: the list of rights connected to the diversion.
+        """
+        return self.rights
+
     def get_username(self):
         """
         :return: the user name
@@ -420,7 +472,7 @@ class StateMod_Diversion(StateMod_Data):
         ]
 
         try:
-            with open(filename) as f:
+            with StateMod_Util.open_file(filename) as f:
                 lines = f.readlines()
                 i = -1
                 while i < len(lines) - 1:
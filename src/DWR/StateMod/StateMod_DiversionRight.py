@@ -25,7 +25,7 @@ import logging
 
 from DWR.StateMod.StateMod_Data import StateMod_Data
 from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
-# from DWR.StateMod.StateMod_Util import StateMod_Util
+from DWR.StateMod.StateMod_Util import StateMod_Util
 
 from RTi.Util.String.StringUtil import StringUtil
 
@@ -54,7 +54,37 @@ class StateMod_DiversionRight(StateMod_Data):
         """
         self.smdata_type = StateMod_DataSetComponentType.DIVERSION_RIGHTS
         self.irtem = "99999"
-        self.dcridiv = 0
+        self.dcrdiv = 0
+
+    def get_administration_number(self):
+        """
+        :return: the administration number, as a string (same as get_irtem()).
+        """
+        return self.irtem
+
+    def get_dcrdiv(self):
+        """
+        :return: the decreed amount
+        """
+        return self.dcrdiv
+
+    def get_decree(self):
+        """
+        :return: the decreed amount (same as get_dcrdiv()).
+        """
+        return self.dcrdiv
+
+    def get_irtem(self):
+        """
+        :return: the administration number, as a string
+        """
+        return self.irtem
+
+    def get_location_identifier(self):
+        """
+        :return: the identifier of the station where the right is located (same as get_cgoto()).
+        """
+        return self.cgoto
 
     @staticmethod
     def read_statemod_file(filename):
@@ -91,7 +121,7 @@ class StateMod_DiversionRight(StateMod_Data):
         logger.info("Reading diversion rights file: " + filename)
 
         try:
-            with open(filename) as f:
+            with StateMod_Util.open_file(filename) as f:
                 for iline in f:
                     # Check for comments
                     if (iline.startswith("#")) or (len(iline.strip()) == 0):
@@ -104,7 +134,7 @@ class StateMod_DiversionRight(StateMod_Data):
                     a_right.set_name(v[1].strip())
                     a_right.set_cgoto(v[2].strip())
                     a_right.set_irtem(v[3].strip())
-                    a_right.set_dcrciv(float(v[4]))
+                    a_right.set_dcrdiv(float(v[4]))
                     a_right.set_switch(int(v[5]))
                     # Mark as clean because set methods may have marked dirty...
                     a_right.set_dirty(False)
@@ -114,6 +144,12 @@ class StateMod_DiversionRight(StateMod_Data):
         return the_div_rights
 
     def set_dcrciv(self, dcrdiv):
+        """
+        Set the decreed amount.  This is retained for compatibility - use set_dcrdiv().
+        """
+        self.set_dcrdiv(dcrdiv)
+
+    def set_dcrdiv(self, dcrdiv):
         """
         Set the decreed amount
         """
@@ -0,0 +1,225 @@
+# StateMod_IntegrityCheck - referential integrity checks for a StateMod data set
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from DWR.StateMod.StateMod_DataSetComponent import StateMod_DataSetComponent
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_IntegrityFinding import StateMod_IntegrityFinding
+
+
+class StateMod_IntegrityCheck:
+    """
+    Check the referential integrity of a data set, for example that station river nodes are in the river network,
+    that rights are for known stations, and that identifiers are unique.
+    The component identifier indexes are built once before the checks are run and the independent checks are then
+    run concurrently.  Checks that rely on a component are skipped if the component has no data.
+    """
+
+    # Components that are checked for unique identifiers
+    unique_id_component_types = [
+        StateMod_DataSetComponentType.RIVER_NETWORK,
+        StateMod_DataSetComponentType.STREAMGAGE_STATIONS,
+        StateMod_DataSetComponentType.DIVERSION_STATIONS,
+        StateMod_DataSetComponentType.DIVERSION_RIGHTS,
+        StateMod_DataSetComponentType.RESERVOIR_STATIONS,
+        StateMod_DataSetComponentType.RESERVOIR_RIGHTS,
+        StateMod_DataSetComponentType.INSTREAM_STATIONS,
+        StateMod_DataSetComponentType.INSTREAM_RIGHTS,
+        StateMod_DataSetComponentType.WELL_STATIONS,
+        StateMod_DataSetComponentType.WELL_RIGHTS,
+        StateMod_DataSetComponentType.PLANS,
+        StateMod_DataSetComponentType.OPERATION_RIGHTS
+    ]
+
+    def __init__(self, dataset):
+        """
+        Construct the check for a data set.
+        :param dataset: StateMod_DataSet to check.
+        """
+        self.dataset = dataset
+
+    def check_diversion_nodes_in_network(self):
+        """
+        Check that each diversion station's river node (cgoto) is in the river network.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        return self.check_nodes_in_network(StateMod_DataSetComponentType.DIVERSION_STATIONS,
+                                           "DiversionNodeInNetwork", "Diversion")
+
+    def check_diversion_rights_have_station(self):
+        """
+        Check that each diversion right's station (cgoto) is a diversion station.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        findings = []
+        rights = self.get_list_data(StateMod_DataSetComponentType.DIVERSION_RIGHTS)
+        stations = self.get_indexed_component(StateMod_DataSetComponentType.DIVERSION_STATIONS)
+        if (len(rights) == 0) or (stations is None):
+            return findings
+        for right in rights:
+            if stations.lookup(right.get_cgoto()) is None:
+                findings.append(StateMod_IntegrityFinding(
+                    "DiversionRightHasStation", StateMod_IntegrityFinding.SEVERITY_ERROR,
+                    StateMod_DataSetComponentType.DIVERSION_RIGHTS, right.get_id(),
+                    "Diversion right station \"{}\" is not a diversion station.".format(right.get_cgoto()),
+                    right.get_cgoto()))
+        return findings
+
+    def check_diversion_time_series(self):
+        """
+        Check that each diversion station has monthly demand and historical diversion time series,
+        for the time series components that have data.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        findings = []
+        diversions = self.get_list_data(StateMod_DataSetComponentType.DIVERSION_STATIONS)
+        for ts_type, description in [(StateMod_DataSetComponentType.DEMAND_TS_MONTHLY, "demand (monthly)"),
+                                     (StateMod_DataSetComponentType.DIVERSION_TS_MONTHLY,
+                                      "historical diversion (monthly)")]:
+            ts_comp = self.get_indexed_component(ts_type)
+            if ts_comp is None:
+                continue
+            for div in diversions:
+                if ts_comp.lookup(div.get_id()) is None:
+                    findings.append(StateMod_IntegrityFinding(
+                        "DiversionHasTimeSeries", StateMod_IntegrityFinding.SEVERITY_WARNING,
+                        StateMod_DataSetComponentType.DIVERSION_STATIONS, div.get_id(),
+                        "Diversion does not have {} time series.".format(description)))
+        return findings
+
+    def check_integrity(self, max_workers=None):
+        """
+        Run all checks.
+        :param max_workers: maximum number of threads to use, or None for the default.
+        :return: list of StateMod_IntegrityFinding, ordered by check.
+        """
+        logger = logging.getLogger(__name__)
+        # Build the indexes once, before the checks run concurrently
+        for comp_type in StateMod_DataSetComponentType:
+            comp = self.dataset.get_component_for_component_type(comp_type)
+            if isinstance(comp, StateMod_DataSetComponent):
+                comp.check_indexes()
+
+        checks = [
+            self.check_unique_ids,
+            self.check_diversion_nodes_in_network,
+            self.check_stream_gage_nodes_in_network,
+            self.check_return_flow_nodes_in_network,
+            self.check_diversion_rights_have_station,
+            self.check_diversion_time_series
+        ]
+        findings = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(check) for check in checks]
+            for future in futures:
+                findings.extend(future.result())
+        logger.info("Data set integrity check found {} problems.".format(len(findings)))
+        return findings
+
+    def check_nodes_in_network(self, comp_type, check, description):
+        """
+        Check that the river node (cgoto) of each station in a component is in the river network.
+        :param comp_type: StateMod_DataSetComponentType for the stations.
+        :param check: check name for findings.
+        :param description: station description for messages.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        findings = []
+        network = self.get_indexed_component(StateMod_DataSetComponentType.RIVER_NETWORK)
+        if network is None:
+            return findings
+        for station in self.get_list_data(comp_type):
+            cgoto = station.get_cgoto()
+            if network.lookup(cgoto) is None:
+                findings.append(StateMod_IntegrityFinding(
+                    check, StateMod_IntegrityFinding.SEVERITY_ERROR, comp_type, station.get_id(),
+                    "{} river node \"{}\" is not in the river network.".format(description, cgoto), cgoto))
+        return findings
+
+    def check_return_flow_nodes_in_network(self):
+        """
+        Check that each diversion return flow node (crtnid) is in the river network.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        findings = []
+        network = self.get_indexed_component(StateMod_DataSetComponentType.RIVER_NETWORK)
+        if network is None:
+            return findings
+        for div in self.get_list_data(StateMod_DataSetComponentType.DIVERSION_STATIONS):
+            for return_flow in div.get_return_flows():
+                crtnid = return_flow.get_crtnid()
+                if network.lookup(crtnid) is None:
+                    findings.append(StateMod_IntegrityFinding(
+                        "ReturnFlowNodeInNetwork", StateMod_IntegrityFinding.SEVERITY_ERROR,
+                        StateMod_DataSetComponentType.DIVERSION_STATIONS, div.get_id(),
+                        "Diversion return flow node \"{}\" is not in the river network.".format(crtnid), crtnid))
+        return findings
+
+    def check_stream_gage_nodes_in_network(self):
+        """
+        Check that each stream gage station's river node (cgoto) is in the river network.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        return self.check_nodes_in_network(StateMod_DataSetComponentType.STREAMGAGE_STATIONS,
+                                           "StreamGageNodeInNetwork", "Stream gage")
+
+    def check_unique_ids(self):
+        """
+        Check that identifiers are unique within each station and right component.
+        :return: list of StateMod_IntegrityFinding.
+        """
+        findings = []
+        for comp_type in StateMod_IntegrityCheck.unique_id_component_types:
+            comp = self.get_indexed_component(comp_type)
+            if comp is None:
+                continue
+            for id in comp.get_duplicate_ids():
+                findings.append(StateMod_IntegrityFinding(
+                    "UniqueIDs", StateMod_IntegrityFinding.SEVERITY_ERROR, comp_type, id,
+                    "Identifier is used more than once in {}.".format(comp.get_component_name())))
+        return findings
+
+    def get_indexed_component(self, comp_type):
+        """
+        Return a component that has list data and identifier indexes.
+        :param comp_type: StateMod_DataSetComponentType.
+        :return: the StateMod_DataSetComponent, or None if the component has no data.
+        """
+        comp = self.dataset.get_component_for_component_type(comp_type)
+        if (not isinstance(comp, StateMod_DataSetComponent)) or (not isinstance(comp.get_data(), list)) or \
+                (len(comp.get_data()) == 0):
+            return None
+        return comp
+
+    def get_list_data(self, comp_type):
+        """
+        Return the list data for a component.
+        :param comp_type: StateMod_DataSetComponentType.
+        :return: the component data list, or an empty list if the component has no data.
+        """
+        comp = self.get_indexed_component(comp_type)
+        if comp is None:
+            return []
+        return comp.get_data()
@@ -0,0 +1,97 @@
+# StateMod_IntegrityFinding - result of a data set integrity check
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+
+class StateMod_IntegrityFinding:
+    """
+    A problem found by StateMod_IntegrityCheck, for example a station whose river node is not in the network.
+    """
+
+    # Severity levels
+    SEVERITY_ERROR = "ERROR"
+    SEVERITY_WARNING = "WARNING"
+
+    def __init__(self, check, severity, component_type, id, message, related_id=None):
+        """
+        Construct a finding.
+        :param check: name of the check that produced the finding (e.g., "DiversionNodeInNetwork").
+        :param severity: SEVERITY_ERROR or SEVERITY_WARNING.
+        :param component_type: StateMod_DataSetComponentType of the object with the problem.
+        :param id: identifier of the object with the problem.
+        :param message: description of the problem.
+        :param related_id: identifier that could not be resolved, if applicable (e.g., the river node).
+        """
+        self.check = check
+        self.severity = severity
+        self.component_type = component_type
+        self.id = id
+        self.message = message
+        self.related_id = related_id
+
+    def get_check(self):
+        """
+        :return: the name of the check that produced the finding.
+        """
+        return self.check
+
+    def get_component_type(self):
+        """
+        :return: the component type of the object with the problem.
+        """
+        return self.component_type
+
+    def get_id(self):
+        """
+        :return: the identifier of the object with the problem.
+        """
+        return self.id
+
+    def get_message(self):
+        """
+        :return: the description of the problem.
+        """
+        return self.message
+
+    def get_related_id(self):
+        """
+        :return: the identifier that could not be resolved, or None.
+        """
+        return self.related_id
+
+    def get_severity(self):
+        """
+        :return: the severity, SEVERITY_ERROR or SEVERITY_WARNING.
+        """
+        return self.severity
+
+    def __str__(self):
+        """
+        :return: a string representation of the finding.
+        """
+        return "{}: {} [{}] {}".format(self.severity, self.check, self.id, self.message)
+
+    def __repr__(self):
+        """
+        :return: a string representation of the finding.
+        """
+        return self.__str__()
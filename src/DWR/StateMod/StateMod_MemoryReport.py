@@ -0,0 +1,222 @@
+# StateMod_MemoryReport - memory use of the components of a StateMod data set
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import array
+import enum
+import logging
+import sys
+import types
+
+import numpy as np
+
+from RTi.Util.IO.DataSet import DataSet
+from RTi.Util.IO.DataSetComponent import DataSetComponent
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+
+
+class StateMod_MemoryReport:
+    """
+    Approximate memory use of each component of a data set, and of each type of object in the components,
+    for example to find the components that use the most memory after a data set is read.
+
+    Sizes are deep sizes from sys.getsizeof(), following object attributes and containers.  Objects that are
+    referenced from more than one place are counted once, for the first component that references them.
+    References to the data objects of other components (for example the rights attached to a diversion),
+    the data set, components, classes and modules are not followed.  Numeric bytes are the
+    bytes in numpy arrays, array.array and Python int and float objects, which is the memory that could be
+    reduced by storing values in compact arrays (for example as float32).
+
+    If the data set was read with StateMod_DataSet.read_statemod_file(..., trace_memory=True), the report also
+    includes the peak and retained memory traced by tracemalloc while each component was read.
+    """
+
+    # Types that are not followed when computing deep sizes
+    not_followed_types = (DataSet, DataSetComponent, type, types.ModuleType, types.FunctionType,
+                          types.BuiltinFunctionType, types.MethodType, logging.Logger, enum.Enum)
+
+    def __init__(self, dataset):
+        """
+        Build the report for a data set.
+        :param dataset: StateMod_DataSet.
+        """
+        # List of dictionaries, one per component with data, in component type order
+        self.component_rows = []
+
+        # Object type name -> dictionary of object_count, deep_bytes and numeric_bytes
+        self.object_type_rows = {}
+
+        memory_trace = getattr(dataset, "memory_trace", None)
+        if memory_trace is None:
+            memory_trace = {}
+
+        components = []
+        for comp_type in StateMod_DataSetComponentType:
+            comp = dataset.get_component_for_component_type(comp_type)
+            if comp is not None:
+                components.append((comp_type, comp))
+
+        # Identifiers of the data objects of all components, which are only counted for their own component
+        data_object_ids = set()
+        for comp_type, comp in components:
+            data = comp.get_data()
+            if isinstance(data, list):
+                data_object_ids.update(id(obj) for obj in data)
+            elif data is not None:
+                data_object_ids.add(id(data))
+
+        # Object identifiers that have been counted, shared by all components
+        seen = set()
+        # Data object identifier -> component name, to detect components that share data
+        data_components = {}
+        for comp_type, comp in components:
+            data = comp.get_data()
+            trace = memory_trace.get(comp.get_component_name())
+            if ((data is None) or (isinstance(data, list) and (len(data) == 0))) and (trace is None):
+                continue
+            row = {
+                "component_type": comp_type,
+                "component_name": comp.get_component_name(),
+                "object_count": 0,
+                "deep_bytes": 0,
+                "numeric_bytes": 0,
+                "shared_with": data_components.get(id(data)),
+                "traced_peak_bytes": None,
+                "traced_retained_bytes": None
+            }
+            if trace is not None:
+                row["traced_peak_bytes"] = trace["peak_bytes"]
+                row["traced_retained_bytes"] = trace["retained_bytes"]
+            if data is not None:
+                data_components.setdefault(id(data), row["component_name"])
+                objects = data if isinstance(data, list) else [data]
+                row["object_count"] = len(objects)
+                for obj in objects:
+                    deep_bytes, numeric_bytes = StateMod_MemoryReport.get_deep_size(obj, seen, data_object_ids)
+                    row["deep_bytes"] += deep_bytes
+                    row["numeric_bytes"] += numeric_bytes
+                    type_row = self.object_type_rows.setdefault(
+                        type(obj).__name__, {"object_count": 0, "deep_bytes": 0, "numeric_bytes": 0})
+                    type_row["object_count"] += 1
+                    type_row["deep_bytes"] += deep_bytes
+                    type_row["numeric_bytes"] += numeric_bytes
+                if isinstance(data, list):
+                    # Include the list itself, unless shared with another component
+                    if id(data) not in seen:
+                        seen.add(id(data))
+                        row["deep_bytes"] += sys.getsizeof(data)
+            self.component_rows.append(row)
+
+    def get_component_rows(self):
+        """
+        :return: list of dictionaries, one per component with data, with keys component_type, component_name,
+        object_count, deep_bytes, numeric_bytes, shared_with (name of the component that the data are shared
+        with, or None), traced_peak_bytes and traced_retained_bytes (None if memory was not traced).
+        """
+        return self.component_rows
+
+    @staticmethod
+    def get_deep_size(obj, seen, stop_ids=None):
+        """
+        Return the approximate deep size of an object.
+        :param obj: object to size.
+        :param seen: set of object identifiers that have already been counted, which is updated.
+        :param stop_ids: set of identifiers of objects, other than obj, that are not followed, or None.
+        :return: (deep_bytes, numeric_bytes)
+        """
+        deep_bytes = 0
+        numeric_bytes = 0
+        stack = [obj]
+        while len(stack) > 0:
+            o = stack.pop()
+            if (o is None) or (o is True) or (o is False) or (id(o) in seen):
+                continue
+            if isinstance(o, StateMod_MemoryReport.not_followed_types):
+                continue
+            if (stop_ids is not None) and (o is not obj) and (id(o) in stop_ids):
+                continue
+            seen.add(id(o))
+            if isinstance(o, np.ndarray):
+                if o.base is None:
+                    # Array owns its data, which is included in getsizeof()
+                    deep_bytes += sys.getsizeof(o)
+                    numeric_bytes += o.nbytes
+                else:
+                    # View of another array, count the array that owns the data
+                    deep_bytes += sys.getsizeof(o)
+                    stack.append(o.base)
+                if o.dtype == object:
+                    stack.extend(o.ravel().tolist())
+                continue
+            size = sys.getsizeof(o)
+            deep_bytes += size
+            if isinstance(o, (int, float)):
+                numeric_bytes += size
+            elif isinstance(o, array.array):
+                numeric_bytes += o.itemsize * len(o)
+            elif isinstance(o, (str, bytes)):
+                pass
+            elif isinstance(o, dict):
+                stack.extend(o.keys())
+                stack.extend(o.values())
+            elif isinstance(o, (list, tuple, set, frozenset)):
+                stack.extend(o)
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+        return deep_bytes, numeric_bytes
+
+    def get_object_type_rows(self):
+        """
+        :return: dictionary of object type name -> dictionary with keys object_count, deep_bytes and numeric_bytes.
+        """
+        return self.object_type_rows
+
+    def get_total_bytes(self):
+        """
+        :return: total deep bytes of all components.
+        """
+        return sum(row["deep_bytes"] for row in self.component_rows)
+
+    def to_string(self):
+        """
+        :return: the report formatted as a text table, components sorted by deep size.
+        """
+        lines = ["{:<64} {:>10} {:>14} {:>14} {:>14}".format(
+                 "Component", "Objects", "Deep bytes", "Numeric bytes", "Traced peak")]
+        for row in sorted(self.component_rows, key=lambda r: r["deep_bytes"], reverse=True):
+            name = row["component_name"]
+            if row["shared_with"] is not None:
+                name = name + " (shared with " + row["shared_with"] + ")"
+            traced_peak_bytes = row["traced_peak_bytes"]
+            lines.append("{:<64.64} {:>10} {:>14} {:>14} {:>14}".format(
+                name, row["object_count"], row["deep_bytes"], row["numeric_bytes"],
+                "" if traced_peak_bytes is None else traced_peak_bytes))
+        lines.append("{:<64} {:>10} {:>14}".format("Total", "", self.get_total_bytes()))
+        lines.append("")
+        lines.append("{:<64} {:>10} {:>14} {:>14}".format("Object type", "Objects", "Deep bytes", "Numeric bytes"))
+        for name, row in sorted(self.object_type_rows.items(), key=lambda item: item[1]["deep_bytes"], reverse=True):
+            lines.append("{:<64.64} {:>10} {:>14} {:>14}".format(
+                name, row["object_count"], row["deep_bytes"], row["numeric_bytes"]))
+        return "\n".join(lines)
@@ -0,0 +1,217 @@
+# StateMod_ReturnFlowMatrix - sparse return flow routing matrices built from structure return flow tables
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+
+import numpy as np
+
+
+class StateMod_ReturnFlowMatrix:
+    """
+    Return flow routing for a list of structures (e.g., diversions), stored as one sparse matrix per delay table.
+    Each matrix has one row per structure and one column per river node and is stored in compressed sparse row
+    (CSR) form, where the columns and weights for structure i are indices[indptr[i]:indptr[i+1]] and
+    data[indptr[i]:indptr[i+1]].  Weights are the return flow percent (pcttot) / 100.
+    Applying the matrices to a (structures x time) array of return amounts gives the amount returned to each
+    river node for each delay table, before lagging through the delay table.
+
+    The routing used to apply each matrix is computed once when the matrices are built:  the matrix entries
+    sorted by column, with the row and weight of each entry and the start of each column's entries, so that
+    applying a matrix is a gather, a multiply and one segmented sum (numpy.add.reduceat) without sorting.
+    """
+
+    def __init__(self, structure_ids, node_ids):
+        """
+        Construct an empty matrix set.  Use build() to construct from structure return flow lists.
+        :param structure_ids: list of structure identifiers, one per matrix row.
+        :param node_ids: list of river node identifiers, one per matrix column.
+        """
+        # Structure identifiers (matrix rows)
+        self.structure_ids = list(structure_ids)
+
+        # River node identifiers (matrix columns)
+        self.node_ids = list(node_ids)
+
+        # Delay table identifier -> (indptr, indices, data) CSR arrays
+        self.matrices = {}
+
+        # Delay table identifier -> (rows, weights, starts, columns) column routing, see build_routing()
+        self.routings = {}
+
+        # Return flow node identifiers that are not in the river node list, as (structure ID, node ID)
+        self.unmatched_returns = []
+
+    def apply(self, values, delay_table_id=None):
+        """
+        Distribute structure return amounts to river nodes.
+        :param values: array of return amounts, dimensioned (structures) or (structures x time).
+        :param delay_table_id: delay table identifier to apply, or None to apply all delay tables.
+        :return: array dimensioned (nodes) or (nodes x time) if delay_table_id is specified, otherwise a dictionary
+        of such arrays keyed by delay table identifier.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] != len(self.structure_ids):
+            raise ValueError("Array first dimension ({}) does not match the number of structures ({}).".format(
+                values.shape[0], len(self.structure_ids)))
+        if delay_table_id is not None:
+            return self.apply_routing(self.routings.get(delay_table_id), values)
+        results = {}
+        for table_id in self.get_delay_table_ids():
+            results[table_id] = self.apply_routing(self.routings[table_id], values)
+        return results
+
+    def apply_routing(self, routing, values):
+        """
+        Multiply the transpose of a matrix by an array of structure values, using the matrix column routing.
+        :param routing: (rows, weights, starts, columns) from build_routing(), or None for an empty matrix.
+        :param values: array dimensioned (structures) or (structures x time).
+        :return: array dimensioned (nodes) or (nodes x time).
+        """
+        result = np.zeros((len(self.node_ids),) + values.shape[1:], dtype=np.float64)
+        if (routing is None) or (len(routing[1]) == 0):
+            return result
+        rows, weights, starts, columns = routing
+        # Weighted contribution of each matrix entry, in column order, then sum the entries for each column
+        if values.ndim == 1:
+            contributions = values[rows] * weights
+        else:
+            contributions = values[rows] * weights.reshape((-1,) + (1,) * (values.ndim - 1))
+        result[columns] = np.add.reduceat(contributions, starts, axis=0)
+        return result
+
+    def apply_total(self, values):
+        """
+        Distribute structure return amounts to river nodes, summing all delay tables, which is useful
+        when return flow timing is not needed.
+        :param values: array of return amounts, dimensioned (structures) or (structures x time).
+        :return: array dimensioned (nodes) or (nodes x time).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = np.zeros((len(self.node_ids),) + values.shape[1:], dtype=np.float64)
+        for table_result in self.apply(values).values():
+            result += table_result
+        return result
+
+    @staticmethod
+    def build(structures, node_ids):
+        """
+        Build the return flow matrices for a list of structures.
+        :param structures: list of objects with get_id() and get_return_flows() (e.g., StateMod_Diversion), where
+        get_return_flows() returns a list of StateMod_ReturnFlow.
+        :param node_ids: list of river node identifiers for the matrix columns, for example
+        StateMod_RiverNetwork.node_ids so that results can be accumulated on the network.
+        :return: StateMod_ReturnFlowMatrix
+        """
+        logger = logging.getLogger(__name__)
+        matrix = StateMod_ReturnFlowMatrix([structure.get_id() for structure in structures], node_ids)
+        node_index = {}
+        for i, node_id in enumerate(matrix.node_ids):
+            node_index.setdefault(node_id.upper(), i)
+
+        # Collect matrix entries in coordinate form
+        rows = []
+        cols = []
+        weights = []
+        tables = []
+        for row, structure in enumerate(structures):
+            for return_flow in structure.get_return_flows():
+                crtnid = return_flow.get_crtnid()
+                col = node_index.get(crtnid.upper(), -1) if crtnid is not None else -1
+                if col < 0:
+                    matrix.unmatched_returns.append((structure.get_id(), crtnid))
+                    continue
+                rows.append(row)
+                cols.append(col)
+                weights.append(return_flow.get_pcttot() / 100.0)
+                tables.append(return_flow.get_irtndl())
+        if len(matrix.unmatched_returns) > 0:
+            logger.warning("{} return flows are to nodes that are not in the river network (e.g., structure \"{}\" "
+                           "node \"{}\") - ignoring.".format(len(matrix.unmatched_returns),
+                                                             matrix.unmatched_returns[0][0],
+                                                             matrix.unmatched_returns[0][1]))
+
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        weights = np.array(weights, dtype=np.float64)
+        tables = np.array(tables, dtype=np.int64)
+        row_count = len(matrix.structure_ids)
+        col_count = len(matrix.node_ids)
+        for table_id in np.unique(tables):
+            in_table = tables == table_id
+            # Sort by row then column and add duplicate entries
+            keys = rows[in_table] * col_count + cols[in_table]
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            data = np.bincount(inverse, weights=weights[in_table])
+            indptr = np.zeros(row_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(unique_keys // col_count, minlength=row_count), out=indptr[1:])
+            indices = (unique_keys % col_count).astype(np.int32)
+            matrix.matrices[int(table_id)] = (indptr, indices, data)
+            matrix.routings[int(table_id)] = StateMod_ReturnFlowMatrix.build_routing(indptr, indices, data)
+        return matrix
+
+    @staticmethod
+    def build_routing(indptr, indices, data):
+        """
+        Build the column routing for a CSR matrix, used to apply the matrix without sorting.
+        :param indptr: CSR row pointers.
+        :param indices: CSR column indices.
+        :param data: CSR weights.
+        :return: (rows, weights, starts, columns), where rows and weights are the row and weight of each entry
+        sorted by column, starts is the position of the first entry for each column that has entries, and
+        columns is the column for each start.
+        """
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        order = np.argsort(indices, kind="stable")
+        sorted_indices = indices[order]
+        starts = np.nonzero(np.diff(sorted_indices, prepend=-1))[0] if len(order) > 0 else np.zeros(0, np.int64)
+        return rows[order], data[order], starts, sorted_indices[starts]
+
+    def get_delay_table_ids(self):
+        """
+        :return: sorted list of delay table identifiers that are used by the return flows.
+        """
+        return sorted(self.matrices.keys())
+
+    def get_total_percent(self):
+        """
+        Return the total return flow percent for each structure, which is normally 100 for each structure
+        with return flows and can be used to check the return flow data.
+        :return: array of total percent, one value per structure.
+        """
+        total = np.zeros(len(self.structure_ids), dtype=np.float64)
+        row_count = len(self.structure_ids)
+        for indptr, indices, data in self.matrices.values():
+            rows = np.repeat(np.arange(row_count), np.diff(indptr))
+            total += np.bincount(rows, weights=data, minlength=row_count)
+        return total * 100.0
+
+    def to_scipy(self, delay_table_id):
+        """
+        Return a matrix as a scipy.sparse.csr_matrix, for use with other sparse matrix tools.
+        scipy is imported only when this method is called.
+        :param delay_table_id: delay table identifier.
+        :return: scipy.sparse.csr_matrix dimensioned (structures x nodes).
+        """
+        from scipy.sparse import csr_matrix
+        indptr, indices, data = self.matrices[delay_table_id]
+        return csr_matrix((data, indices, indptr), shape=(len(self.structure_ids), len(self.node_ids)))
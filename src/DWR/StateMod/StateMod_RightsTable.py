@@ -0,0 +1,203 @@
+# StateMod_RightsTable - water rights stored in a priority-sorted array
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+
+import numpy as np
+
+
+class StateMod_RightsTable:
+    """
+    Water rights of one or more types stored in a numpy structured array, sorted by priority
+    (administration number, with ties in the order the rights were added).  Each record contains:
+
+        admin - administration number (float64), smaller is more senior
+        decree - decreed amount
+        switch - on/off switch, 1 if on
+        station - index of the owning station in station_ids, or -1 if the station is not known
+        right_type - StateMod_DataSetComponentType value for the rights component (e.g., DIVERSION_RIGHTS)
+        source - index of the right in the list of all rights that were added, see get_right()
+
+    Rights objects must provide get_id(), get_administration_number(), get_decree(), get_switch() and
+    get_location_identifier(), as StateMod_DiversionRight does.
+    """
+
+    # Administration number used when the administration number cannot be parsed, most junior.
+    MISSING_ADMINISTRATION_NUMBER = 99999.0
+
+    # Record data type
+    DTYPE = np.dtype([
+        ("admin", np.float64),
+        ("decree", np.float64),
+        ("switch", np.int32),
+        ("station", np.int32),
+        ("right_type", np.int32),
+        ("source", np.int32)
+    ])
+
+    def __init__(self, right_lists, station_ids=None):
+        """
+        Build the table.
+        :param right_lists: list of (right_type, rights) pairs, where right_type is a
+        StateMod_DataSetComponentType and rights is a list of rights objects.
+        :param station_ids: list of station identifiers for the station index.  If None, the station list
+        is built from the right location identifiers, in the order first found.
+        """
+        logger = logging.getLogger(__name__)
+
+        # Right objects in the order added, indexed by the source field
+        self.rights = []
+
+        # Station identifiers, indexed by the station field
+        self.station_ids = []
+        station_index = {}
+        add_stations = station_ids is None
+        if not add_stations:
+            self.station_ids = list(station_ids)
+            for i, station_id in enumerate(self.station_ids):
+                station_index.setdefault(station_id.upper(), i)
+
+        admins = []
+        decrees = []
+        switches = []
+        stations = []
+        right_types = []
+        bad_admin_count = 0
+        for right_type, rights in right_lists:
+            right_type_value = right_type.value if hasattr(right_type, "value") else int(right_type)
+            for right in rights:
+                self.rights.append(right)
+                try:
+                    admins.append(float(right.get_administration_number()))
+                except (TypeError, ValueError):
+                    admins.append(StateMod_RightsTable.MISSING_ADMINISTRATION_NUMBER)
+                    bad_admin_count += 1
+                decree = right.get_decree()
+                decrees.append(decree if decree is not None else 0.0)
+                switches.append(right.get_switch())
+                location_id = right.get_location_identifier()
+                key = location_id.upper() if location_id is not None else ""
+                station = station_index.get(key, -1)
+                if (station < 0) and add_stations:
+                    station = len(self.station_ids)
+                    station_index[key] = station
+                    self.station_ids.append(location_id)
+                stations.append(station)
+                right_types.append(right_type_value)
+        records = np.zeros(len(self.rights), dtype=StateMod_RightsTable.DTYPE)
+        records["admin"] = admins
+        records["decree"] = decrees
+        records["switch"] = switches
+        records["station"] = stations
+        records["right_type"] = right_types
+        records["source"] = np.arange(len(self.rights))
+        if bad_admin_count > 0:
+            logger.warning("{} rights have an administration number that is not a number - using {}.".format(
+                bad_admin_count, StateMod_RightsTable.MISSING_ADMINISTRATION_NUMBER))
+
+        # Records sorted by priority.  A stable sort keeps rights with the same administration number
+        # in the order they were added.
+        self.table = records[np.argsort(records["admin"], kind="stable")]
+
+        # Contiguous copy of the sorted administration numbers for binary searches
+        self.admins = np.ascontiguousarray(self.table["admin"])
+
+        # Station identifier (upper case) -> station index
+        self.station_index = station_index
+
+        # Cumulative decree in priority order, for rights that are on
+        self.cumulative_decree = np.cumsum(np.where(self.table["switch"] > 0, self.table["decree"], 0.0))
+
+    def cumulative_decree_senior_to(self, admin):
+        """
+        Return the total decree of rights that are on and senior to an administration number.
+        :param admin: administration number.
+        :return: total decree of rights with administration number less than admin.
+        """
+        n = int(np.searchsorted(self.admins, admin, side="left"))
+        if n == 0:
+            return 0.0
+        return float(self.cumulative_decree[n - 1])
+
+    def get_right(self, record):
+        """
+        Return the right object for a table record.
+        :param record: table record (e.g., an element of table) or source index.
+        :return: the right object.
+        """
+        if isinstance(record, np.void):
+            return self.rights[int(record["source"])]
+        return self.rights[int(record)]
+
+    def get_rights(self, records):
+        """
+        Return the right objects for table records, for example the result of senior_to().
+        :param records: structured array of table records.
+        :return: list of right objects, in record order.
+        """
+        return [self.rights[i] for i in records["source"]]
+
+    def get_size(self):
+        """
+        :return: the number of rights in the table.
+        """
+        return len(self.table)
+
+    def priority_range(self, admin1, admin2):
+        """
+        Return the positions in the table of rights with administration number in a range.
+        :param admin1: first administration number, inclusive.
+        :param admin2: last administration number, inclusive.
+        :return: (start, end) positions, for use in slicing table and cumulative_decree.
+        """
+        return (int(np.searchsorted(self.admins, admin1, side="left")),
+                int(np.searchsorted(self.admins, admin2, side="right")))
+
+    def rights_between(self, admin1, admin2):
+        """
+        Return rights with administration number in a range, in priority order.
+        :param admin1: first administration number, inclusive.
+        :param admin2: last administration number, inclusive.
+        :return: structured array of table records (a view of table).
+        """
+        start, end = self.priority_range(admin1, admin2)
+        return self.table[start:end]
+
+    def rights_for_station(self, station_id):
+        """
+        Return the rights for a station, in priority order.
+        :param station_id: station identifier.
+        :return: structured array of table records.
+        """
+        station = self.station_index.get(station_id.upper(), -1)
+        if station < 0:
+            return self.table[:0]
+        return self.table[self.table["station"] == station]
+
+    def senior_to(self, admin):
+        """
+        Return rights that are senior to an administration number, in priority order.
+        :param admin: administration number.
+        :return: structured array of table records with administration number less than admin (a view of table).
+        """
+        return self.table[:int(np.searchsorted(self.admins, admin, side="left"))]
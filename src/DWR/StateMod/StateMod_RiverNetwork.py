@@ -0,0 +1,351 @@
+# StateMod_RiverNetwork - array-backed river network built from river network (.rin) nodes
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import logging
+
+import numpy as np
+
+from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
+
+
+class StateMod_RiverNetwork:
+    """
+    River network stored as arrays, built from the StateMod_RiverNetworkNode list read from the .rin file.
+    Nodes are numbered 0 to N-1 in file order.  The network is a tree (or forest if more than one
+    outlet) where each node has at most one downstream node.  The following arrays are maintained:
+
+        downstream - downstream node index for each node, -1 for an outlet
+        upstream_indptr, upstream_indices - upstream (child) nodes in compressed sparse row form,
+            the upstream nodes of node i are upstream_indices[upstream_indptr[i]:upstream_indptr[i+1]]
+        preorder - nodes in depth-first order starting at the outlets and moving upstream
+        tin, tout - position of each node in preorder and the end of its upstream sub-tree, so that the
+            nodes upstream of node i are preorder[tin[i]+1:tout[i]]
+        topological_order - nodes ordered so that every node follows all nodes upstream of it
+
+    The tin/tout (Euler tour) intervals allow upstream and downstream tests in constant time.
+    Arrays of node data passed to the accumulation methods have one row per node, in node index order,
+    and optionally a second (time) dimension.
+    """
+
+    def __init__(self, nodes):
+        """
+        Construct the network from a list of river network nodes.
+        A downstream identifier that is blank or does not match a node indicates an outlet.
+        :param nodes: list of StateMod_RiverNetworkNode, in .rin file order.
+        :raise ValueError: if the network contains a loop.
+        """
+        logger = logging.getLogger(__name__)
+
+        # Node identifiers, in file order
+        self.node_ids = []
+
+        # Node identifier (upper case) -> node index
+        self.node_index = {}
+
+        # Identifiers of nodes with a non-blank downstream identifier that does not match a node
+        self.unmatched_downstream_ids = []
+
+        for node in nodes:
+            id = node.get_id()
+            key = id.upper()
+            if key in self.node_index:
+                logger.warning("Duplicate river network node \"{}\" - using the first occurrence.".format(id))
+                continue
+            self.node_index[key] = len(self.node_ids)
+            self.node_ids.append(id)
+
+        node_count = len(self.node_ids)
+        self.downstream = np.full(node_count, -1, dtype=np.int32)
+        i = 0
+        for node in nodes:
+            # Skip duplicates, which were not added above
+            if (i >= node_count) or (self.node_index[node.get_id().upper()] != i):
+                continue
+            cstadn = node.get_cstadn()
+            if (cstadn is not None) and (len(cstadn.strip()) > 0):
+                idown = self.node_index.get(cstadn.strip().upper(), -1)
+                if idown < 0:
+                    self.unmatched_downstream_ids.append(node.get_id())
+                self.downstream[i] = idown
+            i += 1
+        if len(self.unmatched_downstream_ids) > 0:
+            logger.warning("{} river network nodes have a downstream node that is not in the network "
+                           "(e.g., \"{}\") - treating as outlets.".format(len(self.unmatched_downstream_ids),
+                                                                          self.unmatched_downstream_ids[0]))
+
+        self.upstream_indptr = None
+        self.upstream_indices = None
+        self.preorder = None
+        self.tin = None
+        self.tout = None
+        self.topological_order = None
+        # Nodes grouped by the number of links in the longest path from a headwater, built when needed
+        self.levels = None
+        self.build_arrays()
+
+    def accumulate_upstream(self, values, include_node=True):
+        """
+        Accumulate values over all nodes upstream of each node, for example to total gains or diversions.
+        Nodes are processed in topological order, one level of the network at a time, so that the time
+        is proportional to nodes x time steps.  Missing values (NaN) propagate downstream.
+        :param values: array of node values, dimensioned (nodes) or (nodes x time).
+        :param include_node: if True, each total includes the node's own value.
+        :return: array of totals with the same shape as values.
+        """
+        values = self.check_node_array(values)
+        totals = values.astype(np.float64, copy=True)
+        for level in self.get_levels():
+            # Each node's total is complete when its level is processed, so add to the downstream nodes.
+            # Several nodes at a level may have the same downstream node, so use unbuffered addition.
+            np.add.at(totals, self.downstream[level], totals[level])
+        if not include_node:
+            totals -= values
+        return totals
+
+    def build_arrays(self):
+        """
+        Build the upstream adjacency, traversal order and Euler tour intervals from the downstream array.
+        :raise ValueError: if the network contains a loop.
+        """
+        node_count = len(self.downstream)
+        has_downstream = self.downstream >= 0
+
+        # Upstream adjacency in compressed sparse row form, with upstream nodes in file order
+        counts = np.bincount(self.downstream[has_downstream], minlength=node_count)
+        self.upstream_indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.upstream_indptr[1:])
+        children = np.nonzero(has_downstream)[0]
+        order = np.argsort(self.downstream[children], kind="stable")
+        self.upstream_indices = children[order].astype(np.int32)
+
+        # Depth-first traversal from the outlets, without recursion because networks can be deep.
+        # Each node's upstream sub-tree occupies the preorder positions tin[i] to tout[i] - 1.
+        self.preorder = np.empty(node_count, dtype=np.int32)
+        self.tin = np.full(node_count, -1, dtype=np.int64)
+        self.tout = np.full(node_count, -1, dtype=np.int64)
+        indptr = self.upstream_indptr
+        indices = self.upstream_indices
+        position = 0
+        for root in np.nonzero(~has_downstream)[0]:
+            # Stack contains (node, next upstream position to visit)
+            stack = [[int(root), int(indptr[root])]]
+            self.tin[root] = position
+            self.preorder[position] = root
+            position += 1
+            while len(stack) > 0:
+                top = stack[-1]
+                node = top[0]
+                if top[1] < indptr[node + 1]:
+                    child = int(indices[top[1]])
+                    top[1] += 1
+                    self.tin[child] = position
+                    self.preorder[position] = child
+                    position += 1
+                    stack.append([child, int(indptr[child])])
+                else:
+                    self.tout[node] = position
+                    stack.pop()
+        if position != node_count:
+            # Nodes that cannot be reached from an outlet are in a loop
+            loop_ids = [self.node_ids[i] for i in np.nonzero(self.tin < 0)[0][:5]]
+            raise ValueError("River network contains a loop involving nodes: " + ", ".join(loop_ids))
+
+        # Reversed preorder places each node after all of its upstream nodes
+        self.topological_order = self.preorder[::-1].copy()
+
+    def check_node_array(self, values):
+        """
+        Check that an array has one row per node.
+        :param values: array-like of node values.
+        :return: the values as a numpy array.
+        :raise ValueError: if the first dimension does not match the number of nodes.
+        """
+        values = np.asarray(values)
+        if (values.ndim == 0) or (values.shape[0] != len(self.node_ids)):
+            raise ValueError("Array first dimension ({}) does not match the number of river network nodes ({})."
+                             .format(values.shape[0] if values.ndim > 0 else 0, len(self.node_ids)))
+        return values
+
+    def get_downstream_node_indices(self, node):
+        """
+        Return the nodes downstream of a node, in order to the outlet.
+        :param node: node identifier or index.
+        :return: array of node indices.
+        """
+        i = self.to_index(node)
+        nodes = []
+        idown = self.downstream[i]
+        while idown >= 0:
+            nodes.append(idown)
+            idown = self.downstream[idown]
+        return np.array(nodes, dtype=np.int32)
+
+    def get_levels(self):
+        """
+        Return the nodes that have a downstream node, grouped by level, where the level is the number of
+        links in the longest path from a headwater node.  All nodes upstream of a node are in lower levels.
+        :return: list of node index arrays, from headwaters downstream.
+        """
+        if self.levels is None:
+            node_count = len(self.node_ids)
+            level = np.zeros(node_count, dtype=np.int32)
+            downstream = self.downstream
+            for i in self.topological_order:
+                idown = downstream[i]
+                if (idown >= 0) and (level[idown] <= level[i]):
+                    level[idown] = level[i] + 1
+            has_downstream = np.nonzero(downstream >= 0)[0]
+            order = has_downstream[np.argsort(level[has_downstream], kind="stable")]
+            bounds = np.searchsorted(level[order], np.arange(level.max() + 2 if node_count > 0 else 1))
+            self.levels = [order[bounds[k]:bounds[k + 1]] for k in range(len(bounds) - 1)
+                           if bounds[k + 1] > bounds[k]]
+        return self.levels
+
+    def get_node_count(self):
+        """
+        :return: the number of nodes in the network.
+        """
+        return len(self.node_ids)
+
+    def get_node_id(self, i):
+        """
+        :param i: node index.
+        :return: the node identifier for the index.
+        """
+        return self.node_ids[i]
+
+    def get_upstream_node_ids(self, node, direct_only=False):
+        """
+        Return the identifiers of the nodes upstream of a node.
+        :param node: node identifier or index.
+        :param direct_only: if True, return only the nodes immediately upstream.
+        :return: list of node identifiers.
+        """
+        return [self.node_ids[i] for i in self.get_upstream_node_indices(node, direct_only)]
+
+    def get_upstream_node_indices(self, node, direct_only=False):
+        """
+        Return the indices of the nodes upstream of a node, not including the node.
+        :param node: node identifier or index.
+        :param direct_only: if True, return only the nodes immediately upstream.
+        :return: array of node indices (a view that should not be modified), in depth-first order.
+        """
+        i = self.to_index(node)
+        if direct_only:
+            return self.upstream_indices[self.upstream_indptr[i]:self.upstream_indptr[i + 1]]
+        return self.preorder[self.tin[i] + 1:self.tout[i]]
+
+    def incremental_gain(self, totals):
+        """
+        Compute the incremental value at each node from cumulative upstream totals that include each node's
+        own value, for example to compute reach gains from cumulative natural flow.
+        This is the inverse of accumulate_upstream() with include_node=True.
+        :param totals: array of cumulative totals, dimensioned (nodes) or (nodes x time).
+        :return: array of incremental values with the same shape as totals.
+        """
+        totals = self.check_node_array(totals)
+        gains = totals.astype(np.float64, copy=True)
+        # Subtract each node's total from its downstream node
+        has_downstream = np.nonzero(self.downstream >= 0)[0]
+        np.subtract.at(gains, self.downstream[has_downstream], totals[has_downstream])
+        return gains
+
+    def index_of(self, node_id):
+        """
+        :param node_id: node identifier (case is ignored).
+        :return: the index of the node, or -1 if not found.
+        """
+        if node_id is None:
+            return -1
+        return self.node_index.get(node_id.upper(), -1)
+
+    def is_downstream(self, node, other_node):
+        """
+        Determine whether a node is downstream of another node.
+        :param node: node identifier or index.
+        :param other_node: node identifier or index.
+        :return: True if node is downstream of other_node (a node is not downstream of itself).
+        """
+        return self.is_upstream(other_node, node)
+
+    def is_upstream(self, node, other_node):
+        """
+        Determine whether a node is upstream of another node.
+        :param node: node identifier or index.
+        :param other_node: node identifier or index.
+        :return: True if node is upstream of other_node (a node is not upstream of itself).
+        """
+        i = self.to_index(node)
+        j = self.to_index(other_node)
+        return bool(self.tin[j] < self.tin[i] < self.tout[j])
+
+    @staticmethod
+    def read_statemod_file(filename):
+        """
+        Read a river network (.rin) file and build the network.
+        :param filename: name of file to read.
+        :return: StateMod_RiverNetwork
+        """
+        return StateMod_RiverNetwork(StateMod_RiverNetworkNode.read_statemod_file(filename))
+
+    def to_node_array(self, node_ids, values):
+        """
+        Place rows of data for a list of node identifiers into an array in network node order,
+        for example to align station time series with the network.  Rows for nodes that are not in
+        node_ids are zero, and identifiers that are not in the network are ignored.
+        Rows for repeated identifiers are added.
+        :param node_ids: list of node identifiers, one per row of values.
+        :param values: array of values, dimensioned (len(node_ids)) or (len(node_ids) x time).
+        :return: array dimensioned (nodes) or (nodes x time).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        index = np.array([self.index_of(id) for id in node_ids], dtype=np.int64)
+        found = index >= 0
+        result = np.zeros((len(self.node_ids),) + values.shape[1:], dtype=np.float64)
+        np.add.at(result, index[found], values[found])
+        return result
+
+    def to_index(self, node):
+        """
+        Convert a node identifier or index to a node index.
+        :param node: node identifier or index.
+        :return: the node index.
+        :raise ValueError: if the node identifier is not in the network.
+        """
+        if isinstance(node, str):
+            i = self.index_of(node)
+            if i < 0:
+                raise ValueError("Node \"{}\" is not in the river network.".format(node))
+            return i
+        return int(node)
+
+    def upstream_mask(self, node):
+        """
+        Return a boolean array indicating the nodes upstream of a node, useful for selecting rows of
+        arrays dimensioned by node.
+        :param node: node identifier or index.
+        :return: boolean array with one value per node, True for nodes upstream of the node.
+        """
+        mask = np.zeros(len(self.node_ids), dtype=bool)
+        mask[self.get_upstream_node_indices(node)] = True
+        return mask
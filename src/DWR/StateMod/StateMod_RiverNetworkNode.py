@@ -26,6 +26,7 @@ import logging
 
 from DWR.StateMod.StateMod_Data import StateMod_Data
 from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_Util import StateMod_Util
 
 from RTi.Util.String.StringUtil import StringUtil
 
@@ -75,6 +76,18 @@ class StateMod_RiverNetworkNode(StateMod_Data):
         self.gwmaxr = -999
         self.smdata_type = StateMod_DataSetComponentType.RIVER_NETWORK
 
+    def get_cstadn(self):
+        """
+        :return: the downstream river node identifier
+        """
+        return self.cstadn
+
+    def get_gwmaxr(self):
+        """
+        :return: the maximum recharge limit
+        """
+        return self.gwmaxr
+
     @staticmethod
     def read_statemod_file(filename):
         """
@@ -110,7 +123,7 @@ class StateMod_RiverNetworkNode(StateMod_Data):
         linecount = 0
 
         try:
-            with open(filename) as f:
+            with StateMod_Util.open_file(filename) as f:
                 for iline in f:
                     linecount += 1
                     # Check for comments
@@ -124,6 +137,7 @@ class StateMod_RiverNetworkNode(StateMod_Data):
                     StringUtil.fixed_read2(iline, format_0, format_0w, v)
                     a_river_node.set_id(v[0].strip())
                     a_river_node.set_name(v[1].strip())
+                    a_river_node.set_cstadn(v[2].strip())
                     # 3 is whitespace
                     # Expect that we also may have the comment and possibly the gwmaxr value...
                     a_river_node.set_comment(v[4].strip())
@@ -25,6 +25,7 @@ import logging
 
 from DWR.StateMod.StateMod_Data import StateMod_Data
 from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_Util import StateMod_Util
 
 from RTi.Util.String.StringUtil import StringUtil
 
@@ -125,7 +126,7 @@ class StateMod_StreamGage(StateMod_Data):
         linecount = 0
 
         try:
-            with open(filename) as f:
+            with StateMod_Util.open_file(filename) as f:
                 for iline in f:
                     iline.strip()
                     linecount += 1
@@ -174,10 +175,13 @@ class StateMod_StreamGage(StateMod_Data):
         :param cgoto: River node identifier.
         """
         if (cgoto is not None) and (cgoto != self.cgoto):
+            old_cgoto = self.cgoto
             self.cgoto = cgoto
             self.set_dirty(True)
             if (not self.is_clone) and (self.dataset is not None):
                 self.dataset.set_dirty(self.smdata_type, True)
+            if (not self.is_clone) and (self.component is not None):
+                self.component.update_cgoto_index(self, old_cgoto)
 
     def set_crunidy(self, crunidy):
         """
@@ -22,7 +22,8 @@
 # NoticeEnd
 
 import logging
-import os
+
+import numpy as np
 
 from RTi.TS.DayTS import DayTS
 from RTi.TS.MonthTS import MonthTS
@@ -34,6 +35,8 @@ from RTi.Util.Time.DateTime import DateTime
 from RTi.Util.Time.TimeInterval import TimeInterval
 from RTi.Util.Time.TimeUtil import TimeUtil
 from RTi.Util.Time.YearType import YearType
+from DWR.StateMod.StateMod_UnitConversion import StateMod_UnitConversion
+from DWR.StateMod.StateMod_Util import StateMod_Util
 
 
 class StateMod_TS(object):
@@ -80,6 +83,75 @@ class StateMod_TS(object):
     def __init__(self):
         pass
 
+    @staticmethod
+    def from_dataframe(df, units=None, input_name=None):
+        """
+        Create time series from a wide (time x station) pandas DataFrame, for example to write with
+        write_time_series_list().  The values are converted from the DataFrame's array once and the dates for the
+        time steps are created once and shared by all the time series, rather than converting values and
+        incrementing dates for each value.
+        :param df: DataFrame with a monthly or daily PeriodIndex (or DatetimeIndex with a frequency)
+        and one column per station, such as one returned by to_dataframe().
+        :param units: data units, or None to use df.attrs["units"].
+        :param input_name: input name for the time series, or None to use df.attrs["filename"].
+        :return: list of MonthTS or DayTS, one per column.
+        """
+        from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+        ts_array = StateMod_TSArray.from_dataframe(df, units)
+        if input_name is None:
+            input_name = ts_array.filename or ""
+        tslist = []
+        if len(ts_array.dates) == 0:
+            return tslist
+        # Dates for the time steps, from the datetime64 values
+        if ts_array.is_daily:
+            precision = DateTime.PRECISION_DAY
+            ymd = ts_array.dates.astype("datetime64[D]").astype(str).tolist()
+        else:
+            precision = DateTime.PRECISION_MONTH
+            ymd = ts_array.dates.astype("datetime64[M]").astype(str).tolist()
+        dates = []
+        for value in ymd:
+            parts = value.split("-")
+            date = DateTime(flag=precision)
+            date.set_year(int(parts[0]))
+            date.set_month(int(parts[1]))
+            if ts_array.is_daily:
+                date.set_day(int(parts[2]))
+            dates.append(date)
+        # Missing values (NaN) are left as the time series missing value
+        values = ts_array.values
+        valid = ~np.isnan(values)
+        for i, locid in enumerate(ts_array.ids):
+            if ts_array.is_daily:
+                ts = DayTS()
+            else:
+                ts = MonthTS()
+            ts.set_date1(dates[0])
+            ts.set_date2(dates[-1])
+            ts.set_date1_original(dates[0])
+            ts.set_date2_original(dates[-1])
+            ts.allocate_data_space()
+            ts.set_data_units(ts_array.units)
+            ts.set_data_units_original(ts_array.units)
+            ts.set_input_name(input_name)
+            ident = TSIdent()
+            ident.set_location(full_location=locid)
+            if ts_array.is_daily:
+                ident.set_interval_string("DAY")
+            else:
+                ident.set_interval_string("MONTH")
+            ident.set_input_type("StateMod")
+            ident.set_input_name(input_name)
+            ts.set_description(locid)
+            ts.set_identifier(ident)
+            row_values = values[i].tolist()
+            for j in np.flatnonzero(valid[i]).tolist():
+                ts.set_data_value(dates[j], row_values[j])
+            ts.add_to_genesis("Created from DataFrame for " + str(ts.get_date1()) + " to " + str(ts.get_date2()))
+            tslist.append(ts)
+        return tslist
+
     @staticmethod
     def get_file_data_interval(filename):
         """
@@ -95,17 +167,17 @@ class StateMod_TS(object):
         logger = logging.getLogger(__name__)
         interval_unknown = -999  # Return if can't figure out interval
         interval = interval_unknown
-        full_filename = IOUtil.get_path_using_working_dir(filename)
+        full_filename = StateMod_Util.find_file(IOUtil.get_path_using_working_dir(filename))
         try:
-            f = open(full_filename)
+            StateMod_Util.open_file(full_filename).close()
         except Exception as e:
             msg = "Unable to open file \"{}\" to determine data interval.".format(full_filename)
             logger.warning(msg, exc_info=True)
             return interval_unknown
         try:
-            if filename.upper().endswith("XOP"):
+            if StateMod_Util.remove_compressed_file_extension(filename).upper().endswith("XOP"):
                 # The *.xop file will have "Time Step: Monthly"
-                with open(full_filename) as f:
+                with StateMod_Util.open_file(full_filename) as f:
                     for iline in f:
                         if iline is None:
                             break
@@ -119,7 +191,7 @@ class StateMod_TS(object):
                                     interval = TimeInterval.DAY
                                     break
             else:
-                with open(full_filename) as f:
+                with StateMod_Util.open_file(full_filename) as f:
                     lines = f.readlines()
                     # Read while a comment or blank line...
                     i = -1
@@ -300,15 +372,46 @@ class StateMod_TS(object):
             return StateMod_TS.get_precision(-1*units_precision, width, value)
 
     @staticmethod
-    def read_time_series_list(fname, date1, date2, units, read_data):
+    def get_units_multipliers(units, req_units, year1, month1, year2, month2, is_daily, factor):
+        """
+        Return the multipliers that convert values from one units to another for each month of a period,
+        computed with one array operation.  Monthly conversions between volumes and rates depend on the days in
+        the month.  Daily conversions use the same multiplier for every day of the month.
+        :param units: units of the values.
+        :param req_units: requested units.
+        :param year1: first year, or 0 for average monthly values (a non-leap year is used for the days in months).
+        :param month1: first month.
+        :param year2: last year.
+        :param month2: last month.
+        :param is_daily: True if the values are daily, False if monthly.
+        :param factor: factor to convert CFS to AF/day.
+        :return: list of multipliers, one per month starting with year1 and month1.
+        """
+        if year1 == 0:
+            # Average monthly values are in years 0 and 1
+            months = np.datetime64("2001-01", "M") + (month1 - 1) + np.arange(12)
+        else:
+            months = np.datetime64("{:04d}-{:02d}".format(year1, month1), "M") + \
+                np.arange((year2 * 12 + month2) - (year1 * 12 + month1) + 1)
+        if is_daily:
+            return StateMod_UnitConversion.get_multipliers(units, req_units, months[:1], True, factor).tolist() * \
+                len(months)
+        return StateMod_UnitConversion.get_multipliers(units, req_units, months, False, factor).tolist()
+
+    @staticmethod
+    def read_time_series_list(fname, date1, date2, units, read_data,
+                              factor=StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY, statistics=None):
         """
         Read all the time series from a StateMod format file.
         The IOUtil.get_path_using_working_dir() method is applied to the filename.
         :param fname: Name of file to read.
         :param date1: Starting date to initialize period (NULL to read the entire time series).
         :param date2: Ending date to initialize period (NULL to read the entire time series).
-        :param units: Units to convert to.
+        :param units: Units to convert to, or None to use the file units.
         :param read_data: Indicates whether data should be read.
+        :param factor: Factor to convert CFS to AF/day, used when converting units.
+        :param statistics: StateMod_TSStatistics to accumulate the statistics for each time series as the data
+        are read, or None to not compute statistics.
         :return: a pointer to a newly-allocated Vector of time series if successful, a NULL pointer
         if not.
         """
@@ -316,15 +419,15 @@ class StateMod_TS(object):
         tslist = None
 
         input_name = fname
-        full_fname = IOUtil.get_path_using_working_dir(fname)
+        full_fname = StateMod_Util.find_file(IOUtil.get_path_using_working_dir(fname))
         data_interval = 0
-        if not os.path.isfile(full_fname):
+        if not StateMod_Util.file_exists(full_fname):
             logger.warning("File does not exist: \"{}\"".format(full_fname))
         try:
             data_interval = StateMod_TS.get_file_data_interval(full_fname)
-            with open(full_fname) as f:
+            with StateMod_Util.open_file(full_fname) as f:
                 tslist = StateMod_TS.read_time_series_list2(None, f, full_fname, data_interval,
-                                                            date1, date2, units, read_data)
+                                                            date1, date2, units, read_data, factor, statistics)
             nts = int()
             if tslist is not None:
                 nts = len(tslist)
@@ -338,7 +441,8 @@ class StateMod_TS(object):
         return tslist
 
     @staticmethod
-    def read_time_series_list2(req_ts, f, full_filename, file_interval, req_date1, req_date2, req_units, read_data):
+    def read_time_series_list2(req_ts, f, full_filename, file_interval, req_date1, req_date2, req_units, read_data,
+                               factor=StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY, statistics=None):
         """
         Read one or more time series from a StateMod format file.
         :param req_ts: Pointer to time series to fill. If null, return all new time series
@@ -350,8 +454,13 @@ class StateMod_TS(object):
         :param req_date1: Requested starting date to initialize period (or NULL to read the entire
         time series).
         :param req_date2: Requested ending date to initialize period (or NULL to read the entire time series).
-        :param req_units: Units to convert to (currently ignored).
+        :param req_units: Units to convert to, or None to use the file units.  Flow rate (CFS, CMS, AF/D) and volume
+        (ACFT, AF) units are converted using the factor and the days in each month.
         :param read_data: Indicates whether data should be read.
+        :param factor: Factor to convert CFS to AF/day, used when converting units.
+        :param statistics: StateMod_TSStatistics to accumulate the statistics for each time series (one row per
+        time series, in file order) as each data line is read, or None to not compute statistics.  Statistics are
+        not accumulated for XOP files.
         :return: a list of time series if successful, null if not. The calling code is responsible
         for freeing the memory for the time series.
         """
@@ -363,7 +472,7 @@ class StateMod_TS(object):
 
         v = []
         date = None
-        if full_filename.upper().endswith("XOP"):
+        if StateMod_Util.remove_compressed_file_extension(full_filename).upper().endswith("XOP"):
             # XOP file is similar to the normal time series format but has some difference
             # in that the header is different, station identifier is provided in the header, and
             # time series are listed vertically one after another, not interwoven by interval like
@@ -381,6 +490,8 @@ class StateMod_TS(object):
         else:
             logger.warning("Requested file interval is invalid.")
         logger.info("Reading time series file interval: " + file_interval_string)
+        if statistics is not None:
+            statistics.is_daily = (file_interval == TimeInterval.DAY)
 
         req_id_found = False  # Indicates if we have found the requested TS in the file.
         standard_ts = True  # Non-standard indicates 12 monthly averages in file.
@@ -472,8 +583,8 @@ class StateMod_TS(object):
             logger.info("Header year type string =\"" + yeartypes + "\"")
             # Year type is used in one place to initialize the year when
             # transferring data. However, it is assumed that m1 is always correct for the year type.
-            if yeartypes.upper() == "CAL" or yeartypes.upper() == "":
-                yeartype = YearType(YearType.WATER)
+            if yeartypes.upper() == "CAL" or yeartypes.upper() == "CYR" or yeartypes.upper() == "":
+                yeartype = YearType(YearType.CALENDAR)
             elif yeartypes.upper() == "WYR":
                 yeartype = YearType(YearType.WATER)
             elif yeartypes.upper() == "IYR":
@@ -486,6 +597,22 @@ class StateMod_TS(object):
             logger.info("Header has start date=" + str(date1_header) + " end date=" + str(date2_header) +
                         " units=" + units + " yeartype=" + str(yeartype))
 
+            # Multipliers to convert the file units to the requested units, computed once for the months in the
+            # header period, because monthly conversions between volumes and rates depend on the days in the month
+            data_units = units
+            unit_multipliers = None
+            unit_multiplier_start = y1 * 12 + m1 - 1
+            if (req_units is not None) and (req_units.strip() != "") and \
+                    not StateMod_UnitConversion.is_same_units(units, req_units):
+                if StateMod_UnitConversion.can_convert(units, req_units):
+                    unit_multipliers = StateMod_TS.get_units_multipliers(
+                        units, req_units, y1, m1, y2, m2, file_interval == TimeInterval.DAY, factor)
+                    data_units = req_units.strip()
+                    logger.info("Converting units from \"" + units + "\" to \"" + data_units + "\"")
+                else:
+                    logger.warning("Unable to convert units \"" + units + "\" to \"" + req_units +
+                                   "\" - using file units.")
+
             format_t = []
             format_w = []
             if file_interval == TimeInterval.DAY:
@@ -727,8 +854,8 @@ class StateMod_TS(object):
                         ts.allocate_data_space()
 
                     if StateMod_TS.debug:
-                        logger.debug("Setting data units to " + units)
-                    ts.set_data_units(units)
+                        logger.debug("Setting data units to " + data_units)
+                    ts.set_data_units(data_units)
                     ts.set_data_units_original(units)
 
                     # The input name is the full path to the input file...
@@ -826,12 +953,27 @@ class StateMod_TS(object):
                     if file_interval == TimeInterval.DAY:
                         # Need to loop through the proper number of days for the month...
                         ndata_per_line = TimeUtil.num_days_in_month(date.get_month(), date.get_year())
+                    if statistics is not None:
+                        # Time step of the first value on the line, since 1970-01
+                        line_step = (date.get_year() - 1970) * 12 + date.get_month() - 1
+                        if file_interval == TimeInterval.DAY:
+                            line_step = int(np.datetime64(line_step, "M").astype("datetime64[D]").astype(np.int64))
+                        line_values = []
                     for i in range(ndata_per_line):
-                        current_ts.set_data_value(date, float(v[i + doffset]))
+                        value = float(v[i + doffset])
+                        if (unit_multipliers is not None) and not (StateMod_Util.MISSING_DOUBLE_FLOOR <= value <=
+                                                                    StateMod_Util.MISSING_DOUBLE_CEILING):
+                            value *= unit_multipliers[(date.get_year() * 12 + date.get_month() - 1 -
+                                                       unit_multiplier_start) % len(unit_multipliers)]
+                        current_ts.set_data_value(date, value)
+                        if statistics is not None:
+                            line_values.append(value)
                         if file_interval == TimeInterval.DAY:
                             date.add_day(1)
                         else:
                             date.add_month(1)
+                    if statistics is not None:
+                        statistics.add_values(current_ts_index, line_step, line_values)
                 current_ts_index += 1
                 # print("time end: " + str(time.time() - start))
             # end of while(True) to read lines
@@ -841,6 +983,12 @@ class StateMod_TS(object):
                        ", units =\"" + units + "\" line: " + iline)
             logger.warning(message, exc_info=True)
             return
+        if statistics is not None:
+            if req_id_found:
+                statistics.set_id(0, req_ts.get_identifier().get_location())
+            elif tslist is not None:
+                for i, ts in enumerate(tslist):
+                    statistics.set_id(i, ts.get_identifier().get_location())
         return tslist
 
     @staticmethod
@@ -1058,6 +1206,22 @@ class StateMod_TS(object):
             return
         return tslist
 
+    @staticmethod
+    def to_dataframe(tslist):
+        """
+        Return time series as a wide (time x station) pandas DataFrame with a monthly or daily PeriodIndex.
+        The values of time series objects are copied into one array, which backs the DataFrame without a further
+        copy.  Use StateMod_DataSet.component_to_dataframe() to create a DataFrame from a component's data file
+        without creating time series objects.
+        :param tslist: list of MonthTS or DayTS with the same period, or a StateMod_TSArray.
+        :return: pandas DataFrame, with the units and year type in DataFrame.attrs.
+        """
+        from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+        if isinstance(tslist, StateMod_TSArray):
+            return tslist.to_dataframe()
+        is_daily = (len(tslist) > 0) and isinstance(tslist[0], DayTS)
+        return StateMod_TSArray.from_ts_list(tslist, is_daily).to_dataframe()
+
     @staticmethod
     def write_time_series_list_props(tslist, props):
         """
@@ -1117,6 +1281,13 @@ class StateMod_TS(object):
         <td>None - must be specified.</td>
         </tr>
 
+        <tr>
+        <td><b>OutputUnits</b></td>
+        <td>Units to convert the values to on output, for example "CFS" or "ACFT".
+        </td>
+        <td>Write the time series units.</td>
+        </tr>
+
         <tr>
         <td><b>OutputPrecision</b></td>
         <td>Number of digits after the decimal point on output for data values.  If
@@ -1229,6 +1400,10 @@ class StateMod_TS(object):
         if prop_value is not None:
             precision = int(prop_value)
 
+        # Get the output units...
+
+        output_units = props.get_value("OutputUnits")
+
         # Check to see if should print genesis information...
 
         prop_value = props.get_value("PrintGenesis")
@@ -1261,13 +1436,14 @@ class StateMod_TS(object):
             if StateMod_TS.debug:
                 logger.debug("Calling writeTimeSeriesList")
             StateMod_TS.write_time_series_list(out, tslist, date1, date2, year_type, missing_dv,
-                                               precision, print_genesis_flag)
+                                               precision, print_genesis_flag, output_units)
         finally:
             if out is not None:
                 out.close()
 
     @staticmethod
-    def write_time_series_list(out, tslist, date1, date2, output_year_type, missing_dv, req_precision, print_genesis):
+    def write_time_series_list(out, tslist, date1, date2, output_year_type, missing_dv, req_precision, print_genesis,
+                               req_units=None, factor=StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY):
         """
         This method is typically not called directly but is called by others that set up the output file.
         This method writes a file in StateMod format.  It is the lowest-level write
@@ -1286,6 +1462,9 @@ class StateMod_TS(object):
         for time series values is 8 characters and 10 for the total.
         @param print_genesis Specify as true to include time series genesis information
         in the file header, or false to omit from the header.
+        @param req_units Units to convert the values to, or None to write the time series units.
+        Flow rate (CFS, CMS, AF/D) and volume (ACFT, AF) units are converted using the factor and days in each month.
+        @param factor Factor to convert CFS to AF/day, used when converting units.
         @exception Exception if there is an error writing the file.
         """
         # String cmnt	= "#>"; // non-permanent comment string
@@ -1368,6 +1547,9 @@ class StateMod_TS(object):
                     logger.warning("A TS interval other than daily detected for " + tsptr.get_identifier() +
                                    " - skipping in output.")
 
+        if (req_units is not None) and (req_units.strip() != ""):
+            output_units = req_units.strip()
+
         do_total = True
         if (output_units.upper() == "AF") or (output_units.upper() == "ACFT") or \
            (output_units.upper() == "AF/M") or (output_units.upper() == "IN") or \
@@ -1631,6 +1813,30 @@ class StateMod_TS(object):
         iline = StringUtil.format_string(v, format_header)
         out.write(iline + nl)
 
+        # Multipliers to convert each time series to the output units, for each month of the output period,
+        # computed once for each time series units...
+
+        series_multipliers = [None]*nseries
+        multiplier_start = req_date1.get_year() * 12 + req_date1.get_month() - 1
+        if (req_units is not None) and (req_units.strip() != ""):
+            units_multipliers = {}
+            for i in range(nseries):
+                if not include_ts[i]:
+                    continue
+                ts_units = tslist[i].get_data_units()
+                if StateMod_UnitConversion.is_same_units(ts_units, output_units):
+                    continue
+                if ts_units not in units_multipliers:
+                    units_multipliers[ts_units] = None
+                    if StateMod_UnitConversion.can_convert(ts_units, output_units):
+                        units_multipliers[ts_units] = StateMod_TS.get_units_multipliers(
+                            ts_units, output_units, req_date1.get_year(), req_date1.get_month(),
+                            req_date2.get_year(), req_date2.get_month(), req_interval_base == TimeInterval.DAY, factor)
+                    else:
+                        logger.warning("Unable to convert units \"" + ts_units + "\" to \"" + output_units +
+                                       "\" - writing values without conversion.")
+                series_multipliers[i] = units_multipliers[ts_units]
+
         # Write the data...
 
         # date is the starting date for each line and is incremented once
@@ -1697,13 +1903,8 @@ class StateMod_TS(object):
                 format8_for_precision[i] = data_format8 + str(i) + "f"
             # Python for loops are not as clean as original Java code
             # for ( ; date.lessThanOrEqualTo(req_date2); date.addMonth(12)):
-            first_iteration = True
+            # The date is incremented at the end of the loop so that the check is for the year that is written
             while date.less_than_or_equal_to(req_date2):
-                if first_iteration:
-                    first_iteration = False
-                else:
-                    # Not the first iteration, increment the date as if it occurred at end of traditional for loop
-                    date.add_month(12)
                 year = year + 1
                 for j in range(nseries):
                     cdate.set_month(date.get_month())
@@ -1716,9 +1917,13 @@ class StateMod_TS(object):
                     if tsptr.get_data_interval_base() != req_interval_base:
                         # We've already warned user above.
                         continue
+                    multipliers = series_multipliers[j]
                     if req_precision == StateMod_TS.PRECISION_USE_UNITS:
                         # Only get the units if we are going to use them...
-                        units = tsptr.get_data_units()
+                        if multipliers is not None:
+                            units = output_units
+                        else:
+                            units = tsptr.get_data_units()
                     annual_sum = 0
                     annual_count = 0
                     iline_v.clear()
@@ -1735,6 +1940,9 @@ class StateMod_TS(object):
 
                     for mon in range(12):
                         value = tsptr.get_data_value(cdate)
+                        if (multipliers is not None) and not tsptr.is_data_missing(value):
+                            value *= multipliers[(cdate.get_year() * 12 + cdate.get_month() - 1 -
+                                                  multiplier_start) % len(multipliers)]
                         if req_precision == StateMod_TS.PRECISION_USE_UNITS:
                             precision = StateMod_TS.get_precision_with_units(req_precision, 8, value, units)
                         else:
@@ -1770,6 +1978,7 @@ class StateMod_TS(object):
                         logger.debug("Output using format:  " + iline_format_buffer)
                     iline = StringUtil.format_string(iline_v, iline_format_buffer)
                     out.write(iline + nl)
+                date.add_month(12)
         elif req_interval_base == TimeInterval.DAY:
             # Daily format files.  Because the output is always in calendar
             # date and because counts are slightly different, include separate code,
@@ -1791,13 +2000,8 @@ class StateMod_TS(object):
                 format8_for_precision[i] = "%#8." + str(i) + "f"
             # Python for loops are not as clean as original Java code
             # for ( ; date.less_than_or_equal_to(req_date2); date.add_month(1)):
-            first_iteration = True
+            # The date is incremented at the end of the loop so that the check is for the month that is written
             while date.less_than_or_equal_to(req_date2):
-                if first_iteration:
-                    first_iteration = False
-                else:
-                    # Not the first iteration, increment the date as if it occurred at end of traditional for loop
-                    date.add_month(1)
                 for j in range(nseries):
                     # Set the calendar date for daily data...
                     cdate.set_month(date.get_month())
@@ -1810,6 +2014,7 @@ class StateMod_TS(object):
                     if tsptr.get_data_interval_base() != req_interval_base:
                         # Only output the requested, matching interval.
                         continue
+                    multipliers = series_multipliers[j]
                     monthly_sum = 0
                     monthly_count = 0
                     iline_v.clear()
@@ -1829,6 +2034,9 @@ class StateMod_TS(object):
                         if day <= ndays:
                             cdate.set_day(day)
                             value = tsptr.get_data_value(cdate)
+                            if (multipliers is not None) and not tsptr.is_data_missing(value):
+                                value *= multipliers[(cdate.get_year() * 12 + cdate.get_month() - 1 -
+                                                      multiplier_start) % len(multipliers)]
                         else:
                             # Extra non-existent days up to 31 days...
                             # TODO SAM 2010-02-25 Should this be set to missing?  How does StateMod use it?
@@ -1854,10 +2062,11 @@ class StateMod_TS(object):
 
                     # Add total onto format line, format, and print
                     precision = StateMod_TS.get_precision(req_precision, 10, monthly_sum)
-                    iline_format_buffer.append(format10_for_precision[precision])
+                    iline_format_buffer = iline_format_buffer + format10_for_precision[precision]
                     # Total value at the end of the line...
                     iline_v.append(StateMod_TS.get_line_total(tsptr, standard_ts, ndays, iline_v, iline_format_v,
                                    req_interval_base, do_total, monthly_sum, monthly_count, do_sum_to_printed))
                     iline = StringUtil.format_string(iline_v, iline_format_buffer)
                     out.write(iline + nl)
+                date.add_month(1)
         # Do not close the files.  They are closed in the calling routine.
@@ -0,0 +1,173 @@
+# StateMod_TSAggregator - aggregate daily and monthly time series arrays to months and years
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_TSAggregator:
+    """
+    Aggregate time series arrays dimensioned (station x time step) from daily to monthly values, and from daily or
+    monthly to annual values for calendar (CYR), water (WYR, October to September) or irrigation (IYR, November to
+    October) years.  The period boundaries for the dates are computed once when the aggregator is created, and
+    each aggregation then reduces all stations at once.
+
+    Volume and depth units (AF, ACFT, AF/M, IN, MM) are totaled and other units (e.g., CFS) are averaged,
+    as for the annual values in StateMod time series files.  A period is missing (NaN) if more time steps than
+    allowed are missing, including time steps outside the period of the data for partial first and last periods.
+    Annual periods are labeled with the calendar year in which the year ends (e.g., water year 2000 is
+    October 1999 to September 2000).
+    """
+
+    # Aggregation intervals
+    INTERVAL_MONTH = "Month"
+    INTERVAL_YEAR = "Year"
+
+    # Statistics
+    STATISTIC_TOTAL = "Total"
+    STATISTIC_MEAN = "Mean"
+    STATISTIC_MIN = "Min"
+    STATISTIC_MAX = "Max"
+
+    # Units (upper case) that are totaled, others are averaged
+    total_units = ["AF", "ACFT", "AF/M", "IN", "MM"]
+
+    # Year type (upper case) -> first month of the year
+    year_type_start_months = {
+        "CYR": 1,
+        "CAL": 1,
+        "CALENDAR": 1,
+        "WYR": 10,
+        "WATER": 10,
+        "IYR": 11,
+        "NOVTOOCT": 11
+    }
+
+    def __init__(self, dates, is_daily, interval, year_type="CYR"):
+        """
+        Compute the period boundaries for dates.
+        :param dates: numpy datetime64 array of consecutive dates, datetime64[D] for daily or datetime64[M]
+        for monthly time steps.
+        :param is_daily: True if the time steps are days, False if months.
+        :param interval: INTERVAL_MONTH (daily time steps only) or INTERVAL_YEAR.
+        :param year_type: year type for annual periods, "CYR", "WYR" or "IYR" (or "Calendar", "Water", "NovToOct").
+        """
+        self.is_daily = is_daily
+        self.interval = interval
+        self.start_month = StateMod_TSAggregator.get_year_start_month(year_type)
+
+        months = np.asarray(dates).astype("datetime64[M]")
+        if interval == StateMod_TSAggregator.INTERVAL_MONTH:
+            if not is_daily:
+                raise ValueError("Monthly aggregation requires daily time steps.")
+            period_months = 1
+            step_period_starts = months
+        elif interval == StateMod_TSAggregator.INTERVAL_YEAR:
+            period_months = 12
+            # Months since the start of the year type year
+            shift = (months.astype(np.int64) % 12 + 1 - self.start_month) % 12
+            step_period_starts = months - shift
+        else:
+            raise ValueError("Unknown aggregation interval \"" + str(interval) + "\".")
+
+        # Index of the first time step of each period
+        if len(step_period_starts) == 0:
+            self.boundaries = np.zeros(0, dtype=np.int64)
+        else:
+            self.boundaries = np.flatnonzero(np.concatenate(
+                ([True], step_period_starts[1:] != step_period_starts[:-1])))
+        # First month of each period
+        self.period_starts = step_period_starts[self.boundaries]
+
+        # Number of time steps in each complete period
+        if is_daily:
+            self.expected_counts = ((self.period_starts + period_months).astype("datetime64[D]") -
+                                    self.period_starts.astype("datetime64[D]")).astype(np.int64)
+        else:
+            self.expected_counts = np.full(len(self.period_starts), period_months, dtype=np.int64)
+
+        # Period labels, months or the years in which the years end
+        if interval == StateMod_TSAggregator.INTERVAL_MONTH:
+            self.periods = self.period_starts
+        else:
+            self.periods = (self.period_starts + 11).astype("datetime64[Y]").astype(np.int64) + 1970
+
+    def aggregate(self, values, statistic=None, units="", allowed_missing=0):
+        """
+        Aggregate values for all stations.
+        :param values: array dimensioned (station x time step), or one-dimensional for one station, with missing
+        values as NaN or -999.
+        :param statistic: STATISTIC_TOTAL, STATISTIC_MEAN, STATISTIC_MIN or STATISTIC_MAX, or None to determine
+        total or mean from the units.
+        :param units: data units, used if statistic is None.
+        :param allowed_missing: number of missing time steps allowed in a period before the period is missing.
+        :return: (values, periods) where values is an array dimensioned (station x period) and periods is
+        a numpy datetime64[M] array of months or an integer array of years.
+        """
+        if statistic is None:
+            statistic = StateMod_TSAggregator.get_statistic_for_units(units)
+        values = np.asarray(values, dtype=np.float64)
+        shape = values.shape[:-1] + (len(self.periods),)
+        if len(self.periods) == 0:
+            return np.full(shape, np.nan), self.periods
+        valid = ~(np.isnan(values) | ((values >= StateMod_Util.MISSING_DOUBLE_FLOOR) &
+                                      (values <= StateMod_Util.MISSING_DOUBLE_CEILING)))
+        counts = np.add.reduceat(valid, self.boundaries, axis=-1)
+        if statistic in [StateMod_TSAggregator.STATISTIC_TOTAL, StateMod_TSAggregator.STATISTIC_MEAN]:
+            result = np.add.reduceat(np.where(valid, values, 0.0), self.boundaries, axis=-1)
+            if statistic == StateMod_TSAggregator.STATISTIC_MEAN:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = result / counts
+        elif statistic == StateMod_TSAggregator.STATISTIC_MIN:
+            result = np.minimum.reduceat(np.where(valid, values, np.inf), self.boundaries, axis=-1)
+        elif statistic == StateMod_TSAggregator.STATISTIC_MAX:
+            result = np.maximum.reduceat(np.where(valid, values, -np.inf), self.boundaries, axis=-1)
+        else:
+            raise ValueError("Unknown statistic \"" + str(statistic) + "\".")
+        missing = (self.expected_counts - counts) > allowed_missing
+        result[missing | (counts == 0)] = np.nan
+        return result, self.periods
+
+    @staticmethod
+    def get_statistic_for_units(units):
+        """
+        Determine whether values are totaled or averaged, based on units.
+        :param units: data units.
+        :return: STATISTIC_TOTAL for volume and depth units, STATISTIC_MEAN otherwise.
+        """
+        if (units is not None) and (units.strip().upper() in StateMod_TSAggregator.total_units):
+            return StateMod_TSAggregator.STATISTIC_TOTAL
+        return StateMod_TSAggregator.STATISTIC_MEAN
+
+    @staticmethod
+    def get_year_start_month(year_type):
+        """
+        Return the first month of a year type.
+        :param year_type: "CYR", "WYR" or "IYR", or the YearType name ("Calendar", "Water", "NovToOct").
+        :return: first month of the year (1-12).
+        """
+        start_month = StateMod_TSAggregator.year_type_start_months.get(str(year_type).strip().upper())
+        if start_month is None:
+            raise ValueError("Unknown year type \"" + str(year_type) + "\".")
+        return start_month
@@ -0,0 +1,446 @@
+# StateMod_TSArray - time series from a StateMod time series file, stored as one array
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import bisect
+import fnmatch
+import logging
+
+import numpy as np
+
+from DWR.StateMod.StateMod_UnitConversion import StateMod_UnitConversion
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_TSArray:
+    """
+    The time series in a StateMod monthly or daily time series file (e.g., *.xbm, *.ddm, *.rid, *.ddd), stored as
+    one array dimensioned (station x time step) with a date axis and station identifiers, without creating
+    MonthTS or DayTS objects.  The file is parsed by slicing the fixed-width value fields of all data lines at once.
+
+    Stations are selected with identifiers, lists of identifiers or wildcard patterns (e.g., "36*").
+    A pattern that only has a trailing "*" is resolved with a binary search of the sorted identifiers.
+    """
+
+    # Value field width and the number of values on monthly and daily data lines
+    value_width = 8
+    month_value_count = 12
+    day_value_count = 31
+
+    def __init__(self, ids, dates, values, units="", is_daily=False, filename=None, year_type="CYR"):
+        """
+        Construct from arrays.
+        :param ids: list of station identifiers, one per row of values.
+        :param dates: numpy datetime64 array of dates, datetime64[M] for monthly or datetime64[D] for daily.
+        :param values: array dimensioned (station x time step).
+        :param units: data units.
+        :param is_daily: True if the time series are daily, False if monthly.
+        :param filename: name of the file that was read, or None.
+        :param year_type: year type of the file ("CYR", "WYR" or "IYR").
+        """
+        self.ids = list(ids)
+        self.dates = dates
+        self.values = values
+        self.units = units
+        self.is_daily = is_daily
+        self.filename = filename
+        self.year_type = year_type
+
+        # Summary statistics for each station (StateMod_TSStatistics), computed when the file is read or on request
+        self.statistics = None
+
+        # Bit-packed missing value mask (station x bytes of 8 time steps), computed when read or on request
+        self.missing_mask = None
+
+        # Sorted (identifier, row) for prefix searches, and identifier -> row for exact matches
+        self.sorted_ids = sorted((id, i) for i, id in enumerate(self.ids))
+        self.id_index = {}
+        for i, id in enumerate(self.ids):
+            self.id_index.setdefault(id, i)
+
+    @staticmethod
+    def from_ts_list(tslist, is_daily=False):
+        """
+        Create from a list of time series objects, for example component data that have been edited in memory.
+        :param tslist: list of MonthTS or DayTS with the same period.
+        :param is_daily: True if the time series are daily, False if monthly.
+        :return: StateMod_TSArray
+        """
+        from RTi.Util.Time.DateTime import DateTime
+        if len(tslist) == 0:
+            return StateMod_TSArray([], np.array([], dtype="datetime64[D]" if is_daily else "datetime64[M]"),
+                                    np.zeros((0, 0)), "", is_daily)
+        date1 = tslist[0].get_date1()
+        date2 = tslist[0].get_date2()
+        if is_daily:
+            start = np.datetime64("{:04d}-{:02d}-{:02d}".format(date1.get_year(), date1.get_month(), date1.get_day()))
+            end = np.datetime64("{:04d}-{:02d}-{:02d}".format(date2.get_year(), date2.get_month(), date2.get_day()))
+        else:
+            start = np.datetime64("{:04d}-{:02d}".format(date1.get_year(), date1.get_month()))
+            end = np.datetime64("{:04d}-{:02d}".format(date2.get_year(), date2.get_month()))
+        dates = np.arange(start, end + 1)
+        values = np.empty((len(tslist), len(dates)), dtype=np.float64)
+        for i, ts in enumerate(tslist):
+            date = DateTime(date_time=date1)
+            for j in range(len(dates)):
+                values[i, j] = ts.get_data_value(date)
+                if is_daily:
+                    date.add_day(1)
+                else:
+                    date.add_month(1)
+        return StateMod_TSArray([ts.get_identifier().get_location() for ts in tslist], dates, values,
+                                tslist[0].get_data_units(), is_daily)
+
+    def aggregate(self, interval, year_type=None, statistic=None, allowed_missing=0, ids=None):
+        """
+        Aggregate daily values to months, or daily or monthly values to years, for all stations at once.
+        :param interval: StateMod_TSAggregator.INTERVAL_MONTH or INTERVAL_YEAR.
+        :param year_type: year type for annual values ("CYR", "WYR" or "IYR"), or None to use the file year type.
+        :param statistic: StateMod_TSAggregator statistic, or None to total or average based on the units.
+        :param allowed_missing: number of missing time steps allowed in a period before the period is missing.
+        :param ids: identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :return: (values, periods, ids) where values is an array dimensioned (station x period), periods is a
+        numpy datetime64[M] array of months or an integer array of years and ids is the list of identifiers.
+        """
+        from DWR.StateMod.StateMod_TSAggregator import StateMod_TSAggregator
+        if year_type is None:
+            year_type = self.year_type
+        values, dates, ids = self.query(ids)
+        aggregator = StateMod_TSAggregator(dates, self.is_daily, interval, year_type)
+        values, periods = aggregator.aggregate(values, statistic, self.units, allowed_missing)
+        return values, periods, ids
+
+    def convert_units(self, units, factor=StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY):
+        """
+        Return the time series converted to other units, for example monthly ACFT to CFS, with one array operation.
+        :param units: requested units.
+        :param factor: factor to convert CFS to AF/day, for example the data set "factor" control value.
+        :return: new StateMod_TSArray with the converted values and units, or this object if the units are the same.
+        """
+        if StateMod_UnitConversion.is_same_units(self.units, units):
+            return self
+        values = StateMod_UnitConversion.convert(self.values, self.units, units, self.dates, self.is_daily, factor)
+        ts_array = StateMod_TSArray(self.ids, self.dates, values, units, self.is_daily, self.filename, self.year_type)
+        # Missing values are not converted so the mask is the same
+        ts_array.missing_mask = self.missing_mask
+        return ts_array
+
+    def fill(self, method, constant=None, pattern=None, max_gap=None):
+        """
+        Return the time series with missing values filled, for all stations at once.
+        :param method: StateMod_TSFill.FILL_CONSTANT, FILL_INTERPOLATE, FILL_MONTHLY_AVERAGE or FILL_PATTERN.
+        :param constant: value for constant fill.
+        :param pattern: pattern for pattern fill, an array of the pattern (e.g., "WET", "AVG", "DRY") for each time
+        step, one dimensional or dimensioned (station x time step).
+        :param max_gap: largest number of consecutive missing values to fill with interpolation, or None for any.
+        :return: new StateMod_TSArray with the filled values.
+        """
+        from DWR.StateMod.StateMod_TSFill import StateMod_TSFill
+        values = StateMod_TSFill.fill(self.values, method, self.dates, self.get_missing(), constant, pattern, max_gap)
+        return StateMod_TSArray(self.ids, self.dates, values, self.units, self.is_daily, self.filename,
+                                self.year_type)
+
+    @staticmethod
+    def from_dataframe(df, units=None, year_type=None):
+        """
+        Create from a wide (time x station) pandas DataFrame, such as one returned by to_dataframe().
+        The values are converted to float64 once, as a view where the DataFrame already holds float64 values.
+        :param df: DataFrame with a monthly or daily PeriodIndex (or DatetimeIndex with a frequency)
+        and one column per station.
+        :param units: data units, or None to use df.attrs["units"].
+        :param year_type: year type, or None to use df.attrs["year_type"].
+        :return: StateMod_TSArray
+        """
+        import pandas as pd
+        index = df.index
+        if not isinstance(index, pd.PeriodIndex):
+            if not isinstance(index, pd.DatetimeIndex) or (index.freq is None):
+                raise ValueError("DataFrame index must be a PeriodIndex or a DatetimeIndex with a frequency.")
+            index = index.to_period()
+        is_daily = index.freqstr.upper().startswith("D")
+        # Period ordinals are months or days since 1970-01
+        dates = np.asarray(index.asi8).astype("datetime64[D]" if is_daily else "datetime64[M]")
+        if units is None:
+            units = df.attrs.get("units", "")
+        if year_type is None:
+            year_type = df.attrs.get("year_type", "CYR")
+        values = df.to_numpy(dtype=np.float64).T
+        return StateMod_TSArray([str(column) for column in df.columns], dates, values, units, is_daily,
+                                df.attrs.get("filename"), year_type)
+
+    def get_dates(self):
+        """
+        :return: numpy datetime64 array of the dates for the time steps.
+        """
+        return self.dates
+
+    def get_ids(self):
+        """
+        :return: list of station identifiers, in file order.
+        """
+        return self.ids
+
+    def get_missing(self):
+        """
+        Return which values are missing (NaN or -999), using the missing value mask.
+        :return: boolean array dimensioned (station x time step).
+        """
+        from DWR.StateMod.StateMod_TSFill import StateMod_TSFill
+        return StateMod_TSFill.unpack_missing(self.get_missing_mask(), len(self.dates))
+
+    def get_missing_mask(self):
+        """
+        Return the bit-packed missing value mask, computed for all values at once the first time.
+        :return: uint8 array dimensioned (station x bytes), with 8 time steps per byte (see StateMod_TSFill).
+        """
+        if self.missing_mask is None:
+            from DWR.StateMod.StateMod_TSFill import StateMod_TSFill
+            self.missing_mask = StateMod_TSFill.pack_missing(StateMod_TSFill.get_missing(self.values))
+        return self.missing_mask
+
+    def get_statistics(self):
+        """
+        Return the summary statistics for each station, computed for all stations at once the first time.
+        :return: StateMod_TSStatistics
+        """
+        if self.statistics is None:
+            from DWR.StateMod.StateMod_TSStatistics import StateMod_TSStatistics
+            self.statistics = StateMod_TSStatistics.from_values(self.ids, self.dates, self.values, self.is_daily)
+        return self.statistics
+
+    def get_values(self):
+        """
+        :return: array of values dimensioned (station x time step).
+        """
+        return self.values
+
+    def match_ids(self, ids=None):
+        """
+        Return the rows for station identifiers or patterns.
+        :param ids: identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :return: list of rows, in file order for each pattern.
+        """
+        if ids is None:
+            return list(range(len(self.ids)))
+        if isinstance(ids, str):
+            ids = [ids]
+        rows = []
+        found = set()
+        for pattern in ids:
+            if not any(c in pattern for c in "*?["):
+                matches = [self.id_index[pattern]] if pattern in self.id_index else []
+            elif pattern.endswith("*") and not any(c in pattern[:-1] for c in "*?["):
+                # Prefix search of the sorted identifiers
+                prefix = pattern[:-1]
+                i = bisect.bisect_left(self.sorted_ids, (prefix,))
+                matches = []
+                while (i < len(self.sorted_ids)) and self.sorted_ids[i][0].startswith(prefix):
+                    matches.append(self.sorted_ids[i][1])
+                    i += 1
+                matches.sort()
+            else:
+                matches = [i for i, id in enumerate(self.ids) if fnmatch.fnmatchcase(id, pattern)]
+            for row in matches:
+                if row not in found:
+                    found.add(row)
+                    rows.append(row)
+        return rows
+
+    def query(self, ids=None, start=None, end=None):
+        """
+        Select stations and a period.
+        :param ids: identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :param start: first date to include (anything accepted by numpy.datetime64, e.g., "1990-01"),
+        or None to start with the first date.
+        :param end: last date to include, or None to end with the last date.
+        :return: (values, dates, ids) where values is an array dimensioned (station x time step), dates is the
+        datetime64 array for the time steps and ids is the list of identifiers for the rows.
+        """
+        rows = self.match_ids(ids)
+        unit = "D" if self.is_daily else "M"
+        first = 0
+        last = len(self.dates)
+        if start is not None:
+            first = int(np.searchsorted(self.dates, np.datetime64(start, unit), side="left"))
+        if end is not None:
+            last = int(np.searchsorted(self.dates, np.datetime64(end, unit), side="right"))
+        last = max(first, last)
+        if (len(rows) > 0) and (rows == list(range(rows[0], rows[0] + len(rows)))):
+            # Contiguous rows, return a view
+            values = self.values[rows[0]:rows[0] + len(rows), first:last]
+        else:
+            values = self.values[rows, first:last]
+        return values, self.dates[first:last], [self.ids[row] for row in rows]
+
+    def to_dataframe(self, ids=None, start=None, end=None):
+        """
+        Return stations and a period as a wide (time x station) pandas DataFrame with a monthly or daily
+        PeriodIndex.  The DataFrame is backed by the values array without copying when the selected stations are
+        contiguous rows (for example all stations), so it must be treated as read-only if the array is shared.
+        The units, year type and file name are saved in DataFrame.attrs.
+        :param ids: identifier or wildcard pattern (e.g., "36*"), list of identifiers or patterns,
+        or None for all stations.
+        :param start: first date to include, or None to start with the first date.
+        :param end: last date to include, or None to end with the last date.
+        :return: pandas DataFrame
+        """
+        import pandas as pd
+        values, dates, ids = self.query(ids, start, end)
+        freq = "D" if self.is_daily else "M"
+        if len(dates) > 0:
+            index = pd.period_range(start=pd.Period(str(dates[0]), freq=freq), periods=len(dates), freq=freq)
+        else:
+            index = pd.PeriodIndex([], freq=freq)
+        # The transpose of a (station x time step) C-ordered array is the layout that pandas uses for a
+        # single float block, so the array is not copied
+        df = pd.DataFrame(values.T, index=index, columns=pd.Index(ids, name="Station"), copy=False)
+        df.attrs["units"] = self.units
+        df.attrs["year_type"] = self.year_type
+        df.attrs["filename"] = self.filename
+        return df
+
+    @staticmethod
+    def read_statemod_file(filename, is_daily=None, units=None, factor=StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY,
+                           compute_statistics=False, compute_missing_mask=False):
+        """
+        Read a StateMod monthly or daily time series file.
+        :param filename: name of the file to read.
+        :param is_daily: True if the file is daily, False if monthly, or None to determine from the first data line.
+        :param units: units to convert the values to, or None to use the file units.
+        :param factor: factor to convert CFS to AF/day, used when converting units.
+        :param compute_statistics: if True, compute the summary statistics for each station (see get_statistics()).
+        :param compute_missing_mask: if True, compute the missing value mask (see get_missing_mask()).
+        :return: StateMod_TSArray
+        """
+        logger = logging.getLogger(__name__)
+        with StateMod_Util.open_file(filename, "rb") as f:
+            lines = f.read().splitlines()
+
+        # Skip comments to the header, for example "    1/1950  -    12/2019 ACFT  CYR"
+        line_pos = 0
+        while (line_pos < len(lines)) and lines[line_pos].startswith(b"#"):
+            line_pos += 1
+        if line_pos >= len(lines):
+            raise ValueError("File \"{}\" does not have a header line.".format(filename))
+        header = lines[line_pos].decode("ascii", "replace")
+        line_pos += 1
+        if header[3] == "/":
+            # Non-standard header, allowed as in StateMod_TS
+            header = "  " + header
+        m1 = int(header[0:5])
+        y1 = int(header[6:10])
+        m2 = int(header[15:20])
+        y2 = int(header[21:25])
+        file_units = header[25:30].strip()
+        year_type = header[30:35].strip().upper()
+        if year_type not in ["", "CAL", "CYR", "WYR", "IYR"]:
+            raise ValueError("Unknown year type " + year_type)
+        if year_type in ["", "CAL"]:
+            year_type = "CYR"
+
+        data_lines = [line for line in lines[line_pos:] if (len(line.strip()) > 0) and not line.startswith(b"#")]
+        if len(data_lines) == 0:
+            return StateMod_TSArray([], np.array([], dtype="datetime64[M]"), np.zeros((0, 0)), file_units, False,
+                                    filename, year_type)
+        # Daily lines have year, month and identifier before the values and monthly lines year and identifier
+        if is_daily is None:
+            is_daily = StateMod_TSArray.is_daily_line(data_lines[0])
+        if is_daily:
+            year_end = 4
+            id_start = 9
+            value_count = StateMod_TSArray.day_value_count
+        else:
+            year_end = 5
+            id_start = 5
+            value_count = StateMod_TSArray.month_value_count
+        value_start = id_start + 12
+        line_width = value_start + value_count * StateMod_TSArray.value_width
+
+        # Fixed width array of the lines, padded with blanks, and the value fields as 8 character strings
+        line_bytes = b"".join(line[:line_width].ljust(line_width) for line in data_lines)
+        chars = np.frombuffer(line_bytes, dtype="S1").reshape(len(data_lines), line_width)
+        fields = np.ascontiguousarray(chars[:, value_start:]).view(
+            "S{}".format(StateMod_TSArray.value_width)).reshape(len(data_lines), value_count)
+        blank = np.char.strip(fields) == b""
+        if blank.any():
+            fields = np.where(blank, b"nan", fields)
+        line_values = fields.astype(np.float64)
+
+        years = np.array([int(line[0:year_end].strip() or 0) for line in data_lines], dtype=np.int64)
+        line_ids = [line[id_start:value_start].strip().decode("ascii", "replace") for line in data_lines]
+
+        # Stations in file order
+        ids = []
+        id_rows = {}
+        for id in line_ids:
+            if id not in id_rows:
+                id_rows[id] = len(ids)
+                ids.append(id)
+        rows = np.array([id_rows[id] for id in line_ids], dtype=np.int64)
+
+        start_month = y1 * 12 + m1 - 1
+        month_count = (y2 * 12 + m2 - 1) - start_month + 1
+        if is_daily:
+            months = np.array([int(line[4:8]) for line in data_lines], dtype=np.int64)
+            line_months = years * 12 + months - 1 - start_month
+            by_month = np.full((len(ids), month_count, value_count), np.nan)
+            by_month[rows, line_months, :] = line_values
+            month_dates = np.datetime64("{:04d}-{:02d}".format(y1, m1), "M") + np.arange(month_count)
+            day_dates = month_dates.astype("datetime64[D]")[:, np.newaxis] + np.arange(value_count)
+            valid = day_dates.astype("datetime64[M]") == month_dates[:, np.newaxis]
+            values = by_month[:, valid]
+            dates = day_dates[valid]
+        else:
+            # The year on a data line is the year for the year type, so the first month of a water or
+            # irrigation year is in the previous calendar year.  Average files (no year) use the header year.
+            if (year_type in ["WYR", "IYR"]) and (y1 != 0):
+                years = years - 1
+            line_columns = years * 12 + m1 - 1 - start_month
+            values = np.full((len(ids), month_count), np.nan)
+            columns = line_columns[:, np.newaxis] + np.arange(value_count)
+            in_period = (columns >= 0) & (columns < month_count)
+            values[np.broadcast_to(rows[:, np.newaxis], columns.shape)[in_period], columns[in_period]] = \
+                line_values[in_period]
+            dates = np.datetime64("{:04d}-{:02d}".format(y1, m1), "M") + np.arange(month_count)
+        logger.info("Read {} time series x {} time steps from \"{}\".".format(len(ids), len(dates), filename))
+        ts_array = StateMod_TSArray(ids, dates, values, file_units, is_daily, filename, year_type)
+        if units is not None:
+            ts_array = ts_array.convert_units(units, factor)
+        if compute_missing_mask:
+            ts_array.get_missing_mask()
+        if compute_statistics:
+            ts_array.get_statistics()
+        return ts_array
+
+    @staticmethod
+    def is_daily_line(line):
+        """
+        Determine whether a data line is from a daily file, which has year (i4) and month (i4) before the
+        identifier, rather than year (i5) and the identifier for a monthly file.
+        :param line: data line, as bytes.
+        :return: True if the line is from a daily file.
+        """
+        month = line[4:8].strip()
+        return (len(month) > 0) and month.isdigit() and (1 <= int(month) <= 12) and (line[8:9] == b" ")
@@ -0,0 +1,221 @@
+# StateMod_TSFill - fill missing values in daily and monthly time series arrays
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_TSFill:
+    """
+    Fill missing values in time series arrays dimensioned (station x time step), for all stations at once.
+    Missing values are NaN and values between StateMod_Util.MISSING_DOUBLE_FLOOR and MISSING_DOUBLE_CEILING (-999).
+
+    Missing values can be tracked with a bit-packed mask (one bit per value, see pack_missing()), which is
+    1/64 of the size of the values and is computed once rather than comparing each value to the missing range.
+    The fill methods accept the unpacked mask so that it does not need to be recomputed.
+
+    Values are filled with a constant, the average of the non-missing values in the same calendar month,
+    linear interpolation between non-missing values, or the average of the non-missing values in the same
+    calendar month for years with the same pattern (e.g., "WET", "AVG", "DRY"), similar to the StateDMI and
+    TSTool fill commands.  The fill methods return new arrays and do not modify the values that are passed in.
+    """
+
+    # Fill methods
+    FILL_CONSTANT = "Constant"
+    FILL_INTERPOLATE = "Interpolate"
+    FILL_MONTHLY_AVERAGE = "MonthlyAverage"
+    FILL_PATTERN = "Pattern"
+
+    @staticmethod
+    def fill(values, method, dates=None, missing=None, constant=None, pattern=None, max_gap=None):
+        """
+        Fill missing values using a fill method.
+        :param values: array with time steps on the last axis, for example (station x time step).
+        :param method: FILL_CONSTANT, FILL_INTERPOLATE, FILL_MONTHLY_AVERAGE or FILL_PATTERN.
+        :param dates: numpy datetime64 array of the dates for the time steps, for monthly average and pattern fill.
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :param constant: value for constant fill.
+        :param pattern: pattern for pattern fill (see fill_pattern()).
+        :param max_gap: largest number of consecutive missing values to fill with interpolation, or None for any.
+        :return: new array with missing values filled.
+        """
+        if method == StateMod_TSFill.FILL_CONSTANT:
+            if constant is None:
+                raise ValueError("A constant is required to fill with a constant.")
+            return StateMod_TSFill.fill_constant(values, constant, missing)
+        elif method == StateMod_TSFill.FILL_INTERPOLATE:
+            return StateMod_TSFill.fill_interpolate(values, missing, max_gap)
+        elif method == StateMod_TSFill.FILL_MONTHLY_AVERAGE:
+            return StateMod_TSFill.fill_monthly_average(values, dates, missing)
+        elif method == StateMod_TSFill.FILL_PATTERN:
+            if pattern is None:
+                raise ValueError("A pattern is required to fill with a pattern.")
+            return StateMod_TSFill.fill_pattern(values, dates, pattern, missing)
+        raise ValueError("Unknown fill method \"" + str(method) + "\".")
+
+    @staticmethod
+    def fill_constant(values, constant, missing=None):
+        """
+        Fill missing values with a constant.
+        :param values: array with time steps on the last axis.
+        :param constant: value to fill with.
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :return: new array with missing values filled.
+        """
+        if missing is None:
+            missing = StateMod_TSFill.get_missing(values)
+        return np.where(missing, constant, values)
+
+    @staticmethod
+    def fill_group_average(values, groups, group_count, missing=None):
+        """
+        Fill missing values with the average of the non-missing values for the station in the same group.
+        Values in groups that have no non-missing values remain missing.
+        :param values: array dimensioned (station x time step).
+        :param groups: integer array of the group (0 to group_count - 1) for each time step, either one
+        dimensional or dimensioned (station x time step).
+        :param group_count: number of groups.
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :return: new array with missing values filled.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if missing is None:
+            missing = StateMod_TSFill.get_missing(values)
+        values_2d = values.reshape(-1, values.shape[-1])
+        missing_2d = missing.reshape(values_2d.shape)
+        station_count = values_2d.shape[0]
+        # Group for each value, numbered across all stations so that one bincount computes all averages
+        station_groups = np.broadcast_to(groups, values_2d.shape) + \
+            (np.arange(station_count) * group_count)[:, np.newaxis]
+        valid = ~missing_2d
+        totals = np.bincount(station_groups[valid], weights=values_2d[valid], minlength=station_count * group_count)
+        counts = np.bincount(station_groups[valid], minlength=station_count * group_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(counts > 0, totals / counts, np.nan)
+        filled = values_2d.copy()
+        fill_values = averages[station_groups[missing_2d]]
+        # Values in groups without an average keep the original missing value
+        filled[missing_2d] = np.where(np.isnan(fill_values), values_2d[missing_2d], fill_values)
+        return filled.reshape(values.shape)
+
+    @staticmethod
+    def fill_interpolate(values, missing=None, max_gap=None):
+        """
+        Fill missing values by linear interpolation between the non-missing values before and after each gap.
+        Values before the first and after the last non-missing value are not filled.
+        :param values: array with time steps on the last axis.
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :param max_gap: largest number of consecutive missing values to fill, or None to fill any gap.
+        :return: new array with missing values filled.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if missing is None:
+            missing = StateMod_TSFill.get_missing(values)
+        n = values.shape[-1]
+        values_2d = values.reshape(-1, n)
+        missing_2d = missing.reshape(values_2d.shape)
+        steps = np.broadcast_to(np.arange(n), values_2d.shape)
+        # Index of the previous and following non-missing values, -1 and n if none
+        previous = np.maximum.accumulate(np.where(missing_2d, -1, steps), axis=-1)
+        following = np.minimum.accumulate(np.where(missing_2d, n, steps)[:, ::-1], axis=-1)[:, ::-1]
+        fill = missing_2d & (previous >= 0) & (following < n)
+        if max_gap is not None:
+            fill &= (following - previous - 1) <= max_gap
+        filled = values_2d.copy()
+        rows, columns = np.nonzero(fill)
+        previous = previous[rows, columns]
+        following = following[rows, columns]
+        previous_values = values_2d[rows, previous]
+        following_values = values_2d[rows, following]
+        filled[rows, columns] = previous_values + (following_values - previous_values) * \
+            (columns - previous) / (following - previous)
+        return filled.reshape(values.shape)
+
+    @staticmethod
+    def fill_monthly_average(values, dates, missing=None):
+        """
+        Fill missing values with the average of the non-missing values in the same calendar month for the station.
+        :param values: array dimensioned (station x time step).
+        :param dates: numpy datetime64 array of the dates for the time steps (monthly or daily).
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :return: new array with missing values filled.
+        """
+        months = StateMod_TSFill.get_calendar_months(dates)
+        return StateMod_TSFill.fill_group_average(values, months, 12, missing)
+
+    @staticmethod
+    def fill_pattern(values, dates, pattern, missing=None):
+        """
+        Fill missing values with the average of the non-missing values in the same calendar month and with
+        the same pattern for the station, for example the average of all "WET" Mays for a missing "WET" May.
+        :param values: array dimensioned (station x time step).
+        :param dates: numpy datetime64 array of the dates for the time steps (monthly or daily).
+        :param pattern: array of the pattern (e.g., "WET", "AVG", "DRY") for each time step, either one dimensional
+        to use the same pattern for all stations or dimensioned (station x time step).
+        :param missing: boolean array of the missing values, or None to determine from the values.
+        :return: new array with missing values filled.
+        """
+        pattern_names, pattern_index = np.unique(np.asarray(pattern), return_inverse=True)
+        pattern_index = pattern_index.reshape(np.shape(pattern))
+        groups = pattern_index * 12 + StateMod_TSFill.get_calendar_months(dates)
+        return StateMod_TSFill.fill_group_average(values, groups, len(pattern_names) * 12, missing)
+
+    @staticmethod
+    def get_calendar_months(dates):
+        """
+        Return the calendar month index for dates.
+        :param dates: numpy datetime64 array.
+        :return: integer array of the month for each date, 0 for January to 11 for December.
+        """
+        return np.asarray(dates).astype("datetime64[M]").astype(np.int64) % 12
+
+    @staticmethod
+    def get_missing(values):
+        """
+        Determine which values are missing.
+        :param values: array of values.
+        :return: boolean array, True for values that are NaN or in the missing range (-999).
+        """
+        values = np.asarray(values)
+        return np.isnan(values) | ((values >= StateMod_Util.MISSING_DOUBLE_FLOOR) &
+                                   (values <= StateMod_Util.MISSING_DOUBLE_CEILING))
+
+    @staticmethod
+    def pack_missing(missing):
+        """
+        Pack a missing value mask into bits.
+        :param missing: boolean array with time steps on the last axis.
+        :return: uint8 array with 8 time steps per byte on the last axis.
+        """
+        return np.packbits(missing, axis=-1)
+
+    @staticmethod
+    def unpack_missing(packed, count):
+        """
+        Unpack a missing value mask that was packed with pack_missing().
+        :param packed: uint8 array with 8 time steps per byte on the last axis.
+        :param count: number of time steps.
+        :return: boolean array with time steps on the last axis.
+        """
+        return np.unpackbits(packed, axis=-1, count=count).astype(bool)
@@ -0,0 +1,204 @@
+# StateMod_TSStatistics - summary statistics for each time series in a StateMod time series file
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import math
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_TSStatistics:
+    """
+    Summary statistics for each station in a time series file (count of values, missing count, total, mean,
+    minimum, maximum and the first and last dates with non-missing values), for example for QA reports after
+    a data set is read.
+
+    The statistics are accumulated while a file is parsed, either one data line at a time with add_values()
+    when time series objects are read, or for all stations at once with from_values() when the file is parsed
+    into an array.  The result is a numpy structured array with one row per station (see get_table()).
+    Missing values are NaN and values between StateMod_Util.MISSING_DOUBLE_FLOOR and MISSING_DOUBLE_CEILING.
+    """
+
+    def __init__(self, is_daily=False):
+        """
+        Construct empty statistics, to accumulate with add_values().
+        :param is_daily: True if the time steps are days, False if months.
+        """
+        self.is_daily = is_daily
+
+        # Station identifiers, one per row
+        self.ids = []
+
+        # Accumulators, one per row:  values (including missing), non-missing values, total, minimum, maximum,
+        # and first and last time step with a non-missing value (months or days since 1970-01, or None)
+        self.value_counts = []
+        self.counts = []
+        self.totals = []
+        self.mins = []
+        self.maxs = []
+        self.first_steps = []
+        self.last_steps = []
+
+        # Table built from the accumulators, reset when values are added
+        self.table = None
+
+    def add_values(self, row, step, values):
+        """
+        Add the values from one data line.
+        :param row: row for the station, 0 for the first station (rows are added as needed).
+        :param step: time step of the first value, as months (monthly) or days (daily) since 1970-01.
+        :param values: list of values for consecutive time steps.
+        """
+        while row >= len(self.counts):
+            self.ids.append("")
+            self.value_counts.append(0)
+            self.counts.append(0)
+            self.totals.append(0.0)
+            self.mins.append(math.inf)
+            self.maxs.append(-math.inf)
+            self.first_steps.append(None)
+            self.last_steps.append(None)
+        self.table = None
+        floor = StateMod_Util.MISSING_DOUBLE_FLOOR
+        ceiling = StateMod_Util.MISSING_DOUBLE_CEILING
+        valid = [i for i, value in enumerate(values) if (value == value) and not (floor <= value <= ceiling)]
+        self.value_counts[row] += len(values)
+        if len(valid) == 0:
+            return
+        valid_values = [values[i] for i in valid]
+        self.counts[row] += len(valid)
+        self.totals[row] += sum(valid_values)
+        self.mins[row] = min(self.mins[row], min(valid_values))
+        self.maxs[row] = max(self.maxs[row], max(valid_values))
+        if (self.first_steps[row] is None) or (step + valid[0] < self.first_steps[row]):
+            self.first_steps[row] = step + valid[0]
+        if (self.last_steps[row] is None) or (step + valid[-1] > self.last_steps[row]):
+            self.last_steps[row] = step + valid[-1]
+
+    @staticmethod
+    def from_values(ids, dates, values, is_daily=False):
+        """
+        Compute the statistics for an array of values, with vectorized reductions for all stations at once.
+        :param ids: list of station identifiers, one per row of values.
+        :param dates: numpy datetime64 array of the dates for the time steps.
+        :param values: array dimensioned (station x time step).
+        :param is_daily: True if the time steps are days, False if months.
+        :return: StateMod_TSStatistics
+        """
+        statistics = StateMod_TSStatistics(is_daily)
+        values = np.asarray(values, dtype=np.float64).reshape(len(ids), len(dates))
+        valid = ~(np.isnan(values) | ((values >= StateMod_Util.MISSING_DOUBLE_FLOOR) &
+                                      (values <= StateMod_Util.MISSING_DOUBLE_CEILING)))
+        counts = valid.sum(axis=1)
+        table = np.zeros(len(ids), dtype=statistics.get_table_dtype())
+        table["id"] = ids
+        table["value_count"] = len(dates)
+        table["count"] = counts
+        table["missing_count"] = len(dates) - counts
+        table["total"] = np.where(valid, values, 0.0).sum(axis=1)
+        has_values = counts > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            table["mean"] = np.where(has_values, table["total"] / counts, np.nan)
+        if len(dates) > 0:
+            table["min"] = np.where(has_values, np.where(valid, values, np.inf).min(axis=1), np.nan)
+            table["max"] = np.where(has_values, np.where(valid, values, -np.inf).max(axis=1), np.nan)
+            first = np.argmax(valid, axis=1)
+            last = len(dates) - 1 - np.argmax(valid[:, ::-1], axis=1)
+            table["first_date"] = np.where(has_values, dates[first], np.datetime64("NaT"))
+            table["last_date"] = np.where(has_values, dates[last], np.datetime64("NaT"))
+        else:
+            table["min"] = np.nan
+            table["max"] = np.nan
+            table["first_date"] = np.datetime64("NaT")
+            table["last_date"] = np.datetime64("NaT")
+        statistics.ids = list(ids)
+        statistics.table = table
+        return statistics
+
+    def get_ids(self):
+        """
+        :return: list of station identifiers, one per row.
+        """
+        return self.ids
+
+    def get_table(self):
+        """
+        Return the statistics as a numpy structured array with one row per station and fields id, value_count
+        (time steps read), count (non-missing values), missing_count, total, mean, min, max, first_date and
+        last_date (first and last dates with non-missing values, NaT if none).  Statistics for stations
+        without non-missing values are NaN.
+        :return: numpy structured array.
+        """
+        if self.table is None:
+            table = np.zeros(len(self.counts), dtype=self.get_table_dtype())
+            table["id"] = self.ids
+            table["value_count"] = self.value_counts
+            table["count"] = self.counts
+            table["missing_count"] = np.array(self.value_counts) - np.array(self.counts, dtype=np.int64)
+            table["total"] = self.totals
+            counts = np.array(self.counts, dtype=np.float64)
+            has_values = counts > 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                table["mean"] = np.where(has_values, table["total"] / counts, np.nan)
+            table["min"] = np.where(has_values, self.mins, np.nan)
+            table["max"] = np.where(has_values, self.maxs, np.nan)
+            unit = "D" if self.is_daily else "M"
+            table["first_date"] = [np.datetime64("NaT") if step is None else np.datetime64(step, unit)
+                                   for step in self.first_steps]
+            table["last_date"] = [np.datetime64("NaT") if step is None else np.datetime64(step, unit)
+                                  for step in self.last_steps]
+            self.table = table
+        return self.table
+
+    def get_table_dtype(self):
+        """
+        :return: numpy dtype of the statistics table.
+        """
+        date_type = "datetime64[D]" if self.is_daily else "datetime64[M]"
+        return np.dtype([("id", "U12"), ("value_count", np.int64), ("count", np.int64),
+                         ("missing_count", np.int64), ("total", np.float64), ("mean", np.float64),
+                         ("min", np.float64), ("max", np.float64), ("first_date", date_type),
+                         ("last_date", date_type)])
+
+    def lookup(self, id):
+        """
+        Return the statistics for a station.
+        :param id: station identifier.
+        :return: row of the statistics table (numpy record), or None if the station is not found.
+        """
+        try:
+            return self.get_table()[self.ids.index(id)]
+        except ValueError:
+            return None
+
+    def set_id(self, row, id):
+        """
+        Set the station identifier for a row.
+        :param row: row for the station.
+        :param id: station identifier.
+        """
+        while row >= len(self.ids):
+            self.add_values(len(self.ids), 0, [])
+        self.ids[row] = id
+        self.table = None
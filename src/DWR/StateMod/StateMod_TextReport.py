@@ -0,0 +1,378 @@
+# StateMod_TextReport - indexed reader for StateMod text balance reports (*.xdd, *.xre, *.xwb)
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_TextReport:
+    """
+    Read station time series from a StateMod text balance report (*.xdd diversion and stream summary,
+    *.xre reservoir summary, *.xwb well balance) without reading the whole file into memory.
+
+    The first time a report is opened, the file is read once, line by line, to index the byte range of each
+    station and year section.  The index can be saved (report file name + ".idx.json", next to the report or in an
+    index directory) and is reused while the report size and modification time are unchanged.  Requested series
+    are then read by seeking to the sections for the station and parsing only those lines into numpy arrays.
+
+    Data rows are lines with the station identifier, optional name, year, month abbreviation (or TOT/AVE for
+    annual total and average rows, which are skipped) and then the parameter values.  Heading lines are ignored.
+    The parameter values are fixed-width columns, which end at the ends of the underline fields
+    ("____ ____" or "---- ----") in the heading before the first data row, or if the underline does not
+    include the value columns, at the ends of the values in the first data row.  Values are right-justified in
+    their columns.  Blank fields, non-numeric fields and fields beyond the end of short rows are NaN.
+
+    The year on a data row is the year for the report's year type, so the first months of a water or irrigation
+    year (e.g., OCT to DEC) are in the previous calendar year.  The year type is determined from the month
+    of the first data row (OCT for water year, NOV for irrigation year, otherwise calendar year) unless it is
+    specified.  The parameter names are those in the StateMod_Util output_ts_data_types lists for the report's
+    station type.
+    """
+
+    # Index file format version, increment if the index contents change
+    index_version = 2
+
+    # Index file name suffix
+    index_suffix = ".idx.json"
+
+    # Month abbreviations in data rows, and the rows that are skipped
+    months = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+    summary_months = ["TOT", "AVE"]
+
+    # Data row:  identifier, optional name, year, month and values
+    row_pattern = re.compile(rb"^\s*(\S+)\s+(?:.*?\s+)?(\d{4})\s+(" + b"|".join(
+        m.encode("ascii") for m in months + summary_months) + rb")\s+(\S.*)$")
+
+    # Heading underline:  fields of "_" or "-" separated by blanks
+    underline_pattern = re.compile(rb"^\s*[_-]+(?:\s+[_-]+)*\s*$")
+
+    # First month (upper case abbreviation) of the first data row -> year type
+    first_month_year_types = {
+        "OCT": "WYR",
+        "NOV": "IYR"
+    }
+
+    # Year type -> first month of the year
+    year_type_start_months = {
+        "CYR": 1,
+        "WYR": 10,
+        "IYR": 11
+    }
+
+    # File extension (lower case) -> station type used to look up parameters
+    file_types = {
+        "xdd": StateMod_Util.STATION_TYPE_DIVERSION,
+        "xre": StateMod_Util.STATION_TYPE_RESERVOIR,
+        "xwb": StateMod_Util.STATION_TYPE_WELL
+    }
+
+    def __init__(self, filename, parameters=None, use_saved_index=True, save_index=False, index_directory=None,
+                 year_type=None):
+        """
+        Open a report and read or build its section index.
+        :param filename: name of the report file.
+        :param parameters: list of parameter names for the value columns, or None to use the StateMod_Util
+        list for the file extension.
+        :param use_saved_index: if True, use the saved index file if it is current.
+        :param save_index: if True, save the index file after building the index.  The index is not saved by
+        default because reports are often in read-only or shared directories.
+        :param index_directory: directory for the index file, or None to use the report directory.
+        :param year_type: year type of the report ("CYR", "WYR" or "IYR"), or None to determine from the
+        first data row.
+        """
+        self.filename = filename
+        self.index_directory = index_directory
+
+        # Station identifier -> list of [year, start offset, end offset, row count], in file order
+        self.sections = {}
+
+        # Number of value columns in data rows
+        self.value_count = 0
+
+        # Character position of the end of the month field and of each value column in data rows
+        self.month_end = 0
+        self.column_ends = []
+
+        # Year type of the report, determined from the first data row when the index is built
+        self.year_type = "CYR"
+
+        index_loaded = False
+        if use_saved_index:
+            index_loaded = self.read_index()
+        if not index_loaded:
+            self.build_index()
+            if save_index:
+                self.write_index()
+        if year_type is not None:
+            if year_type.upper() not in StateMod_TextReport.year_type_start_months:
+                raise ValueError("Unknown year type \"" + str(year_type) + "\".")
+            self.year_type = year_type.upper()
+
+        if parameters is None:
+            parameters = StateMod_TextReport.get_parameters(filename)
+        self.parameters = list(parameters[:self.value_count])
+        for i in range(len(self.parameters), self.value_count):
+            self.parameters.append("Parameter_{}".format(i + 1))
+
+    def build_index(self):
+        """
+        Read the report once and index the byte range of each station and year section, and determine the
+        value columns and year type from the heading and first data row.
+        """
+        logger = logging.getLogger(__name__)
+        self.sections = {}
+        self.value_count = 0
+        self.month_end = 0
+        self.column_ends = []
+        self.year_type = "CYR"
+        section = None
+        section_key = None
+        underline = None
+        offset = 0
+        with open(self.filename, "rb") as f:
+            for line in f:
+                match = StateMod_TextReport.row_pattern.match(line)
+                if match is not None:
+                    key = (match.group(1), match.group(2))
+                    if key != section_key:
+                        section_key = key
+                        section = [int(match.group(2)), offset, offset, 0]
+                        self.sections.setdefault(match.group(1).decode("ascii", "replace"), []).append(section)
+                    month = match.group(3).decode("ascii")
+                    if month not in StateMod_TextReport.summary_months:
+                        section[3] += 1
+                        if self.value_count == 0:
+                            self.set_columns(line, match, underline)
+                            self.year_type = StateMod_TextReport.first_month_year_types.get(month, "CYR")
+                    section[2] = offset + len(line)
+                elif (self.value_count == 0) and StateMod_TextReport.underline_pattern.match(line):
+                    underline = line
+                offset += len(line)
+        logger.info("Indexed {} stations in \"{}\".".format(len(self.sections), self.filename))
+
+    def get_index_filename(self):
+        """
+        Return the name of the index file for the report.  Index files in an index directory include a hash of
+        the report path so that reports with the same name in different directories have different index files.
+        :return: the name of the index file for the report.
+        """
+        if self.index_directory is None:
+            return self.filename + StateMod_TextReport.index_suffix
+        path_hash = hashlib.sha1(os.path.abspath(self.filename).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.index_directory, "{}.{}{}".format(
+            os.path.basename(self.filename), path_hash, StateMod_TextReport.index_suffix))
+
+    @staticmethod
+    def get_parameters(filename):
+        """
+        Return the parameter names for a report, from the StateMod_Util output_ts_data_types lists.
+        :param filename: report file name, used to determine the station type from the extension.
+        :return: list of parameter names, in column order.
+        """
+        extension = os.path.splitext(filename)[1][1:].lower()
+        station_type = StateMod_TextReport.file_types.get(extension)
+        if station_type == StateMod_Util.STATION_TYPE_RESERVOIR:
+            return list(StateMod_Util.output_ts_data_types_reservoir_0969)
+        elif station_type == StateMod_Util.STATION_TYPE_WELL:
+            return list(StateMod_Util.output_ts_data_types_well_0969)
+        return list(StateMod_Util.output_ts_data_types_diversion_0969)
+
+    def get_station_ids(self):
+        """
+        :return: list of station identifiers, in file order.
+        """
+        return list(self.sections.keys())
+
+    def get_station_values(self, station_id, parameters=None, start_year=None, end_year=None):
+        """
+        Read the monthly values for a station.
+        :param station_id: station identifier.
+        :param parameters: list of parameter names or indexes, or None for all parameters.
+        :param start_year: first report year to read, or None to start with the first year.
+        :param end_year: last report year to read, or None to end with the last year.
+        :return: (values, dates) where values is an array dimensioned (month x parameter) and dates is a
+        numpy datetime64[M] array for the months.
+        """
+        sections = self.sections.get(station_id)
+        if sections is None:
+            raise KeyError("Station \"{}\" is not in \"{}\".".format(station_id, self.filename))
+        columns = None
+        if parameters is not None:
+            columns = [self.index_of_parameter(parameter) for parameter in parameters]
+        years = []
+        months = []
+        rows = []
+        with open(self.filename, "rb") as f:
+            for year, start, end, row_count in sections:
+                if ((start_year is not None) and (year < start_year)) or \
+                        ((end_year is not None) and (year > end_year)):
+                    continue
+                f.seek(start)
+                for line in f.read(end - start).splitlines():
+                    match = StateMod_TextReport.row_pattern.match(line)
+                    if (match is None) or (match.group(1).decode("ascii", "replace") != station_id):
+                        continue
+                    month = match.group(3).decode("ascii")
+                    if month in StateMod_TextReport.summary_months:
+                        continue
+                    years.append(int(match.group(2)))
+                    months.append(StateMod_TextReport.months.index(month))
+                    rows.append(self.parse_values(line, columns))
+        if columns is None:
+            array = np.array(rows, dtype=np.float64).reshape(len(rows), self.value_count)
+        else:
+            array = np.array(rows, dtype=np.float64).reshape(len(rows), len(columns))
+        # Months at and after the first month of a water or irrigation year are in the previous calendar year
+        years = np.array(years, dtype=np.int64)
+        months = np.array(months, dtype=np.int64)
+        start_month = StateMod_TextReport.year_type_start_months[self.year_type]
+        if start_month > 1:
+            years = years - (months >= start_month - 1)
+        dates = (years - 1970) * 12 + months
+        return array, dates.astype("datetime64[M]")
+
+    def get_values(self, station_id, parameter, start_year=None, end_year=None):
+        """
+        Read the monthly values of one parameter for a station.
+        :param station_id: station identifier.
+        :param parameter: parameter name or index.
+        :param start_year: first report year to read, or None to start with the first year.
+        :param end_year: last report year to read, or None to end with the last year.
+        :return: (values, dates) where values is an array of the monthly values and dates is a
+        numpy datetime64[M] array for the months.
+        """
+        values, dates = self.get_station_values(station_id, [parameter], start_year, end_year)
+        return values[:, 0], dates
+
+    def index_of_parameter(self, parameter):
+        """
+        Return the column index of a parameter.
+        :param parameter: parameter index, full name (e.g., "Demand - Total_Demand") or the name after the
+        group (e.g., "Total_Demand").
+        :return: index of the parameter.
+        """
+        if isinstance(parameter, (int, np.integer)):
+            return int(parameter)
+        for i, name in enumerate(self.parameters):
+            if (name == parameter) or (name.split(" - ", 1)[-1] == parameter):
+                return i
+        raise KeyError("Parameter \"{}\" is not in \"{}\".".format(parameter, self.filename))
+
+    def parse_values(self, line, columns=None):
+        """
+        Parse the values of a data row from the fixed-width value columns.
+        :param line: data row, as bytes.
+        :param columns: list of column indexes to parse, or None for all columns.
+        :return: list of values, NaN for blank and non-numeric fields.
+        """
+        if columns is None:
+            columns = range(self.value_count)
+        values = []
+        for column in columns:
+            start = self.month_end if column == 0 else self.column_ends[column - 1]
+            field = line[start:self.column_ends[column]].strip()
+            try:
+                values.append(float(field) if len(field) > 0 else np.nan)
+            except ValueError:
+                values.append(np.nan)
+        return values
+
+    def read_index(self):
+        """
+        Read the saved index, if it is current for the report.
+        :return: True if the index was read, False if it is missing, out of date or cannot be read.
+        """
+        logger = logging.getLogger(__name__)
+        index_filename = self.get_index_filename()
+        if not os.path.exists(index_filename):
+            return False
+        try:
+            with open(index_filename) as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Error reading index \"{}\" ({}) - rebuilding.".format(index_filename, e))
+            return False
+        stat = os.stat(self.filename)
+        if (index.get("version") != StateMod_TextReport.index_version) or (index.get("size") != stat.st_size) or \
+                (index.get("mtime_ns") != stat.st_mtime_ns):
+            logger.info("Index \"{}\" is out of date - rebuilding.".format(index_filename))
+            return False
+        self.value_count = index["value_count"]
+        self.month_end = index["month_end"]
+        self.column_ends = index["column_ends"]
+        self.year_type = index["year_type"]
+        self.sections = index["sections"]
+        return True
+
+    def set_columns(self, line, match, underline):
+        """
+        Determine the value columns from the first data row and the heading underline before it.
+        The underline fields are used if they include all the values in the row, otherwise the columns end
+        at the ends of the values in the row.
+        :param line: first data row, as bytes.
+        :param match: row_pattern match for the row.
+        :param underline: last heading underline line before the row, as bytes, or None.
+        """
+        self.month_end = match.end(3)
+        row_ends = [m.end() for m in re.finditer(rb"\S+", line[:len(line.rstrip())]) if m.start() >= self.month_end]
+        column_ends = []
+        if underline is not None:
+            column_ends = [m.end() for m in re.finditer(rb"[_-]+", underline) if m.start() >= self.month_end]
+        if (len(column_ends) < len(row_ends)) or (len(column_ends) == 0) or (column_ends[-1] < row_ends[-1]):
+            column_ends = row_ends
+        self.column_ends = column_ends
+        self.value_count = len(column_ends)
+
+    def write_index(self):
+        """
+        Save the index next to the report or in the index directory.  Errors writing the index, for example
+        if the directory is read-only, are logged and otherwise ignored.
+        """
+        logger = logging.getLogger(__name__)
+        try:
+            stat = os.stat(self.filename)
+        except OSError as e:
+            logger.warning("Unable to save index \"{}\" ({}).".format(self.get_index_filename(), e))
+            return
+        index = {
+            "version": StateMod_TextReport.index_version,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "value_count": self.value_count,
+            "month_end": self.month_end,
+            "column_ends": self.column_ends,
+            "year_type": self.year_type,
+            "sections": self.sections
+        }
+        try:
+            with open(self.get_index_filename(), "w") as f:
+                json.dump(index, f)
+        except OSError as e:
+            logger.warning("Unable to save index \"{}\" ({}).".format(self.get_index_filename(), e))
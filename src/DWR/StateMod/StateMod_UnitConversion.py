@@ -0,0 +1,149 @@
+# StateMod_UnitConversion - convert time series values between flow rate and volume units
+
+# NoticeStart
+#
+# CDSS Models Python Library
+# CDSS Models Python Library is a part of Colorado's Decision Support Systems (CDSS)
+# Copyright (C) 1994-2019 Colorado Department of Natural Resources
+#
+# CDSS Models Python Library is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     CDSS Models Python Library is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with CDSS Models Python Library.  If not, see <https://www.gnu.org/licenses/>.
+#
+# NoticeEnd
+
+import numpy as np
+
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+
+class StateMod_UnitConversion:
+    """
+    Convert time series values between flow rate units (CFS, CMS, AF/D) and volume units (ACFT, AF, AF/M),
+    where a volume is the total for the time step.  Monthly conversions between rates and volumes use the
+    number of days in each month.  Multipliers are computed once for all time steps so that a whole
+    (station x time step) array is converted with one multiplication.  Missing values (-999 and NaN) are not changed.
+    """
+
+    # Default factor to convert CFS to AF/day, as for the StateMod control file "factor"
+    CFS_TO_ACFT_PER_DAY = 1.9835
+
+    # Factor to convert CMS to CFS
+    CMS_TO_CFS = 35.3147
+
+    # Flow rate units (upper case)
+    flow_units = ["CFS", "CMS", "AF/D", "AF/DAY"]
+
+    # Volume units (upper case), as the total for the time step
+    volume_units = ["ACFT", "AF", "AF/M", "AF/MO", "AF/MON", "AF/MONTH"]
+
+    @staticmethod
+    def can_convert(from_units, to_units):
+        """
+        Determine whether values can be converted between units.
+        :param from_units: units of the values.
+        :param to_units: requested units.
+        :return: True if the units are the same or both are flow rate or volume units that can be converted.
+        """
+        if StateMod_UnitConversion.is_same_units(from_units, to_units):
+            return True
+        known_units = StateMod_UnitConversion.flow_units + StateMod_UnitConversion.volume_units
+        return (from_units.strip().upper() in known_units) and (to_units.strip().upper() in known_units)
+
+    @staticmethod
+    def convert(values, from_units, to_units, dates, is_daily, factor=CFS_TO_ACFT_PER_DAY):
+        """
+        Convert values between units.
+        :param values: numpy array with time steps on the last axis, for example (station x time step).
+        :param from_units: units of the values.
+        :param to_units: requested units.
+        :param dates: numpy datetime64 array of the dates for the time steps.
+        :param is_daily: True if the values are daily, False if monthly.
+        :param factor: factor to convert CFS to AF/day.
+        :return: new array of converted values, or values if the units are the same.
+        """
+        if StateMod_UnitConversion.is_same_units(from_units, to_units):
+            return values
+        multipliers = StateMod_UnitConversion.get_multipliers(from_units, to_units, dates, is_daily, factor)
+        missing = (values >= StateMod_Util.MISSING_DOUBLE_FLOOR) & (values <= StateMod_Util.MISSING_DOUBLE_CEILING)
+        converted = values * multipliers
+        if missing.any():
+            converted[missing] = values[missing]
+        return converted
+
+    @staticmethod
+    def get_cfs_multipliers(units, days, factor=CFS_TO_ACFT_PER_DAY):
+        """
+        Return the multipliers that convert values in units to CFS.
+        :param units: flow rate or volume units.
+        :param days: number of days in each time step (numpy array or number).
+        :param factor: factor to convert CFS to AF/day.
+        :return: multipliers, with the same shape as days.
+        """
+        units_upper = units.strip().upper()
+        if units_upper == "CFS":
+            return np.ones_like(days, dtype=np.float64)
+        elif units_upper == "CMS":
+            return np.full_like(days, StateMod_UnitConversion.CMS_TO_CFS, dtype=np.float64)
+        elif units_upper in ["AF/D", "AF/DAY"]:
+            return np.full_like(days, 1.0 / factor, dtype=np.float64)
+        elif units_upper in StateMod_UnitConversion.volume_units:
+            return 1.0 / (factor * np.asarray(days, dtype=np.float64))
+        raise ValueError("Unable to convert units \"" + units + "\".")
+
+    @staticmethod
+    def get_days_per_time_step(dates, is_daily):
+        """
+        Return the number of days in each time step.
+        :param dates: numpy datetime64 array of the dates for the time steps.
+        :param is_daily: True if the time steps are days, False if months.
+        :return: numpy array of the number of days in each time step.
+        """
+        if is_daily:
+            return np.ones(len(dates), dtype=np.float64)
+        months = np.asarray(dates).astype("datetime64[M]")
+        return ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.float64)
+
+    @staticmethod
+    def get_multipliers(from_units, to_units, dates, is_daily, factor=CFS_TO_ACFT_PER_DAY):
+        """
+        Return the multipliers that convert values from one units to another for each time step.
+        :param from_units: units of the values.
+        :param to_units: requested units.
+        :param dates: numpy datetime64 array of the dates for the time steps.
+        :param is_daily: True if the values are daily, False if monthly.
+        :param factor: factor to convert CFS to AF/day.
+        :return: numpy array of multipliers, one per time step.
+        """
+        days = StateMod_UnitConversion.get_days_per_time_step(dates, is_daily)
+        if StateMod_UnitConversion.is_same_units(from_units, to_units):
+            return np.ones_like(days)
+        if not StateMod_UnitConversion.can_convert(from_units, to_units):
+            raise ValueError("Unable to convert units \"" + from_units + "\" to \"" + to_units + "\".")
+        return StateMod_UnitConversion.get_cfs_multipliers(from_units, days, factor) / \
+            StateMod_UnitConversion.get_cfs_multipliers(to_units, days, factor)
+
+    @staticmethod
+    def is_same_units(from_units, to_units):
+        """
+        Determine whether units are the same, including equivalent volume units (e.g., "AF" and "ACFT").
+        :param from_units: units of the values.
+        :param to_units: requested units.
+        :return: True if no conversion is needed.
+        """
+        from_upper = from_units.strip().upper()
+        to_upper = to_units.strip().upper()
+        if from_upper == to_upper:
+            return True
+        volume_units = StateMod_UnitConversion.volume_units
+        return ((from_upper in volume_units) and (to_upper in volume_units)) or \
+            ((from_upper in ["AF/D", "AF/DAY"]) and (to_upper in ["AF/D", "AF/DAY"]))
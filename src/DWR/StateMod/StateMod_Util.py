@@ -21,6 +21,31 @@
 #
 # NoticeEnd
 
+import io
+import os
+
+
+class _CompressedMemberFile(io.BufferedReader):
+    """
+    Buffered reader for a decompressed member of a StateMod_DataSetSource.
+    The gzip, lzma and bz2 readers do not close a file object that is passed to them,
+    so closing this reader closes both the decompressed stream and the member file.
+    """
+
+    def __init__(self, raw, member):
+        """
+        :param raw: decompressed binary stream.
+        :param member: member file object from the source, closed when this reader is closed.
+        """
+        super().__init__(raw)
+        self.member = member
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.member.close()
+
 
 class StateMod_Util:
     """
@@ -434,6 +459,63 @@ class StateMod_Util:
     # See the system/StateModGUI.cfg file for configuration properties.
     smdelta_executable = "SmDelta"
 
+    # Extensions (lower case) of compressed files that can be read transparently, in the order checked
+    compressed_file_extensions = [".gz", ".xz", ".bz2"]
+
+    @staticmethod
+    def file_exists(filename):
+        """
+        Determine whether a data file exists, either on disk or in a StateMod_DataSetSource.
+        :param filename: name of the file.
+        :return: True if the file exists.
+        """
+        from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+        source = StateMod_DataSetSource.find_source(filename)
+        if source is not None:
+            return source.exists(filename)
+        return os.path.isfile(filename)
+
+    @staticmethod
+    def find_file(filename):
+        """
+        Find a data file, allowing for the file to have been compressed.  If the file does not exist but a
+        compressed file with the same name plus a compressed file extension (e.g., "file.ddm.gz") does,
+        the compressed file name is returned.
+        :param filename: name of the file.
+        :return: the name of the file or of its compressed file, or filename if neither exists.
+        """
+        if (filename is None) or StateMod_Util.file_exists(filename):
+            return filename
+        for extension in StateMod_Util.compressed_file_extensions:
+            if StateMod_Util.file_exists(filename + extension):
+                return filename + extension
+        return filename
+
+    @staticmethod
+    def get_compressed_file_extension(filename):
+        """
+        Determine the compressed file extension of a file name.
+        :param filename: name of the file.
+        :return: compressed file extension (lower case, e.g., ".gz") or "" if the file is not compressed.
+        """
+        extension = os.path.splitext(str(filename))[1].lower()
+        if extension in StateMod_Util.compressed_file_extensions:
+            return extension
+        return ""
+
+    @staticmethod
+    def get_file_size(filename):
+        """
+        Return the size of a data file, either on disk or in a StateMod_DataSetSource.
+        :param filename: name of the file.
+        :return: size of the file in bytes.
+        """
+        from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+        source = StateMod_DataSetSource.find_source(filename)
+        if source is not None:
+            return source.get_size(filename)
+        return os.path.getsize(filename)
+
     @staticmethod
     def is_missing(i):
         """
@@ -445,3 +527,57 @@ class StateMod_Util:
             return True
         else:
             return False
+
+    @staticmethod
+    def open_file(filename, mode="r"):
+        """
+        Open a data file for reading.  Files with a compressed file extension (.gz, .xz or .bz2) are decompressed
+        as they are read, so that compressed data sets can be read without first decompressing the files.
+        Files under the root of a StateMod_DataSetSource (zip archive or in-memory files) are read from the source.
+        :param filename: name of the file.
+        :param mode: "r" to read text or "rb" to read bytes.
+        :return: file object, which should be closed (use in a "with" statement).
+        """
+        from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+        source = StateMod_DataSetSource.find_source(filename)
+        extension = StateMod_Util.get_compressed_file_extension(filename)
+        if extension == "":
+            if source is not None:
+                return source.open(filename, mode)
+            return open(filename, mode)
+        if mode == "r":
+            mode = "rt"
+        if extension == ".gz":
+            import gzip
+            decompress = gzip.open
+        elif extension == ".xz":
+            import lzma
+            decompress = lzma.open
+        else:
+            import bz2
+            decompress = bz2.open
+        if source is None:
+            return decompress(filename, mode)
+        # Decompress the member of the source, closing the member when the returned file is closed
+        member = source.open(filename, "rb")
+        try:
+            f = _CompressedMemberFile(decompress(member, "rb"), member)
+        except BaseException:
+            member.close()
+            raise
+        if mode == "rt":
+            return io.TextIOWrapper(f)
+        return f
+
+    @staticmethod
+    def remove_compressed_file_extension(filename):
+        """
+        Remove the compressed file extension from a file name, for example to determine the file type from
+        the remaining extension.
+        :param filename: name of the file.
+        :return: the file name without the compressed file extension.
+        """
+        extension = StateMod_Util.get_compressed_file_extension(filename)
+        if extension == "":
+            return filename
+        return filename[:-len(extension)]
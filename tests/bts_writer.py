@@ -0,0 +1,86 @@
+# Stand-in writer for StateMod binary output fixture files, used only by the tests
+
+import struct
+
+import numpy as np
+
+from DWR.StateMod.StateMod_BTS import StateMod_BTS
+
+MONTH_NAMES = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def write_bts(filename, data, station_ids, station_names=None, parameters=None, iystr0=2000, iyend0=None,
+              start_month=1, units="ACFT", other_stations=None, other_parameters=None, padding=0):
+    """
+    Write a StateMod binary output file in the layout read by StateMod_BTS.
+    :param filename: name of file to write, with the extension that determines the file type (e.g., "B43").
+    :param data: array of values dimensioned (time step x station x parameter).
+    :param station_ids: list of station identifiers of the data records.  For reservoir files, the reservoirs
+    are written to the reservoir block and other_stations can provide the account block.
+    :param station_names: list of station names, or None to use blank names.
+    :param parameters: list of parameter names, or None to use generic names.
+    :param iystr0: first year of the data, in the year type.
+    :param iyend0: last year of the data, in the year type, or None to determine from the data.
+    :param start_month: first month of the year type, 1 for calendar year, 10 for water year, 11 for irrigation year.
+    :param units: units for the header.
+    :param other_stations: dictionary of station block -> list of (identifier, name) for blocks other than those
+    of the data records, or None.
+    :param other_parameters: dictionary of parameter block (station type) -> list of names for the other file
+    types, or None.
+    :param padding: number of bytes in each record after the largest header record or parameter values.
+    """
+    data = np.asarray(data, dtype=StateMod_BTS.value_dtype)
+    step_count, station_count, parameter_count = data.shape
+    if station_names is None:
+        station_names = [""] * len(station_ids)
+    if parameters is None:
+        parameters = ["Parameter_{}".format(i + 1) for i in range(parameter_count)]
+    extension = filename.rsplit(".", 1)[1].upper()
+    station_type, data_blocks, is_daily = StateMod_BTS.file_types[extension]
+    if iyend0 is None:
+        iyend0 = iystr0 + max((step_count + 11) // 12, 1) - 1 if not is_daily else iystr0
+
+    # Station blocks
+    blocks = {block: [] for block in StateMod_BTS.station_blocks}
+    if other_stations is not None:
+        for block, stations in other_stations.items():
+            blocks[block] = list(stations)
+    blocks[data_blocks[0]] = list(zip(station_ids, station_names))
+    if len(data_blocks) > 1:
+        # Reservoir files - data records for the reservoirs and then the accounts
+        account_count = len(blocks[data_blocks[1]])
+        blocks[data_blocks[0]] = blocks[data_blocks[0]][:station_count - account_count]
+    parameter_blocks = {block: [] for block in StateMod_BTS.parameter_blocks}
+    if other_parameters is not None:
+        for block, names in other_parameters.items():
+            parameter_blocks[block] = list(names)
+    parameter_blocks[station_type] = list(parameters)
+
+    counts = [len(blocks[block]) for block in StateMod_BTS.station_blocks]
+    parameter_counts = [len(parameter_blocks[block]) for block in StateMod_BTS.parameter_blocks]
+    record_length = max(StateMod_BTS.get_header_record_length(),
+                        max(parameter_counts) * StateMod_BTS.value_dtype.itemsize) + padding
+    month_names = MONTH_NAMES[start_month - 1:] + MONTH_NAMES[:start_month - 1] + ["TOT", "AVE"]
+    month_days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    month_days = month_days[start_month - 1:] + month_days[:start_month - 1]
+
+    records = [
+        struct.pack(StateMod_BTS.header_format, units.encode("ascii").ljust(4), iystr0, iyend0, counts[0],
+                    counts[1], counts[2], counts[3], counts[4], counts[3] + counts[4], counts[5], 0, counts[6],
+                    *parameter_counts, record_length),
+        struct.pack(StateMod_BTS.month_format, *[name.encode("ascii").ljust(4) for name in month_names]),
+        struct.pack(StateMod_BTS.month_day_format, *month_days)
+    ]
+    for block in StateMod_BTS.station_blocks:
+        for station_id, station_name in blocks[block]:
+            records.append(struct.pack(StateMod_BTS.station_format, station_id.encode("ascii").ljust(12),
+                                       station_name.encode("ascii").ljust(24)))
+    for block in StateMod_BTS.parameter_blocks:
+        for name in parameter_blocks[block]:
+            records.append(struct.pack(StateMod_BTS.parameter_format, name.encode("ascii").ljust(24)))
+    with open(filename, "wb") as f:
+        for record in records:
+            f.write(record.ljust(record_length, b"\0"))
+        data_records = np.zeros((step_count, station_count, record_length), dtype=np.uint8)
+        data_records[:, :, :parameter_count * 4] = data.view(np.uint8).reshape(step_count, station_count, -1)
+        f.write(data_records.tobytes())
@@ -0,0 +1,6 @@
+# Test configuration - make the library source importable without installing the package
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_Allocation import StateMod_Allocation
+from DWR.StateMod.StateMod_Benchmark import StateMod_Benchmark
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
+from DWR.StateMod.StateMod_RightsTable import StateMod_RightsTable
+from DWR.StateMod.StateMod_RiverNetwork import StateMod_RiverNetwork
+from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
+
+
+def make_network(downstream_ids):
+    nodes = []
+    for node_id, cstadn in downstream_ids:
+        node = StateMod_RiverNetworkNode()
+        node.set_id(node_id)
+        node.set_cstadn(cstadn)
+        nodes.append(node)
+    return StateMod_RiverNetwork(nodes)
+
+
+def make_right(right_id, station_id, admin, decree, switch=1):
+    right = StateMod_DiversionRight()
+    right.set_id(right_id)
+    right.set_cgoto(station_id)
+    right.set_irtem(admin)
+    right.set_dcrdiv(decree)
+    right.set_switch(switch)
+    return right
+
+
+def make_allocation(network, rights):
+    rights_table = StateMod_RightsTable([(StateMod_DataSetComponentType.DIVERSION_RIGHTS, rights)],
+                                        network.node_ids)
+    return StateMod_Allocation(network, rights_table)
+
+
+def allocate_by_walking(network, rights_table, demand, capacity, gains):
+    """
+    Reference allocation that walks downstream from each right's station.
+    """
+    demand = np.array(demand, dtype=np.float64)
+    capacity = np.array(capacity, dtype=np.float64)
+    available = np.maximum(network.accumulate_upstream(gains), 0.0)
+    diversions = np.zeros(rights_table.get_size())
+    for k, record in enumerate(rights_table.table):
+        station = record["station"]
+        if (record["switch"] <= 0) or (station < 0):
+            continue
+        path = [station] + list(network.get_downstream_node_indices(int(station)))
+        amount = min(record["decree"], demand[station], capacity[station], available[path].min())
+        if amount > 0.0:
+            available[path] -= amount
+            demand[station] -= amount
+            capacity[station] -= amount
+            diversions[k] = amount
+    return diversions, available
+
+
+@pytest.fixture
+def network():
+    # A and B drain to C, which drains to the outlet D
+    return make_network([("A", "C"), ("B", "C"), ("C", "D"), ("D", "")])
+
+
+def test_junior_upstream_right_cannot_take_senior_downstream_water(network):
+    rights = [make_right("A.01", "A", "20000.00000", 10.0), make_right("D.01", "D", "10000.00000", 8.0)]
+    allocation = make_allocation(network, rights)
+    gains = np.array([10.0, 0.0, 0.0, 0.0])
+    right_diversions, node_flows, station_diversions = allocation.allocate(
+        np.full(4, 100.0), np.full(4, np.inf), gains)
+    # Table order is priority order, D.01 is senior
+    assert allocation.rights_table.get_rights(allocation.rights_table.table)[0].get_id() == "D.01"
+    np.testing.assert_allclose(right_diversions, [8.0, 2.0])
+    np.testing.assert_allclose(node_flows, [8.0, 0.0, 8.0, 0.0])
+    np.testing.assert_allclose(station_diversions, [2.0, 0.0, 0.0, 8.0])
+
+    # With the upstream right senior it takes all of the flow
+    rights[0].set_irtem("5000.00000")
+    right_diversions = make_allocation(network, rights).allocate(np.full(4, 100.0), np.full(4, np.inf), gains)[0]
+    np.testing.assert_allclose(right_diversions, [10.0, 0.0])
+
+
+def test_capacity_and_demand_limits(network):
+    rights = [make_right("C.01", "C", "1.00000", 50.0), make_right("C.02", "C", "2.00000", 50.0),
+              make_right("D.01", "D", "3.00000", 50.0)]
+    allocation = make_allocation(network, rights)
+    gains = np.array([50.0, 50.0, 0.0, 0.0])
+    demand = np.array([0.0, 0.0, 100.0, 20.0])
+    capacity = np.array([np.inf, np.inf, 30.0, np.inf])
+    right_diversions, node_flows, station_diversions = allocation.allocate(demand, capacity, gains)
+    np.testing.assert_allclose(right_diversions, [30.0, 0.0, 20.0])
+    np.testing.assert_allclose(station_diversions, [0.0, 0.0, 30.0, 20.0])
+    np.testing.assert_allclose(node_flows, [50.0, 50.0, 70.0, 50.0])
+
+
+def test_off_and_unknown_station_rights_divert_nothing(network):
+    rights = [make_right("A.01", "A", "1.00000", 5.0, switch=0), make_right("X.01", "X", "2.00000", 5.0),
+              make_right("B.01", "B", "3.00000", 5.0)]
+    allocation = make_allocation(network, rights)
+    assert list(allocation.rights_table.table["station"]) == [0, -1, 1]
+    right_diversions, node_flows, station_diversions = allocation.allocate(
+        np.full(4, 10.0), np.full(4, np.inf), np.full(4, 10.0))
+    np.testing.assert_allclose(right_diversions, [0.0, 0.0, 5.0])
+    np.testing.assert_allclose(station_diversions, [0.0, 5.0, 0.0, 0.0])
+
+
+def test_station_diversions_sum_right_diversions():
+    rng = np.random.default_rng(1)
+    network = StateMod_RiverNetwork(StateMod_Benchmark.create_network_nodes(200, rng, max_reach=10))
+    rights = StateMod_Benchmark.create_diversion_rights(network.node_ids, 1000, rng)
+    allocation = make_allocation(network, rights)
+    gains = rng.gamma(0.5, 20.0, 200)
+    demand = rng.gamma(1.0, 30.0, 200)
+    capacity = np.where(rng.random(200) < 0.5, rng.gamma(1.0, 10.0, 200), np.inf)
+    right_diversions, node_flows, station_diversions = allocation.allocate(demand, capacity, gains)
+    stations = allocation.rights_table.table["station"]
+    np.testing.assert_allclose(station_diversions, np.bincount(stations, weights=right_diversions, minlength=200))
+    expected_diversions, expected_flows = allocate_by_walking(network, allocation.rights_table, demand, capacity,
+                                                              gains)
+    np.testing.assert_allclose(right_diversions, expected_diversions)
+    np.testing.assert_allclose(node_flows, expected_flows)
+
+
+def test_deep_main_stem():
+    rng = np.random.default_rng(2)
+    network = StateMod_RiverNetwork(StateMod_Benchmark.create_network_nodes(3000, rng, max_reach=1))
+    rights = StateMod_Benchmark.create_diversion_rights(network.node_ids, 500, rng)
+    allocation = make_allocation(network, rights)
+    gains = rng.gamma(0.5, 2.0, 3000)
+    demand = rng.gamma(1.0, 30.0, 3000)
+    capacity = np.full(3000, np.inf)
+    right_diversions, node_flows, station_diversions = allocation.allocate(demand, capacity, gains)
+    # A single chain, so each path to the outlet is one slice
+    assert all(len(allocation.get_path_slices(i)) == 1 for i in range(3000))
+    expected_diversions, expected_flows = allocate_by_walking(network, allocation.rights_table, demand, capacity,
+                                                              gains)
+    np.testing.assert_allclose(right_diversions, expected_diversions)
+    np.testing.assert_allclose(node_flows, expected_flows)
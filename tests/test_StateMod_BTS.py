@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_BTS import StateMod_BTS
+from DWR.StateMod.StateMod_Util import StateMod_Util
+from bts_writer import write_bts
+
+
+def make_data(step_count, station_count, parameter_count):
+    return np.arange(step_count * station_count * parameter_count, dtype=np.float32).reshape(
+        step_count, station_count, parameter_count)
+
+
+def test_monthly_file(tmp_path):
+    filename = str(tmp_path / "test.B43")
+    data = make_data(24, 3, 5)
+    parameters = [name.split(" - ")[1] for name in StateMod_Util.output_ts_data_types_diversion_0969[:5]]
+    write_bts(filename, data, ["A1", "B2", "C3"], ["Ditch A", "Ditch B", "Ditch C"], parameters=parameters,
+              other_stations={StateMod_BTS.STATION_BLOCK_DIVERSION: [("A1", "Ditch A"), ("B2", "Ditch B")],
+                              StateMod_BTS.STATION_BLOCK_WELL: [("W1", "Well 1")]},
+              other_parameters={StateMod_Util.STATION_TYPE_RESERVOIR: ["Storage"]})
+    with StateMod_BTS(filename) as bts:
+        assert bts.get_units() == "ACFT"
+        assert (bts.numsta, bts.numdiv, bts.numwel, bts.ndivO, bts.nresO) == (3, 2, 1, 5, 1)
+        assert bts.get_station_ids() == ["A1", "B2", "C3"]
+        assert bts.get_station_names() == ["Ditch A", "Ditch B", "Ditch C"]
+        assert bts.get_station_ids(StateMod_BTS.STATION_BLOCK_DIVERSION) == ["A1", "B2"]
+        assert bts.get_station_ids(StateMod_BTS.STATION_BLOCK_WELL) == ["W1"]
+        assert bts.get_parameters() == parameters
+        assert bts.get_month_names()[0] == "JAN"
+        assert bts.get_month_days()[1] == 28
+        assert bts.data_offset == (3 + 3 + 2 + 1 + 5 + 1) * bts.record_length
+        assert bts.get_data().shape == (24, 3, 5)
+        np.testing.assert_array_equal(bts.get_data(), data)
+        dates = bts.get_dates()
+        assert dates[0] == np.datetime64("2000-01")
+        assert dates[-1] == np.datetime64("2001-12")
+        np.testing.assert_array_equal(bts.get_values("B2", parameters[2]), data[:, 1, 2])
+        np.testing.assert_array_equal(bts.get_parameter("Demand - CU_Demand"), data[:, :, 1])
+
+
+def test_daily_file(tmp_path):
+    filename = str(tmp_path / "test.B49")
+    data = make_data(366, 2, 4)
+    write_bts(filename, data, ["D1", "D2"], iystr0=2000)
+    with StateMod_BTS(filename) as bts:
+        assert bts.is_daily
+        dates = bts.get_dates()
+        assert dates.dtype == np.dtype("datetime64[D]")
+        assert dates[0] == np.datetime64("2000-01-01")
+        assert dates[-1] == np.datetime64("2000-12-31")
+        np.testing.assert_array_equal(bts.get_station("D2"), data[:, 1, :])
+
+
+def test_reservoir_accounts(tmp_path):
+    filename = str(tmp_path / "test.B44")
+    data = make_data(12, 3, 2)
+    write_bts(filename, data, ["R1", "R1", "R1"], ["Res 1", "Owner 1", "Owner 2"],
+              other_stations={StateMod_BTS.STATION_BLOCK_RESERVOIR_ACCOUNT: [("R1", "Owner 1"), ("R1", "Owner 2")]})
+    with StateMod_BTS(filename) as bts:
+        assert (bts.numres, bts.numown, bts.nrsact) == (1, 2, 3)
+        assert bts.get_station_names() == ["Res 1", "Owner 1", "Owner 2"]
+        np.testing.assert_array_equal(bts.get_station(2), data[:, 2, :])
+
+
+def test_water_year_start(tmp_path):
+    filename = str(tmp_path / "test.B65")
+    write_bts(filename, make_data(12, 1, 3), ["W1"], iystr0=2001, start_month=10)
+    with StateMod_BTS(filename) as bts:
+        assert bts.get_month_names()[:2] == ["OCT", "NOV"]
+        assert bts.get_start_year() == 2000
+        dates = bts.get_dates()
+        assert dates[0] == np.datetime64("2000-10")
+        assert dates[-1] == np.datetime64("2001-09")
+
+
+def test_padded_records(tmp_path):
+    filename = str(tmp_path / "test.B43")
+    data = make_data(12, 4, 3)
+    write_bts(filename, data, ["S1", "S2", "S3", "S4"], padding=20)
+    with StateMod_BTS(filename) as bts:
+        assert bts.record_length == StateMod_BTS.get_header_record_length() + 20
+        assert bts.data_offset % bts.record_length == 0
+        np.testing.assert_array_equal(bts.get_data(), data)
+
+
+def test_views_share_memory(tmp_path):
+    filename = str(tmp_path / "test.B43")
+    data = make_data(12, 3, 5)
+    write_bts(filename, data, ["A1", "B2", "C3"], padding=8)
+    with StateMod_BTS(filename) as bts:
+        parameter = bts.get_parameter(1)
+        station = bts.get_station("C3")
+        assert np.shares_memory(parameter, bts.get_data())
+        assert np.shares_memory(station, bts.get_data())
+        assert not parameter.flags.writeable
+        np.testing.assert_array_equal(parameter, data[:, :, 1])
+        np.testing.assert_array_equal(station, data[:, 2, :])
+
+
+def test_short_file(tmp_path):
+    filename = str(tmp_path / "test.B43")
+    write_bts(filename, make_data(12, 2, 2), ["A1", "B2"])
+    with open(filename, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 1)
+    with pytest.raises(ValueError):
+        StateMod_BTS(filename)
+
+
+def test_unknown_parameter(tmp_path):
+    filename = str(tmp_path / "test.B43")
+    write_bts(filename, make_data(12, 1, 2), ["A1"])
+    with StateMod_BTS(filename) as bts:
+        with pytest.raises(KeyError):
+            bts.get_parameter("Not_A_Parameter")
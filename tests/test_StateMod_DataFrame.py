@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("RTi")
+pd = pytest.importorskip("pandas")
+
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+from DWR.StateMod.StateMod_TS import StateMod_TS
+from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+
+import ts_writer
+
+IDS = ["0901", "0902", "1001"]
+
+
+@pytest.fixture
+def monthly_file(tmp_path):
+    values = np.round(np.random.default_rng(0).uniform(0.0, 500.0, (len(IDS), 24)), 2)
+    values[1, 5] = np.nan
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, IDS, values, 2001, "WYR")
+    return filename
+
+
+@pytest.fixture
+def daily_file(tmp_path):
+    values = np.round(np.random.default_rng(1).uniform(0.0, 50.0, (2, ts_writer.get_day_count(2000, 1))), 2)
+    values[0, 59] = np.nan
+    filename = str(tmp_path / "test.ddd")
+    ts_writer.write_daily(filename, IDS[:2], values, 2000)
+    return filename
+
+
+def test_ts_array_round_trip(monthly_file, daily_file):
+    for filename, freq, first in [(monthly_file, "M", "2000-10"), (daily_file, "D", "2000-01-01")]:
+        ts_array = StateMod_TSArray.read_statemod_file(filename)
+        df = ts_array.to_dataframe()
+        assert isinstance(df.index, pd.PeriodIndex)
+        assert df.index.freqstr == freq
+        assert str(df.index[0]) == first
+        assert len(df.index) == len(ts_array.get_dates())
+        assert list(df.columns) == ts_array.get_ids()
+        assert df.attrs["units"] == ts_array.units
+        assert df.attrs["year_type"] == ts_array.year_type
+        # All stations are contiguous, so the DataFrame is backed by the array
+        assert np.shares_memory(df.to_numpy(), ts_array.get_values())
+
+        copy = StateMod_TSArray.from_dataframe(df)
+        assert copy.is_daily == ts_array.is_daily
+        assert copy.year_type == ts_array.year_type
+        assert copy.units == ts_array.units
+        assert copy.get_ids() == ts_array.get_ids()
+        np.testing.assert_array_equal(copy.get_dates(), ts_array.get_dates())
+        # Missing values (-999 in the file) are preserved
+        np.testing.assert_array_equal(copy.get_values(), ts_array.get_values())
+        assert (copy.get_values() == -999.0).sum() == 1
+
+
+def test_ts_array_from_dataframe_with_nan():
+    index = pd.period_range("2000-01", periods=3, freq="M")
+    df = pd.DataFrame({"A": [1.0, np.nan, 3.0], "B": [4.0, 5.0, 6.0]}, index=index)
+    ts_array = StateMod_TSArray.from_dataframe(df, units="CFS")
+    assert not ts_array.is_daily
+    assert ts_array.units == "CFS"
+    assert ts_array.year_type == "CYR"
+    assert [str(date) for date in ts_array.get_dates()] == ["2000-01", "2000-02", "2000-03"]
+    np.testing.assert_array_equal(ts_array.get_values(), [[1.0, np.nan, 3.0], [4.0, 5.0, 6.0]])
+    np.testing.assert_array_equal(ts_array.to_dataframe().to_numpy(), df.to_numpy())
+    # A DatetimeIndex needs a frequency
+    with pytest.raises(ValueError):
+        StateMod_TSArray.from_dataframe(pd.DataFrame({"A": [1.0]}, index=pd.DatetimeIndex(["2000-01-05"])))
+
+
+def test_ts_round_trip(monthly_file, daily_file):
+    for filename, freq in [(monthly_file, "M"), (daily_file, "D")]:
+        tslist = StateMod_TS.read_time_series_list(filename, None, None, None, True)
+        df = StateMod_TS.to_dataframe(tslist)
+        assert df.index.freqstr == freq
+        assert list(df.columns) == [ts.get_identifier().get_location() for ts in tslist]
+        expected = StateMod_TSArray.read_statemod_file(filename)
+        np.testing.assert_array_equal(df.to_numpy().T, expected.get_values())
+
+        # NaN in the DataFrame is the time series missing value
+        df = df.where(df != -999.0)
+        assert df.isna().to_numpy().sum() == 1
+        copy = StateMod_TS.from_dataframe(df)
+        assert len(copy) == len(tslist)
+        assert copy[0].get_date1().get_year() == tslist[0].get_date1().get_year()
+        assert copy[0].get_date1().get_month() == tslist[0].get_date1().get_month()
+        np.testing.assert_array_equal(StateMod_TS.to_dataframe(copy).to_numpy().T, expected.get_values())
+
+
+def test_component_to_dataframe(tmp_path):
+    generator = StateMod_DataSetGenerator(node_count=20, diversion_count=5, stream_gage_count=3,
+                                          start_year=2000, end_year=2001, daily=True)
+    response_file = generator.generate(str(tmp_path), "frame")
+    dataset = StateMod_DataSet()
+    dataset.read_statemod_file(response_file, True, True, False, None)
+    for comp_type, extension, freq in [(StateMod_DataSetComponentType.DEMAND_TS_MONTHLY, ".ddm", "M"),
+                                       (StateMod_DataSetComponentType.DEMAND_TS_DAILY, ".ddd", "D")]:
+        expected = StateMod_TSArray.read_statemod_file(str(response_file.with_suffix(extension)))
+        df = dataset.component_to_dataframe(comp_type)
+        assert df.index.freqstr == freq
+        assert len(df.index) == len(expected.get_dates())
+        assert list(df.columns) == expected.get_ids()
+        np.testing.assert_array_equal(df.to_numpy().T, expected.get_values())
+
+        # Stations and a period
+        ids = expected.get_ids()[1:3]
+        df = dataset.component_to_dataframe(comp_type, ids, "2001-01", "2001-03")
+        assert list(df.columns) == ids
+        assert str(df.index[0]).startswith("2001-01")
+        assert str(df.index[-1]).startswith("2001-03")
+        first = [str(date) for date in expected.get_dates()].index(str(df.index[0]))
+        np.testing.assert_array_equal(df.to_numpy().T, expected.get_values()[1:3, first:first + len(df.index)])
+
+        # Converted values
+        df = dataset.component_to_dataframe(comp_type, units="CFS" if freq == "M" else "ACFT")
+        assert df.attrs["units"] == ("CFS" if freq == "M" else "ACFT")
@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSetComponent import StateMod_DataSetComponent
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
+
+
+def make_diversion(div_id, cgoto):
+    div = StateMod_Diversion()
+    div.set_id(div_id)
+    div.set_cgoto(cgoto)
+    return div
+
+
+@pytest.fixture
+def component():
+    component = StateMod_DataSetComponent(None, StateMod_DataSetComponentType.DIVERSION_STATIONS)
+    component.set_data([make_diversion("D1", "N1"), make_diversion("D2", "N2"), make_diversion("d1", "N1"),
+                        make_diversion("D3", "N1")])
+    return component
+
+
+def test_lookup(component):
+    data = component.get_data()
+    assert component.lookup("D2") is data[1]
+    # Case is ignored and the first object with a duplicate identifier is found
+    assert component.lookup("d1") is data[0]
+    assert component.lookup("X") is None
+    assert component.lookup(None) is None
+    assert component.get_duplicate_ids() == ["D1"]
+
+
+def test_at_node(component):
+    data = component.get_data()
+    assert component.at_node("n1") == [data[0], data[2], data[3]]
+    assert component.at_node("N2") == [data[1]]
+    assert component.at_node("N9") == []
+
+
+def test_set_id_updates_indexes(component):
+    data = component.get_data()
+    data[0].set_id("D9")
+    assert component.lookup("D9") is data[0]
+    assert component.lookup("D1") is data[2]
+    assert component.get_duplicate_ids() == []
+    data[3].set_id("D2")
+    assert component.lookup("D2") is data[1]
+    assert component.get_duplicate_ids() == ["D2"]
+    # The first object in list order is indexed when an earlier object takes a duplicate identifier
+    data[1].set_id("D8")
+    data[0].set_id("D2")
+    assert component.lookup("D2") is data[0]
+
+
+def test_set_cgoto_keeps_list_order(component):
+    data = component.get_data()
+    data[0].set_cgoto("N2")
+    assert component.at_node("N1") == [data[2], data[3]]
+    assert component.at_node("N2") == [data[0], data[1]]
+    data[0].set_cgoto("N1")
+    assert component.at_node("N1") == [data[0], data[2], data[3]]
+    assert component.at_node("N2") == [data[1]]
+
+
+def test_direct_list_edits(component):
+    data = component.get_data()
+    # Changes in length are detected
+    data.append(make_diversion("D4", "N4"))
+    assert component.lookup("D4") is data[4]
+    assert component.at_node("N4") == [data[4]]
+    # An element replaced in place is only found after the indexes are rebuilt
+    data[1] = make_diversion("D5", "N5")
+    assert component.lookup("D5") is None
+    component.rebuild_indexes()
+    assert component.lookup("D5") is data[1]
+    assert component.lookup("D2") is None
+
+
+def test_add_and_remove_data_object(component):
+    data = component.get_data()
+    div = make_diversion("D6", "N1")
+    component.add_data_object(div)
+    assert component.lookup("D6") is div
+    assert component.at_node("N1")[-1] is div
+    first = data[0]
+    assert component.remove_data_object(first)
+    assert first.component is None
+    assert component.lookup("D1") is data[1]
+    assert component.get_duplicate_ids() == []
+    assert not component.remove_data_object(first)
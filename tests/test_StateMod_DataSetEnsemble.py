@@ -0,0 +1,63 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetEnsemble import StateMod_DataSetEnsemble
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+
+
+@pytest.fixture
+def ensemble_datasets(tmp_path):
+    generator = StateMod_DataSetGenerator(node_count=30, diversion_count=10, stream_gage_count=3,
+                                          start_year=2000, end_year=2000)
+    response_file = generator.generate(str(tmp_path), "scenario")
+    response_files = [response_file]
+    for name in ["scenario_b", "scenario_c"]:
+        copy = str(tmp_path / (name + ".rsp"))
+        shutil.copy(response_file, copy)
+        response_files.append(copy)
+    ensemble = StateMod_DataSetEnsemble(response_files)
+    return ensemble.read(True, False)
+
+
+def get_diversion_components(datasets):
+    return [dataset.get_component_for_component_type(StateMod_DataSetComponentType.DIVERSION_STATIONS)
+            for dataset in datasets]
+
+
+def test_shared_objects_edit_updates_every_scenario(ensemble_datasets):
+    components = get_diversion_components(ensemble_datasets)
+    assert all(component.get_data() is components[0].get_data() for component in components)
+    diversion = components[0].get_data()[0]
+    old_id = diversion.get_id()
+    old_cgoto = diversion.get_cgoto()
+
+    # Edit an object obtained from the first scenario
+    assert components[0].lookup(old_id) is diversion
+    diversion.set_id("EDITED_ID")
+    diversion.set_cgoto("EDITED_NODE")
+
+    for component in components:
+        assert component.lookup("EDITED_ID") is diversion
+        assert component.lookup(old_id) is None
+        assert component.at_node("EDITED_NODE") == [diversion]
+        assert diversion not in component.at_node(old_cgoto)
+
+
+def test_replaced_data_stops_sharing(ensemble_datasets):
+    components = get_diversion_components(ensemble_datasets)
+    shared = components[0].get_data()
+    diversion = shared[1]
+    old_id = diversion.get_id()
+
+    # The first scenario replaces its data, the others continue to share the parsed list
+    components[0].set_data([])
+    diversion.set_id("EDITED_ID")
+
+    assert components[0].lookup("EDITED_ID") is None
+    for component in components[1:]:
+        assert component.lookup("EDITED_ID") is diversion
+        assert component.lookup(old_id) is None
@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+
+MONTHLY_COUNTS = {
+    StateMod_DataSetComponentType.RIVER_NETWORK: 20,
+    StateMod_DataSetComponentType.STREAMGAGE_STATIONS: 3,
+    StateMod_DataSetComponentType.DIVERSION_STATIONS: 5,
+    StateMod_DataSetComponentType.DIVERSION_RIGHTS: 15,
+    StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY: 4,
+    StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY: 3,
+    StateMod_DataSetComponentType.DEMAND_TS_MONTHLY: 5
+}
+
+DAILY_COUNTS = {
+    StateMod_DataSetComponentType.DELAY_TABLES_DAILY: 4,
+    StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY: 3,
+    StateMod_DataSetComponentType.DEMAND_TS_DAILY: 5
+}
+
+
+def read_generated(directory, daily):
+    generator = StateMod_DataSetGenerator(node_count=20, diversion_count=5, rights_per_diversion=3,
+                                          return_flows_per_diversion=2, stream_gage_count=3, delay_table_count=4,
+                                          start_year=2000, end_year=2001, daily=daily)
+    response_file = generator.generate(str(directory), "generated")
+    assert response_file == directory / "generated.rsp"
+    dataset = StateMod_DataSet()
+    # The returned path is passed to the reader as is
+    dataset.read_statemod_file(response_file, True, True, False, None)
+    return dataset
+
+
+def get_count(dataset, comp_type):
+    comp = dataset.get_component_for_component_type(comp_type)
+    if (comp is None) or (not isinstance(comp.get_data(), list)):
+        return 0
+    return len(comp.get_data())
+
+
+@pytest.mark.parametrize("daily", [False, True])
+def test_generated_data_set_is_read(tmp_path, daily):
+    dataset = read_generated(tmp_path, daily)
+    for comp_type, count in MONTHLY_COUNTS.items():
+        assert get_count(dataset, comp_type) == count, comp_type
+    for comp_type, count in DAILY_COUNTS.items():
+        assert get_count(dataset, comp_type) == (count if daily else 0), comp_type
+    diversions = dataset.get_component_for_component_type(StateMod_DataSetComponentType.DIVERSION_STATIONS)
+    assert all(len(div.get_return_flows()) == 2 for div in diversions.get_data())
+    assert dataset.check_integrity() == []
+
+
+def test_same_seed_writes_same_files(tmp_path):
+    generator = StateMod_DataSetGenerator(node_count=20, diversion_count=5, stream_gage_count=3,
+                                          start_year=2000, end_year=2000)
+    first = generator.generate(str(tmp_path / "a"), "generated")
+    second = generator.generate(str(tmp_path / "b"), "generated")
+    for extension in [".rin", ".ris", ".dds", ".ddr", ".dly", ".xbm", ".ddm"]:
+        assert first.with_suffix(extension).read_text() == second.with_suffix(extension).read_text()
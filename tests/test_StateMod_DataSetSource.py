@@ -0,0 +1,108 @@
+import gzip
+import os
+import zipfile
+
+import pytest
+
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+COUNTS = {
+    StateMod_DataSetComponentType.RIVER_NETWORK: 20,
+    StateMod_DataSetComponentType.STREAMGAGE_STATIONS: 3,
+    StateMod_DataSetComponentType.DIVERSION_STATIONS: 5,
+    StateMod_DataSetComponentType.DIVERSION_RIGHTS: 10,
+    StateMod_DataSetComponentType.DEMAND_TS_MONTHLY: 5
+}
+
+
+@pytest.fixture
+def files(tmp_path):
+    """
+    Generate a small data set and return its files as name -> bytes, with the demand time series compressed.
+    """
+    directory = tmp_path / "generated"
+    StateMod_DataSetGenerator(node_count=20, diversion_count=5, stream_gage_count=3,
+                              start_year=2000, end_year=2000).generate(str(directory), "source")
+    files = {}
+    for name in os.listdir(str(directory)):
+        data = (directory / name).read_bytes()
+        if name.endswith(".ddm"):
+            files["data/" + name + ".gz"] = gzip.compress(data)
+        else:
+            files["data/" + name] = data
+    return files
+
+
+@pytest.fixture(params=["zip", "bytes"])
+def source(request, tmp_path, files):
+    if request.param == "zip":
+        zip_filename = str(tmp_path / "source.zip")
+        with zipfile.ZipFile(zip_filename, "w") as z:
+            for name, data in files.items():
+                z.writestr(name, data)
+        source = StateMod_DataSetSource.from_zip(zip_filename)
+        assert source.root == os.path.abspath(zip_filename)
+    else:
+        source = StateMod_DataSetSource.from_bytes(files)
+    yield source
+    source.close()
+
+
+def test_member_paths(source, files):
+    assert sorted(source.get_file_names()) == sorted(files)
+    assert source.get_response_file_names() == ["data/source.rsp"]
+    path = source.get_path("data/source.rin")
+    assert str(path).startswith(source.root + os.sep)
+    assert StateMod_DataSetSource.find_source(path) is source
+    assert StateMod_DataSetSource.find_source(source.root) is None
+    assert StateMod_DataSetSource.find_source(os.path.dirname(source.root) + os.sep + "other") is None
+
+    # StateMod_Util resolves member paths with the source
+    assert StateMod_Util.file_exists(path)
+    assert not StateMod_Util.file_exists(source.get_path("data/missing.rin"))
+    assert StateMod_Util.get_file_size(path) == len(files["data/source.rin"])
+    with StateMod_Util.open_file(path) as f:
+        assert f.read() == files["data/source.rin"].decode()
+    with StateMod_Util.open_file(path, "rb") as f:
+        f.seek(10)
+        assert f.read() == files["data/source.rin"][10:]
+    with pytest.raises(FileNotFoundError):
+        StateMod_Util.open_file(source.get_path("data/missing.rin"))
+
+    # Compressed members are found and decompressed
+    demand = str(source.get_path("data/source.ddm"))
+    assert StateMod_Util.find_file(demand) == demand + ".gz"
+    with StateMod_Util.open_file(demand + ".gz") as f:
+        text = f.read()
+    assert text == gzip.decompress(files["data/source.ddm.gz"]).decode()
+
+
+def test_read_data_set(source):
+    pytest.importorskip("RTi")
+    dataset = source.read_data_set()
+    for comp_type, count in COUNTS.items():
+        assert len(dataset.get_component_for_component_type(comp_type).get_data()) == count, comp_type
+    assert dataset.check_integrity() == []
+
+
+def test_read_data_set_needs_one_response_file(files):
+    pytest.importorskip("RTi")
+    files["data/other.rsp"] = files["data/source.rsp"]
+    with StateMod_DataSetSource.from_bytes(files) as source:
+        with pytest.raises(ValueError):
+            source.read_data_set()
+
+
+def test_close_unregisters(files):
+    source = StateMod_DataSetSource.from_bytes(files, root=os.path.join(os.path.abspath(os.sep), "memory_test"))
+    path = source.get_path("data/source.rin")
+    assert StateMod_Util.file_exists(path)
+    source.close()
+    assert StateMod_DataSetSource.find_source(path) is None
+    assert source.root not in StateMod_DataSetSource.sources
+    assert not StateMod_Util.file_exists(path)
+    # Closing again does nothing
+    source.close()
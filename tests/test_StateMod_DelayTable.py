@@ -0,0 +1,25 @@
+import pytest
+
+from DWR.StateMod.StateMod_DelayTable import StateMod_DelayTable
+
+
+def write_file(tmp_path, text):
+    filename = str(tmp_path / "test.dly")
+    with open(filename, "w") as f:
+        f.write(text)
+    return filename
+
+
+def test_variable_length_tables(tmp_path):
+    filename = write_file(tmp_path, "# Delay tables\n1 3 50.0 30.0\n20.0\n2 2 60.0 40.0\n")
+    delays = StateMod_DelayTable.read_statemod_file(filename, True, -1)
+    assert [delay.get_id() for delay in delays] == ["1", "2"]
+    assert delays[0].ret_val == [50.0, 30.0, 20.0]
+    assert delays[1].ret_val == [60.0, 40.0]
+    assert delays[0].get_units() == "PERCENT"
+
+
+def test_malformed_file_raises(tmp_path):
+    filename = write_file(tmp_path, "1 3 50.0 thirty 20.0\n")
+    with pytest.raises(ValueError):
+        StateMod_DelayTable.read_statemod_file(filename, True, -1)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_DelayTableArray import StateMod_DelayTableArray
+
+# Percent tables of different lengths, including a long table and a table with zeros
+PERCENT_TABLES = {"1": [50.0, 30.0, 20.0], "2": [100.0], "3": [2.5] * 40, "4": [0.0, 60.0, 0.0, 40.0, 0.0]}
+
+# Fraction tables
+FRACTION_TABLES = {"1": [0.75, 0.25], "2": [0.04] * 25}
+
+
+def read_tables(tmp_path, tables, interv):
+    """
+    Write tables in the variable length format (interv < 0) and read them.
+    """
+    filename = str(tmp_path / "test.dly")
+    with open(filename, "w") as f:
+        for table_id, values in tables.items():
+            f.write("{} {}\n".format(table_id, len(values)))
+            # Continue long tables on following lines
+            for i in range(0, len(values), 12):
+                f.write(" ".join(str(value) for value in values[i:i + 12]) + "\n")
+    return StateMod_DelayTableArray.read_statemod_file(filename, True, interv)
+
+
+def convolve_by_row(values, kernel):
+    return np.array([np.convolve(row, kernel)[:values.shape[1]] for row in values])
+
+
+@pytest.mark.parametrize("tables, interv, scale", [(PERCENT_TABLES, -1, 100.0), (FRACTION_TABLES, -100, 1.0)])
+@pytest.mark.parametrize("fft_length_factor", [0, 1000000])
+def test_convolution_paths_match_numpy(tmp_path, monkeypatch, tables, interv, scale, fft_length_factor):
+    # A factor of 0 always uses the FFT and a large factor always uses direct convolution
+    monkeypatch.setattr(StateMod_DelayTableArray, "FFT_LENGTH_FACTOR", fft_length_factor)
+    delay_tables = read_tables(tmp_path, tables, interv)
+    rng = np.random.default_rng(0)
+    values = rng.gamma(1.0, 10.0, (7, 60))
+    table_ids = [list(tables)[i % len(tables)] for i in range(7)]
+    lagged = delay_tables.lag(values, table_ids)
+    for i, table_id in enumerate(table_ids):
+        kernel = np.array(tables[table_id]) / scale
+        np.testing.assert_allclose(delay_tables.get_table(table_id), kernel)
+        np.testing.assert_allclose(lagged[i], convolve_by_row(values[i:i + 1], kernel)[0], atol=1e-10)
+
+
+@pytest.mark.parametrize("fft_length_factor", [0, 1000000])
+def test_table_longer_than_period(monkeypatch, fft_length_factor):
+    monkeypatch.setattr(StateMod_DelayTableArray, "FFT_LENGTH_FACTOR", fft_length_factor)
+    values = np.array([[10.0, 0.0, 5.0], [1.0, 2.0, 3.0]])
+    kernel = np.array([0.1, 0.2, 0.3, 0.4, 0.0])
+    np.testing.assert_allclose(StateMod_DelayTableArray.convolve_rows(values, kernel),
+                               convolve_by_row(values, kernel), atol=1e-12)
+
+
+def test_lag_by_table_and_unknown_table(tmp_path):
+    delay_tables = read_tables(tmp_path, PERCENT_TABLES, -1)
+    values = np.ones((2, 5))
+    lagged = delay_tables.lag_by_table({1: values, "02": values})
+    np.testing.assert_allclose(lagged, convolve_by_row(values, [0.5, 0.3, 0.2]) + values)
+    with pytest.raises(ValueError):
+        delay_tables.lag(values, [1, 9])
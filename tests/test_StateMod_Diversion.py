@@ -0,0 +1,48 @@
+import logging
+
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
+from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
+
+
+def make_diversion(div_id):
+    div = StateMod_Diversion()
+    div.set_id(div_id)
+    return div
+
+
+def make_right(right_id, cgoto):
+    right = StateMod_DiversionRight()
+    right.set_id(right_id)
+    right.set_cgoto(cgoto)
+    return right
+
+
+def test_connect_all_rights(caplog):
+    diversions = [make_diversion("0100501"), make_diversion("0100502"), make_diversion("0100503_D")]
+    rights = [make_right("0100501.01", "0100501"), make_right("0100503.01", "0100503_d"),
+              make_right("0100501.02", "0100501"), make_right("0100599.01", "0100599"),
+              make_right("0100503.02", "0100503_D"), make_right("0100598.01", "0100598")]
+    # Previously connected rights are replaced
+    diversions[1].rights = [rights[0]]
+    with caplog.at_level(logging.WARNING):
+        orphan_rights = StateMod_Diversion.connect_all_rights(diversions, rights)
+    assert diversions[0].get_rights() == [rights[0], rights[2]]
+    assert diversions[1].get_rights() == []
+    # Identifiers that differ only in case match, and the rights stay in list order
+    assert diversions[2].get_rights() == [rights[1], rights[4]]
+    assert orphan_rights == [rights[3], rights[5]]
+    assert "2 diversion rights do not have a matching diversion station" in caplog.text
+
+
+def test_connect_all_rights_matches_connect_rights():
+    diversions = [make_diversion("A"), make_diversion("b")]
+    rights = [make_right("A.01", "a"), make_right("B.01", "B"), make_right("A.02", "A")]
+    assert StateMod_Diversion.connect_all_rights(diversions, rights) == []
+    for div in diversions:
+        connected = div.get_rights()
+        div.connect_rights(rights)
+        assert div.get_rights() == connected
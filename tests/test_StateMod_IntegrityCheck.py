@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+from DWR.StateMod.StateMod_IntegrityFinding import StateMod_IntegrityFinding
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    generator = StateMod_DataSetGenerator(node_count=20, diversion_count=5, stream_gage_count=2,
+                                          start_year=2000, end_year=2000)
+    response_file = generator.generate(str(tmp_path), "integrity")
+    dataset = StateMod_DataSet()
+    dataset.read_statemod_file(response_file, True, True, False, None)
+    return dataset
+
+
+def get_data(dataset, comp_type):
+    return dataset.get_component_for_component_type(comp_type).get_data()
+
+
+def test_generated_data_set_has_no_findings(dataset):
+    assert dataset.check_integrity() == []
+
+
+def test_findings(dataset):
+    diversions = get_data(dataset, StateMod_DataSetComponentType.DIVERSION_STATIONS)
+    rights = get_data(dataset, StateMod_DataSetComponentType.DIVERSION_RIGHTS)
+    gages = get_data(dataset, StateMod_DataSetComponentType.STREAMGAGE_STATIONS)
+    demands = get_data(dataset, StateMod_DataSetComponentType.DEMAND_TS_MONTHLY)
+
+    # Missing cgoto
+    diversions[0].set_cgoto("NO_NODE")
+    # Unresolved crtnid
+    diversions[1].get_return_flows()[0].set_crtnid("NO_RETURN_NODE")
+    # Orphan right
+    rights[0].set_cgoto("NO_STATION")
+    # Duplicate identifier
+    gages[0].set_id(gages[1].get_id())
+    # Missing demand time series
+    missing_demand_id = diversions[4].get_id()
+    demands[:] = [ts for ts in demands if ts.get_identifier().get_location() != missing_demand_id]
+
+    findings = dataset.check_integrity(max_workers=2)
+    found = [(finding.get_check(), finding.get_severity(), finding.get_component_type(), finding.get_id(),
+              finding.get_related_id()) for finding in findings]
+    error = StateMod_IntegrityFinding.SEVERITY_ERROR
+    # Findings are in check order
+    assert found == [
+        ("UniqueIDs", error, StateMod_DataSetComponentType.STREAMGAGE_STATIONS, gages[1].get_id(), None),
+        ("DiversionNodeInNetwork", error, StateMod_DataSetComponentType.DIVERSION_STATIONS,
+         diversions[0].get_id(), "NO_NODE"),
+        ("ReturnFlowNodeInNetwork", error, StateMod_DataSetComponentType.DIVERSION_STATIONS,
+         diversions[1].get_id(), "NO_RETURN_NODE"),
+        ("DiversionRightHasStation", error, StateMod_DataSetComponentType.DIVERSION_RIGHTS,
+         rights[0].get_id(), "NO_STATION"),
+        ("DiversionHasTimeSeries", StateMod_IntegrityFinding.SEVERITY_WARNING,
+         StateMod_DataSetComponentType.DIVERSION_STATIONS, missing_demand_id, None)
+    ]
+    assert "demand (monthly)" in findings[-1].get_message()
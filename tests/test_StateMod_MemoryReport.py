@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSet import StateMod_DataSet
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DataSetGenerator import StateMod_DataSetGenerator
+
+# Components that are read from their own file in a generated daily data set
+READ_COMPONENT_TYPES = [
+    StateMod_DataSetComponentType.STREAMGAGE_STATIONS,
+    StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_MONTHLY,
+    StateMod_DataSetComponentType.STREAMGAGE_NATURAL_FLOW_TS_DAILY,
+    StateMod_DataSetComponentType.DELAY_TABLES_MONTHLY,
+    StateMod_DataSetComponentType.DELAY_TABLES_DAILY,
+    StateMod_DataSetComponentType.DIVERSION_STATIONS,
+    StateMod_DataSetComponentType.DIVERSION_RIGHTS,
+    StateMod_DataSetComponentType.DEMAND_TS_MONTHLY,
+    StateMod_DataSetComponentType.DEMAND_TS_DAILY,
+    StateMod_DataSetComponentType.RIVER_NETWORK
+]
+
+
+@pytest.fixture
+def response_file(tmp_path):
+    generator = StateMod_DataSetGenerator(node_count=20, diversion_count=5, stream_gage_count=3,
+                                          start_year=2000, end_year=2000, daily=True)
+    return generator.generate(str(tmp_path), "memory")
+
+
+def read_dataset(response_file, trace_memory):
+    dataset = StateMod_DataSet()
+    dataset.read_statemod_file(response_file, True, True, False, None, trace_memory=trace_memory)
+    return dataset
+
+
+def test_memory_report_rows(response_file):
+    dataset = read_dataset(response_file, True)
+    rows = {row["component_type"]: row for row in dataset.memory_report().get_component_rows()}
+    for comp_type in READ_COMPONENT_TYPES:
+        row = rows[comp_type]
+        data = dataset.get_component_for_component_type(comp_type).get_data()
+        assert row["component_name"] == comp_type.name
+        assert row["object_count"] == len(data)
+        assert row["deep_bytes"] > 0
+        assert row["shared_with"] is None
+        # Every component that is read is traced
+        assert row["traced_peak_bytes"] is not None, comp_type
+        assert row["traced_peak_bytes"] >= row["traced_retained_bytes"]
+        assert row["traced_peak_bytes"] > 0
+    assert sorted(dataset.memory_trace) == sorted(comp_type.name for comp_type in READ_COMPONENT_TYPES)
+
+    # Stream estimate time series are the stream gage time series, which are only counted once
+    row = rows[StateMod_DataSetComponentType.STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY]
+    assert row["shared_with"] == "STREAMGAGE_NATURAL_FLOW_TS_MONTHLY"
+    assert row["object_count"] == 3
+    assert row["deep_bytes"] == 0
+    assert row["traced_peak_bytes"] is None
+
+    report = dataset.memory_report()
+    assert report.get_total_bytes() == sum(row["deep_bytes"] for row in rows.values())
+    assert report.get_object_type_rows()["StateMod_Diversion"]["object_count"] == 5
+    text = report.to_string()
+    assert "STREAMGAGE_STATIONS" in text
+    assert "STREAMESTIMATE_NATURAL_FLOW_TS_MONTHLY (shared with" in text
+
+
+def test_memory_report_without_trace(response_file):
+    dataset = read_dataset(response_file, False)
+    rows = dataset.memory_report().get_component_rows()
+    assert len(rows) > 0
+    assert all(row["traced_peak_bytes"] is None for row in rows)
+    assert all(row["traced_retained_bytes"] is None for row in rows)
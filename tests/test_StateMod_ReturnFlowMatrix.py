@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_Diversion import StateMod_Diversion
+from DWR.StateMod.StateMod_ReturnFlow import StateMod_ReturnFlow
+from DWR.StateMod.StateMod_ReturnFlowMatrix import StateMod_ReturnFlowMatrix
+
+NODE_IDS = ["N1", "N2", "N3", "N4"]
+
+# Structure -> list of (return node, percent, delay table)
+RETURNS = {
+    "S1": [("N1", 60.0, 1), ("N2", 40.0, 2)],
+    "S2": [("N2", 50.0, 1), ("n2", 30.0, 1), ("N3", 20.0, 2)],
+    "S3": [("N4", 100.0, 3)],
+    "S4": [("X", 100.0, 1)]
+}
+
+
+def make_structures():
+    structures = []
+    for structure_id, returns in RETURNS.items():
+        div = StateMod_Diversion()
+        div.set_id(structure_id)
+        for crtnid, pcttot, irtndl in returns:
+            return_flow = StateMod_ReturnFlow(StateMod_DataSetComponentType.DIVERSION_STATIONS)
+            return_flow.set_crtnid(crtnid)
+            return_flow.set_pcttot(pcttot)
+            return_flow.set_irtndl(irtndl)
+            div.add_return_flow(return_flow)
+        structures.append(div)
+    return structures
+
+
+def apply_by_hand(values, delay_table_id):
+    """
+    Route each return separately, as the percent of the structure's return amount.
+    """
+    result = np.zeros((len(NODE_IDS),) + values.shape[1:])
+    for row, returns in enumerate(RETURNS.values()):
+        for crtnid, pcttot, irtndl in returns:
+            if (irtndl == delay_table_id) and (crtnid.upper() in NODE_IDS):
+                result[NODE_IDS.index(crtnid.upper())] += values[row] * pcttot / 100.0
+    return result
+
+
+@pytest.fixture
+def matrix():
+    return StateMod_ReturnFlowMatrix.build(make_structures(), NODE_IDS)
+
+
+def test_build(matrix):
+    assert matrix.get_delay_table_ids() == [1, 2, 3]
+    assert matrix.unmatched_returns == [("S4", "X")]
+    np.testing.assert_allclose(matrix.get_total_percent(), [100.0, 100.0, 100.0, 0.0])
+    # Duplicate returns to the same node with the same delay table are combined
+    indptr, indices, data = matrix.matrices[1]
+    assert list(indptr) == [0, 1, 2, 2, 2]
+    np.testing.assert_allclose(data, [0.6, 0.8])
+    # The column routing is computed once, in column order
+    rows, weights, starts, columns = matrix.routings[2]
+    assert list(columns) == [1, 2]
+    assert list(rows) == [0, 1]
+
+
+@pytest.mark.parametrize("shape", [(4,), (4, 3)])
+def test_apply_matches_hand_computation(matrix, shape):
+    values = np.arange(1.0, np.prod(shape) + 1.0).reshape(shape)
+    results = matrix.apply(values)
+    assert sorted(results) == [1, 2, 3]
+    for delay_table_id in [1, 2, 3]:
+        np.testing.assert_allclose(results[delay_table_id], apply_by_hand(values, delay_table_id))
+        np.testing.assert_allclose(matrix.apply(values, delay_table_id), apply_by_hand(values, delay_table_id))
+    np.testing.assert_allclose(matrix.apply_total(values),
+                               sum(apply_by_hand(values, delay_table_id) for delay_table_id in [1, 2, 3]))
+    # A delay table that is not used returns nothing
+    np.testing.assert_allclose(matrix.apply(values, 9), np.zeros((4,) + shape[1:]))
+
+
+def test_apply_checks_structure_count(matrix):
+    with pytest.raises(ValueError):
+        matrix.apply(np.ones(3))
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_DataSetComponentType import StateMod_DataSetComponentType
+from DWR.StateMod.StateMod_DiversionRight import StateMod_DiversionRight
+from DWR.StateMod.StateMod_RightsTable import StateMod_RightsTable
+
+
+def make_right(right_id, station_id, admin, decree, switch=1):
+    right = StateMod_DiversionRight()
+    right.set_id(right_id)
+    right.set_cgoto(station_id)
+    right.set_irtem(admin)
+    right.set_dcrdiv(decree)
+    right.set_switch(switch)
+    return right
+
+
+@pytest.fixture
+def rights_table():
+    rights = [
+        make_right("R5", "S2", "300.00000", 16.0),
+        make_right("R2", "S1", "200.00000", 2.0),
+        make_right("R6", "S3", "not a number", 32.0),
+        make_right("R3", "S2", "200.00000", 4.0, switch=0),
+        make_right("R1", "s1", "100.00000", 1.0),
+        make_right("R4", "X", "200.00000", 8.0)
+    ]
+    return StateMod_RightsTable([(StateMod_DataSetComponentType.DIVERSION_RIGHTS, rights)], ["S1", "S2", "S3"])
+
+
+def right_ids(rights_table, records):
+    return [right.get_id() for right in rights_table.get_rights(records)]
+
+
+def test_priority_order(rights_table):
+    # Rights with the same administration number stay in the order added
+    assert right_ids(rights_table, rights_table.table) == ["R1", "R2", "R3", "R4", "R5", "R6"]
+    assert list(rights_table.table["station"]) == [0, 0, 1, -1, 1, 2]
+    assert rights_table.get_right(rights_table.table[0]).get_id() == "R1"
+
+
+def test_unparseable_administration_number(rights_table):
+    assert rights_table.table[-1]["admin"] == StateMod_RightsTable.MISSING_ADMINISTRATION_NUMBER
+    assert right_ids(rights_table, rights_table.senior_to(StateMod_RightsTable.MISSING_ADMINISTRATION_NUMBER)) == \
+        ["R1", "R2", "R3", "R4", "R5"]
+
+
+def test_senior_to(rights_table):
+    assert right_ids(rights_table, rights_table.senior_to(100.0)) == []
+    # Rights with an equal administration number are not senior
+    assert right_ids(rights_table, rights_table.senior_to(200.0)) == ["R1"]
+    assert right_ids(rights_table, rights_table.senior_to(200.00001)) == ["R1", "R2", "R3", "R4"]
+
+
+def test_rights_between(rights_table):
+    # Both ends of the range are included
+    assert right_ids(rights_table, rights_table.rights_between(200.0, 200.0)) == ["R2", "R3", "R4"]
+    assert right_ids(rights_table, rights_table.rights_between(100.0, 300.0)) == ["R1", "R2", "R3", "R4", "R5"]
+    assert right_ids(rights_table, rights_table.rights_between(300.5, 400.0)) == []
+    assert rights_table.priority_range(200.0, 300.0) == (1, 5)
+
+
+def test_cumulative_decree_senior_to(rights_table):
+    assert rights_table.cumulative_decree_senior_to(100.0) == 0.0
+    assert rights_table.cumulative_decree_senior_to(200.0) == 1.0
+    # R3 is off and is not included
+    assert rights_table.cumulative_decree_senior_to(300.0) == 1.0 + 2.0 + 8.0
+    assert rights_table.cumulative_decree_senior_to(1.0e6) == 1.0 + 2.0 + 8.0 + 16.0 + 32.0
+
+
+def test_rights_for_station(rights_table):
+    assert right_ids(rights_table, rights_table.rights_for_station("s1")) == ["R1", "R2"]
+    assert right_ids(rights_table, rights_table.rights_for_station("S2")) == ["R3", "R5"]
+    assert right_ids(rights_table, rights_table.rights_for_station("X")) == []
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_RiverNetwork import StateMod_RiverNetwork
+from DWR.StateMod.StateMod_RiverNetworkNode import StateMod_RiverNetworkNode
+
+
+def make_network(downstream_ids):
+    nodes = []
+    for node_id, cstadn in downstream_ids:
+        node = StateMod_RiverNetworkNode()
+        node.set_id(node_id)
+        node.set_cstadn(cstadn)
+        nodes.append(node)
+    return StateMod_RiverNetwork(nodes)
+
+
+@pytest.fixture
+def network():
+    # A and B drain to C, C and E drain to the outlet D, and F drains to a second outlet G
+    return make_network([("A", "C"), ("B", "C"), ("C", "D"), ("D", ""), ("E", "D"), ("F", "G"), ("G", "")])
+
+
+def test_accumulate_upstream(network):
+    gains = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+    np.testing.assert_allclose(network.accumulate_upstream(gains), [1.0, 2.0, 6.0, 15.0, 5.0, 6.0, 13.0])
+    np.testing.assert_allclose(network.accumulate_upstream(gains, include_node=False),
+                               [0.0, 0.0, 3.0, 11.0, 0.0, 0.0, 6.0])
+    # Time series are accumulated for each time step
+    series = np.column_stack((gains, 10.0 * gains))
+    np.testing.assert_allclose(network.accumulate_upstream(series)[:, 1], [10.0, 20.0, 60.0, 150.0, 50.0, 60.0, 130.0])
+    # Missing values propagate downstream
+    gains[0] = np.nan
+    assert np.isnan(network.accumulate_upstream(gains)[[0, 2, 3]]).all()
+    assert not np.isnan(network.accumulate_upstream(gains)[[1, 4, 5, 6]]).any()
+
+
+def test_incremental_gain_inverts_accumulate_upstream(network):
+    gains = np.random.default_rng(0).normal(size=(7, 3))
+    np.testing.assert_allclose(network.incremental_gain(network.accumulate_upstream(gains)), gains)
+    np.testing.assert_allclose(network.incremental_gain(np.array([1.0, 2.0, 6.0, 15.0, 5.0, 6.0, 13.0])),
+                               [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+
+
+def test_is_upstream(network):
+    assert network.is_upstream("A", "C")
+    assert network.is_upstream("A", "D")
+    assert network.is_upstream("E", "D")
+    assert not network.is_upstream("A", "A")
+    assert not network.is_upstream("D", "A")
+    assert not network.is_upstream("A", "E")
+    assert not network.is_upstream("F", "D")
+    assert network.is_downstream("D", "B")
+    assert not network.is_downstream("C", "E")
+    # The Euler tour intervals agree with walking downstream from each node
+    for i in range(network.get_node_count()):
+        downstream = set(network.get_downstream_node_indices(i))
+        for j in range(network.get_node_count()):
+            assert network.is_upstream(i, j) == (j in downstream)
+            assert (network.tin[j] < network.tin[i] < network.tout[j]) == (j in downstream)
+
+
+def test_upstream_mask(network):
+    assert list(network.upstream_mask("C")) == [True, True, False, False, False, False, False]
+    assert list(network.upstream_mask("D")) == [True, True, True, False, True, False, False]
+    assert not network.upstream_mask("A").any()
+    assert sorted(network.get_upstream_node_ids("D")) == ["A", "B", "C", "E"]
+    assert network.get_upstream_node_ids("D", direct_only=True) == ["C", "E"]
+    assert list(network.get_downstream_node_indices("A")) == [2, 3]
+
+
+def test_outlets_and_loops():
+    network = make_network([("A", "X"), ("B", "A")])
+    assert network.unmatched_downstream_ids == ["A"]
+    assert list(network.downstream) == [-1, 0]
+    with pytest.raises(ValueError):
+        make_network([("A", "B"), ("B", "C"), ("C", "A")])
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_TSAggregator import StateMod_TSAggregator
+from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+
+# January 2000 to December 2001
+MONTHS = np.datetime64("2000-01", "M") + np.arange(24)
+
+
+def monthly_values():
+    # Station 0 has the month number as the value, station 1 is ten times station 0
+    values = (np.arange(24) % 12 + 1).astype(np.float64)
+    return np.vstack((values, 10.0 * values))
+
+
+@pytest.mark.parametrize("year_type, periods, first_month", [
+    ("CYR", [2000, 2001], 1),
+    ("WYR", [2000, 2001, 2002], 10),
+    ("IYR", [2000, 2001, 2002], 11),
+    ("Water", [2000, 2001, 2002], 10)
+])
+def test_annual_period_labels(year_type, periods, first_month):
+    aggregator = StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR, year_type)
+    # Periods are labeled with the year in which they end
+    assert list(aggregator.periods) == periods
+    assert aggregator.start_month == first_month
+    assert [str(start) for start in aggregator.period_starts][-1] == "2001-{:02d}".format(first_month)
+
+
+def test_partial_years_are_missing():
+    aggregator = StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR, "WYR")
+    values, periods = aggregator.aggregate(monthly_values(), units="ACFT")
+    assert list(periods) == [2000, 2001, 2002]
+    # Water year 2000 is missing October to December 1999 and 2002 only has October to December 2001
+    assert np.isnan(values[:, 0]).all()
+    assert np.isnan(values[:, 2]).all()
+    np.testing.assert_allclose(values[:, 1], [78.0, 780.0])
+
+    # Allowing the three months before the data
+    values = aggregator.aggregate(monthly_values(), units="ACFT", allowed_missing=3)[0]
+    np.testing.assert_allclose(values[:, 0], [45.0, 450.0])
+    assert np.isnan(values[:, 2]).all()
+
+
+def test_allowed_missing():
+    values = monthly_values()
+    values[0, 13] = np.nan
+    values[0, 14] = -999.0
+    values[1, 20] = -999.0
+    aggregator = StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR, "CYR")
+    result = aggregator.aggregate(values, units="ACFT")[0]
+    np.testing.assert_allclose(result[:, 0], [78.0, 780.0])
+    assert np.isnan(result[:, 1]).all()
+    result = aggregator.aggregate(values, units="ACFT", allowed_missing=1)[0]
+    assert np.isnan(result[0, 1])
+    np.testing.assert_allclose(result[1, 1], 780.0 - 90.0)
+    result = aggregator.aggregate(values, units="ACFT", allowed_missing=2)[0]
+    np.testing.assert_allclose(result[:, 1], [78.0 - 5.0, 780.0 - 90.0])
+    # A period with no values is missing however many missing values are allowed
+    result = aggregator.aggregate(np.full((1, 24), np.nan), units="ACFT", allowed_missing=12)[0]
+    assert np.isnan(result).all()
+
+
+def test_statistic_from_units():
+    aggregator = StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR, "CYR")
+    values = monthly_values()
+    for units in ["ACFT", "af", "AF/M", "IN", "MM"]:
+        assert StateMod_TSAggregator.get_statistic_for_units(units) == StateMod_TSAggregator.STATISTIC_TOTAL
+        np.testing.assert_allclose(aggregator.aggregate(values, units=units)[0][:, 0], [78.0, 780.0])
+    for units in ["CFS", "CMS", "", None]:
+        assert StateMod_TSAggregator.get_statistic_for_units(units) == StateMod_TSAggregator.STATISTIC_MEAN
+        np.testing.assert_allclose(aggregator.aggregate(values, units=units)[0][:, 0], [6.5, 65.0])
+    # A statistic overrides the units
+    np.testing.assert_allclose(aggregator.aggregate(values, StateMod_TSAggregator.STATISTIC_MIN, "ACFT")[0][:, 1],
+                               [1.0, 10.0])
+    np.testing.assert_allclose(aggregator.aggregate(values, StateMod_TSAggregator.STATISTIC_MAX, "ACFT")[0][:, 1],
+                               [12.0, 120.0])
+    # One station as a one-dimensional array
+    np.testing.assert_allclose(aggregator.aggregate(values[0], units="CFS")[0], [6.5, 6.5])
+
+
+def test_daily_to_monthly():
+    # January to March 2000, with 29 days in February
+    days = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-04-01"))
+    values = np.ones((1, len(days)))
+    values[0, 31:60] = 2.0
+    values[0, 60:] = 3.0
+    aggregator = StateMod_TSAggregator(days, True, StateMod_TSAggregator.INTERVAL_MONTH)
+    assert [str(period) for period in aggregator.periods] == ["2000-01", "2000-02", "2000-03"]
+    assert list(aggregator.expected_counts) == [31, 29, 31]
+    np.testing.assert_allclose(aggregator.aggregate(values, units="ACFT")[0], [[31.0, 58.0, 93.0]])
+    np.testing.assert_allclose(aggregator.aggregate(values, units="CFS")[0], [[1.0, 2.0, 3.0]])
+
+    # A missing day
+    values[0, 40] = -999.0
+    result = aggregator.aggregate(values, units="CFS")[0]
+    assert np.isnan(result[0, 1])
+    result = aggregator.aggregate(values, units="CFS", allowed_missing=1)[0]
+    np.testing.assert_allclose(result, [[1.0, 2.0, 3.0]])
+    result = aggregator.aggregate(values, units="ACFT", allowed_missing=1)[0]
+    np.testing.assert_allclose(result, [[31.0, 56.0, 93.0]])
+
+    # A partial first month
+    aggregator = StateMod_TSAggregator(days[10:], True, StateMod_TSAggregator.INTERVAL_MONTH)
+    result = aggregator.aggregate(values[:, 10:], units="CFS")[0]
+    assert np.isnan(result[0, 0])
+    np.testing.assert_allclose(aggregator.aggregate(values[:, 10:], units="CFS", allowed_missing=10)[0][0, 0], 1.0)
+
+
+def test_daily_to_annual():
+    # Water year 2001 is October 2000 to September 2001, 365 days
+    days = np.arange(np.datetime64("2000-10-01"), np.datetime64("2001-10-01"))
+    aggregator = StateMod_TSAggregator(days, True, StateMod_TSAggregator.INTERVAL_YEAR, "WYR")
+    assert list(aggregator.periods) == [2001]
+    assert list(aggregator.expected_counts) == [365]
+    np.testing.assert_allclose(aggregator.aggregate(np.ones(len(days)), units="ACFT")[0], [365.0])
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_MONTH)
+    with pytest.raises(ValueError):
+        StateMod_TSAggregator(MONTHS, False, "Week")
+    with pytest.raises(ValueError):
+        StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR, "XYR")
+    aggregator = StateMod_TSAggregator(MONTHS, False, StateMod_TSAggregator.INTERVAL_YEAR)
+    with pytest.raises(ValueError):
+        aggregator.aggregate(monthly_values(), "Median")
+
+
+def test_ts_array_aggregate():
+    ts_array = StateMod_TSArray(["A", "B"], MONTHS, monthly_values(), "ACFT", False, None, "WYR")
+    # The year type of the array is used by default
+    values, periods, ids = ts_array.aggregate(StateMod_TSAggregator.INTERVAL_YEAR)
+    assert list(periods) == [2000, 2001, 2002]
+    assert ids == ["A", "B"]
+    np.testing.assert_allclose(values[:, 1], [78.0, 780.0])
+    values, periods, ids = ts_array.aggregate(StateMod_TSAggregator.INTERVAL_YEAR, "CYR", ids="B")
+    assert list(periods) == [2000, 2001]
+    assert ids == ["B"]
+    np.testing.assert_allclose(values, [[780.0, 780.0]])
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("RTi")
+
+from DWR.StateMod.StateMod_TS import StateMod_TS
+from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+
+import ts_writer
+
+IDS = ["0901", "0902", "1001", "0903"]
+
+
+@pytest.fixture
+def monthly_values():
+    values = np.round(np.random.default_rng(0).uniform(0.0, 500.0, (len(IDS), 24)), 2)
+    values[1, 5] = np.nan
+    return values
+
+
+def read_with_statemod_ts(filename, is_daily):
+    """
+    Read the file with StateMod_TS and return the identifiers and an array of the values.
+    """
+    tslist = StateMod_TS.read_time_series_list(filename, None, None, None, True)
+    ts_array = StateMod_TSArray.from_ts_list(tslist, is_daily)
+    return [ts.get_identifier().get_location() for ts in tslist], ts_array
+
+
+@pytest.mark.parametrize("year_type, first_date, last_date", [
+    ("CYR", "2001-01", "2002-12"),
+    ("WYR", "2000-10", "2002-09"),
+    ("IYR", "2000-11", "2002-10")
+])
+def test_read_monthly(tmp_path, monthly_values, year_type, first_date, last_date):
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, IDS, monthly_values, 2001, year_type)
+    ts_array = StateMod_TSArray.read_statemod_file(filename)
+    assert not ts_array.is_daily
+    assert ts_array.year_type == year_type
+    assert ts_array.units == "ACFT"
+    assert ts_array.get_ids() == IDS
+    dates = ts_array.get_dates()
+    assert (str(dates[0]), str(dates[-1]), len(dates)) == (first_date, last_date, 24)
+    # The missing value is kept as -999, as in StateMod_TS
+    np.testing.assert_array_equal(ts_array.get_values(), np.where(np.isnan(monthly_values), -999.0, monthly_values))
+
+    ts_ids, expected = read_with_statemod_ts(filename, False)
+    assert ts_ids == IDS
+    np.testing.assert_array_equal(ts_array.get_dates(), expected.get_dates())
+    np.testing.assert_array_equal(ts_array.get_values(), expected.get_values())
+
+
+def test_read_daily(tmp_path):
+    day_count = ts_writer.get_day_count(2000, 2)
+    values = np.round(np.random.default_rng(1).uniform(0.0, 50.0, (2, day_count)), 2)
+    values[0, 59] = np.nan
+    filename = str(tmp_path / "test.ddd")
+    ts_writer.write_daily(filename, IDS[:2], values, 2000)
+    ts_array = StateMod_TSArray.read_statemod_file(filename)
+    assert ts_array.is_daily
+    dates = ts_array.get_dates()
+    # The leap day is included and the padding after shorter months is not
+    assert (str(dates[0]), str(dates[59]), str(dates[-1]), len(dates)) == \
+        ("2000-01-01", "2000-02-29", "2001-12-31", 731)
+    np.testing.assert_array_equal(ts_array.get_values(), np.where(np.isnan(values), -999.0, values))
+
+    ts_ids, expected = read_with_statemod_ts(filename, True)
+    assert ts_ids == IDS[:2]
+    np.testing.assert_array_equal(ts_array.get_dates(), expected.get_dates())
+    np.testing.assert_array_equal(ts_array.get_values(), expected.get_values())
+
+
+def test_query(tmp_path, monthly_values):
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, IDS, monthly_values, 2001)
+    ts_array = StateMod_TSArray.read_statemod_file(filename)
+
+    # Contiguous stations are a view of the array
+    values, dates, ids = ts_array.query(["0901", "0902"], "2001-03", "2001-05")
+    assert ids == ["0901", "0902"]
+    assert [str(date) for date in dates] == ["2001-03", "2001-04", "2001-05"]
+    assert np.shares_memory(values, ts_array.get_values())
+    np.testing.assert_array_equal(values, ts_array.get_values()[:2, 2:5])
+    values, dates, ids = ts_array.query(["0902", "1001"])
+    assert np.shares_memory(values, ts_array.get_values())
+    values = ts_array.query()[0]
+    assert np.shares_memory(values, ts_array.get_values())
+    assert values.shape == (4, 24)
+
+    # Stations that are not contiguous rows are copied
+    values, dates, ids = ts_array.query(["0903", "0901"], end="2001-12")
+    assert ids == ["0903", "0901"]
+    assert len(dates) == 12
+    assert not np.shares_memory(values, ts_array.get_values())
+    np.testing.assert_array_equal(values, ts_array.get_values()[[3, 0], :12])
+
+    # Patterns and identifiers that do not match
+    assert ts_array.match_ids("09*") == [0, 1, 3]
+    assert ts_array.match_ids(["?9?1", "0901"]) == [0]
+    values, dates, ids = ts_array.query("X*")
+    assert ids == []
+    assert values.shape == (0, 24)
+    assert ts_array.query(start="2003-01")[0].shape == (4, 0)
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+from DWR.StateMod.StateMod_TSFill import StateMod_TSFill
+
+import ts_writer
+
+# January 2000 to December 2001
+MONTHS = np.datetime64("2000-01", "M") + np.arange(24)
+
+
+def test_get_missing():
+    values = np.array([1.0, np.nan, -999.0, -999.05, -998.8, -1000.0, 0.0])
+    np.testing.assert_array_equal(StateMod_TSFill.get_missing(values),
+                                  [False, True, True, True, False, False, False])
+
+
+@pytest.mark.parametrize("count", [1, 7, 8, 9, 24, 366])
+def test_pack_unpack_round_trip(count):
+    missing = np.random.default_rng(count).random((3, count)) < 0.3
+    packed = StateMod_TSFill.pack_missing(missing)
+    assert packed.dtype == np.uint8
+    assert packed.shape == (3, (count + 7) // 8)
+    np.testing.assert_array_equal(StateMod_TSFill.unpack_missing(packed, count), missing)
+
+
+def test_fill_constant():
+    values = np.array([[1.0, np.nan, -999.0, 4.0]])
+    filled = StateMod_TSFill.fill(values, StateMod_TSFill.FILL_CONSTANT, constant=0.0)
+    np.testing.assert_array_equal(filled, [[1.0, 0.0, 0.0, 4.0]])
+    # The values that are passed in are not modified
+    assert np.isnan(values[0, 1])
+    with pytest.raises(ValueError):
+        StateMod_TSFill.fill(values, StateMod_TSFill.FILL_CONSTANT)
+    with pytest.raises(ValueError):
+        StateMod_TSFill.fill(values, "Median")
+
+
+def test_fill_interpolate():
+    values = np.array([
+        [np.nan, 1.0, np.nan, np.nan, 4.0, -999.0, 6.0, np.nan],
+        [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+        [0.0, np.nan, np.nan, np.nan, np.nan, 10.0, -999.0, 12.0]
+    ])
+    filled = StateMod_TSFill.fill_interpolate(values)
+    # Values before the first and after the last non-missing value are not filled
+    np.testing.assert_allclose(filled[0], [np.nan, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, np.nan])
+    assert np.isnan(filled[1]).all()
+    np.testing.assert_allclose(filled[2], [0.0, 2.0, 4.0, 6.0, 8.0, 10.0, 11.0, 12.0])
+
+    # Gaps longer than max_gap keep the original missing values
+    filled = StateMod_TSFill.fill_interpolate(values, max_gap=2)
+    np.testing.assert_allclose(filled[0], [np.nan, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, np.nan])
+    np.testing.assert_allclose(filled[2, [0, 5, 6, 7]], [0.0, 10.0, 11.0, 12.0])
+    assert np.isnan(filled[2, 1:5]).all()
+    filled = StateMod_TSFill.fill(values, StateMod_TSFill.FILL_INTERPOLATE, max_gap=1)
+    assert np.isnan(filled[0, 2:4]).all()
+    assert filled[0, 5] == 5.0
+
+
+def test_fill_monthly_average():
+    values = np.vstack((np.arange(24, dtype=np.float64), np.full(24, np.nan)))
+    values[0, [1, 13]] = np.nan
+    values[0, 14] = -999.0
+    filled = StateMod_TSFill.fill(values, StateMod_TSFill.FILL_MONTHLY_AVERAGE, MONTHS)
+    # March 2001 is filled with March 2000
+    assert filled[0, 14] == 2.0
+    np.testing.assert_array_equal(np.delete(filled[0], [1, 13, 14]), np.delete(values[0], [1, 13, 14]))
+    # February has no values, so it stays missing
+    assert np.isnan(filled[0, [1, 13]]).all()
+    # A station with no values stays missing
+    assert np.isnan(filled[1]).all()
+
+    # Daily values are grouped by calendar month
+    days = np.arange(np.datetime64("2000-01-30"), np.datetime64("2000-02-03"))
+    filled = StateMod_TSFill.fill_monthly_average(np.array([[1.0, np.nan, 3.0, np.nan]]), days)
+    np.testing.assert_array_equal(filled, [[1.0, 1.0, 3.0, 3.0]])
+
+
+def test_fill_pattern():
+    values = np.arange(24, dtype=np.float64)
+    values[[12, 13]] = [100.0, 200.0]
+    values[[0, 1, 2]] = np.nan
+    pattern = np.where(np.arange(24) < 12, "DRY", "WET")
+    pattern[0] = "WET"
+    filled = StateMod_TSFill.fill(values[np.newaxis, :], StateMod_TSFill.FILL_PATTERN, MONTHS, pattern=pattern)
+    # A "WET" January is filled with the other "WET" Januaries and a "DRY" February with the other "DRY" Februaries
+    assert filled[0, 0] == 100.0
+    # No other "DRY" February or March has a value, so they stay missing
+    assert np.isnan(filled[0, [1, 2]]).all()
+    np.testing.assert_array_equal(filled[0, 3:], values[3:])
+
+    # A pattern for each station
+    values = np.array([[1.0, np.nan, 3.0], [1.0, np.nan, 3.0]])
+    days = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-01-04"))
+    pattern = np.array([["AVG", "AVG", "WET"], ["WET", "WET", "AVG"]])
+    filled = StateMod_TSFill.fill_pattern(values, days, pattern)
+    np.testing.assert_array_equal(filled, [[1.0, 1.0, 3.0], [1.0, 1.0, 3.0]])
+    with pytest.raises(ValueError):
+        StateMod_TSFill.fill(values, StateMod_TSFill.FILL_PATTERN, days)
+
+
+def test_missing_mask_is_used():
+    values = np.array([[1.0, np.nan, 3.0, 4.0]])
+    missing = np.array([[False, True, True, False]])
+    # The mask rather than the values determines which values are filled
+    np.testing.assert_array_equal(StateMod_TSFill.fill_constant(values, 0.0, missing), [[1.0, 0.0, 0.0, 4.0]])
+    np.testing.assert_allclose(StateMod_TSFill.fill_interpolate(values, missing), [[1.0, 2.0, 3.0, 4.0]])
+
+
+def test_ts_array_fill(tmp_path):
+    values = np.round(np.random.default_rng(0).uniform(10.0, 100.0, (2, 24)), 2)
+    values[0, [3, 4]] = np.nan
+    values[1, 20] = np.nan
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, ["A", "B"], values, 2000)
+    ts_array = StateMod_TSArray.read_statemod_file(filename, compute_missing_mask=True)
+    assert ts_array.missing_mask is not None
+    np.testing.assert_array_equal(ts_array.get_missing(), np.isnan(values))
+
+    filled = ts_array.fill(StateMod_TSFill.FILL_INTERPOLATE)
+    assert filled.get_ids() == ts_array.get_ids()
+    np.testing.assert_array_equal(filled.get_dates(), ts_array.get_dates())
+    np.testing.assert_allclose(filled.get_values()[0, 3:5], values[0, 2] + (values[0, 5] - values[0, 2]) *
+                               np.array([1.0, 2.0]) / 3.0)
+    # The array that was filled keeps its -999 values
+    assert (ts_array.get_values() == -999.0).sum() == 3
+
+    # The stored mask is used rather than recomputing it from the values
+    ts_array.missing_mask = StateMod_TSFill.pack_missing(np.zeros((2, 24), dtype=bool))
+    np.testing.assert_array_equal(ts_array.fill(StateMod_TSFill.FILL_CONSTANT, constant=0.0).get_values(),
+                                  ts_array.get_values())
+    ts_array.missing_mask = None
+    filled = ts_array.fill(StateMod_TSFill.FILL_MONTHLY_AVERAGE)
+    assert filled.get_values()[0, 3] == values[0, 15]
+    assert filled.get_values()[1, 20] == values[1, 8]
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+from DWR.StateMod.StateMod_TSStatistics import StateMod_TSStatistics
+
+import ts_writer
+
+IDS = ["A", "B", "C"]
+
+
+def make_monthly_values():
+    """
+    Water years 2000 and 2001:  A has all values, B is missing the first two and the last month and
+    C is missing all values.
+    """
+    values = np.round(np.random.default_rng(0).uniform(-10.0, 100.0, (3, 24)), 2)
+    values[1, [0, 1, 23]] = np.nan
+    values[1, 10] = -999.0
+    values[2, :] = np.nan
+    return values
+
+
+def assert_tables_equal(table, expected):
+    assert list(table["id"]) == list(expected["id"])
+    for field in ["value_count", "count", "missing_count", "first_date", "last_date"]:
+        np.testing.assert_array_equal(table[field], expected[field], err_msg=field)
+    for field in ["total", "mean", "min", "max"]:
+        np.testing.assert_allclose(table[field], expected[field], err_msg=field)
+
+
+def add_lines(ts_array):
+    """
+    Accumulate statistics one data line (12 months or one month of days) at a time, as when a file is read.
+    """
+    statistics = StateMod_TSStatistics(ts_array.is_daily)
+    dates = ts_array.get_dates()
+    if ts_array.is_daily:
+        months = dates.astype("datetime64[M]")
+        line_starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+    else:
+        line_starts = np.arange(0, len(dates), 12)
+    line_ends = list(line_starts[1:]) + [len(dates)]
+    for start, end in zip(line_starts, line_ends):
+        step = int(dates[start].astype(np.int64))
+        for row in range(len(ts_array.get_ids())):
+            statistics.add_values(row, step, ts_array.get_values()[row, start:end].tolist())
+    for row, id in enumerate(ts_array.get_ids()):
+        statistics.set_id(row, id)
+    return statistics
+
+
+@pytest.fixture
+def monthly_file(tmp_path):
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, IDS, make_monthly_values(), 2000, "WYR")
+    return filename
+
+
+@pytest.fixture
+def daily_file(tmp_path):
+    values = np.round(np.random.default_rng(1).uniform(0.0, 50.0, (3, ts_writer.get_day_count(2000, 1))), 2)
+    values[0, :40] = np.nan
+    values[1, 100] = np.nan
+    values[2, :] = np.nan
+    filename = str(tmp_path / "test.ddd")
+    ts_writer.write_daily(filename, IDS, values, 2000)
+    return filename
+
+
+def test_monthly_statistics(monthly_file):
+    ts_array = StateMod_TSArray.read_statemod_file(monthly_file, compute_statistics=True)
+    statistics = ts_array.get_statistics()
+    table = statistics.get_table()
+    values = make_monthly_values()
+
+    a = statistics.lookup("A")
+    assert (a["count"], a["missing_count"], a["value_count"]) == (24, 0, 24)
+    assert a["total"] == pytest.approx(values[0].sum())
+    assert a["min"] == values[0].min()
+    assert a["max"] == values[0].max()
+    # Water year 2000 starts in October 1999
+    assert (str(a["first_date"]), str(a["last_date"])) == ("1999-10", "2001-09")
+
+    b = statistics.lookup("B")
+    assert (b["count"], b["missing_count"]) == (20, 4)
+    assert b["mean"] == pytest.approx(np.nanmean(np.where(values[1] == -999.0, np.nan, values[1])))
+    assert (str(b["first_date"]), str(b["last_date"])) == ("1999-12", "2001-08")
+
+    # A station with no values
+    c = statistics.lookup("C")
+    assert (c["count"], c["missing_count"], c["total"]) == (0, 24, 0.0)
+    assert np.isnan(c["mean"]) and np.isnan(c["min"]) and np.isnan(c["max"])
+    assert np.isnat(c["first_date"]) and np.isnat(c["last_date"])
+    assert statistics.lookup("X") is None
+
+    # Line by line accumulation gives the same table
+    assert_tables_equal(add_lines(ts_array).get_table(), table)
+
+
+def test_daily_statistics(daily_file):
+    ts_array = StateMod_TSArray.read_statemod_file(daily_file, compute_statistics=True)
+    table = ts_array.get_statistics().get_table()
+    assert table.dtype["first_date"] == np.dtype("datetime64[D]")
+    assert list(table["count"]) == [326, 365, 0]
+    assert str(table["first_date"][0]) == "2000-02-10"
+    assert str(table["last_date"][1]) == "2000-12-31"
+    assert np.isnat(table["first_date"][2])
+    assert_tables_equal(add_lines(ts_array).get_table(), table)
+
+
+def test_empty_values():
+    statistics = StateMod_TSStatistics.from_values(["A"], np.array([], dtype="datetime64[M]"), np.zeros((1, 0)))
+    row = statistics.lookup("A")
+    assert row["count"] == 0
+    assert np.isnan(row["mean"])
+    assert np.isnat(row["first_date"])
+
+
+@pytest.mark.parametrize("fixture", ["monthly_file", "daily_file"])
+def test_statemod_ts_statistics(request, fixture):
+    pytest.importorskip("RTi")
+    from DWR.StateMod.StateMod_TS import StateMod_TS
+    filename = request.getfixturevalue(fixture)
+    statistics = StateMod_TSStatistics()
+    StateMod_TS.read_time_series_list(filename, None, None, None, True, statistics=statistics)
+    assert statistics.is_daily == (fixture == "daily_file")
+    assert statistics.get_ids() == IDS
+    expected = StateMod_TSArray.read_statemod_file(filename, compute_statistics=True).get_statistics()
+    assert_tables_equal(statistics.get_table(), expected.get_table())
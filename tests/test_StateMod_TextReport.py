@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+
+from DWR.StateMod.StateMod_TextReport import StateMod_TextReport
+
+REPORT = """ StateMod Diversion Summary
+
+Structure    River                                      Total   River   Carried
+ID           ID           Year Mo    Demand   Divert   Return  Account
+____________ ____________ ____ ____ _______ _______ _______ _______
+0100501      0100502      1950 OCT      10.      5.      1.     ACCT
+0100501      0100502      1950 NOV      20.              2.      7.
+0100501      0100502      1950 DEC      30.      6.
+0100501      0100502      1950 TOT      60.     11.      3.      7.
+0100503      0100502      1950 OCT      40.      8.      4.      9.
+0100503      0100502      1950 NOV      50.      9.      5.     10.
+0100503      0100502      1950 DEC      60.     10.      6.     11.
+0100501      0100502      1951 OCT      70.     11.      7.     12.
+"""
+
+
+def write_report(tmp_path):
+    filename = str(tmp_path / "test.xdd")
+    with open(filename, "w") as f:
+        f.write(REPORT)
+    return filename
+
+
+def test_fixed_width_columns(tmp_path):
+    report = StateMod_TextReport(write_report(tmp_path), parameters=["Demand", "Divert", "Return", "Account"])
+    assert report.get_station_ids() == ["0100501", "0100503"]
+    values, dates = report.get_station_values("0100501")
+    expected = np.array([[10.0, 5.0, 1.0, np.nan],
+                         [20.0, np.nan, 2.0, 7.0],
+                         [30.0, 6.0, np.nan, np.nan],
+                         [70.0, 11.0, 7.0, 12.0]])
+    np.testing.assert_array_equal(values, expected)
+    divert, dates = report.get_values("0100503", "Divert")
+    np.testing.assert_array_equal(divert, [8.0, 9.0, 10.0])
+
+
+def test_water_year_dates(tmp_path):
+    report = StateMod_TextReport(write_report(tmp_path))
+    assert report.year_type == "WYR"
+    values, dates = report.get_station_values("0100501")
+    np.testing.assert_array_equal(dates, np.array(["1949-10", "1949-11", "1949-12", "1950-10"],
+                                                  dtype="datetime64[M]"))
+    report = StateMod_TextReport(write_report(tmp_path), year_type="CYR")
+    values, dates = report.get_station_values("0100501", start_year=1950, end_year=1950)
+    assert dates[0] == np.datetime64("1950-10")
+
+
+def test_index_not_saved_by_default(tmp_path):
+    filename = write_report(tmp_path)
+    report = StateMod_TextReport(filename)
+    assert not os.path.exists(report.get_index_filename())
+
+
+def test_index_directory(tmp_path):
+    filename = write_report(tmp_path)
+    index_directory = tmp_path / "index"
+    index_directory.mkdir()
+    report = StateMod_TextReport(filename, save_index=True, index_directory=str(index_directory))
+    assert os.path.dirname(report.get_index_filename()) == str(index_directory)
+    assert os.path.exists(report.get_index_filename())
+    saved = StateMod_TextReport(filename, index_directory=str(index_directory))
+    assert saved.read_index()
+    np.testing.assert_array_equal(saved.get_station_values("0100503")[0], report.get_station_values("0100503")[0])
+
+
+def test_index_write_error_ignored(tmp_path):
+    filename = write_report(tmp_path)
+    report = StateMod_TextReport(filename, save_index=True, index_directory=str(tmp_path / "missing"))
+    assert report.get_station_ids() == ["0100501", "0100503"]
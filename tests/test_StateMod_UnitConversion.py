@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from DWR.StateMod.StateMod_UnitConversion import StateMod_UnitConversion
+
+import ts_writer
+
+FACTOR = StateMod_UnitConversion.CFS_TO_ACFT_PER_DAY
+
+# February of a non-leap and a leap year, April and January
+DATES = np.array(["2001-02", "2000-02", "2001-04", "2001-01"], dtype="datetime64[M]")
+DAYS = np.array([28.0, 29.0, 30.0, 31.0])
+
+
+def test_days_per_time_step():
+    np.testing.assert_array_equal(StateMod_UnitConversion.get_days_per_time_step(DATES, False), DAYS)
+    np.testing.assert_array_equal(StateMod_UnitConversion.get_days_per_time_step(DATES, True), np.ones(4))
+
+
+def test_monthly_volume_and_rate():
+    acft = np.array([[100.0, 100.0, 100.0, 100.0]])
+    cfs = StateMod_UnitConversion.convert(acft, "ACFT", "CFS", DATES, False)
+    np.testing.assert_allclose(cfs, acft / (FACTOR * DAYS))
+    # The same volume is a higher rate in a shorter month
+    assert cfs[0, 0] > cfs[0, 1] > cfs[0, 2] > cfs[0, 3]
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(cfs, "CFS", "ACFT", DATES, False), acft)
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(acft, "AF", "CFS", DATES, False, factor=2.0),
+                               acft / (2.0 * DAYS))
+
+
+def test_rates():
+    cfs = np.array([10.0, 20.0, 30.0, 40.0])
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(cfs, "CFS", "CMS", DATES, False),
+                               cfs / StateMod_UnitConversion.CMS_TO_CFS)
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(cfs, "CFS", "AF/D", DATES, False), cfs * FACTOR)
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(cfs, "cms ", "AF/DAY", DATES, False),
+                               cfs * StateMod_UnitConversion.CMS_TO_CFS * FACTOR)
+    # Monthly AF/D to ACFT uses the days in the month
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(cfs, "AF/D", "ACFT", DATES, False), cfs * DAYS)
+
+
+def test_daily_uses_one_day():
+    dates = np.arange(np.datetime64("2000-02-27"), np.datetime64("2000-03-02"))
+    acft = np.full(len(dates), 19.835)
+    np.testing.assert_allclose(StateMod_UnitConversion.convert(acft, "ACFT", "CFS", dates, True), 10.0)
+
+
+def test_missing_values_are_not_converted():
+    values = np.array([[100.0, -999.0, np.nan, -999.0000001]])
+    converted = StateMod_UnitConversion.convert(values, "ACFT", "CFS", DATES, False)
+    assert converted[0, 0] == pytest.approx(100.0 / (FACTOR * 28.0))
+    assert converted[0, 1] == -999.0
+    assert np.isnan(converted[0, 2])
+    assert converted[0, 3] == -999.0000001
+    # The input is not modified
+    assert values[0, 0] == 100.0
+
+
+def test_same_and_unknown_units():
+    values = np.ones(4)
+    assert StateMod_UnitConversion.convert(values, "AF", "ACFT", DATES, False) is values
+    assert StateMod_UnitConversion.is_same_units("af/d", "AF/DAY")
+    assert not StateMod_UnitConversion.is_same_units("CFS", "CMS")
+    assert StateMod_UnitConversion.can_convert("ACFT", "cms")
+    assert not StateMod_UnitConversion.can_convert("ACFT", "IN")
+    with pytest.raises(ValueError):
+        StateMod_UnitConversion.get_multipliers("ACFT", "IN", DATES, False)
+
+
+def test_time_series_read_and_write_conversion(tmp_path):
+    pytest.importorskip("RTi")
+    from RTi.Util.Time.YearType import YearType
+    from DWR.StateMod.StateMod_TS import StateMod_TS
+    from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+
+    ids = ["A", "B"]
+    # Water years 2000 and 2001, which include February of a leap year
+    acft = np.round(np.random.default_rng(0).uniform(10.0, 500.0, (2, 24)), 2)
+    acft[1, 3] = np.nan
+    filename = str(tmp_path / "test.ddm")
+    ts_writer.write_monthly(filename, ids, acft, 2000, "WYR")
+    expected = StateMod_TSArray.read_statemod_file(filename)
+    factor = 1.98
+
+    tslist = StateMod_TS.read_time_series_list(filename, None, None, "CFS", True, factor=factor)
+    assert all(ts.get_data_units() == "CFS" for ts in tslist)
+    cfs = StateMod_TSArray.from_ts_list(tslist)
+    days = StateMod_UnitConversion.get_days_per_time_step(expected.get_dates(), False)
+    assert days[4] == 29.0
+    # -999 is not converted
+    np.testing.assert_allclose(cfs.get_values(),
+                               np.where(np.isnan(acft), -999.0, acft / (factor * days)))
+    np.testing.assert_allclose(cfs.get_values(),
+                               StateMod_TSArray.read_statemod_file(filename, units="CFS", factor=factor).get_values())
+
+    # Writing as ACFT gives the values that were read
+    output = str(tmp_path / "output.ddm")
+    with open(output, "w") as out:
+        StateMod_TS.write_time_series_list(out, tslist, None, None, YearType.WATER, -999.0, 2, False,
+                                           req_units="ACFT", factor=factor)
+    written = StateMod_TSArray.read_statemod_file(output)
+    assert written.units == "ACFT"
+    # One line per station for each year of the period
+    with open(output) as f:
+        assert len([line for line in f if line[:4].isdigit()]) == 4
+    np.testing.assert_array_equal(written.get_dates(), expected.get_dates())
+    np.testing.assert_allclose(written.get_values(), expected.get_values(), atol=0.005)
+    assert written.get_values()[1, 3] == -999.0
+
+
+def test_daily_time_series_read_and_write(tmp_path):
+    pytest.importorskip("RTi")
+    from RTi.Util.Time.YearType import YearType
+    from DWR.StateMod.StateMod_TS import StateMod_TS
+    from DWR.StateMod.StateMod_TSArray import StateMod_TSArray
+
+    cfs = np.round(np.random.default_rng(1).uniform(1.0, 50.0, (2, ts_writer.get_day_count(2000, 1))), 2)
+    cfs[0, 59] = np.nan
+    filename = str(tmp_path / "test.ddd")
+    ts_writer.write_daily(filename, ["A", "B"], cfs, 2000)
+
+    tslist = StateMod_TS.read_time_series_list(filename, None, None, "AF/D", True)
+    np.testing.assert_allclose(StateMod_TSArray.from_ts_list(tslist, True).get_values(),
+                               np.where(np.isnan(cfs), -999.0, cfs * FACTOR))
+    output = str(tmp_path / "output.ddd")
+    with open(output, "w") as out:
+        StateMod_TS.write_time_series_list(out, tslist, None, None, YearType.CALENDAR, -999.0, 2, False,
+                                           req_units="CFS")
+    written = StateMod_TSArray.read_statemod_file(output)
+    assert written.units == "CFS"
+    assert len(written.get_dates()) == 366
+    np.testing.assert_allclose(written.get_values(), np.where(np.isnan(cfs), -999.0, cfs), atol=0.005)
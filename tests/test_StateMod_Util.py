@@ -0,0 +1,41 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pytest
+
+from DWR.StateMod.StateMod_DataSetSource import StateMod_DataSetSource
+from DWR.StateMod.StateMod_Util import StateMod_Util
+
+TEXT = "# Test file\n0100501 10.0\n"
+
+COMPRESS = {".gz": gzip.compress, ".xz": lzma.compress, ".bz2": bz2.compress}
+
+
+def write_zip(tmp_path):
+    filename = str(tmp_path / "test.zip")
+    with zipfile.ZipFile(filename, "w") as z:
+        for extension, compress in COMPRESS.items():
+            z.writestr("test.txt" + extension, compress(TEXT.encode()))
+    return filename
+
+
+@pytest.mark.parametrize("extension", sorted(COMPRESS))
+@pytest.mark.parametrize("mode", ["r", "rb"])
+def test_compressed_member_is_closed(tmp_path, extension, mode):
+    with StateMod_DataSetSource.from_zip(write_zip(tmp_path)) as source:
+        members = []
+        zip_open = source.zip_file.open
+
+        def open_member(*args, **kwargs):
+            member = zip_open(*args, **kwargs)
+            members.append(member)
+            return member
+
+        source.zip_file.open = open_member
+        with StateMod_Util.open_file(source.get_path("test.txt" + extension), mode) as f:
+            data = f.read()
+        assert data == (TEXT if mode == "r" else TEXT.encode())
+        assert len(members) == 1
+        assert members[0].closed
@@ -0,0 +1,76 @@
+# Writer for small StateMod monthly and daily time series files, used only by the tests
+
+import calendar
+
+import numpy as np
+
+# First month of each year type
+YEAR_TYPE_START_MONTH = {"CYR": 1, "WYR": 10, "IYR": 11}
+
+
+def write_header(f, first_month, first_year, last_month, last_year, units, year_type):
+    f.write("#\n# StateMod time series for tests\n#\n#>EndHeader\n")
+    f.write("   %2d/%4d  -     %2d/%4d%5.5s%5.5s\n" %
+            (first_month, first_year, last_month, last_year, units, year_type))
+
+
+def write_monthly(filename, ids, values, first_year, year_type="CYR", units="ACFT"):
+    """
+    Write monthly time series for whole years.
+    :param filename: name of file to write.
+    :param ids: time series identifiers.
+    :param values: array of shape (len(ids), 12 * number of years), starting with the first month of the year type,
+    with NaN for missing values (written as -999).
+    :param first_year: first year, for the year type (a water year is the calendar year in which it ends).
+    :param year_type: "CYR", "WYR" or "IYR".
+    :param units: data units.
+    """
+    values = np.where(np.isnan(values), -999.0, values)
+    year_count = values.shape[1] // 12
+    start_month = YEAR_TYPE_START_MONTH[year_type]
+    offset = 0 if start_month == 1 else 1
+    last_month = 12 if start_month == 1 else start_month - 1
+    line_format = "%4d %-12.12s" + "%8.2f" * 12 + "%10.2f\n"
+    with open(filename, "w") as f:
+        write_header(f, start_month, first_year - offset, last_month, first_year + year_count - 1, units, year_type)
+        for iyear in range(year_count):
+            year_values = values[:, iyear * 12:(iyear + 1) * 12]
+            for k, ts_id in enumerate(ids):
+                f.write(line_format % ((first_year + iyear, ts_id) + tuple(year_values[k]) + (year_values[k].sum(),)))
+
+
+def write_daily(filename, ids, values, first_year, units="CFS"):
+    """
+    Write daily time series for whole calendar years.
+    :param filename: name of file to write.
+    :param ids: time series identifiers.
+    :param values: array of shape (len(ids), number of days), starting on January 1, with NaN for missing values.
+    :param first_year: first calendar year.
+    :param units: data units.
+    """
+    values = np.where(np.isnan(values), -999.0, values)
+    line_format = "%4d%4d %-12.12s" + "%8.2f" * 31 + "%10.2f\n"
+    padded = np.zeros((len(ids), 31))
+    with open(filename, "w") as f:
+        day = 0
+        year = first_year
+        months = []
+        while day < values.shape[1]:
+            for month in range(1, 13):
+                months.append((year, month, day))
+                day += calendar.monthrange(year, month)[1]
+            year += 1
+        write_header(f, 1, first_year, 12, year - 1, units, "CYR")
+        for year, month, day in months:
+            ndays = calendar.monthrange(year, month)[1]
+            padded[:, :ndays] = values[:, day:day + ndays]
+            padded[:, ndays:] = 0.0
+            for k, ts_id in enumerate(ids):
+                f.write(line_format % ((year, month, ts_id) + tuple(padded[k]) + (padded[k, :ndays].sum(),)))
+
+
+def get_day_count(first_year, year_count):
+    """
+    :return: number of days in whole calendar years.
+    """
+    return sum(366 if calendar.isleap(year) else 365 for year in range(first_year, first_year + year_count))